@@ -49,6 +49,7 @@ AUTH_USER_MODEL = 'SistemManagementInventar.Angajat'
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'SistemManagementInventar.middleware.CompresieRaspunsMiddleware',  # brotli / gzip peste prag
     'corsheaders.middleware.CorsMiddleware',           # sus, înainte de CommonMiddleware
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -66,8 +67,80 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated'
-    )
+    ),
+    # orjson când e instalat (altfel JSON-ul standard DRF) + MessagePack prin Accept: application/msgpack
+    'DEFAULT_RENDERER_CLASSES': [
+        'SistemManagementInventar.renderers.JSONRapidRenderer',
+        'SistemManagementInventar.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    # token bucket per utilizator și clasă de endpoint (LIMITARI_GALETI, mai jos)
+    'DEFAULT_THROTTLE_CLASSES': [
+        'SistemManagementInventar.throttling.LimitareGaleata',
+    ],
+}
+
+# Răspunsurile mai mici de atât nu sunt comprimate (nu merită costul CPU)
+COMPRESIE_PRAG_OCTETI = 1024
+COMPRESIE_BROTLI_CALITATE = 5
+
+# Sarcinile în fundal (comanda ruleaza_sarcini): după cât timp o sarcină rămasă în rulare
+# este considerată abandonată și de câte ori se reîncearcă
+SARCINI_TIMEOUT_SECUNDE = 600
+SARCINI_INCERCARI_MAXIME = 3
+
+# /api/sync/: rândurile modificate în ultimele secunde sunt trimise în lotul următor
+# (o tranzacție încă deschisă poate confirma mai târziu un rând cu data_modificare mai veche)
+SYNC_MARJA_SECUNDE = 2
+
+# /api/evenimente/ (server-sent events): evenimente ținute per conexiune înainte ca un client
+# lent să primească "resincronizare", și intervalul heartbeat-ului pe conexiunile inactive
+EVENIMENTE_DIMENSIUNE_COADA = 100
+EVENIMENTE_HEARTBEAT_SECUNDE = 15
+# releul dintre procese (evenimente.py): cât de des citește fiecare proces evenimentele noi, cât de
+# în urmă recitește (commit-uri întârziate) și cât timp rămân rândurile EvenimentFlux în tabelă
+EVENIMENTE_SONDARE_SECUNDE = 0.5
+EVENIMENTE_MARJA_SECUNDE = 5
+EVENIMENTE_PASTRARE_SECUNDE = 600
+
+# /api/prognoza_stoc/: termenul implicit de livrare (zile) și factorul z al stocului de siguranță
+# (1.65 ~ 95% probabilitate să nu rămânem fără stoc pe durata livrării)
+PROGNOZA_ZILE_LIVRARE = 7
+PROGNOZA_Z_SERVICIU = 1.65
+
+# arhiveaza_facturi: facturile mai vechi de atâtea zile sunt mutate în tabelele de arhivă
+ARHIVA_ZILE_PASTRARE = 365
+
+# Limitarea cererilor (token bucket) per utilizator și clasă de endpoint (throttle_scope al view-ului):
+# clasă -> (capacitate = rafala maximă, jetoane reumplute pe secundă); None = nelimitat
+LIMITARI_GALETI = {
+    'dashboard': (10, 0.2),     # 10 cereri în rafală, apoi una la 5 secunde
+    'rapoarte': (20, 0.5),      # rapoarte, analize, clasamente, prognoză
+    'export': (5, 1 / 60),      # 5 exporturi, apoi unul pe minut
+    'catalog': (300, 20),       # produse / furnizori / sync: citiri ieftine, paginate
+    'implicit': (100, 5),
 }
+# 'proces' (găleți în memoria fiecărui worker) sau 'cache' (cache-ul Django, comun workerilor
+# când CACHES este Redis / Memcached)
+LIMITARI_STOCARE = 'proces'
+
+# Idempotency-Key pe endpoint-urile de creare: cât timp (ore) o cheie returnează răspunsul salvat;
+# după aceea este ștearsă de comanda curata_chei_idempotenta
+IDEMPOTENTA_ORE_PASTRARE = 24
+
+# fragmenteaza_stoc: pe câte rânduri FragmentStoc se împarte implicit stocul unui produs foarte vândut
+STOC_NUMAR_FRAGMENTE = 8
+# după o vânzare dintr-un fragment, stoc_total se sincronizează în fundal (sarcina sincronizeaza_stoc_fragmentat);
+# cât timp una este programată nu se mai adaugă alta, cel mult atâtea secunde (dacă lucrătorul nu o preia)
+STOC_SINCRONIZARE_SECUNDE = 300
+
+# Încălzirea worker-ilor la pornire (gunicorn.conf.py / incalzire.py): tipurile de sarcini memorate
+# calculate înainte de prima cerere
+INCALZIRE_SARCINI = ('acasa',)
+
+# Potrivirea cererilor clienților cu produsele intrate în stoc (potriviri.py): fracția minimă din
+# cuvintele cererii care trebuie regăsite în numele / tipul produsului
+POTRIVIRI_SCOR_MINIM = 0.6
 
 ROOT_URLCONF = 'SistemDeManagementInventar.urls'
 
@@ -89,6 +162,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'SistemDeManagementInventar.wsgi.application'
+# serverul de producție (gunicorn.conf.py, worker-i uvicorn); WSGI rămâne pentru runserver și teste
+ASGI_APPLICATION = 'SistemDeManagementInventar.asgi.application'
 
 
 # Database
@@ -115,6 +190,21 @@ else:
 
 
 
+# Cache comun tuturor proceselor (workerii gunicorn, ruleaza_sarcini, comenzile de management):
+# rezultatele sarcinilor și lunile închise ale rapoartelor sunt șterse sau invalidate de procesul
+# care a făcut scrierea (versiunile sunt în tabela VersiuneRezultate), iar celelalte procese trebuie
+# să vadă invalidarea. Cache-ul implicit
+# (LocMemCache) este separat pentru fiecare proces, deci aici folosim o tabelă în baza de date,
+# creată cu `python manage.py createcachetable` (build.sh).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'cache_aplicatie',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -40,6 +40,12 @@ router.register(
     views.ContFurnizorViewSet,
     basename="contfurnizor"
 )
+router.register(
+    # Soldul curent al fiecărui furnizor, întreținut din tranzacțiile contfurnizor
+    "sold_furnizor",
+    views.SoldFurnizorViewSet,
+    basename="sold_furnizor"
+)
 router.register(
     "angajat",
     views.AngajatViewSet,
@@ -63,11 +69,29 @@ router.register(
     views.GenerareFacturaViewSet,
     basename="api_generare_factura"
 )
+router.register(
+    # Facturile cu liniile și totalurile lor (doar citire)
+    "factura",
+    views.FacturaViewSet,
+    basename="factura"
+)
 router.register(
     "cerere_client",
     views.CerereClientViewSet,
     basename="cerere_client"
 )
+router.register(
+    # Sarcini în fundal: trimitere, listare și stare (rezultatul are rută separată, mai jos)
+    "sarcini",
+    views.SarcinaViewSet,
+    basename="sarcini"
+)
+router.register(
+    # Potrivirile cererilor clienților cu produsele intrate în stoc (listare, respingere)
+    "potriviri_cereri",
+    views.PotrivireCerereViewSet,
+    basename="potriviri_cereri"
+)
 router.register(
     # ViewSet pentru date „de acasă” (dashboard, statistici etc.)
     "api_acasa",
@@ -127,4 +151,100 @@ urlpatterns = [
         views.SalariuAngajatByAngIDViewSet.as_view(),
         name='angajat_salariuby_id'
     ),
+
+    # Export contabil în flux (CSV / XLSX), filtrabil pe interval de date
+    # ex: GET /api/export/facturi/?tip=xlsx&data_start=2025-05-01&data_end=2025-05-31
+    path(
+        'api/export/<str:resursa>/',
+        views.ExportViewSet.as_view(),
+        name='export'
+    ),
+
+    # Import în masă al produselor din CSV / JSON (cu upsert opțional)
+    # ex: POST /api/import_produse/?upsert=1
+    path(
+        'api/import_produse/',
+        views.ImportProduseViewSet.as_view(),
+        name='import_produse'
+    ),
+
+    # Raportul de vechime al datoriilor către furnizori
+    # ex: GET /api/raport_vechime_furnizori/?data=2025-06-30
+    path(
+        'api/raport_vechime_furnizori/',
+        views.RaportVechimeFurnizoriViewSet.as_view(),
+        name='raport_vechime_furnizori'
+    ),
+
+    # Raport de salarii pe lună / an, pe angajat și pe firmă
+    # ex: GET /api/raport_salarii/?an=2025&granularitate=luna&id_angajat=3
+    path(
+        'api/raport_salarii/',
+        views.RaportSalariiViewSet.as_view(),
+        name='raport_salarii'
+    ),
+
+    # Rezultatul unei sarcini în fundal (202 cât timp nu este finalizată)
+    # ex: GET /api/sarcini/12/rezultat/
+    path(
+        'api/sarcini/<int:pk>/rezultat/',
+        views.SarcinaRezultatViewSet.as_view({'get': 'retrieve'}),
+        name='sarcini_rezultat'
+    ),
+
+    # Sincronizare incrementală: doar ce s-a modificat / șters după cursor
+    # ex: GET /api/sync/?since=eyJwcm9kdXMiOi4uLn0&lot=500
+    path(
+        'api/sync/',
+        views.SyncViewSet.as_view(),
+        name='sync'
+    ),
+
+    # Flux server-sent events: stoc modificat, facturi și cereri noi (servit prin asgi.py)
+    # ex: GET /api/evenimente/?tipuri=stoc,cerere_noua&token=<access token>
+    path(
+        'api/evenimente/',
+        views.EvenimenteViewSet.as_view(),
+        name='evenimente'
+    ),
+
+    # Prognoza stocului: zile de stoc rămase și punct de reaprovizionare, cele mai urgente primele
+    # ex: GET /api/prognoza_stoc/?pagina=1&dimensiune=50&zile_livrare=10
+    path(
+        'api/prognoza_stoc/',
+        views.PrognozaStocViewSet.as_view(),
+        name='prognoza_stoc'
+    ),
+
+    # Analize vânzări pe zi / săptămână / lună, grupate pe produs, tip_produs sau furnizor
+    # ex: GET /api/analize_vanzari/?data_start=2025-01-01&data_end=2025-06-30&granularitate=luna&grupare=furnizor
+    path(
+        'api/analize_vanzari/',
+        views.AnalizeVanzariViewSet.as_view(),
+        name='analize_vanzari'
+    ),
+
+    # Clasamente: primele N produse / furnizori / clienți după vânzări, bucăți sau marjă
+    # ex: GET /api/clasament/?entitate=client&criteriu=vanzari&zile=30&n=10
+    path(
+        'api/clasament/',
+        views.ClasamentViewSet.as_view(),
+        name='clasament'
+    ),
+
+    # Statisticile limitării cererilor: limite, acceptate / respinse pe clasă de endpoint (doar admin)
+    # ex: GET /api/limitari/
+    path(
+        'api/limitari/',
+        views.LimitariViewSet.as_view(),
+        name='limitari'
+    ),
+
+    # Filtrarea produselor după atribute și tip, cu numărul de produse pe valorile atributelor rămase
+    # ex: GET /api/filtrare_atribute/?atribut[concentratie]=500mg&tip_produs=Medicamente
+    path(
+        'api/filtrare_atribute/',
+        views.FiltrareAtributeViewSet.as_view(),
+        name='filtrare_atribute'
+    ),
 ]
@@ -1,18 +1,268 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
 from SistemManagementInventar.models import (
     Furnizor, Produs, DetaliiProdus, Angajat, Client, Factura,
-    SalariuAngajat, DetaliiFactura, CerereClient, ContFurnizor, BancaFurnizor, BancaAngajat
+    SalariuAngajat, DetaliiFactura, CerereClient, ContFurnizor, BancaFurnizor, BancaAngajat,
+    SoldFurnizor, Sarcina, StergereSync, VanzareZilnica, VanzareZilnicaClient, ProgresAgregare, TotalFereastra,
+    FacturaArhiva, DetaliiFacturaArhiva, CheieIdempotenta, FragmentStoc, TokenCerere, PotrivireCerere,
+    VersiuneRezultate, EvenimentFlux
 )
+
+# Sub atâtea rânduri estimate, numărarea exactă este destul de ieftină
+PRAG_NUMARARE_EXACTA = 10000
+
+
+def numar_estimat_randuri(model, alias='default'):
+    """
+    Numărul de rânduri al tabelei din statisticile bazei de date (fără COUNT(*)), sau None dacă
+    nu există statistici: pg_class.reltuples în PostgreSQL, sqlite_stat1 (după ANALYZE) în SQLite.
+    """
+    conexiune = connections[alias]
+    tabela = model._meta.db_table
+    with conexiune.cursor() as cursor:
+        if conexiune.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+                           [conexiune.ops.quote_name(tabela)])
+        elif conexiune.vendor == 'sqlite':
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            # primul număr din stat = rândurile tabelei (pe orice rând al ei, al tabelei sau al unui index)
+            cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [tabela])
+        else:
+            return None
+        rand = cursor.fetchone()
+    if rand is None or rand[0] is None:
+        return None
+    numar = int(str(rand[0]).split()[0])
+    return numar if numar >= 0 else None
+
+
+class PaginatorEstimat(Paginator):
+    """Pentru listele nefiltrate ale tabelelor mari, numărul de rânduri vine din statistici, nu din COUNT(*)."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimat = numar_estimat_randuri(queryset.model, queryset.db)
+            if estimat is not None and estimat > PRAG_NUMARARE_EXACTA:
+                return estimat
+        return super().count
+
+
+class AdminTabelMare(admin.ModelAdmin):
+    """
+    Admin pentru tabelele mari:
+    - număr de rânduri estimat și fără al doilea COUNT(*) pentru "total"
+    - relațiile din list_display aduse prin JOIN (list_select_related), nu câte o interogare pe rând
+    - FK-urile editate prin raw_id_fields / autocomplete, nu prin <select> cu toată tabela
+    - căutare doar pe coloane indexate: un termen numeric caută exact după id-uri (campuri_cautare_id),
+      restul după prefix (search_fields cu __startswith, care poate folosi indexul)
+    """
+    paginator = PaginatorEstimat
+    show_full_result_count = False
+    list_per_page = 50
+    campuri_cautare_id = ('id',)
+
+    def get_search_results(self, request, queryset, search_term):
+        termen = search_term.strip()
+        if termen.isdigit() and self.campuri_cautare_id:
+            conditii = Q.create([(camp, int(termen)) for camp in self.campuri_cautare_id], connector=Q.OR)
+            return queryset.filter(conditii), False
+        return super().get_search_results(request, queryset, search_term)
+
+
+class AdminDoarCitire(admin.ModelAdmin):
+    """Tabele derivate, întreținute de aplicație: în admin se pot doar consulta, nu și modifica."""
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class SoldFurnizorAdmin(AdminDoarCitire):
+    # soldurile sunt calculate din ContFurnizor (solduri.py); se corectează cu reconstruieste_solduri
+    list_display = ('id_furnizor', 'total_debit', 'total_credit', 'sold_net', 'data_ultima_tranzactie')
+    list_select_related = ('id_furnizor',)
+
+
+class FragmentStocAdmin(AdminDoarCitire):
+    # fragmentele se modifică doar prin stocuri.py (fragmenteaza_stoc / defragmenteaza_stoc / vânzări)
+    list_display = ('id_produs', 'index', 'cantitate')
+    list_select_related = ('id_produs',)
+
+
+class FurnizorAdmin(admin.ModelAdmin):
+    list_display = ('id', 'nume', 'nr_telefon', 'email')
+    search_fields = ('nume__startswith',)
+
+
+class ClientAdmin(AdminTabelMare):
+    list_display = ('id', 'nume', 'contact', 'adresa')
+    search_fields = ('nume__startswith',)
+
+
+class ProdusAdmin(AdminTabelMare):
+    list_display = ('id', 'nume', 'nr_lot', 'tip_produs', 'id_furnizor', 'stoc_total', 'pret_vanzare', 'data_expirare')
+    list_select_related = ('id_furnizor',)
+    autocomplete_fields = ('id_furnizor',)
+    search_fields = ('nume__startswith',)
+    date_hierarchy = 'data_expirare'
+
+
+class DetaliiProdusAdmin(AdminTabelMare):
+    list_display = ('id', 'id_produs', 'nume_atribut', 'valoare_atribut', 'unitate_masura')
+    list_select_related = ('id_produs',)
+    autocomplete_fields = ('id_produs',)
+    search_fields = ('nume_atribut__startswith',)
+    campuri_cautare_id = ('id', 'id_produs')
+
+
+class FacturaAdmin(AdminTabelMare):
+    list_display = ('id', 'id_client', 'data_adaugare')
+    list_select_related = ('id_client',)
+    raw_id_fields = ('id_client',)
+    search_fields = ('id_client__nume__startswith',)
+    campuri_cautare_id = ('id', 'id_client')
+    date_hierarchy = 'data_adaugare'
+
+
+class DetaliiFacturaAdmin(AdminTabelMare):
+    list_display = ('id', 'id_factura', 'id_produs', 'cantitate', 'data_adaugare')
+    list_select_related = ('id_factura', 'id_produs')
+    raw_id_fields = ('id_factura',)
+    autocomplete_fields = ('id_produs',)
+    search_fields = ('id_produs__nume__startswith',)
+    campuri_cautare_id = ('id', 'id_factura', 'id_produs')
+    date_hierarchy = 'data_adaugare'
+
+
+class SalariuAngajatAdmin(AdminTabelMare):
+    list_display = ('id', 'id_angajat', 'data_salariu', 'suma_salariu')
+    list_select_related = ('id_angajat',)
+    raw_id_fields = ('id_angajat',)
+    campuri_cautare_id = ('id', 'id_angajat')
+
+
+class ContFurnizorAdmin(AdminTabelMare):
+    list_display = ('id', 'id_furnizor', 'tip_tranzactie', 'suma_tranzactie', 'data_tranzactie', 'modalitate_plata')
+    list_select_related = ('id_furnizor',)
+    raw_id_fields = ('id_furnizor',)
+    campuri_cautare_id = ('id', 'id_furnizor')
+
+
+# Tabelele generate de aplicație (marcaje sync, index, rollup-uri, potriviri): mari și doar de consultat
+class StergereSyncAdmin(AdminDoarCitire, AdminTabelMare):
+    list_display = ('id', 'model', 'id_obiect', 'data_modificare')
+
+
+class TokenCerereAdmin(AdminDoarCitire, AdminTabelMare):
+    list_display = ('id', 'token', 'id_cerere', 'nr_tokenuri')
+    list_select_related = ('id_cerere',)
+    search_fields = ('token__startswith',)
+    campuri_cautare_id = ('id', 'id_cerere')
+
+
+class VanzareZilnicaAdmin(AdminDoarCitire, AdminTabelMare):
+    list_display = ('id', 'data', 'id_produs', 'cantitate', 'valoare_vanzare', 'valoare_cumparare')
+    list_select_related = ('id_produs',)
+    campuri_cautare_id = ('id', 'id_produs')
+    date_hierarchy = 'data'
+
+
+class VanzareZilnicaClientAdmin(AdminDoarCitire, AdminTabelMare):
+    list_display = ('id', 'data', 'id_client', 'cantitate', 'valoare_vanzare', 'valoare_cumparare')
+    list_select_related = ('id_client',)
+    campuri_cautare_id = ('id', 'id_client')
+    date_hierarchy = 'data'
+
+
+class PotrivireCerereAdmin(AdminDoarCitire, AdminTabelMare):
+    list_display = ('id', 'id_cerere', 'id_produs', 'scor', 'data_potrivire')
+    list_select_related = ('id_cerere', 'id_produs')
+    campuri_cautare_id = ('id', 'id_cerere', 'id_produs')
+    date_hierarchy = 'data_potrivire'
+
+
+class SarcinaAdmin(AdminDoarCitire, AdminTabelMare):
+    list_display = ('id', 'tip', 'stare', 'incercari', 'lucrator', 'id_angajat', 'data_adaugare', 'data_final')
+    list_select_related = ('id_angajat',)
+    list_filter = ('stare',)
+    campuri_cautare_id = ('id', 'id_angajat')
+
+
+class CheieIdempotentaAdmin(AdminDoarCitire, AdminTabelMare):
+    list_display = ('id', 'id_angajat', 'ruta', 'cheie', 'cod_raspuns', 'data_adaugare', 'data_expirare')
+    list_select_related = ('id_angajat',)
+    campuri_cautare_id = ('id', 'id_angajat')
+    date_hierarchy = 'data_expirare'
+
+
+class ProgresAgregareAdmin(AdminDoarCitire, AdminTabelMare):
+    # cheia primară este textul agregării: fără căutare după id-uri
+    list_display = ('cheie', 'pana_la')
+    search_fields = ('cheie__startswith',)
+    campuri_cautare_id = ()
+
+
+class TotalFereastraAdmin(AdminDoarCitire, AdminTabelMare):
+    list_display = ('id', 'zile', 'id_produs', 'id_client', 'cantitate', 'valoare_vanzare', 'valoare_cumparare')
+    list_select_related = ('id_produs', 'id_client')
+    campuri_cautare_id = ('id', 'id_produs', 'id_client')
+
+
+class FacturaArhivaAdmin(AdminTabelMare):
+    list_display = ('id', 'id_client', 'data_adaugare', 'data_arhivare')
+    list_select_related = ('id_client',)
+    raw_id_fields = ('id_client',)
+    search_fields = ('id_client__nume__startswith',)
+    campuri_cautare_id = ('id', 'id_client')
+    date_hierarchy = 'data_adaugare'
+
+
+class DetaliiFacturaArhivaAdmin(AdminTabelMare):
+    list_display = ('id', 'id_factura', 'id_produs', 'cantitate', 'data_adaugare')
+    list_select_related = ('id_factura', 'id_produs')
+    raw_id_fields = ('id_factura', 'id_produs')
+    campuri_cautare_id = ('id', 'id_factura', 'id_produs')
+    date_hierarchy = 'data_adaugare'
+
+
 # Register your models here.
-admin.site.register(Furnizor)
-admin.site.register(Produs)
-admin.site.register(DetaliiProdus)
+admin.site.register(Furnizor, FurnizorAdmin)
+admin.site.register(Produs, ProdusAdmin)
+admin.site.register(DetaliiProdus, DetaliiProdusAdmin)
 admin.site.register(Angajat)
-admin.site.register(Client)
-admin.site.register(Factura)
-admin.site.register(SalariuAngajat)
-admin.site.register(DetaliiFactura)
+admin.site.register(Client, ClientAdmin)
+admin.site.register(Factura, FacturaAdmin)
+admin.site.register(SalariuAngajat, SalariuAngajatAdmin)
+admin.site.register(DetaliiFactura, DetaliiFacturaAdmin)
 admin.site.register(CerereClient)
-admin.site.register(ContFurnizor)
+admin.site.register(ContFurnizor, ContFurnizorAdmin)
 admin.site.register(BancaFurnizor)
-admin.site.register(BancaAngajat)
\ No newline at end of file
+admin.site.register(BancaAngajat)
+admin.site.register(SoldFurnizor, SoldFurnizorAdmin)
+admin.site.register(Sarcina, SarcinaAdmin)
+admin.site.register(StergereSync, StergereSyncAdmin)
+admin.site.register(VanzareZilnica, VanzareZilnicaAdmin)
+admin.site.register(VanzareZilnicaClient, VanzareZilnicaClientAdmin)
+admin.site.register(ProgresAgregare, ProgresAgregareAdmin)
+admin.site.register(TotalFereastra, TotalFereastraAdmin)
+admin.site.register(FacturaArhiva, FacturaArhivaAdmin)
+admin.site.register(DetaliiFacturaArhiva, DetaliiFacturaArhivaAdmin)
+admin.site.register(CheieIdempotenta, CheieIdempotentaAdmin)
+admin.site.register(FragmentStoc, FragmentStocAdmin)
+admin.site.register(TokenCerere, TokenCerereAdmin)
+admin.site.register(PotrivireCerere, PotrivireCerereAdmin)
+admin.site.register(VersiuneRezultate, AdminDoarCitire)
+admin.site.register(EvenimentFlux, AdminDoarCitire)
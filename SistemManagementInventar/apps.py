@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class SistemmanagementinventarConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'SistemManagementInventar'
+
+    def ready(self):
+        # semnalele de invalidare și modulele care își înregistrează tipurile de sarcini
+        from SistemManagementInventar import arhiva, fatete, idempotenta, potriviri, prognoza, rapoarte, signals, \
+            solduri, stocuri, vanzari  # noqa: F401
@@ -0,0 +1,83 @@
+# arhiva.py
+# Arhivarea facturilor vechi: Factura / DetaliiFactura -> FacturaArhiva / DetaliiFacturaArhiva.
+# - tabelele calde rămân mici (doar facturile recente), deci interogările de zi cu zi ating
+#   puține pagini, care rămân în cache-ul bazei de date
+# - înainte de mutare rollup-ul vânzărilor este adus la zi și se arhivează doar zilele deja
+#   agregate, deci rapoartele (care citesc din rollup-uri) nu pierd nimic
+# - mutarea se face în loturi (keyset după id), fiecare lot într-o tranzacție: copiere + ștergere
+# - facturile își păstrează id-ul; ultima factură (și factura ultimei linii) rămân mereu în
+#   tabelele calde, ca SQLite să nu refolosească un id deja mutat în arhivă
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from SistemManagementInventar import signals, vanzari
+from SistemManagementInventar.models import DetaliiFactura, DetaliiFacturaArhiva, Factura, FacturaArhiva
+from SistemManagementInventar.sarcini import param_boolean, param_data, param_intreg, tip_sarcina
+
+DIMENSIUNE_LOT_ARHIVARE = 500
+
+
+def data_limita_implicita():
+    return timezone.localdate() - timedelta(days=getattr(settings, 'ARHIVA_ZILE_PASTRARE', 365))
+
+
+def _id_uri_pastrate():
+    """Facturile care nu se arhivează niciodată: cea cu id-ul maxim și cea a liniei cu id-ul maxim."""
+    pastrate = set(Factura.objects.order_by('-id').values_list('id', flat=True)[:1])
+    pastrate.update(DetaliiFactura.objects.order_by('-id').values_list('id_factura', flat=True)[:1])
+    return pastrate
+
+
+@tip_sarcina('arhiveaza_facturi', memoreaza=False, doar_admin=True, parametri={
+    'inainte_de': param_data, 'dimensiune_lot': param_intreg, 'simulare': param_boolean,
+})
+def arhiveaza_facturi(inainte_de=None, dimensiune_lot=DIMENSIUNE_LOT_ARHIVARE, simulare=False):
+    """
+    Mută în arhivă facturile adăugate înainte de ziua inainte_de (implicit: mai vechi de
+    ARHIVA_ZILE_PASTRARE zile), împreună cu liniile lor.
+    Returnează {'pana_la', 'facturi', 'linii'}.
+    """
+    inainte_de = inainte_de or data_limita_implicita()
+    vanzari.actualizeaza_vanzari_zilnice()
+    ultima = vanzari.ultima_zi_agregata()
+    raport = {'pana_la': None, 'facturi': 0, 'linii': 0}
+    if ultima is None:
+        return raport
+    # doar zilele deja agregate în rollup pot părăsi tabelele calde
+    limita = min(inainte_de, ultima + timedelta(days=1))
+    raport['pana_la'] = limita - timedelta(days=1)
+
+    facturi = Factura.objects.filter(data_adaugare__lt=vanzari.inceput_zi(limita)).exclude(id__in=_id_uri_pastrate())
+    ultimul_id = 0
+    while True:
+        lot = list(facturi.filter(id__gt=ultimul_id).order_by('id')[:dimensiune_lot])
+        if not lot:
+            return raport
+        ultimul_id = lot[-1].id
+        id_uri = [factura.id for factura in lot]
+        linii = list(DetaliiFactura.objects.filter(id_factura__in=id_uri))
+        raport['facturi'] += len(lot)
+        raport['linii'] += len(linii)
+        if simulare:
+            continue
+
+        # semnalele de ștergere ale fiecărei facturi / linii doar se adună; invalidarea se face o dată pe lot
+        with transaction.atomic(), signals.scrieri_in_bloc():
+            FacturaArhiva.objects.bulk_create([
+                FacturaArhiva(id=factura.id, id_client_id=factura.id_client_id, data_adaugare=factura.data_adaugare,
+                              data_modificare=factura.data_modificare)
+                for factura in lot
+            ], batch_size=dimensiune_lot)
+            DetaliiFacturaArhiva.objects.bulk_create([
+                DetaliiFacturaArhiva(id=linie.id, id_factura_id=linie.id_factura_id, id_produs_id=linie.id_produs_id,
+                                     cantitate=linie.cantitate, pret_cumparare=linie.pret_cumparare,
+                                     pret_vanzare=linie.pret_vanzare, tva_produs=linie.tva_produs,
+                                     data_adaugare=linie.data_adaugare,
+                                     data_modificare=linie.data_modificare)
+                for linie in linii
+            ], batch_size=2000)
+            # ștergerea facturilor șterge în cascadă și liniile
+            Factura.objects.filter(id__in=id_uri).delete()
@@ -0,0 +1,117 @@
+# clienti.py
+# Identificarea clienților după o cheie normalizată (nume + contact), ca un client care
+# revine să nu mai fie inserat din nou la fiecare factură.
+# Cheia este salvată în Client.cheie_unica (index unic), deci get_or_create rămâne corect și
+# când două facturi pentru același client nou sunt generate în paralel: una inserează, cealaltă
+# primește IntegrityError și citește rândul deja creat.
+import hashlib
+import re
+import unicodedata
+
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+from django.utils import timezone
+
+from SistemManagementInventar import vanzari
+from SistemManagementInventar.models import Client, Factura, FacturaArhiva
+
+DIMENSIUNE_LOT_UNIFICARE = 1000
+
+
+def _normalizeaza_text(text):
+    """'  Ionescu   ȘTEFAN ' -> 'ionescu stefan' (fără diacritice, spații comprimate)"""
+    text = unicodedata.normalize('NFKD', str(text or ''))
+    text = ''.join(caracter for caracter in text if not unicodedata.combining(caracter))
+    return ' '.join(text.lower().split())
+
+
+def _normalizeaza_contact(contact):
+    """Emailul se compară fără majuscule și spații; un telefon doar după cifre."""
+    contact = _normalizeaza_text(contact)
+    if '@' in contact:
+        return contact.replace(' ', '')
+    cifre = re.sub(r'\D', '', contact)
+    return cifre or contact
+
+
+def cheie_client(nume, contact):
+    baza = f"{_normalizeaza_text(nume)}|{_normalizeaza_contact(contact)}"
+    return hashlib.sha256(baza.encode('utf-8')).hexdigest()
+
+
+def obtine_sau_creeaza_client(nume, adresa, contact):
+    """
+    Returnează (client, creat). Un client existent își păstrează datele, doar adresa se
+    actualizează dacă s-a schimbat (ultima adresă folosită pe factură).
+    """
+    client, creat = Client.objects.get_or_create(
+        cheie_unica=cheie_client(nume, contact),
+        defaults={'nume': nume, 'adresa': adresa, 'contact': contact},
+    )
+    if not creat and adresa and client.adresa != adresa:
+        client.adresa = adresa
+        client.save(update_fields=['adresa', 'data_modificare'])
+    return client, creat
+
+
+def unifica_clienti(dimensiune_lot=DIMENSIUNE_LOT_UNIFICARE, simulare=False):
+    """
+    Unifică duplicatele existente: parcurge clienții fără cheie în loturi (după id), le calculează
+    cheia, mută facturile duplicatelor pe clientul canonic (cel mai vechi / cel care are deja
+    cheia) și șterge duplicatele. Fiecare lot rulează în propria tranzacție; la final se
+    recalculează rollup-ul vânzărilor clienților canonici.
+    Returnează {'procesati', 'unificati', 'facturi_mutate'}.
+    """
+    raport = {'procesati': 0, 'unificati': 0, 'facturi_mutate': 0}
+    marcati_in_simulare = {}
+    canonici_cu_facturi_mutate = set()
+    ultimul_id = 0
+    while True:
+        lot = list(Client.objects.filter(cheie_unica__isnull=True, id__gt=ultimul_id)
+                   .order_by('id').only('id', 'nume', 'contact')[:dimensiune_lot])
+        if not lot:
+            # rollup-ul vânzărilor pe client trebuie să includă și facturile mutate
+            vanzari.reagrega_clienti(canonici_cu_facturi_mutate)
+            return raport
+        ultimul_id = lot[-1].id
+        raport['procesati'] += len(lot)
+
+        chei = {client.id: cheie_client(client.nume, client.contact) for client in lot}
+        canonici = dict(Client.objects.filter(cheie_unica__in=set(chei.values())).values_list('cheie_unica', 'id'))
+        # în simulare nu se scrie nimic, deci canonicii din loturile anterioare sunt ținuți în memorie
+        canonici.update({cheie: marcati_in_simulare[cheie] for cheie in chei.values() if cheie in marcati_in_simulare})
+
+        de_marcat, duplicate = [], {}
+        for client in lot:
+            cheie = chei[client.id]
+            if cheie in canonici:
+                duplicate[client.id] = canonici[cheie]
+            else:
+                canonici[cheie] = client.id
+                client.cheie_unica = cheie
+                de_marcat.append(client)
+
+        raport['unificati'] += len(duplicate)
+        if simulare:
+            raport['facturi_mutate'] += sum(model.objects.filter(id_client__in=list(duplicate)).count()
+                                            for model in (Factura, FacturaArhiva))
+            marcati_in_simulare.update({client.cheie_unica: client.id for client in de_marcat})
+            continue
+
+        with transaction.atomic():
+            if duplicate:
+                # facturile arhivate se mută la fel, altfel ar fi șterse în cascadă odată cu duplicatul
+                for model in (Factura, FacturaArhiva):
+                    raport['facturi_mutate'] += model.objects.filter(id_client__in=list(duplicate)).update(
+                        id_client=Case(
+                            *[When(id_client=duplicat, then=Value(canonic)) for duplicat, canonic in duplicate.items()],
+                            output_field=IntegerField(),
+                        ),
+                        data_modificare=timezone.now(),
+                    )
+                Client.objects.filter(id__in=list(duplicate)).delete()
+                canonici_cu_facturi_mutate.update(duplicate.values())
+            acum = timezone.now()
+            for client in de_marcat:
+                client.data_modificare = acum
+            Client.objects.bulk_update(de_marcat, ['cheie_unica', 'data_modificare'], batch_size=dimensiune_lot)
@@ -0,0 +1,188 @@
+# evenimente.py
+# Pub/sub pentru fluxul server-sent events (/api/evenimente/):
+# - căile de scriere publică evenimente (stoc, factură nouă, cerere nouă) după commit, ca rânduri
+#   EvenimentFlux: procesul care scrie nu este neapărat cel care ține conexiunea SSE a clientului
+# - în fiecare proces cu abonați, ReleuEvenimente citește periodic rândurile noi și le dă hub-ului
+#   local; rândurile cu data_creare în ultimele EVENIMENTE_MARJA_SECUNDE sunt recitite la fiecare
+#   pas (un id mai mic poate fi confirmat după unul mai mare), iar cele deja livrate sunt sărite
+# - fiecare conexiune SSE are propria coadă asyncio, limitată: un client lent nu blochează
+#   publicarea și nu consumă memorie nelimitată; la depășire coada este golită și clientul
+#   primește un singur eveniment "resincronizare" (trebuie să reîncarce datele)
+# - pe conexiunile fără trafic se trimite periodic un heartbeat (comentariu SSE)
+# Conexiunile SSE rămân deschise, deci fluxul cere un server ASGI: gunicorn.conf.py pornește
+# worker-i uvicorn (`gunicorn SistemDeManagementInventar.asgi:application`). Sub un server WSGI
+# un generator infinit ar ține ocupat un worker pentru fiecare client, deci endpoint-ul răspunde 501.
+import asyncio
+import json
+import logging
+import threading
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from SistemManagementInventar.models import EvenimentFlux
+
+logger = logging.getLogger(__name__)
+
+EVENIMENT_STOC = 'stoc'
+EVENIMENT_FACTURA_NOUA = 'factura_noua'
+EVENIMENT_CERERE_NOUA = 'cerere_noua'
+EVENIMENT_RESINCRONIZARE = 'resincronizare'
+TIPURI_EVENIMENTE = (EVENIMENT_STOC, EVENIMENT_FACTURA_NOUA, EVENIMENT_CERERE_NOUA)
+
+
+class Abonat:
+    def __init__(self, loop, tipuri, dimensiune_coada):
+        self.loop = loop
+        self.tipuri = set(tipuri)
+        self.coada = asyncio.Queue(maxsize=dimensiune_coada)
+        self.pierdute = 0
+
+    def _pune(self, eveniment):
+        """Rulează în bucla abonatului (call_soon_threadsafe)."""
+        if self.coada.full():
+            self.pierdute += self.coada.qsize() + 1
+            while not self.coada.empty():
+                self.coada.get_nowait()
+            self.coada.put_nowait((None, EVENIMENT_RESINCRONIZARE, {'pierdute': self.pierdute}))
+            return
+        self.coada.put_nowait(eveniment)
+
+
+class HubEvenimente:
+    """Abonații conexiunilor SSE ale procesului curent."""
+
+    def __init__(self):
+        self._abonati = set()
+        self._blocare = threading.Lock()
+
+    def aboneaza(self, tipuri=TIPURI_EVENIMENTE, dimensiune_coada=None):
+        """Apelat din bucla asyncio a conexiunii SSE."""
+        abonat = Abonat(asyncio.get_running_loop(), tipuri,
+                        dimensiune_coada or getattr(settings, 'EVENIMENTE_DIMENSIUNE_COADA', 100))
+        with self._blocare:
+            self._abonati.add(abonat)
+        return abonat
+
+    def dezaboneaza(self, abonat):
+        with self._blocare:
+            self._abonati.discard(abonat)
+
+    def numar_abonati(self):
+        with self._blocare:
+            return len(self._abonati)
+
+    def publica(self, id_eveniment, tip, date):
+        """Livrează abonaților locali; poate fi apelată din orice fir și nu blochează niciodată."""
+        eveniment = (id_eveniment, tip, date)
+        with self._blocare:
+            abonati = [abonat for abonat in self._abonati if tip in abonat.tipuri]
+        for abonat in abonati:
+            try:
+                abonat.loop.call_soon_threadsafe(abonat._pune, eveniment)
+            except RuntimeError:
+                # bucla conexiunii s-a închis între timp
+                self.dezaboneaza(abonat)
+
+
+class ReleuEvenimente:
+    """
+    Aduce în hub-ul local evenimentele publicate de toate procesele (tabela EvenimentFlux).
+    Rulează ca sarcină asyncio în bucla conexiunilor SSE, cât timp procesul are abonați.
+    """
+
+    def __init__(self, hub):
+        self.hub = hub
+        self._sarcina = None
+        self._livrate = {}  # id -> data_creare, pentru evenimentele din marjă deja livrate
+        self._ultima_curatare = None
+
+    def porneste(self):
+        """Apelat din bucla asyncio, la fiecare abonare; o singură sarcină activă per buclă."""
+        bucla = asyncio.get_running_loop()
+        if self._sarcina is not None and not self._sarcina.done() and self._sarcina.get_loop() is bucla:
+            return
+        self._sarcina = bucla.create_task(self._ruleaza())
+
+    async def _ruleaza(self):
+        interval = getattr(settings, 'EVENIMENTE_SONDARE_SECUNDE', 0.5)
+        sondeaza = sync_to_async(self.sondeaza, thread_sensitive=False)
+        # evenimentele dinaintea primei abonări nu se mai trimit
+        await sondeaza(livreaza=False)
+        while self.hub.numar_abonati():
+            await asyncio.sleep(interval)
+            try:
+                await sondeaza()
+            except Exception:
+                logger.exception('Citirea evenimentelor a esuat')
+
+    def sondeaza(self, livreaza=True):
+        """Un pas: evenimentele noi din marjă sunt date hub-ului (sau doar marcate, cu livreaza=False)."""
+        acum = timezone.now()
+        inceput = acum - timedelta(seconds=getattr(settings, 'EVENIMENTE_MARJA_SECUNDE', 5))
+        randuri = (EvenimentFlux.objects.filter(data_creare__gte=inceput).order_by('id')
+                   .values_list('id', 'tip', 'date', 'data_creare'))
+        for id_eveniment, tip, date, data_creare in randuri:
+            if id_eveniment in self._livrate:
+                continue
+            self._livrate[id_eveniment] = data_creare
+            if livreaza:
+                self.hub.publica(id_eveniment, tip, date)
+        self._livrate = {id_eveniment: data_creare for id_eveniment, data_creare in self._livrate.items()
+                         if data_creare >= inceput}
+        self._curata(acum)
+
+    def _curata(self, acum):
+        """Cel mult o dată pe minut per proces: rândurile mai vechi decât EVENIMENTE_PASTRARE_SECUNDE."""
+        if self._ultima_curatare is not None and acum - self._ultima_curatare < timedelta(minutes=1):
+            return
+        self._ultima_curatare = acum
+        pastrare = timedelta(seconds=getattr(settings, 'EVENIMENTE_PASTRARE_SECUNDE', 600))
+        EvenimentFlux.objects.filter(data_creare__lt=acum - pastrare).delete()
+
+
+hub = HubEvenimente()
+releu = ReleuEvenimente(hub)
+
+
+def publica_dupa_commit(tip, date):
+    """
+    Evenimentul se scrie doar dacă tranzacția curentă este confirmată (sau imediat, fără tranzacție).
+    O eroare la scriere nu mai poate anula scrierea confirmată: este doar înregistrată în log.
+    """
+    transaction.on_commit(lambda: EvenimentFlux.objects.create(tip=tip, date=date), robust=True)
+
+
+def formateaza_sse(id_eveniment, tip, date):
+    linii = []
+    if id_eveniment is not None:
+        linii.append(f'id: {id_eveniment}')
+    linii.append(f'event: {tip}')
+    linii.append('data: ' + json.dumps(date, cls=DjangoJSONEncoder, ensure_ascii=False))
+    return '\n'.join(linii) + '\n\n'
+
+
+async def flux_sse(tipuri=TIPURI_EVENIMENTE, interval_heartbeat=None):
+    """
+    Generatorul asincron al răspunsului text/event-stream. Abonarea se face abia când serverul
+    începe să trimită răspunsul și se anulează când clientul închide conexiunea.
+    """
+    interval_heartbeat = interval_heartbeat or getattr(settings, 'EVENIMENTE_HEARTBEAT_SECUNDE', 15)
+    abonat = hub.aboneaza(tipuri)
+    releu.porneste()
+    try:
+        # clientul (EventSource) se reconectează după 5 secunde dacă fluxul se întrerupe
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                id_eveniment, tip, date = await asyncio.wait_for(abonat.coada.get(), timeout=interval_heartbeat)
+            except asyncio.TimeoutError:
+                yield ': heartbeat\n\n'
+                continue
+            yield formateaza_sse(id_eveniment, tip, date)
+    finally:
+        hub.dezaboneaza(abonat)
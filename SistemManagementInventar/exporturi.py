@@ -0,0 +1,309 @@
+# exporturi.py
+# Export CSV / XLSX în flux (streaming) pentru rapoartele contabile.
+# Rândurile sunt citite cu values_list().iterator(), deci memoria folosită este
+# constantă indiferent de numărul de rânduri, iar primul octet pleacă imediat.
+import csv
+import itertools
+import zipfile
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import models
+from django.utils import timezone
+
+from SistemManagementInventar.models import DetaliiFactura, DetaliiFacturaArhiva, Produs, ContFurnizor, SalariuAngajat
+
+# Câte rânduri se aduc din baza de date la un pas al iteratorului
+DIMENSIUNE_LOT_EXPORT = 2000
+# Sub ASGI: câte bucăți ale fluxului sincron se generează la o trecere prin firul cererii; ele se
+# trimit unite, pentru că GZipMiddleware comprimă separat fiecare bucată a unui flux asincron
+BUCATI_PE_PAS_ASGI = 500
+
+TIP_TRANZACTIE = {str(cod): eticheta for cod, eticheta in ContFurnizor.TIP_TRANZACTIE_CHOICES}
+
+# Definirea resurselor exportabile:
+# - model: modelul de pornire al interogării
+# - model_arhiva: opțional, tabela de arhivă cu aceleași câmpuri, exportată înaintea celei calde
+# - camp_data: câmpul după care se aplică filtrul data_start / data_end
+# - coloane: (cale ORM, antet în fișier, transformare opțională)
+EXPORTURI = {
+    'facturi': {
+        'model': DetaliiFactura,
+        'model_arhiva': DetaliiFacturaArhiva,
+        'camp_data': 'id_factura__data_adaugare',
+        'coloane': [
+            ('id_factura', 'ID factura', None),
+            ('id_factura__data_adaugare', 'Data factura', None),
+            ('id_factura__id_client__nume', 'Client', None),
+            ('id_factura__id_client__contact', 'Contact client', None),
+            ('id_factura__id_client__adresa', 'Adresa client', None),
+            ('id_produs', 'ID produs', None),
+            ('id_produs__nume', 'Produs', None),
+            ('cantitate', 'Cantitate', None),
+            ('pret_cumparare', 'Pret cumparare', None),
+            ('pret_vanzare', 'Pret vanzare', None),
+            ('tva_produs', 'TVA (%)', None),
+        ],
+    },
+    'produse': {
+        'model': Produs,
+        'camp_data': 'data_adaugare',
+        'coloane': [
+            ('id', 'ID produs', None),
+            ('nume', 'Nume', None),
+            ('tip_produs', 'Tip produs', None),
+            ('pret_cumparare', 'Pret cumparare', None),
+            ('pret_vanzare', 'Pret vanzare', None),
+            ('tva_produs', 'TVA (%)', None),
+            ('nr_lot', 'Nr. lot', None),
+            ('nr_raft', 'Nr. raft', None),
+            ('data_producere', 'Data producere', None),
+            ('data_expirare', 'Data expirare', None),
+            ('stoc_total', 'Stoc total', None),
+            ('cantitate_in_pachet', 'Cantitate in pachet', None),
+            ('id_furnizor', 'ID furnizor', None),
+            ('id_furnizor__nume', 'Furnizor', None),
+            ('data_adaugare', 'Data adaugare', None),
+        ],
+    },
+    'contfurnizor': {
+        'model': ContFurnizor,
+        'camp_data': 'data_tranzactie',
+        'coloane': [
+            ('id', 'ID tranzactie', None),
+            ('id_furnizor', 'ID furnizor', None),
+            ('id_furnizor__nume', 'Furnizor', None),
+            ('tip_tranzactie', 'Tip tranzactie', lambda valoare: TIP_TRANZACTIE.get(str(valoare), valoare)),
+            ('suma_tranzactie', 'Suma', None),
+            ('data_tranzactie', 'Data tranzactie', None),
+            ('modalitate_plata', 'Modalitate plata', None),
+        ],
+    },
+    'salarii': {
+        'model': SalariuAngajat,
+        'camp_data': 'data_salariu',
+        'coloane': [
+            ('id', 'ID salariu', None),
+            ('id_angajat', 'ID angajat', None),
+            ('id_angajat__nume', 'Nume', None),
+            ('id_angajat__prenume', 'Prenume', None),
+            ('data_salariu', 'Data salariu', None),
+            ('suma_salariu', 'Suma', None),
+        ],
+    },
+}
+
+
+def _camp_model(model, cale):
+    """Returnează câmpul de model de la capătul unei căi ORM (ex. id_factura__data_adaugare)."""
+    camp = None
+    for nume in cale.split('__'):
+        camp = model._meta.get_field(nume)
+        if camp.is_relation:
+            model = camp.related_model
+    return camp
+
+
+def construieste_queryset(resursa, data_start=None, data_end=None, model=None):
+    """
+    Construiește interogarea pentru o resursă exportabilă, filtrată pe interval (inclusiv).
+    Pentru câmpurile DateTimeField filtrul se face pe interval de momente,
+    ca să poată folosi indexul coloanei (fără funcții aplicate pe coloană).
+    """
+    definitie = EXPORTURI[resursa]
+    model = model or definitie['model']
+    camp_data = definitie['camp_data']
+    queryset = model.objects.all()
+
+    if isinstance(_camp_model(model, camp_data), models.DateTimeField):
+        if data_start:
+            queryset = queryset.filter(**{f'{camp_data}__gte': timezone.make_aware(datetime.combine(data_start, time.min))})
+        if data_end:
+            sfarsit = timezone.make_aware(datetime.combine(data_end + timedelta(days=1), time.min))
+            queryset = queryset.filter(**{f'{camp_data}__lt': sfarsit})
+    else:
+        if data_start:
+            queryset = queryset.filter(**{f'{camp_data}__gte': data_start})
+        if data_end:
+            queryset = queryset.filter(**{f'{camp_data}__lte': data_end})
+
+    cai = [cale for cale, _, _ in definitie['coloane']]
+    return queryset.order_by('pk').values_list(*cai)
+
+
+def construieste_interogari(resursa, data_start=None, data_end=None):
+    """Interogările exportului, în ordine: arhiva (dacă resursa are una), apoi tabela caldă."""
+    definitie = EXPORTURI[resursa]
+    modele = [definitie['model_arhiva'], definitie['model']] if 'model_arhiva' in definitie else [definitie['model']]
+    return [construieste_queryset(resursa, data_start, data_end, model) for model in modele]
+
+
+def _formateaza(valoare):
+    """Transformă o valoare din baza de date într-un text potrivit pentru fișier."""
+    if valoare is None:
+        return ''
+    if isinstance(valoare, datetime):
+        return timezone.localtime(valoare).strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(valoare, date):
+        return valoare.isoformat()
+    return valoare
+
+
+def randuri_export(resursa, interogari):
+    """Generator de rânduri (listă de valori) citite în loturi din baza de date, interogare după interogare."""
+    transformari = [transformare for _, _, transformare in EXPORTURI[resursa]['coloane']]
+    for queryset in interogari:
+        for rand in queryset.iterator(chunk_size=DIMENSIUNE_LOT_EXPORT):
+            yield [
+                _formateaza(transformare(valoare) if transformare else valoare)
+                for valoare, transformare in zip(rand, transformari)
+            ]
+
+
+def antete_export(resursa):
+    return [antet for _, antet, _ in EXPORTURI[resursa]['coloane']]
+
+
+class _Ecou:
+    """Pseudo-fișier pentru csv.writer: write() întoarce direct textul scris."""
+    def write(self, valoare):
+        return valoare
+
+
+def flux_csv(antete, randuri):
+    """Generează fișierul CSV rând cu rând (cu BOM, ca Excel să recunoască UTF-8)."""
+    writer = csv.writer(_Ecou())
+    yield '\ufeff' + writer.writerow(antete)
+    for rand in randuri:
+        yield writer.writerow(rand)
+
+
+class _BufferFlux:
+    """
+    Pseudo-fișier fără seek() pentru zipfile: acumulează octeții scriși
+    până când generatorul îi golește și îi trimite clientului.
+    """
+    def __init__(self):
+        self._bucati = []
+        self._pozitie = 0
+
+    def write(self, data):
+        self._bucati.append(bytes(data))
+        self._pozitie += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pozitie
+
+    def flush(self):
+        pass
+
+    def goleste(self):
+        data = b''.join(self._bucati)
+        self._bucati.clear()
+        return data
+
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_XLSX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Export" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+# Caracterele de control nu sunt permise în XML
+_CARACTERE_INTERZISE = dict.fromkeys(c for c in range(32) if c not in (9, 10, 13))
+
+
+def _celula_xlsx(valoare):
+    if isinstance(valoare, bool):
+        valoare = int(valoare)
+    if isinstance(valoare, (int, float, Decimal)):
+        return f'<c><v>{valoare}</v></c>'
+    text = escape(str(valoare).translate(_CARACTERE_INTERZISE))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _rand_xlsx(valori):
+    return '<row>' + ''.join(_celula_xlsx(valoare) for valoare in valori) + '</row>'
+
+
+def flux_xlsx(antete, randuri, randuri_per_bucata=500):
+    """
+    Scrie un fișier XLSX minimal (o singură foaie, șiruri inline) direct într-o arhivă zip
+    în flux. Foaia este comprimată pe măsură ce rândurile sunt citite, așa că nu se
+    construiește niciodată întregul fișier în memorie.
+    """
+    buffer = _BufferFlux()
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_DEFLATED) as arhiva:
+        arhiva.writestr('[Content_Types].xml', _XLSX_CONTENT_TYPES)
+        arhiva.writestr('_rels/.rels', _XLSX_RELS)
+        arhiva.writestr('xl/workbook.xml', _XLSX_WORKBOOK)
+        arhiva.writestr('xl/_rels/workbook.xml.rels', _XLSX_WORKBOOK_RELS)
+        yield buffer.goleste()
+
+        with arhiva.open('xl/worksheets/sheet1.xml', mode='w', force_zip64=True) as foaie:
+            foaie.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                + _rand_xlsx(antete)
+            ).encode('utf-8'))
+
+            bucata = []
+            for rand in randuri:
+                bucata.append(_rand_xlsx(rand))
+                if len(bucata) >= randuri_per_bucata:
+                    foaie.write(''.join(bucata).encode('utf-8'))
+                    bucata.clear()
+                    yield buffer.goleste()
+            foaie.write((''.join(bucata) + '</sheetData></worksheet>').encode('utf-8'))
+    yield buffer.goleste()
+
+
+async def _flux_asincron(flux, bucati_pe_pas=BUCATI_PE_PAS_ASGI):
+    pas = sync_to_async(lambda: list(itertools.islice(flux, bucati_pe_pas)), thread_sensitive=True)
+    while bucati := await pas():
+        yield ''.join(bucati) if isinstance(bucati[0], str) else b''.join(bucati)
+
+
+def flux_pentru_server(request, flux):
+    """
+    Sub ASGI, Django citește un iterator sincron în întregime în memorie înainte să trimită primul
+    octet; fluxul este deci parcurs pe bucăți, în firul cererii (aceeași conexiune la baza de date),
+    dintr-un generator asincron. Sub WSGI se trimite neschimbat.
+    """
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        return _flux_asincron(flux)
+    return flux
+
@@ -0,0 +1,58 @@
+# facturi.py
+# Totalurile facturilor (net / TVA / brut), calculate prin adnotări în baza de date.
+# Valoarea unei linii = cantitate * pret_vanzare, iar TVA-ul = valoarea netă * tva_produs / 100,
+# rotunjit la bani pe fiecare linie (totalul TVA al facturii este suma liniilor rotunjite)
+# (înmulțit cu 0.01: în SQLite, împărțirea la 100 a unor valori întregi ar fi împărțire întreagă).
+# Prețul și cota TVA sunt cele copiate pe linie la emitere (DetaliiFactura.pret_vanzare / tva_produs),
+# nu cele curente ale produsului.
+# O listă de facturi cu liniile lor costă mereu 2 interogări: facturile (cu client și totaluri
+# agregate) și toate liniile lor (cu produs și totaluri pe linie), indiferent de numărul facturilor.
+# Aceleași funcții lucrează și pe arhivă (FacturaArhiva / DetaliiFacturaArhiva au aceleași câmpuri
+# și aceleași nume de relații).
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Prefetch, Sum, Value
+from django.db.models.functions import Coalesce, Round
+
+from SistemManagementInventar.models import DetaliiFactura, DetaliiFacturaArhiva, Factura, FacturaArhiva
+
+TIP_SUMA = DecimalField(max_digits=14, decimal_places=2)
+ZERO = Value(Decimal('0.00'), output_field=TIP_SUMA)
+MODEL_LINII = {Factura: DetaliiFactura, FacturaArhiva: DetaliiFacturaArhiva}
+
+
+def _valoare_neta(prefix=''):
+    return ExpressionWrapper(
+        F(f'{prefix}cantitate') * F(f'{prefix}pret_vanzare'), output_field=TIP_SUMA
+    )
+
+
+def _valoare_tva(prefix=''):
+    return Round(
+        _valoare_neta(prefix) * F(f'{prefix}tva_produs') * Value(Decimal('0.01')), 2, output_field=TIP_SUMA
+    )
+
+
+def linii_cu_totaluri(queryset=None):
+    """Liniile de factură cu produsul (JOIN) și valoare_neta / valoare_tva / valoare_bruta pe linie."""
+    queryset = DetaliiFactura.objects.all() if queryset is None else queryset
+    return (queryset
+            .select_related('id_produs')
+            .annotate(valoare_neta=_valoare_neta(), valoare_tva=_valoare_tva())
+            .annotate(valoare_bruta=ExpressionWrapper(F('valoare_neta') + F('valoare_tva'), output_field=TIP_SUMA))
+            .order_by('id'))
+
+
+def facturi_cu_totaluri(queryset=None):
+    """
+    Facturile cu total_net / total_tva / total_brut / nr_linii adnotate (un singur GROUP BY)
+    și liniile lor preîncărcate în factura.linii.
+    """
+    queryset = Factura.objects.all() if queryset is None else queryset
+    return (queryset
+            .annotate(total_net=Coalesce(Sum(_valoare_neta('detaliifactura__')), ZERO),
+                      total_tva=Coalesce(Sum(_valoare_tva('detaliifactura__')), ZERO),
+                      nr_linii=Count('detaliifactura'))
+            .annotate(total_brut=ExpressionWrapper(F('total_net') + F('total_tva'), output_field=TIP_SUMA))
+            .prefetch_related(Prefetch('detaliifactura_set', to_attr='linii',
+                                       queryset=linii_cu_totaluri(MODEL_LINII[queryset.model].objects.all()))))
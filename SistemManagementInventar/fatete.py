@@ -0,0 +1,119 @@
+# fatete.py
+# Filtrarea produselor după atributele din DetaliiProdus (nume_atribut / valoare_atribut, EAV) și
+# numărul de produse pe fiecare valoare a atributelor rămase (fațete), ca în magazinele online:
+# - un filtru pe atribut = produsele care au un rând DetaliiProdus cu acel nume și una din valorile
+#   date; mai multe atribute se combină cu AND, mai multe valori ale aceluiași atribut cu OR
+# - fiecare filtru este o subinterogare pe indexul (nume_atribut, valoare_atribut, id_produs),
+#   care acoperă complet căutarea, fără acces la tabelă
+# - fațetele sunt calculate cu interogări grupate (GROUP BY nume_atribut, valoare_atribut) și
+#   memorate ca tip de sarcină (sarcini.py), deci sunt invalidate la orice scriere în catalog
+#   (Produs / DetaliiProdus, vezi signals.py)
+# - filtrele vin liber din URL, deci în cache intră doar combinațiile de bază ale navigării (cel mult
+#   VALORI_MEMORATE_MAXIME valori, toate existente în catalog); numărul de intrări este astfel limitat
+#   de catalog, nu de cereri, iar combinațiile mai adânci sau inexistente se calculează la cerere
+from django.db.models import Count, Max, Q
+
+from SistemManagementInventar.models import DetaliiProdus, Produs
+from SistemManagementInventar.sarcini import param_text, tip_sarcina
+
+# câte valori se întorc pentru fiecare atribut (cele mai frecvente)
+VALORI_MAXIME_FATETA = 50
+# limitele unui filtru: atribute diferite, valori pe atribut
+ATRIBUTE_MAXIME_FILTRU = 10
+VALORI_MAXIME_ATRIBUT = 20
+# combinațiile cu cel mult atâtea valori selectate (în total) se păstrează în cache
+VALORI_MEMORATE_MAXIME = 2
+
+
+def filtreaza_produse(atribute=None, tip_produs=None):
+    """Produsele de tipul dat care au toate atributele cerute (atribute: {nume: [valori]})."""
+    produse = Produs.objects.all()
+    if tip_produs:
+        produse = produse.filter(tip_produs=tip_produs)
+    for nume, valori in sorted((atribute or {}).items()):
+        produse = produse.filter(id__in=DetaliiProdus.objects.filter(
+            nume_atribut=nume, valoare_atribut__in=valori
+        ).values('id_produs'))
+    return produse
+
+
+def param_atribute(valoare):
+    """{nume: [valori]} cu nume și valori text, parametrul `atribute` al sarcinii fatete_atribute."""
+    if not isinstance(valoare, dict):
+        raise ValueError('atribute trebuie sa fie un obiect {nume: [valori]}')
+    if len(valoare) > ATRIBUTE_MAXIME_FILTRU:
+        raise ValueError(f'cel mult {ATRIBUTE_MAXIME_FILTRU} atribute intr-un filtru')
+    atribute = {}
+    for nume, valori in valoare.items():
+        if not isinstance(valori, list) or not all(isinstance(v, str) for v in valori):
+            raise ValueError(f'valorile atributului {nume} trebuie sa fie o lista de texte')
+        if len(valori) > VALORI_MAXIME_ATRIBUT:
+            raise ValueError(f'cel mult {VALORI_MAXIME_ATRIBUT} valori pentru atributul {nume}')
+        atribute[param_text(nume)] = sorted({param_text(v) for v in valori})
+    return atribute
+
+
+def memoreaza_fatete(parametri):
+    """Doar filtrele cu cel mult VALORI_MEMORATE_MAXIME valori, toate existente în catalog."""
+    atribute = parametri.get('atribute') or {}
+    perechi = [(nume, valoare) for nume, valori in atribute.items() for valoare in valori]
+    if len(perechi) > VALORI_MEMORATE_MAXIME:
+        return False
+    tip_produs = parametri.get('tip_produs')
+    if tip_produs and not Produs.objects.filter(tip_produs=tip_produs).exists():
+        return False
+    if not perechi:
+        return True
+    conditie = Q.create([Q(nume_atribut=nume, valoare_atribut=valoare) for nume, valoare in perechi],
+                        connector=Q.OR)
+    existente = (DetaliiProdus.objects.filter(conditie).order_by()
+                 .values_list('nume_atribut', 'valoare_atribut').distinct())
+    return len(existente) == len(perechi)
+
+
+@tip_sarcina('fatete_atribute', memoreaza=memoreaza_fatete,
+             parametri={'atribute': param_atribute, 'tip_produs': param_text})
+def numara_fatete(atribute=None, tip_produs=None):
+    """
+    Pentru produsele care trec de filtre: câte sunt, câte produse are fiecare valoare a atributelor
+    nefiltrate și (dacă tipul nu este filtrat) fiecare tip_produs.
+    """
+    atribute = atribute or {}
+    produse = filtreaza_produse(atribute, tip_produs)
+
+    fatete_atribute = {}
+    valori = (DetaliiProdus.objects
+              .filter(id_produs__in=produse.values('id'))
+              .exclude(nume_atribut__in=list(atribute))
+              .values('nume_atribut', 'valoare_atribut')
+              .annotate(numar=Count('id_produs', distinct=True), unitate_masura=Max('unitate_masura'))
+              .order_by('nume_atribut', '-numar', 'valoare_atribut'))
+    for rand in valori:
+        lista = fatete_atribute.setdefault(rand['nume_atribut'], [])
+        if len(lista) < VALORI_MAXIME_FATETA:
+            lista.append({'valoare': rand['valoare_atribut'], 'unitate_masura': rand['unitate_masura'],
+                          'numar': rand['numar']})
+
+    fatete_tip = []
+    if not tip_produs:
+        fatete_tip = [
+            {'valoare': rand['tip_produs'], 'numar': rand['numar']}
+            for rand in produse.values('tip_produs').annotate(numar=Count('id')).order_by('-numar', 'tip_produs')
+        ]
+
+    return {
+        'numar_produse': produse.count(),
+        'atribute': fatete_atribute,
+        'tip_produs': fatete_tip,
+    }
+
+
+def citeste_filtre(parametri):
+    """?atribut[concentratie]=500mg&atribut[forma]=tableta&tip_produs=... -> ({nume: [valori]}, tip_produs)"""
+    atribute = {}
+    for cheie in parametri:
+        if cheie.startswith('atribut[') and cheie.endswith(']') and len(cheie) > len('atribut[]'):
+            valori = sorted({valoare for valoare in parametri.getlist(cheie) if valoare != ''})
+            if valori:
+                atribute[cheie[len('atribut['):-1]] = valori
+    return atribute, parametri.get('tip_produs') or None
@@ -0,0 +1,136 @@
+# idempotenta.py
+# Header-ul Idempotency-Key pe endpoint-urile de creare: un client care reîncearcă aceeași cerere
+# (ex. POS-ul pe o rețea instabilă) primește răspunsul primei execuții, fără să o mai ruleze o dată.
+# - cheia este unică per (angajat, rută); rândul ei din CheieIdempotenta este inserat în aceeași
+#   tranzacție cu efectele cererii, deci răspunsul și datele sunt confirmate (sau anulate) împreună
+# - o cerere duplicată concurentă se blochează pe indexul unic până se termină prima, apoi primește
+#   răspunsul ei (în SQLite așteaptă lock-ul bazei de date, cu timeout-ul conexiunii; dacă expiră -> 409)
+# - se păstrează doar răspunsurile 2xx; la un răspuns de eroare tranzacția este anulată, cu tot cu
+#   cheia, iar clientul poate reîncerca cu aceeași cheie
+# - aceeași cheie cu alt conținut (corp / parametri) -> 422; cheile expiră după IDEMPOTENTA_ORE_PASTRARE
+#   ore și sunt șterse de comanda curata_chei_idempotenta
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, OperationalError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from SistemManagementInventar.models import CheieIdempotenta
+from SistemManagementInventar.sarcini import param_intreg, tip_sarcina
+
+ANTET_CHEIE = 'Idempotency-Key'
+ANTET_RELUARE = 'Idempotent-Replayed'
+LUNGIME_MAXIMA_CHEIE = 255
+
+
+def _valoare_amprenta(valoare):
+    """Fișierele încărcate intră în amprentă prin conținut, nu prin obiect."""
+    if isinstance(valoare, UploadedFile):
+        rezumat = hashlib.sha256()
+        for bucata in valoare.chunks():
+            rezumat.update(bucata)
+        valoare.seek(0)
+        return rezumat.hexdigest()
+    return DjangoJSONEncoder().default(valoare)
+
+
+def amprenta_cerere(request):
+    """SHA-256 peste metodă, parametrii din URL și corpul deja parsat (JSON, formular sau multipart)."""
+    date = request.data
+    if hasattr(date, 'lists'):
+        date = dict(date.lists())
+    continut = json.dumps([request.method, sorted(request.query_params.lists()), date],
+                          sort_keys=True, default=_valoare_amprenta)
+    return hashlib.sha256(continut.encode()).hexdigest()
+
+
+def _raspuns_eroare(mesaj, cod):
+    return Response({'error': True, 'message': mesaj}, status=cod)
+
+
+def _rezerva_cheie(angajat, cheie, ruta, amprenta):
+    """
+    Inserează cheia (într-un savepoint) și returnează (inregistrare, None) când cererea trebuie
+    executată, sau (None, raspuns) când există deja: reluarea răspunsului salvat sau eroarea 422.
+    """
+    acum = timezone.now()
+    expirare = acum + timedelta(hours=getattr(settings, 'IDEMPOTENTA_ORE_PASTRARE', 24))
+    for _ in range(2):
+        try:
+            with transaction.atomic():
+                return CheieIdempotenta.objects.create(
+                    cheie=cheie, ruta=ruta, id_angajat=angajat, amprenta=amprenta, data_expirare=expirare
+                ), None
+        except IntegrityError:
+            existenta = CheieIdempotenta.objects.filter(cheie=cheie, ruta=ruta, id_angajat=angajat).first()
+            if existenta is None:
+                continue
+            if existenta.data_expirare <= acum:
+                # cheie expirată, încă neștearsă de curata_chei_idempotenta: se refolosește
+                existenta.delete()
+                continue
+            if existenta.amprenta != amprenta:
+                return None, _raspuns_eroare(
+                    f'{ANTET_CHEIE} a fost deja folosita pentru o cerere diferita',
+                    status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            raspuns = Response(existenta.raspuns, status=existenta.cod_raspuns)
+            raspuns[ANTET_RELUARE] = 'true'
+            return None, raspuns
+    return None, _raspuns_eroare('Cheia de idempotenta nu a putut fi rezervata', status.HTTP_409_CONFLICT)
+
+
+def idempotent(metoda):
+    """
+    Decorator pentru metodele create / post ale view-urilor: fără header-ul Idempotency-Key
+    cererea rulează neschimbat, cu el rulează cel mult o dată per (angajat, rută, cheie).
+    """
+    @functools.wraps(metoda)
+    def invelis(view, request, *args, **kwargs):
+        cheie = request.headers.get(ANTET_CHEIE)
+        if not cheie:
+            return metoda(view, request, *args, **kwargs)
+        if len(cheie) > LUNGIME_MAXIMA_CHEIE:
+            return _raspuns_eroare(f'{ANTET_CHEIE} poate avea cel mult {LUNGIME_MAXIMA_CHEIE} caractere',
+                                   status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                inregistrare, raspuns = _rezerva_cheie(request.user, cheie, request.path, amprenta_cerere(request))
+                if raspuns is not None:
+                    return raspuns
+                raspuns = metoda(view, request, *args, **kwargs)
+                if status.is_success(raspuns.status_code):
+                    inregistrare.cod_raspuns = raspuns.status_code
+                    inregistrare.raspuns = raspuns.data
+                    inregistrare.save(update_fields=['cod_raspuns', 'raspuns'])
+                else:
+                    # nimic din cererea eșuată nu rămâne scris, nici cheia
+                    transaction.set_rollback(True)
+                return raspuns
+        except OperationalError as e:
+            # SQLite: prima cerere cu aceeași cheie ține încă baza de date blocată
+            if 'locked' not in str(e):
+                raise
+            return _raspuns_eroare('O cerere cu aceeasi cheie de idempotenta este in curs, reincercati',
+                                   status.HTTP_409_CONFLICT)
+    return invelis
+
+
+@tip_sarcina('curata_chei_idempotenta', memoreaza=False, doar_admin=True, parametri={'lot': param_intreg})
+def curata_chei_expirate(lot=5000):
+    """Șterge cheile expirate în loturi; returnează numărul lor."""
+    acum = timezone.now()
+    sterse = 0
+    while True:
+        id_uri = list(CheieIdempotenta.objects.filter(data_expirare__lte=acum).values_list('id', flat=True)[:lot])
+        if not id_uri:
+            return sterse
+        sterse += CheieIdempotenta.objects.filter(id__in=id_uri).delete()[0]
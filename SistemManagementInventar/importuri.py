@@ -0,0 +1,227 @@
+# importuri.py
+# Import în masă al catalogului de produse (CSV sau JSON).
+# Rândurile sunt validate în loturi, furnizorii sunt verificați cu o singură interogare,
+# iar Produs / DetaliiProdus sunt scrise cu bulk_create / bulk_update, câte o tranzacție pe lot.
+# Un rând invalid nu oprește importul: erorile sunt raportate pe rând.
+# Cheia unui produs este (nume, nr_lot, id_furnizor), unică în baza de date: fără upsert, un rând cu o
+# cheie existentă este o eroare; cu upsert, produsul existent (blocat până la commit) este actualizat.
+import csv
+import io
+import json
+import operator
+from functools import reduce
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from SistemManagementInventar import potriviri, sarcini, signals, stocuri
+from SistemManagementInventar.models import Furnizor, Produs, DetaliiProdus
+from SistemManagementInventar.serializers import ProdusImportSerializer, DetaliiProdusScriereSerializer
+
+DIMENSIUNE_LOT_IMPORT = 500
+
+# În CSV, coloanele "atribut:<nume>" devin rânduri DetaliiProdus (nume_atribut=<nume>)
+PREFIX_ATRIBUT = 'atribut:'
+
+CAMPURI_ACTUALIZABILE = [
+    camp.name for camp in Produs._meta.concrete_fields
+    if camp.name not in ('id', 'data_adaugare', 'data_modificare', 'nume', 'nr_lot', 'id_furnizor', 'stoc_fragmentat')
+]
+
+
+def citeste_csv(text):
+    """Transformă un CSV (cu antet) în lista de rânduri acceptată de importa_produse."""
+    randuri = []
+    for rand in csv.DictReader(io.StringIO(text.lstrip('\ufeff'))):
+        produs = {}
+        detalii = []
+        for coloana, valoare in rand.items():
+            if coloana is None:
+                continue
+            coloana = coloana.strip()
+            valoare = (valoare or '').strip()
+            if coloana.startswith(PREFIX_ATRIBUT):
+                if valoare:
+                    detalii.append({'nume_atribut': coloana[len(PREFIX_ATRIBUT):], 'valoare_atribut': valoare})
+            else:
+                produs[coloana] = valoare
+        produs['detalii_produs'] = detalii
+        randuri.append(produs)
+    return randuri
+
+
+def citeste_json(text):
+    """Acceptă fie o listă de produse, fie un obiect de forma {"produse": [...]}."""
+    date = json.loads(text)
+    if isinstance(date, dict):
+        date = date.get('produse', [])
+    if not isinstance(date, list):
+        raise ValueError('JSON-ul trebuie sa contina o lista de produse')
+    return date
+
+
+def citeste_fisier(nume_fisier, continut):
+    """Alege parser-ul după extensia fișierului (.json sau implicit .csv)."""
+    if isinstance(continut, bytes):
+        continut = continut.decode('utf-8-sig')
+    if nume_fisier.lower().endswith('.json'):
+        return citeste_json(continut)
+    return citeste_csv(continut)
+
+
+CAMPURI_CHEIE = ['nume', 'nr_lot', 'id_furnizor']
+
+
+def _cheie(date_produs):
+    return (date_produs['nume'], date_produs['nr_lot'], date_produs['id_furnizor'])
+
+
+def _eroare_rand(nr_rand, mesaj):
+    return {'rand': nr_rand, 'erori': {'non_field_errors': [mesaj]}}
+
+
+def _id_furnizor(rand):
+    try:
+        return int(rand.get('id_furnizor'))
+    except (TypeError, ValueError):
+        return None
+
+
+def importa_produse(randuri, upsert=False, dimensiune_lot=DIMENSIUNE_LOT_IMPORT):
+    """
+    Importă o listă de rânduri (dict-uri cu câmpurile Produs + opțional 'detalii_produs').
+    Cu upsert=True, un produs existent cu aceeași cheie (nume, nr_lot, id_furnizor) este
+    actualizat, iar detaliile lui sunt înlocuite cu cele din fișier (dacă rândul are detalii);
+    fără upsert, rândul este raportat ca eroare. O cheie repetată în fișier este o eroare pe rând.
+    Returnează un raport: {'creat': n, 'actualizat': n, 'erori': [{'rand': i, 'erori': ...}]}
+    Numerotarea rândurilor pornește de la 1.
+    """
+    raport = {'creat': 0, 'actualizat': 0, 'erori': []}
+
+    # O singură interogare pentru toți furnizorii referiți în fișier
+    id_uri = {_id_furnizor(rand) for rand in randuri if isinstance(rand, dict)}
+    id_uri.discard(None)
+    furnizori_existenti = set(Furnizor.objects.filter(id__in=id_uri).values_list('id', flat=True))
+
+    chei_vazute = set()
+    for start in range(0, len(randuri), dimensiune_lot):
+        lot_valid = []
+        for nr_rand, rand in enumerate(randuri[start:start + dimensiune_lot], start=start + 1):
+            rezultat = _valideaza_rand(rand, furnizori_existenti)
+            if 'erori' in rezultat:
+                raport['erori'].append({'rand': nr_rand, 'erori': rezultat['erori']})
+                continue
+
+            cheie = _cheie(rezultat['produs'])
+            if cheie in chei_vazute:
+                raport['erori'].append(_eroare_rand(nr_rand, 'Produs duplicat in fisier (nume, nr_lot, id_furnizor)'))
+                continue
+            chei_vazute.add(cheie)
+
+            lot_valid.append((nr_rand, rezultat['produs'], rezultat['detalii']))
+
+        if lot_valid:
+            _salveaza_lot(lot_valid, upsert, raport)
+
+    # bulk_create / bulk_update nu trimit semnale, deci invalidăm explicit dashboard-ul și fațetele
+    if raport['creat'] or raport['actualizat']:
+        sarcini.invalideaza_rezultate('acasa', 'fatete_atribute')
+    return raport
+
+
+def _valideaza_rand(rand, furnizori_existenti):
+    if not isinstance(rand, dict):
+        return {'erori': {'non_field_errors': ['Randul trebuie sa fie un obiect']}}
+
+    date_rand = dict(rand)
+    detalii = date_rand.pop('detalii_produs', None) or []
+
+    produs_ser = ProdusImportSerializer(data=date_rand)
+    detalii_ser = DetaliiProdusScriereSerializer(data=detalii, many=True)
+    produs_valid = produs_ser.is_valid()
+    detalii_valide = detalii_ser.is_valid()
+
+    erori = {}
+    if not produs_valid:
+        erori.update(produs_ser.errors)
+    elif produs_ser.validated_data['id_furnizor'] not in furnizori_existenti:
+        erori['id_furnizor'] = [f"Furnizorul {produs_ser.validated_data['id_furnizor']} nu exista"]
+    if not detalii_valide:
+        erori['detalii_produs'] = detalii_ser.errors
+    if erori:
+        return {'erori': erori}
+
+    return {'produs': dict(produs_ser.validated_data), 'detalii': list(detalii_ser.validated_data)}
+
+
+def _salveaza_lot(lot_valid, upsert, raport):
+    """Scrie un lot validat într-o singură tranzacție; la eroare de bază de date, tot lotul e raportat."""
+    try:
+        # detaliile înlocuite: marcajele de ștergere (sync) se scriu împreună, nu câte unul pe rând
+        with transaction.atomic(), signals.scrieri_in_bloc():
+            # exact cheile din lot; produsele existente rămân blocate până la commit
+            filtru = reduce(operator.or_, (
+                Q(nume=nume, nr_lot=nr_lot, id_furnizor_id=id_furnizor)
+                for nume, nr_lot, id_furnizor in (_cheie(date_produs) for _, date_produs, _ in lot_valid)
+            ))
+            existente = {(p.nume, p.nr_lot, p.id_furnizor_id): p
+                         for p in Produs.objects.select_for_update().filter(filtru)}
+
+            noi, actualizate, de_detaliat, erori = [], [], [], []
+            stoc_anterior = {}
+            acum = timezone.now()
+            for nr_rand, date_produs, detalii in lot_valid:
+                produs = existente.get(_cheie(date_produs))
+                if produs is None:
+                    # copie: la o reîncercare a lotului, rândul validat rămâne neschimbat
+                    date_noi = dict(date_produs)
+                    date_noi['id_furnizor_id'] = date_noi.pop('id_furnizor')
+                    produs = Produs(**date_noi)
+                    noi.append(produs)
+                elif not upsert:
+                    erori.append(_eroare_rand(nr_rand, 'Produsul exista deja (nume, nr_lot, id_furnizor)'))
+                    continue
+                else:
+                    stoc_anterior[produs.id] = produs.stoc_total
+                    for camp in CAMPURI_ACTUALIZABILE:
+                        setattr(produs, camp, date_produs[camp])
+                    produs.data_modificare = acum
+                    actualizate.append(produs)
+                if detalii:
+                    de_detaliat.append((produs, detalii))
+
+            if upsert:
+                # un produs cu aceeași cheie inserat între timp de un import concurent este actualizat
+                Produs.objects.bulk_create(noi, update_conflicts=True, unique_fields=CAMPURI_CHEIE,
+                                           update_fields=CAMPURI_ACTUALIZABILE + ['data_modificare'])
+            else:
+                Produs.objects.bulk_create(noi)
+            if actualizate:
+                # bulk_update nu completează auto_now, deci data_modificare este setată explicit
+                Produs.objects.bulk_update(actualizate, CAMPURI_ACTUALIZABILE + ['data_modificare'])
+                # la produsele fragmentate, stocul importat este reîmpărțit pe fragmente
+                stocuri.redistribuie_stoc(actualizate)
+                # Detaliile produselor actualizate sunt înlocuite cu cele din fișier
+                id_actualizate = {produs.id for produs in actualizate}
+                DetaliiProdus.objects.filter(
+                    id_produs__in=[produs.id for produs, _ in de_detaliat if produs.id in id_actualizate]
+                ).delete()
+
+            DetaliiProdus.objects.bulk_create([
+                DetaliiProdus(id_produs=produs, **detaliu)
+                for produs, detalii in de_detaliat
+                for detaliu in detalii
+            ])
+            # produsele noi și cele reaprovizionate: cererile clienților care le așteaptă
+            potriviri.potriveste_produse(
+                noi + [produs for produs in actualizate if produs.stoc_total > stoc_anterior[produs.id]]
+            )
+    except Exception as e:
+        for nr_rand, _, _ in lot_valid:
+            raport['erori'].append(_eroare_rand(nr_rand, f'Eroare la salvare: {str(e)}'))
+        return
+
+    raport['erori'].extend(erori)
+    raport['creat'] += len(noi)
+    raport['actualizat'] += len(actualizate)
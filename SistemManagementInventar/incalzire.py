@@ -0,0 +1,119 @@
+# incalzire.py
+# Încălzirea unui proces de server înainte de prima cerere. Altfel prima cerere a fiecărui worker
+# plătește tot ce Django / DRF fac leneș:
+# - serializere: câmpurile ModelSerializer (fields="__all__") se construiesc prin introspecția
+#   modelelor (_meta.get_fields, relații), la prima instanțiere
+# - rute: resolver-ul (inclusiv rutele DefaultRouter) își populează tabelele și compilează
+#   expresiile regulate la prima rezolvare
+# - baza de date: conexiunea se deschide la prima interogare
+# - cache: rezultatele memorate (ex. dashboard-ul) se calculează la prima cerere
+# gunicorn.conf.py apelează incalzeste_master() în master (preload_app, înainte de fork: memoria
+# încălzită e partajată copy-on-write) și incalzeste_lucrator() în fiecare worker după fork.
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.urls import NoReverseMatch, Resolver404, get_resolver, resolve, reverse
+from rest_framework.serializers import BaseSerializer
+
+from SistemManagementInventar import sarcini, serializers, throttling
+
+logger = logging.getLogger(__name__)
+
+
+def incalzeste_serializere():
+    """Construiește câmpurile fiecărui serializer de model din serializers.py; returnează câte sunt."""
+    numar = 0
+    for obiect in vars(serializers).values():
+        if (isinstance(obiect, type) and issubclass(obiect, BaseSerializer)
+                and obiect.__module__ == serializers.__name__ and hasattr(getattr(obiect, 'Meta', None), 'model')):
+            obiect().fields
+            numar += 1
+    return numar
+
+
+def incalzeste_rute():
+    """Populează resolver-ul, compilează toate rutele și rezolvă fiecare rută fără parametri."""
+    resolver = get_resolver()
+    nume_rute = [nume for nume in resolver.reverse_dict if isinstance(nume, str)]
+    rezolvate = 0
+    for nume in nume_rute:
+        try:
+            resolve(reverse(nume))
+            rezolvate += 1
+        except (NoReverseMatch, Resolver404):
+            pass
+    # o cale inexistentă parcurge toate rutele, deci le compilează și pe cele cu parametri
+    try:
+        resolve('/api/__incalzire__/0/__incalzire__/')
+    except Resolver404:
+        pass
+    return rezolvate
+
+
+def incalzeste_baza_de_date():
+    """Deschide conexiunea fiecărei baze de date configurate."""
+    for conexiune in connections.all():
+        conexiune.ensure_connection()
+        with conexiune.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    return len(connections.all())
+
+
+def incalzeste_cache():
+    """Deschide cache-ul și calculează rezultatele memorate din INCALZIRE_SARCINI (ex. dashboard-ul)."""
+    cache.get('incalzire')
+    throttling.stocare()
+    tipuri = getattr(settings, 'INCALZIRE_SARCINI', ())
+    for tip in tipuri:
+        sarcini.calculeaza(tip)
+    return len(tipuri)
+
+
+def _ruleaza_etape(etape):
+    """Rulează etapele în ordine; o etapă eșuată este logată, nu oprește pornirea serverului."""
+    durate = {}
+    for nume, etapa in etape:
+        start = time.perf_counter()
+        try:
+            etapa()
+        except Exception:
+            logger.exception("Incalzire: etapa %s a esuat", nume)
+        durate[nume] = round((time.perf_counter() - start) * 1000, 1)
+    return durate
+
+
+def incalzeste_master():
+    """
+    În procesul master, înainte de fork: serializere, rute și cache-ul. Conexiunile deschise aici
+    sunt închise la final, ca worker-ii să nu moștenească socket-uri partajate.
+    """
+    try:
+        return _ruleaza_etape([
+            ('serializere', incalzeste_serializere),
+            ('rute', incalzeste_rute),
+            ('cache', incalzeste_cache),
+        ])
+    finally:
+        connections.close_all()
+
+
+def incalzeste_lucrator():
+    """În fiecare worker, după fork: conexiunile proprii la baza de date (plus restul, dacă nu e preload)."""
+    return _ruleaza_etape([
+        ('serializere', incalzeste_serializere),
+        ('rute', incalzeste_rute),
+        ('baza_de_date', incalzeste_baza_de_date),
+    ])
+
+
+def incalzeste():
+    """Toate etapele, într-un singur proces (servere fără fork, benchmark_pornire)."""
+    return _ruleaza_etape([
+        ('serializere', incalzeste_serializere),
+        ('rute', incalzeste_rute),
+        ('baza_de_date', incalzeste_baza_de_date),
+        ('cache', incalzeste_cache),
+    ])
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from SistemManagementInventar.vanzari import actualizeaza_vanzari_zilnice
+
+
+class Command(BaseCommand):
+    help = ("Actualizează rollup-ul zilnic al vânzărilor (VanzareZilnica) pentru zilele încheiate: "
+            "implicit de la ultima zi agregată până ieri")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--de-la', dest='de_la',
+                            help="Reagregă de la această zi (AAAA-LL-ZZ), ex. după corectarea unor facturi vechi")
+
+    def handle(self, *args, **options):
+        de_la = None
+        if options['de_la']:
+            de_la = parse_date(options['de_la'])
+            if de_la is None:
+                raise CommandError(f"Data invalida: {options['de_la']}")
+        raport = actualizeaza_vanzari_zilnice(de_la=de_la)
+        if raport['de_la'] is None or raport['de_la'] > raport['pana_la']:
+            self.stdout.write("Rollup-ul vânzărilor este deja la zi")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"{raport['randuri']} rânduri agregate pentru {raport['de_la']} - {raport['pana_la']}"
+        ))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from SistemManagementInventar.arhiva import arhiveaza_facturi, DIMENSIUNE_LOT_ARHIVARE
+
+
+class Command(BaseCommand):
+    help = ("Mută facturile vechi și liniile lor în tabelele de arhivă (după actualizarea rollup-ului "
+            "vânzărilor); implicit cele mai vechi de ARHIVA_ZILE_PASTRARE zile")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--inainte-de', dest='inainte_de',
+                            help="Arhivează facturile adăugate înainte de această zi (AAAA-LL-ZZ)")
+        parser.add_argument('--lot', type=int, default=DIMENSIUNE_LOT_ARHIVARE,
+                            help="Numărul de facturi mutate într-o tranzacție")
+        parser.add_argument('--simulare', action='store_true',
+                            help="Doar raportează ce s-ar arhiva, fără să modifice baza de date")
+
+    def handle(self, *args, **options):
+        if options['lot'] < 1:
+            raise CommandError("--lot trebuie să fie cel puțin 1")
+        inainte_de = None
+        if options['inainte_de']:
+            inainte_de = parse_date(options['inainte_de'])
+            if inainte_de is None:
+                raise CommandError(f"Data invalida: {options['inainte_de']}")
+        raport = arhiveaza_facturi(inainte_de=inainte_de, dimensiune_lot=options['lot'],
+                                   simulare=options['simulare'])
+        prefix = "Simulare: " if options['simulare'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{raport['facturi']} facturi și {raport['linii']} linii arhivate "
+            f"(adăugate până la {raport['pana_la'] or '-'} inclusiv)"
+        ))
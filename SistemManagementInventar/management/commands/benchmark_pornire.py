@@ -0,0 +1,126 @@
+import json
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from SistemManagementInventar.models import Angajat
+
+ENDPOINTURI_IMPLICITE = '/api/produs/,/api/api_acasa/,/api/factura/,/api/furnizor/'
+
+# Rulat într-un interpretor nou, ca un worker proaspăt pornit: importă aplicația WSGI, opțional
+# rulează încălzirea, apoi trimite cereri GET direct aplicației (fără rețea) și afișează măsurătorile.
+# argv: 1/0 (cu încălzire), token JWT, endpoint-uri separate prin virgulă, repetări
+SCRIPT_LUCRATOR = r'''
+import json, os, statistics, sys, time
+from wsgiref.util import setup_testing_defaults
+
+start = time.perf_counter()
+ms = lambda inceput, sfarsit=None: round(((sfarsit or time.perf_counter()) - inceput) * 1000, 1)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SistemDeManagementInventar.settings')
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+import_ms = ms(start)
+# măsurătorile nu trebuie să se lovească de limitarea cererilor (throttling.py)
+from django.conf import settings
+settings.LIMITARI_GALETI = {}
+
+etape = {}
+if sys.argv[1] == '1':
+    from SistemManagementInventar import incalzire
+    etape = incalzire.incalzeste()
+gata_ms = ms(start)
+
+def cerere(cale):
+    environ = {'PATH_INFO': cale, 'REQUEST_METHOD': 'GET', 'HTTP_HOST': 'localhost',
+               'HTTP_ACCEPT': 'application/json', 'HTTP_AUTHORIZATION': 'Bearer ' + sys.argv[2]}
+    setup_testing_defaults(environ)
+    stari = []
+    inceput = time.perf_counter()
+    raspuns = application(environ, lambda stare, antete, exc_info=None: stari.append(stare))
+    b''.join(raspuns)
+    raspuns.close()
+    sfarsit = time.perf_counter()
+    if not stari[0].startswith('200'):
+        raise SystemExit(cale + ' -> ' + stari[0])
+    return ms(inceput, sfarsit), ms(start, sfarsit)
+
+endpointuri = sys.argv[3].split(',')
+masuratori = {cale: [] for cale in endpointuri}
+for _ in range(int(sys.argv[4])):
+    for cale in endpointuri:
+        masuratori[cale].append(cerere(cale))
+
+stabil = {cale: statistics.median(durata for durata, _ in valori[1:]) for cale, valori in masuratori.items()}
+# prima cerere "rapidă": cel mult 1.5 x latența stabilă a endpoint-ului ei
+rapide = [moment for cale, valori in masuratori.items() for durata, moment in valori
+          if durata <= 1.5 * stabil[cale]]
+print(json.dumps({
+    'import_ms': import_ms,
+    'incalzire': etape,
+    'gata_ms': gata_ms,
+    'prima_cerere_ms': {cale: valori[0][0] for cale, valori in masuratori.items()},
+    'stabil_ms': stabil,
+    'prima_rapida_ms': min(rapide),
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = ("Măsoară pornirea unui worker (procese noi, succesive): timpul de import al aplicației, "
+            "prima cerere și timpul până la primul răspuns rapid, fără și cu încălzire (incalzire.py)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lucratori', type=int, default=3, help="Procese pornite pentru fiecare mod")
+        parser.add_argument('--repetari', type=int, default=10, help="Cereri pe endpoint în fiecare proces")
+        parser.add_argument('--endpointuri', default=ENDPOINTURI_IMPLICITE,
+                            help="Endpoint-uri GET, separate prin virgulă")
+
+    def handle(self, *args, **options):
+        if options['lucratori'] < 1 or options['repetari'] < 2:
+            raise CommandError("--lucratori trebuie să fie cel puțin 1, iar --repetari cel puțin 2")
+        angajat = Angajat.objects.order_by('-is_staff').first()
+        if angajat is None:
+            raise CommandError("Este nevoie de cel puțin un angajat în baza de date")
+        token = str(AccessToken.for_user(angajat))
+
+        self.stdout.write(f"{'mod':<14} {'worker':>6} {'import':>9} {'gata':>9} {'prima cerere':>13} "
+                          f"{'stabil':>9} {'prima rapida':>13}   (ms)")
+        for cu_incalzire in (False, True):
+            mod = 'cu incalzire' if cu_incalzire else 'fara incalzire'
+            rezultate = [self._ruleaza_lucrator(cu_incalzire, token, options) for _ in range(options['lucratori'])]
+            for index, rezultat in enumerate(rezultate, 1):
+                self._afiseaza(mod, index, rezultat)
+            medii = {cheie: statistics.mean(self._rezumat(rezultat)[cheie] for rezultat in rezultate)
+                     for cheie in ('import_ms', 'gata_ms', 'prima_cerere_ms', 'stabil_ms', 'prima_rapida_ms')}
+            self._afiseaza(mod, 'medie', medii, rezumat=False)
+            if cu_incalzire:
+                self.stdout.write(f"  etape incalzire (ultimul worker, ms): {rezultate[-1]['incalzire']}")
+
+    @staticmethod
+    def _ruleaza_lucrator(cu_incalzire, token, options):
+        proces = subprocess.run(
+            [sys.executable, '-c', SCRIPT_LUCRATOR, '1' if cu_incalzire else '0', token,
+             options['endpointuri'], str(options['repetari'])],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        if proces.returncode != 0:
+            raise CommandError(f"Procesul de masurare a esuat:\n{proces.stdout}{proces.stderr}")
+        return json.loads(proces.stdout.strip().splitlines()[-1])
+
+    @staticmethod
+    def _rezumat(rezultat):
+        """Prima cerere și latența stabilă: media pe endpoint-uri."""
+        return dict(rezultat,
+                    prima_cerere_ms=statistics.mean(rezultat['prima_cerere_ms'].values()),
+                    stabil_ms=statistics.mean(rezultat['stabil_ms'].values()))
+
+    def _afiseaza(self, mod, worker, rezultat, rezumat=True):
+        date = self._rezumat(rezultat) if rezumat else rezultat
+        self.stdout.write(
+            f"{mod:<14} {worker:>6} {date['import_ms']:>9.1f} {date['gata_ms']:>9.1f} "
+            f"{date['prima_cerere_ms']:>13.1f} {date['stabil_ms']:>9.1f} {date['prima_rapida_ms']:>13.1f}"
+        )
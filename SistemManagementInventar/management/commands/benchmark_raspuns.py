@@ -0,0 +1,66 @@
+import copy
+import gzip
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from SistemManagementInventar import views
+from SistemManagementInventar.middleware import brotli
+from SistemManagementInventar.models import Angajat
+from SistemManagementInventar.renderers import JSONRapidRenderer, MessagePackRenderer, orjson, msgpack
+
+
+class Command(BaseCommand):
+    help = ("Măsoară timpul de randare și octeții trimiși (brut / gzip / brotli) "
+            "pentru listarea produselor și dashboard, cu fiecare renderer")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repetari', type=int, default=20, help="De câte ori se randează fiecare răspuns")
+        parser.add_argument('--multiplica', type=int, default=1,
+                            help="Multiplică rândurile listei de produse (simulează un catalog mai mare)")
+
+    def handle(self, *args, **options):
+        angajat = Angajat.objects.order_by('-is_staff').first()
+        if angajat is None:
+            raise CommandError("Este nevoie de cel puțin un angajat în baza de date")
+
+        factory = APIRequestFactory()
+        cazuri = {
+            'produs': self._date_view(factory, angajat, '/api/produs/', views.ProdusViewSet.as_view({'get': 'list'})),
+            'api_acasa': self._date_view(factory, angajat, '/api/api_acasa/', views.ApiAcasaViewSet.as_view({'get': 'list'})),
+        }
+        if options['multiplica'] > 1:
+            produse = cazuri['produs']['data']
+            cazuri['produs']['data'] = [copy.deepcopy(produs) for _ in range(options['multiplica']) for produs in produse]
+
+        renderere = [
+            ('json (DRF, stdlib)', JSONRenderer()),
+            ('json (orjson)' if orjson else 'json (rapid, fara orjson)', JSONRapidRenderer()),
+            ('msgpack' if msgpack else 'msgpack (Python pur)', MessagePackRenderer()),
+        ]
+
+        self.stdout.write(f"{'endpoint':<10} {'renderer':<26} {'ms/randare':>11} {'brut':>10} {'gzip':>10} {'brotli':>10}")
+        for nume_caz, date in cazuri.items():
+            for nume_renderer, renderer in renderere:
+                start = time.perf_counter()
+                for _ in range(options['repetari']):
+                    continut = renderer.render(date, renderer.media_type, {})
+                durata_ms = (time.perf_counter() - start) * 1000 / options['repetari']
+
+                marime_gzip = len(gzip.compress(continut, compresslevel=6))
+                marime_br = len(brotli.compress(continut, quality=5)) if brotli else '-'
+                self.stdout.write(
+                    f"{nume_caz:<10} {nume_renderer:<26} {durata_ms:>11.3f} {len(continut):>10} "
+                    f"{marime_gzip:>10} {marime_br:>10}"
+                )
+
+    @staticmethod
+    def _date_view(factory, angajat, url, view):
+        request = factory.get(url)
+        force_authenticate(request, user=angajat)
+        response = view(request)
+        if response.status_code != 200:
+            raise CommandError(f"{url} a răspuns cu {response.status_code}")
+        return response.data
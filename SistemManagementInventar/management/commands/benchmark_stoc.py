@@ -0,0 +1,96 @@
+import tempfile
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from SistemManagementInventar import stocuri
+from SistemManagementInventar.models import Client, DetaliiFactura, Factura, Furnizor, Produs
+
+
+class Command(BaseCommand):
+    help = ("Măsoară facturile pe secundă create concurent pe același produs: stoc într-un singur rând "
+            "(select_for_update pe Produs) față de stoc fragmentat. Rulează într-o bază de date temporară "
+            "(creată ca pentru teste și ștearsă la final), deci baza de producție nu este atinsă.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fire', type=int, default=8, help="Numărul de fire care facturează în paralel")
+        parser.add_argument('--facturi', type=int, default=50, help="Facturi create de fiecare fir")
+        parser.add_argument('--fragmente', type=int, default=None,
+                            help="Numărul de fragmente în modul fragmentat (implicit STOC_NUMAR_FRAGMENTE)")
+
+    def handle(self, *args, **options):
+        if options['fire'] < 1 or options['facturi'] < 1:
+            raise CommandError("--fire și --facturi trebuie să fie cel puțin 1")
+        if connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                "SQLite serializează toate scrierile: diferența dintre moduri se vede doar pe PostgreSQL"
+            ))
+
+        # firele au conexiuni proprii, deci datele nu pot sta într-o tranzacție anulată la final:
+        # baza temporară (test_<nume>, migrată de la zero) este folosită de toate conexiunile noi
+        nume_original = connection.settings_dict['NAME']
+        if connection.vendor == 'sqlite':
+            # în memorie, firele ar împărți aceeași conexiune SQLite; un fișier temporar se comportă ca baza reală
+            connection.settings_dict['TEST']['NAME'] = str(Path(tempfile.gettempdir()) / 'benchmark_stoc.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self._masoara(options)
+        finally:
+            connection.creation.destroy_test_db(nume_original, verbosity=0)
+
+    def _masoara(self, options):
+        total_facturi = options['fire'] * options['facturi']
+        furnizor = Furnizor.objects.create(nume='benchmark_stoc', adresa='-', nr_telefon='-', email='-', descriere='-')
+        client = Client.objects.create(nume='benchmark_stoc', adresa='-', contact='benchmark_stoc')
+        produs = Produs.objects.create(
+            nume='benchmark_stoc', tip_produs='-', pret_cumparare=1, pret_vanzare=1, tva_produs=0,
+            nr_lot='-', nr_raft='-', data_expirare=date.today(), data_producere=date.today(),
+            id_furnizor=furnizor, descriere='-', stoc_total=2 * total_facturi, cantitate_in_pachet=1,
+        )
+        self.stdout.write(f"{'mod':<12} {'facturi':>8} {'erori':>6} {'secunde':>8} {'facturi/s':>10}")
+        for mod in ('un_rand', 'fragmentat'):
+            if mod == 'fragmentat':
+                stocuri.fragmenteaza_stoc(produs.id, options['fragmente'])
+            reusite, erori, prima_eroare, durata = self._ruleaza(
+                produs.id, client.id, options['fire'], options['facturi']
+            )
+            self.stdout.write(f"{mod:<12} {reusite:>8} {erori:>6} {durata:>8.2f} {reusite / durata:>10.1f}")
+            if prima_eroare:
+                self.stdout.write(self.style.WARNING(f"  prima eroare: {prima_eroare}"))
+
+    @staticmethod
+    def _ruleaza(id_produs, id_client, fire, facturi_pe_fir):
+        """Fiecare fir creează facturi de câte o linie, exact ca GenerareFacturaViewSet."""
+        rezultate = {'reusite': 0, 'erori': 0, 'prima_eroare': None}
+        lacat = threading.Lock()
+        start_comun = threading.Barrier(fire)
+
+        def factureaza():
+            try:
+                start_comun.wait()
+                for _ in range(facturi_pe_fir):
+                    try:
+                        with transaction.atomic():
+                            factura = Factura.objects.create(id_client_id=id_client)
+                            produs = stocuri.scade_stoc(id_produs, 1)
+                            DetaliiFactura.objects.create(id_factura=factura, id_produs=produs, cantitate=1)
+                        rezultat = 'reusite'
+                    except Exception as e:
+                        rezultat = 'erori'
+                        rezultate['prima_eroare'] = rezultate['prima_eroare'] or repr(e)
+                    with lacat:
+                        rezultate[rezultat] += 1
+            finally:
+                connection.close()
+
+        lista_fire = [threading.Thread(target=factureaza) for _ in range(fire)]
+        start = time.perf_counter()
+        for fir in lista_fire:
+            fir.start()
+        for fir in lista_fire:
+            fir.join()
+        return rezultate['reusite'], rezultate['erori'], rezultate['prima_eroare'], time.perf_counter() - start
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from SistemManagementInventar.idempotenta import curata_chei_expirate
+
+
+class Command(BaseCommand):
+    help = "Șterge cheile Idempotency-Key expirate (mai vechi de IDEMPOTENTA_ORE_PASTRARE ore)"
+
+    def handle(self, *args, **options):
+        numar = curata_chei_expirate()
+        self.stdout.write(self.style.SUCCESS(f"{numar} chei de idempotenta expirate sterse"))
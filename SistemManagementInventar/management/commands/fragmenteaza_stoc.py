@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from SistemManagementInventar.models import Produs
+from SistemManagementInventar.stocuri import defragmenteaza_stoc, fragmenteaza_stoc, numar_fragmente_implicit
+
+
+class Command(BaseCommand):
+    help = ("Împarte stocul produselor foarte vândute pe mai multe rânduri FragmentStoc, ca facturile "
+            "concurente să nu se blocheze pe același rând Produs (sau revine la un singur rând)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('id_produse', nargs='+', type=int, help="ID-urile produselor")
+        parser.add_argument('--fragmente', type=int, default=None,
+                            help="Numărul de fragmente (implicit STOC_NUMAR_FRAGMENTE)")
+        parser.add_argument('--dezactiveaza', action='store_true',
+                            help="Readuce stocul într-un singur rând și șterge fragmentele")
+
+    def handle(self, *args, **options):
+        if options['fragmente'] is not None and options['fragmente'] < 1:
+            raise CommandError("--fragmente trebuie să fie cel puțin 1")
+        for id_produs in options['id_produse']:
+            try:
+                if options['dezactiveaza']:
+                    stoc = defragmenteaza_stoc(id_produs)
+                    mesaj = f"Produsul {id_produs}: stoc într-un singur rând ({stoc} unități)"
+                else:
+                    numar = options['fragmente'] or numar_fragmente_implicit()
+                    stoc = fragmenteaza_stoc(id_produs, numar)
+                    mesaj = f"Produsul {id_produs}: {stoc} unități împărțite pe {numar} fragmente"
+            except Produs.DoesNotExist:
+                raise CommandError(f"Produsul {id_produs} nu există")
+            self.stdout.write(self.style.SUCCESS(mesaj))
@@ -0,0 +1,34 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from SistemManagementInventar.importuri import citeste_fisier, importa_produse, DIMENSIUNE_LOT_IMPORT
+
+
+class Command(BaseCommand):
+    help = "Importă în masă produse (și detaliile lor) dintr-un fișier CSV sau JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('fisier', help="Calea către fișierul .csv sau .json")
+        parser.add_argument('--upsert', action='store_true',
+                            help="Actualizează produsele existente cu aceeași cheie (nume, nr_lot, id_furnizor)")
+        parser.add_argument('--lot', type=int, default=DIMENSIUNE_LOT_IMPORT,
+                            help="Numărul de rânduri scrise într-o tranzacție")
+
+    def handle(self, *args, **options):
+        if options['lot'] < 1:
+            raise CommandError("--lot trebuie să fie cel puțin 1")
+        try:
+            with open(options['fisier'], 'rb') as f:
+                randuri = citeste_fisier(options['fisier'], f.read())
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Fișierul nu poate fi citit: {e}")
+
+        raport = importa_produse(randuri, upsert=options['upsert'], dimensiune_lot=options['lot'])
+
+        for eroare in raport['erori']:
+            self.stderr.write(f"Rândul {eroare['rand']}: {json.dumps(eroare['erori'], ensure_ascii=False)}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Import finalizat: {raport['creat']} create, {raport['actualizat']} actualizate, "
+            f"{len(raport['erori'])} rânduri cu erori"
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from SistemManagementInventar.potriviri import reconstruieste_index
+
+
+class Command(BaseCommand):
+    help = ("Reconstruiește indexul inversat al cererilor clienților în așteptare (potriviri.py); "
+            "cu --potriveste caută apoi potriviri pentru toate produsele cu stoc")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--potriveste', action='store_true',
+                            help="Recalculează potrivirile pentru toate produsele cu stoc")
+
+    def handle(self, *args, **options):
+        rezultat = reconstruieste_index(potriveste=options['potriveste'])
+        mesaj = f"{rezultat['cereri']} cereri indexate ({rezultat['tokenuri']} tokenuri)"
+        if options['potriveste']:
+            mesaj += f", {rezultat['potriviri']} potriviri salvate"
+        self.stdout.write(self.style.SUCCESS(mesaj))
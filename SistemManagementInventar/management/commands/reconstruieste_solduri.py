@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from SistemManagementInventar.solduri import reconstruieste_solduri
+
+
+class Command(BaseCommand):
+    help = "Recalculează de la zero soldurile furnizorilor din tranzacțiile ContFurnizor"
+
+    def handle(self, *args, **options):
+        numar = reconstruieste_solduri()
+        self.stdout.write(self.style.SUCCESS(f"Solduri recalculate pentru {numar} furnizori"))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from SistemManagementInventar.sarcini import ruleaza_lucratori, TIPURI_SARCINI
+
+
+class Command(BaseCommand):
+    help = ("Pornește lucrătorii care execută sarcinile în fundal din tabela Sarcina "
+            f"(tipuri: {', '.join(sorted(TIPURI_SARCINI)) or '-'})")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fire', type=int, default=2, help="Numărul de fire de execuție din acest proces")
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help="Secunde de așteptare când coada este goală")
+        parser.add_argument('--pana-la-golire', action='store_true',
+                            help="Se oprește când nu mai sunt sarcini în așteptare (ex. rulare din cron)")
+
+    def handle(self, *args, **options):
+        if options['fire'] < 1:
+            raise CommandError("--fire trebuie să fie cel puțin 1")
+        self.stdout.write(f"Lucrători porniți: {options['fire']} fire (Ctrl+C pentru oprire)")
+        try:
+            ruleaza_lucratori(nr_fire=options['fire'], interval=options['interval'],
+                              pana_la_golire=options['pana_la_golire'])
+        except KeyboardInterrupt:
+            self.stdout.write("Oprire cerută, se așteaptă finalizarea sarcinilor în curs...")
+        self.stdout.write(self.style.SUCCESS("Lucrători opriți"))
@@ -0,0 +1,262 @@
+import json
+import random
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+# scenariu -> ponderea implicită în trafic (casierii caută des, facturează mai rar)
+MIX_IMPLICIT = {'produsbynume': 50, 'produs': 20, 'api_acasa': 15, 'factura': 15}
+
+
+def percentila(valori_sortate, procent):
+    """Percentila prin metoda rangului cel mai apropiat, pe o listă deja sortată."""
+    if not valori_sortate:
+        return None
+    rang = max(1, -(-len(valori_sortate) * procent // 100))
+    return valori_sortate[int(rang) - 1]
+
+
+class ClientApi:
+    """Client HTTP minimal (urllib) cu JWT obținut din api/gettoken/ și reînnoit la 401."""
+
+    def __init__(self, url_baza, utilizator, parola, timeout):
+        self.url_baza = url_baza.rstrip('/')
+        self.utilizator = utilizator
+        self.parola = parola
+        self.timeout = timeout
+        self._lacat = threading.Lock()
+        self.token = None
+        self.autentifica()
+
+    def autentifica(self):
+        cod, raspuns = self._trimite('POST', '/api/gettoken/', {'username': self.utilizator, 'password': self.parola},
+                                     autentificat=False)
+        if cod != 200:
+            raise CommandError(f"Autentificare esuata pentru {self.utilizator} (HTTP {cod})")
+        with self._lacat:
+            self.token = json.loads(raspuns)['access']
+
+    def cerere(self, metoda, ruta, corp=None, antete=None):
+        cod, raspuns = self._trimite(metoda, ruta, corp, antete=antete)
+        if cod == 401:
+            self.autentifica()
+            cod, raspuns = self._trimite(metoda, ruta, corp, antete=antete)
+        return cod, raspuns
+
+    def _trimite(self, metoda, ruta, corp=None, autentificat=True, antete=None):
+        antete = dict(antete or {}, Accept='application/json')
+        date = None
+        if corp is not None:
+            date = json.dumps(corp).encode()
+            antete['Content-Type'] = 'application/json'
+        if autentificat:
+            antete['Authorization'] = f'Bearer {self.token}'
+        cerere = urllib.request.Request(self.url_baza + ruta, data=date, headers=antete, method=metoda)
+        try:
+            with urllib.request.urlopen(cerere, timeout=self.timeout) as raspuns:
+                return raspuns.status, raspuns.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+
+class Command(BaseCommand):
+    help = ("Test de încărcare HTTP fără servicii externe: trimite către un server local, la o rată țintă, "
+            "un amestec de căutări în catalog, dashboard, listări de produse și facturi noi, apoi raportează "
+            "throughput, rata de erori și latențele p50/p95/p99 pe scenariu. Rezultatele se salvează în JSON "
+            "pentru comparație între versiuni. Atenție: facturile sunt reale și scad stocul.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help="Adresa serverului testat")
+        parser.add_argument('--utilizator', action='append', required=True,
+                            help="utilizator:parola (se poate repeta; cererile sunt împărțite între utilizatori)")
+        parser.add_argument('--rata', type=float, default=20, help="Cereri pe secundă (ținta)")
+        parser.add_argument('--durata', type=float, default=30, help="Durata testului, în secunde")
+        parser.add_argument('--fire', type=int, default=32, help="Cereri simultane maxime")
+        parser.add_argument('--mix', default=','.join(f'{nume}={pondere}' for nume, pondere in MIX_IMPLICIT.items()),
+                            help="Ponderile scenariilor, ex. produsbynume=50,produs=20,api_acasa=15,factura=15")
+        parser.add_argument('--timeout', type=float, default=30, help="Timeout-ul unei cereri, în secunde")
+        parser.add_argument('--eticheta', default='', help="Numele rulării în fișierul de rezultate (ex. versiunea)")
+        parser.add_argument('--salveaza', default=None,
+                            help="Fișierul JSON cu rezultate (implicit rezultate_incarcare/<data>_<eticheta>.json)")
+        parser.add_argument('--compara', default=None, help="Un fișier de rezultate anterior, pentru comparație")
+
+    def handle(self, *args, **options):
+        mix = self._citeste_mix(options['mix'])
+        if options['rata'] <= 0 or options['durata'] <= 0 or options['fire'] < 1:
+            raise CommandError("--rata, --durata și --fire trebuie să fie pozitive")
+
+        clienti = []
+        for valoare in options['utilizator']:
+            utilizator, separator, parola = valoare.partition(':')
+            if not separator:
+                raise CommandError(f"--utilizator trebuie să aibă forma utilizator:parola, nu {valoare}")
+            clienti.append(ClientApi(options['url'], utilizator, parola, options['timeout']))
+        produse = self._produse(clienti[0])
+
+        scenarii, ponderi = zip(*mix.items())
+        latente = defaultdict(list)
+        coduri = defaultdict(lambda: defaultdict(int))
+        lacat = threading.Lock()
+
+        def executa(scenariu, moment_planificat, client):
+            try:
+                cod = self._ruleaza_scenariu(scenariu, client, produse)
+            except Exception:
+                cod = 'exceptie'
+            # latența se măsoară de la momentul planificat, nu de la trimitere: cererile întârziate
+            # de un server saturat apar ca latență, nu dispar din statistici
+            durata = time.perf_counter() - moment_planificat
+            with lacat:
+                latente[scenariu].append(durata)
+                coduri[scenariu][cod] += 1
+
+        total = int(options['rata'] * options['durata'])
+        self.stdout.write(f"{total} cereri in {options['durata']:.0f} s catre {options['url']} ({options['mix']})")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['fire']) as executor:
+            for index in range(total):
+                # buclă deschisă: cererile pleacă la rata țintă, indiferent cât răspunde serverul
+                moment_planificat = start + index / options['rata']
+                asteptare = moment_planificat - time.perf_counter()
+                if asteptare > 0:
+                    time.sleep(asteptare)
+                scenariu = random.choices(scenarii, ponderi)[0]
+                executor.submit(executa, scenariu, moment_planificat, clienti[index % len(clienti)])
+        durata_totala = time.perf_counter() - start
+
+        rezultate = self._statistici(latente, coduri, durata_totala)
+        self._afiseaza(rezultate)
+        fisier = self._salveaza(rezultate, options, durata_totala)
+        self.stdout.write(self.style.SUCCESS(f"Rezultate salvate in {fisier}"))
+        if options['compara']:
+            self._compara(rezultate, options['compara'])
+
+    @staticmethod
+    def _citeste_mix(text):
+        mix = {}
+        for parte in filter(None, (parte.strip() for parte in text.split(','))):
+            nume, _, pondere = parte.partition('=')
+            if nume not in MIX_IMPLICIT:
+                raise CommandError(f"Scenariu necunoscut: {nume} (optiuni: {', '.join(MIX_IMPLICIT)})")
+            try:
+                mix[nume] = float(pondere)
+            except ValueError:
+                raise CommandError(f"Pondere invalida pentru {nume}: {pondere}")
+        if not mix or sum(mix.values()) <= 0:
+            raise CommandError("--mix trebuie să conțină cel puțin un scenariu cu pondere pozitivă")
+        return mix
+
+    @staticmethod
+    def _produse(client):
+        """Produsele folosite în căutări și facturi: id, nume, stoc (o singură listare înainte de test)."""
+        cod, raspuns = client.cerere('GET', '/api/produs/?fields=id,nume,stoc_total')
+        if cod != 200:
+            raise CommandError(f"Listarea produselor a esuat (HTTP {cod})")
+        produse = [produs for produs in json.loads(raspuns)['data'] if produs['stoc_total'] > 0]
+        if not produse:
+            raise CommandError("Este nevoie de cel puțin un produs cu stoc pentru test")
+        return produse
+
+    @staticmethod
+    def _ruleaza_scenariu(scenariu, client, produse):
+        produs = random.choice(produse)
+        if scenariu == 'produsbynume':
+            termen = produs['nume'].split()[0] if produs['nume'].split() else produs['nume']
+            cod, _ = client.cerere('GET', f"/api/produsbynume/{urllib.parse.quote(termen)}")
+        elif scenariu == 'produs':
+            cod, _ = client.cerere('GET', '/api/produs/')
+        elif scenariu == 'api_acasa':
+            cod, _ = client.cerere('GET', '/api/api_acasa/')
+        else:
+            # ca un POS: fiecare factură cu cheia ei de idempotență
+            corp = {
+                'nume': 'Client test incarcare', 'adresa': '-', 'contact': 'test_incarcare',
+                'detalii_produs': [{'id': produs['id'], 'cantitate': 1}],
+            }
+            cod, _ = client.cerere('POST', '/api/api_generare_factura/', corp,
+                                   antete={'Idempotency-Key': str(uuid.uuid4())})
+        return cod
+
+    @staticmethod
+    def _statistici(latente, coduri, durata_totala):
+        rezultate = {}
+        for scenariu in sorted(latente):
+            valori = sorted(latente[scenariu])
+            total = len(valori)
+            reusite = sum(numar for cod, numar in coduri[scenariu].items() if isinstance(cod, int) and cod < 400)
+            limitate = coduri[scenariu].get(429, 0)
+            rezultate[scenariu] = {
+                'cereri': total,
+                'cereri_pe_secunda': round(reusite / durata_totala, 2),
+                'rata_erori': round((total - reusite - limitate) / total, 4),
+                'rata_limitate': round(limitate / total, 4),
+                'p50_ms': round(percentila(valori, 50) * 1000, 1),
+                'p95_ms': round(percentila(valori, 95) * 1000, 1),
+                'p99_ms': round(percentila(valori, 99) * 1000, 1),
+                'coduri': {str(cod): numar for cod, numar in sorted(coduri[scenariu].items(), key=str)},
+            }
+        return rezultate
+
+    def _afiseaza(self, rezultate):
+        self.stdout.write(f"{'scenariu':<14} {'cereri':>7} {'req/s':>8} {'erori':>7} {'429':>7} "
+                          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for scenariu, date in rezultate.items():
+            self.stdout.write(
+                f"{scenariu:<14} {date['cereri']:>7} {date['cereri_pe_secunda']:>8.1f} {date['rata_erori']:>7.1%} "
+                f"{date['rata_limitate']:>7.1%} {date['p50_ms']:>9.1f} {date['p95_ms']:>9.1f} {date['p99_ms']:>9.1f}"
+            )
+        if any(date['rata_limitate'] for date in rezultate.values()):
+            self.stdout.write(self.style.WARNING(
+                "Unele cereri au primit 429: măriți LIMITARI_GALETI pe serverul testat sau folosiți mai mulți utilizatori"
+            ))
+
+    @staticmethod
+    def _versiune():
+        try:
+            return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                                  capture_output=True, text=True, timeout=5).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    def _salveaza(self, rezultate, options, durata_totala):
+        acum = timezone.localtime()
+        eticheta = options['eticheta'] or self._versiune() or 'local'
+        fisier = Path(options['salveaza'] or Path(settings.BASE_DIR) / 'rezultate_incarcare'
+                      / f"{acum:%Y%m%d_%H%M%S}_{eticheta}.json")
+        fisier.parent.mkdir(parents=True, exist_ok=True)
+        fisier.write_text(json.dumps({
+            'eticheta': eticheta,
+            'versiune': self._versiune(),
+            'data': acum.isoformat(),
+            'parametri': {camp: options[camp] for camp in ('url', 'rata', 'durata', 'fire', 'mix')},
+            'durata_secunde': round(durata_totala, 2),
+            'scenarii': rezultate,
+        }, indent=2, ensure_ascii=False), encoding='utf-8')
+        return fisier
+
+    def _compara(self, rezultate, fisier_anterior):
+        try:
+            anterior = json.loads(Path(fisier_anterior).read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Nu pot citi {fisier_anterior}: {e}")
+        self.stdout.write(f"Comparatie cu {anterior.get('eticheta')} ({anterior.get('data')}):")
+        self.stdout.write(f"{'scenariu':<14} {'req/s':>16} {'p95 ms':>20} {'p99 ms':>20}")
+        for scenariu, date in rezultate.items():
+            vechi = anterior.get('scenarii', {}).get(scenariu)
+            if not vechi:
+                continue
+            self.stdout.write(
+                f"{scenariu:<14} {vechi['cereri_pe_secunda']:>7.1f} -> {date['cereri_pe_secunda']:<6.1f} "
+                f"{vechi['p95_ms']:>9.1f} -> {date['p95_ms']:<8.1f} {vechi['p99_ms']:>9.1f} -> {date['p99_ms']:<8.1f}"
+            )
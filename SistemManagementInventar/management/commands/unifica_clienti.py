@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from SistemManagementInventar.clienti import unifica_clienti, DIMENSIUNE_LOT_UNIFICARE
+
+
+class Command(BaseCommand):
+    help = ("Unifică clienții duplicați (același nume și contact, normalizate): mută facturile "
+            "pe clientul canonic, șterge duplicatele și completează Client.cheie_unica")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lot', type=int, default=DIMENSIUNE_LOT_UNIFICARE,
+                            help="Numărul de clienți procesați într-o tranzacție")
+        parser.add_argument('--simulare', action='store_true',
+                            help="Doar raportează ce s-ar unifica, fără să modifice baza de date")
+
+    def handle(self, *args, **options):
+        if options['lot'] < 1:
+            raise CommandError("--lot trebuie să fie cel puțin 1")
+        raport = unifica_clienti(dimensiune_lot=options['lot'], simulare=options['simulare'])
+        prefix = "Simulare: " if options['simulare'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{raport['procesati']} clienți procesați, {raport['unificati']} duplicate unificate, "
+            f"{raport['facturi_mutate']} facturi mutate"
+        ))
@@ -0,0 +1,92 @@
+# middleware.py
+import secrets
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Conținut deja comprimat sau care trebuie trimis imediat, fără buffer de compresie
+TIPURI_NECOMPRESIBILE = (
+    'application/zip',
+    'application/vnd.openxmlformats-officedocument',
+    'application/msgpack',
+    'text/event-stream',
+    'image/',
+)
+
+
+class CompresieRaspunsMiddleware(GZipMiddleware):
+    """
+    Comprimă răspunsurile API mai mari decât settings.COMPRESIE_PRAG_OCTETI:
+    - brotli ("br") dacă pachetul brotli e instalat și clientul îl acceptă
+    - altfel gzip, prin GZipMiddleware (inclusiv pentru răspunsurile în flux)
+    MessagePack nu e comprimat: e deja compact și e folosit de clienții care vor CPU minim.
+    Împotriva BREACH, ambele variante adaugă o umplutură de lungime aleatoare (0..max_random_bytes):
+    GZipMiddleware în numele de fișier din antetul gzip, brotli într-un meta-bloc de metadate.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        tip_continut = response.get('Content-Type', '')
+        if any(tip_continut.startswith(tip) for tip in TIPURI_NECOMPRESIBILE):
+            return response
+        if not response.streaming and len(response.content) < getattr(settings, 'COMPRESIE_PRAG_OCTETI', 1024):
+            return response
+
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is not None and not response.streaming and 'br' in _codificari(accept_encoding):
+            patch_vary_headers(response, ('Accept-Encoding',))
+            continut = comprima_brotli(response.content, getattr(settings, 'COMPRESIE_BROTLI_CALITATE', 5),
+                                       self.max_random_bytes)
+            if len(continut) >= len(response.content):
+                return response
+            response.content = continut
+            response.headers['Content-Length'] = str(len(continut))
+            etag = response.get('ETag')
+            if etag and etag.startswith('"'):
+                response.headers['ETag'] = 'W/' + etag
+            response.headers['Content-Encoding'] = 'br'
+            return response
+
+        return super().process_response(request, response)
+
+
+def _metadate_brotli(lungime):
+    """
+    Meta-bloc de metadate brotli (RFC 7932, 9.2) cu `lungime` octeți (1..256) ignorați la decodare:
+    ISLAST=0, MNIBBLES=0 (cod 3), bit rezervat 0, MSKIPBYTES=1, MSKIPLEN-1 pe 8 biți, aliniere la octet.
+    """
+    valoare = lungime - 1
+    return bytes([0b00010110 | ((valoare & 0b11) << 6), valoare >> 2]) + bytes(lungime)
+
+
+def comprima_brotli(continut, calitate, max_octeti_aleatori):
+    """
+    Ca GZipMiddleware (Heal the Breach): lungimea răspunsului comprimat variază aleator, deci un
+    atacator nu poate deduce un secret din răspuns după lungimea lui. flush() aliniază fluxul la
+    octet între meta-blocuri, unde se poate insera metadatele.
+    """
+    compresor = brotli.Compressor(quality=calitate)
+    comprimat = compresor.process(continut) + compresor.flush()
+    umplutura = secrets.randbelow(max_octeti_aleatori + 1)
+    if umplutura:
+        comprimat += _metadate_brotli(umplutura)
+    return comprimat + compresor.finish()
+
+
+def _codificari(accept_encoding):
+    """'gzip, br;q=0.9, deflate;q=0' -> {'gzip', 'br'} (ignoră codificările cu q=0)"""
+    acceptate = set()
+    for element in accept_encoding.split(','):
+        nume, _, parametri = element.strip().partition(';')
+        if parametri.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        if nume:
+            acceptate.add(nume.strip().lower())
+    return acceptate
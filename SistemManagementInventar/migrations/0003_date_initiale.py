@@ -0,0 +1,79 @@
+# Datele inițiale (fixtures/all_data.json), încărcate cu modelele istorice ale acestui punct din
+# istoric. Înlocuiește 0003_auto_20250528_2221: acolo loaddata folosește modelele curente, care au
+# câmpuri adăugate de migrările ulterioare, deci o bază nouă nu mai putea fi creată. Bazele care au
+# aplicat deja 0003_auto_20250528_2221 consideră această migrare aplicată și nu o mai rulează.
+# Tipurile de conținut și permisiunile din fixture nu se copiază: Django le creează după migrare.
+import json
+from pathlib import Path
+
+from django.core.management.color import no_style
+from django.db import migrations
+
+FIXTURE = Path(__file__).resolve().parent.parent / 'fixtures' / 'all_data.json'
+APLICATIE = 'SistemManagementInventar'
+
+
+def _valoare(camp, valoare, angajati):
+    if camp.is_relation:
+        # angajații sunt referiți prin cheie naturală (username), restul prin id
+        if camp.related_model._meta.model_name == 'angajat' and isinstance(valoare, list):
+            return angajati[valoare[0]]
+        return valoare
+    return camp.to_python(valoare)
+
+
+def incarca_date_initiale(apps, schema_editor):
+    with open(FIXTURE, encoding='utf-8') as fisier:
+        obiecte = [obiect for obiect in json.load(fisier) if obiect['model'].startswith(f'{APLICATIE}.')]
+
+    pe_model = {}
+    for obiect in obiecte:
+        pe_model.setdefault(obiect['model'].split('.', 1)[1], []).append(obiect)
+
+    angajati = {}
+    modele = []
+    for nume_model, randuri in pe_model.items():
+        model = apps.get_model(APLICATIE, nume_model)
+        campuri = {camp.name: camp for camp in model._meta.concrete_fields}
+        # auto_now / auto_now_add ar suprascrie datele din fixture la inserare; se rescriu după
+        automate = [camp.name for camp in campuri.values()
+                    if getattr(camp, 'auto_now', False) or getattr(camp, 'auto_now_add', False)]
+        instante = []
+        for rand in randuri:
+            valori = {
+                camp.attname: _valoare(camp, rand['fields'][nume], angajati)
+                for nume, camp in campuri.items() if nume in rand['fields']
+            }
+            instante.append(model(pk=rand.get('pk'), **valori))
+        date_fixture = [{nume: getattr(instanta, nume) for nume in automate} for instanta in instante]
+        model.objects.bulk_create(instante)
+        if automate:
+            # toate modelele cu auto_now_add au id-uri în fixture
+            for instanta, date in zip(instante, date_fixture):
+                for nume, valoare in date.items():
+                    setattr(instanta, nume, valoare)
+            model.objects.bulk_update(instante, automate)
+        if nume_model == 'angajat':
+            angajati.update(model.objects.values_list('username', 'id'))
+        modele.append(model)
+
+    # id-urile au fost date explicit: secvențele (PostgreSQL) pornesc după ele
+    conexiune = schema_editor.connection
+    with conexiune.cursor() as cursor:
+        for sql in conexiune.ops.sequence_reset_sql(no_style(), modele):
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    replaces = [
+        (APLICATIE, '0003_auto_20250528_2221'),
+    ]
+
+    dependencies = [
+        (APLICATIE, '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(incarca_date_initiale, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:40
+
+import django.db.models.deletion
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def calculeaza_solduri_initiale(apps, schema_editor):
+    ContFurnizor = apps.get_model('SistemManagementInventar', 'ContFurnizor')
+    SoldFurnizor = apps.get_model('SistemManagementInventar', 'SoldFurnizor')
+    solduri = {}
+    for tranzactie in ContFurnizor.objects.all().iterator():
+        sold = solduri.setdefault(tranzactie.id_furnizor_id, SoldFurnizor(
+            id_furnizor_id=tranzactie.id_furnizor_id,
+            total_debit=Decimal('0'), total_credit=Decimal('0'), sold_net=Decimal('0'),
+        ))
+        if str(tranzactie.tip_tranzactie) == '1':
+            sold.total_debit += tranzactie.suma_tranzactie
+        else:
+            sold.total_credit += tranzactie.suma_tranzactie
+        sold.sold_net = sold.total_credit - sold.total_debit
+        if sold.data_ultima_tranzactie is None or tranzactie.data_tranzactie > sold.data_ultima_tranzactie:
+            sold.data_ultima_tranzactie = tranzactie.data_tranzactie
+    SoldFurnizor.objects.bulk_create(solduri.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SistemManagementInventar', '0004_auto_20250528_2249'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SoldFurnizor',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('total_debit', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_credit', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('sold_net', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('data_ultima_tranzactie', models.DateField(blank=True, null=True)),
+                ('id_furnizor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sold', to='SistemManagementInventar.furnizor')),
+            ],
+        ),
+        migrations.RunPython(calculeaza_solduri_initiale, migrations.RunPython.noop),
+    ]
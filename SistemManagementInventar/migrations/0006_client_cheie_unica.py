@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SistemManagementInventar', '0005_soldfurnizor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='cheie_unica',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+    ]
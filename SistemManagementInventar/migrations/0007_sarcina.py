@@ -0,0 +1,36 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:49
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SistemManagementInventar', '0006_client_cheie_unica'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Sarcina',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('tip', models.CharField(max_length=100)),
+                ('parametri', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('stare', models.CharField(choices=[('asteptare', 'În așteptare'), ('rulare', 'În rulare'), ('finalizata', 'Finalizată'), ('eroare', 'Eroare')], default='asteptare', max_length=20)),
+                ('rezultat', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('eroare', models.TextField(blank=True, default='')),
+                ('incercari', models.IntegerField(default=0)),
+                ('lucrator', models.CharField(blank=True, default='', max_length=255)),
+                ('data_adaugare', models.DateTimeField(auto_now_add=True)),
+                ('data_start', models.DateTimeField(blank=True, null=True)),
+                ('data_final', models.DateTimeField(blank=True, null=True)),
+                ('id_angajat', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['stare', 'id'], name='SistemManag_stare_65b5ad_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:50
+
+from django.db import migrations, models
+
+
+def initializeaza_data_modificare(apps, schema_editor):
+    """Rândurile existente primesc ca dată a ultimei modificări data la care au fost adăugate."""
+    campuri_creare = {
+        'furnizor': 'data_adaugare', 'produs': 'data_adaugare', 'detaliiprodus': 'data_adaugare',
+        'client': 'data_adaugare', 'factura': 'data_adaugare', 'salariuangajat': 'data_adaugare',
+        'detaliifactura': 'data_adaugare', 'cerereclient': 'data_cerere', 'angajat': 'date_joined',
+    }
+    for nume_model, camp in campuri_creare.items():
+        model = apps.get_model('SistemManagementInventar', nume_model)
+        model.objects.update(data_modificare=models.F(camp))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SistemManagementInventar', '0007_sarcina'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StergereSync',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=100)),
+                ('id_obiect', models.IntegerField()),
+                ('data_modificare', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='angajat',
+            name='data_modificare',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='bancaangajat',
+            name='data_modificare',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='bancafurnizor',
+            name='data_modificare',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='cerereclient',
+            name='data_modificare',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='data_modificare',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='contfurnizor',
+            name='data_modificare',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='detaliifactura',
+            name='data_modificare',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='detaliiprodus',
+            name='data_modificare',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='factura',
+            name='data_modificare',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='furnizor',
+            name='data_modificare',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='produs',
+            name='data_modificare',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='salariuangajat',
+            name='data_modificare',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='soldfurnizor',
+            name='data_modificare',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(initializeaza_data_modificare, migrations.RunPython.noop),
+    ]
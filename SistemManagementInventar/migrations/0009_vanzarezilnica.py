@@ -0,0 +1,34 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SistemManagementInventar', '0008_data_modificare_stergeresync'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='detaliifactura',
+            name='data_adaugare',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='VanzareZilnica',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('data', models.DateField()),
+                ('cantitate', models.IntegerField(default=0)),
+                ('valoare_vanzare', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('valoare_cumparare', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('id_produs', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='SistemManagementInventar.produs')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['data', 'id_produs'], name='SistemManag_data_d413bb_idx')],
+                'constraints': [models.UniqueConstraint(fields=('id_produs', 'data'), name='vanzare_zilnica_unica')],
+            },
+        ),
+    ]
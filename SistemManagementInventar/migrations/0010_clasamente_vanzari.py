@@ -0,0 +1,51 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SistemManagementInventar', '0009_vanzarezilnica'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgresAgregare',
+            fields=[
+                ('cheie', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('pana_la', models.DateField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TotalFereastra',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('zile', models.PositiveSmallIntegerField()),
+                ('cantitate', models.IntegerField(default=0)),
+                ('valoare_vanzare', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('valoare_cumparare', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('id_client', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='SistemManagementInventar.client')),
+                ('id_produs', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='SistemManagementInventar.produs')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('zile', 'id_produs'), name='total_fereastra_produs_unic'), models.UniqueConstraint(fields=('zile', 'id_client'), name='total_fereastra_client_unic')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VanzareZilnicaClient',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('data', models.DateField()),
+                ('cantitate', models.IntegerField(default=0)),
+                ('valoare_vanzare', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('valoare_cumparare', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('id_client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='SistemManagementInventar.client')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['data', 'id_client'], name='SistemManag_data_3bc596_idx')],
+                'constraints': [models.UniqueConstraint(fields=('id_client', 'data'), name='vanzare_zilnica_client_unica')],
+            },
+        ),
+    ]
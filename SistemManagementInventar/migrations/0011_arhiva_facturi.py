@@ -0,0 +1,35 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SistemManagementInventar', '0010_clasamente_vanzari'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacturaArhiva',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('data_adaugare', models.DateTimeField(db_index=True)),
+                ('data_modificare', models.DateTimeField()),
+                ('data_arhivare', models.DateTimeField(auto_now_add=True)),
+                ('id_client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='SistemManagementInventar.client')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DetaliiFacturaArhiva',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('cantitate', models.IntegerField()),
+                ('data_adaugare', models.DateTimeField(db_index=True)),
+                ('data_modificare', models.DateTimeField()),
+                ('id_produs', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='SistemManagementInventar.produs')),
+                ('id_factura', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='detaliifactura_set', related_query_name='detaliifactura', to='SistemManagementInventar.facturaarhiva')),
+            ],
+        ),
+    ]
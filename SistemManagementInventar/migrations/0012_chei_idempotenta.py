@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:07
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SistemManagementInventar', '0011_arhiva_facturi'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheieIdempotenta',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('cheie', models.CharField(max_length=255)),
+                ('ruta', models.CharField(max_length=255)),
+                ('amprenta', models.CharField(max_length=64)),
+                ('cod_raspuns', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('raspuns', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('data_adaugare', models.DateTimeField(auto_now_add=True)),
+                ('data_expirare', models.DateTimeField(db_index=True)),
+                ('id_angajat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('id_angajat', 'ruta', 'cheie'), name='cheie_idempotenta_unica')],
+            },
+        ),
+    ]
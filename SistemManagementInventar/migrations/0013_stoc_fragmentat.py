@@ -0,0 +1,40 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SistemManagementInventar', '0012_chei_idempotenta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FragmentStoc',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('index', models.PositiveSmallIntegerField()),
+                ('cantitate', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='produs',
+            name='stoc_fragmentat',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='produs',
+            index=models.Index(condition=models.Q(('stoc_fragmentat', True)), fields=['id'], name='produs_stoc_fragmentat'),
+        ),
+        migrations.AddField(
+            model_name='fragmentstoc',
+            name='id_produs',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fragmente_stoc', to='SistemManagementInventar.produs'),
+        ),
+        migrations.AddConstraint(
+            model_name='fragmentstoc',
+            constraint=models.UniqueConstraint(fields=('id_produs', 'index'), name='fragment_stoc_unic'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SistemManagementInventar', '0013_stoc_fragmentat'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='client',
+            name='nume',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='detaliiprodus',
+            name='nume_atribut',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='factura',
+            name='data_adaugare',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='produs',
+            name='data_expirare',
+            field=models.DateField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='produs',
+            name='nume',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SistemManagementInventar', '0014_indexuri_admin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PotrivireCerere',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('scor', models.FloatField()),
+                ('data_potrivire', models.DateTimeField(db_index=True)),
+                ('id_cerere', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='potriviri', to='SistemManagementInventar.cerereclient')),
+                ('id_produs', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='potriviri_cereri', to='SistemManagementInventar.produs')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('id_cerere', 'id_produs'), name='potrivire_cerere_unica')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TokenCerere',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('token', models.CharField(max_length=64)),
+                ('nr_tokenuri', models.PositiveSmallIntegerField()),
+                ('id_cerere', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokenuri', to='SistemManagementInventar.cerereclient')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('token', 'id_cerere'), name='token_cerere_unic')],
+            },
+        ),
+    ]
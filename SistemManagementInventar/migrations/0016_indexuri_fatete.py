@@ -0,0 +1,22 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SistemManagementInventar', '0015_potriviri_cereri'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='detaliiprodus',
+            name='nume_atribut',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='detaliiprodus',
+            index=models.Index(fields=['nume_atribut', 'valoare_atribut', 'id_produs'], name='detalii_atribut_valoare_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SistemManagementInventar', '0016_indexuri_fatete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersiuneRezultate',
+            fields=[
+                ('cheie', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('versiune', models.BigIntegerField()),
+            ],
+        ),
+    ]
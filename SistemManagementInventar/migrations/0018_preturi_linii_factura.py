@@ -0,0 +1,40 @@
+# Generated by Django 5.1.6 on 2026-10-19 16:10
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+CAMPURI_PRET = ('pret_cumparare', 'pret_vanzare', 'tva_produs')
+
+
+def copiaza_preturi_produse(apps, schema_editor):
+    # prețurile de la emiterea liniilor existente nu mai sunt cunoscute: se folosesc cele curente ale produselor
+    Produs = apps.get_model('SistemManagementInventar', 'Produs')
+    for nume_model in ('DetaliiFactura', 'DetaliiFacturaArhiva'):
+        model = apps.get_model('SistemManagementInventar', nume_model)
+        model.objects.update(**{
+            camp: Subquery(Produs.objects.filter(pk=OuterRef('id_produs')).values(camp)[:1])
+            for camp in CAMPURI_PRET
+        })
+
+
+def _campuri(null):
+    return [
+        ('pret_cumparare', models.DecimalField(decimal_places=2, max_digits=10, null=null)),
+        ('pret_vanzare', models.DecimalField(decimal_places=2, max_digits=10, null=null)),
+        ('tva_produs', models.DecimalField(decimal_places=2, max_digits=5, null=null)),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SistemManagementInventar', '0017_versiuni_rezultate'),
+    ]
+
+    operations = [
+        *[migrations.AddField(model_name=model, name=nume, field=camp)
+          for model in ('detaliifactura', 'detaliifacturaarhiva') for nume, camp in _campuri(null=True)],
+        migrations.RunPython(copiaza_preturi_produse, migrations.RunPython.noop),
+        *[migrations.AlterField(model_name=model, name=nume, field=camp)
+          for model in ('detaliifactura', 'detaliifacturaarhiva') for nume, camp in _campuri(null=False)],
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.6 on 2026-10-19 16:40
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+from django.utils import timezone
+
+LUNGIME_NR_LOT = 255
+
+
+def diferentiaza_duplicate(apps, schema_editor):
+    """
+    Produsele existente cu aceeași cheie (nume, nr_lot, id_furnizor) nu se pot uni sau șterge fără a
+    atinge facturile și stocul lor: cel mai vechi își păstrează cheia, celelalte primesc id-ul în nr_lot.
+    """
+    Produs = apps.get_model('SistemManagementInventar', 'Produs')
+    acum = timezone.now()
+    duplicate = (Produs.objects.values('nume', 'nr_lot', 'id_furnizor')
+                 .annotate(numar=Count('id'), primul=Min('id')).filter(numar__gt=1))
+    for cheie in duplicate:
+        ramase = list(Produs.objects.filter(nume=cheie['nume'], nr_lot=cheie['nr_lot'],
+                                            id_furnizor=cheie['id_furnizor']).exclude(id=cheie['primul']))
+        for produs in ramase:
+            sufix = f' #{produs.id}'
+            produs.nr_lot = produs.nr_lot[:LUNGIME_NR_LOT - len(sufix)] + sufix
+            # data_modificare: clienții sincronizați (/api/sync/) primesc noul nr_lot
+            produs.data_modificare = acum
+        Produs.objects.bulk_update(ramase, ['nr_lot', 'data_modificare'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SistemManagementInventar', '0018_preturi_linii_factura'),
+    ]
+
+    operations = [
+        migrations.RunPython(diferentiaza_duplicate, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='produs',
+            constraint=models.UniqueConstraint(fields=('nume', 'nr_lot', 'id_furnizor'), name='produs_unic_nume_lot_furnizor'),
+        ),
+    ]
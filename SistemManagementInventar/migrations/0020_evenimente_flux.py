@@ -0,0 +1,24 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:06
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SistemManagementInventar', '0019_produs_cheie_unica'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvenimentFlux',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('tip', models.CharField(max_length=50)),
+                ('date', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('data_creare', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('SistemManagementInventar', '0020_evenimente_flux'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='detaliiprodus',
+            index=models.Index(fields=['nume_atribut'], name='detalii_atribut_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='tokencerere',
+            index=models.Index(fields=['token'], name='token_cerere_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
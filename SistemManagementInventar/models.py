@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.utils import timezone
 
 class Furnizor(models.Model):
     id = models.AutoField(primary_key=True)
@@ -9,29 +11,49 @@ class Furnizor(models.Model):
     email = models.CharField(max_length=255)
     descriere = models.CharField(max_length=255)
     data_adaugare = models.DateTimeField(auto_now_add=True)
+    data_modificare = models.DateTimeField(auto_now=True, db_index=True)
 
     objects = models.Manager()
 
+    def __str__(self):
+        return self.nume
+
 
 class Produs(models.Model):
     id = models.AutoField(primary_key=True)
-    nume = models.CharField(max_length=255)
+    nume = models.CharField(max_length=255, db_index=True)
     tip_produs = models.CharField(max_length=255)
     pret_cumparare = models.DecimalField(max_digits=10, decimal_places=2)
     pret_vanzare = models.DecimalField(max_digits=10, decimal_places=2)
     tva_produs = models.DecimalField(max_digits=5, decimal_places=2, help_text="Procentaj TVA, de ex. 19.00 pentru 19%")
     nr_lot = models.CharField(max_length=255)
     nr_raft = models.CharField(max_length=255)
-    data_expirare = models.DateField()
+    data_expirare = models.DateField(db_index=True)
     data_producere = models.DateField()
     id_furnizor = models.ForeignKey(Furnizor, on_delete=models.CASCADE)
     descriere = models.CharField(max_length=255)
     stoc_total = models.IntegerField()
     cantitate_in_pachet = models.IntegerField()
     data_adaugare = models.DateTimeField(auto_now_add=True)
+    data_modificare = models.DateTimeField(auto_now=True, db_index=True)
+    # stoc împărțit pe rânduri FragmentStoc (produse foarte vândute, vezi stocuri.py);
+    # se schimbă doar prin comanda fragmenteaza_stoc
+    stoc_fragmentat = models.BooleanField(default=False, editable=False)
 
     objects = models.Manager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(stoc_fragmentat=True), name='produs_stoc_fragmentat'),
+        ]
+        constraints = [
+            # cheia după care importul (importuri.py) găsește produsul existent
+            models.UniqueConstraint(fields=['nume', 'nr_lot', 'id_furnizor'], name='produs_unic_nume_lot_furnizor'),
+        ]
+
+    def __str__(self):
+        return f"{self.nume} ({self.nr_lot})"
+
 
 class DetaliiProdus(models.Model):
     id = models.AutoField(primary_key=True)
@@ -41,14 +63,25 @@ class DetaliiProdus(models.Model):
     unitate_masura = models.CharField(max_length=255, blank=True, null=True)
     data_adaugare = models.DateTimeField(auto_now_add=True)
     descriere = models.CharField(max_length=255, blank=True, null=True)
+    data_modificare = models.DateTimeField(auto_now=True, db_index=True)
 
     objects = models.Manager()
 
+    class Meta:
+        # filtrarea după atribute (fatete.py): acoperă complet căutarea (nume, valoare) -> produs;
+        # servește și căutările doar după nume_atribut; căutarea după prefix din admin (LIKE 'x%')
+        # are nevoie pe PostgreSQL de un index cu varchar_pattern_ops când colaționarea nu este "C"
+        indexes = [
+            models.Index(fields=['nume_atribut', 'valoare_atribut', 'id_produs'], name='detalii_atribut_valoare_idx'),
+            models.Index(fields=['nume_atribut'], name='detalii_atribut_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
 class Angajat(AbstractUser):
     nume = models.CharField(max_length=255)
     prenume = models.CharField(max_length=255)
     telefon = models.CharField(max_length=20, blank=True)
     este_admin = models.BooleanField(default=False)
+    data_modificare = models.DateTimeField(auto_now=True, db_index=True)
 
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = ['email', 'nume', 'prenume']
@@ -66,21 +99,33 @@ class Angajat(AbstractUser):
 
 class Client(models.Model):
     id = models.AutoField(primary_key=True)
-    nume = models.CharField(max_length=255)
+    nume = models.CharField(max_length=255, db_index=True)
     adresa = models.CharField(max_length=255)
     contact = models.CharField(max_length=255)
     data_adaugare = models.DateTimeField(auto_now_add=True)
+    # sha256 din numele și contactul normalizate (vezi clienti.cheie_client); NULL pentru
+    # clienții vechi până la rularea comenzii unifica_clienti
+    cheie_unica = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
+    data_modificare = models.DateTimeField(auto_now=True, db_index=True)
 
     objects = models.Manager()
 
+    def __str__(self):
+        return f"{self.nume} ({self.contact})"
+
 
 class Factura(models.Model):
     id = models.AutoField(primary_key=True)
     id_client = models.ForeignKey(Client, on_delete=models.CASCADE)
-    data_adaugare = models.DateTimeField(auto_now_add=True)
+    data_adaugare = models.DateTimeField(auto_now_add=True, db_index=True)
+    data_modificare = models.DateTimeField(auto_now=True, db_index=True)
 
     objects = models.Manager()
 
+    def __str__(self):
+        # fără clientul facturii: listele din admin nu fac câte o interogare pe rând
+        return f"Factura {self.id}"
+
 
 class SalariuAngajat(models.Model):
     id = models.AutoField(primary_key=True)
@@ -88,19 +133,36 @@ class SalariuAngajat(models.Model):
     data_salariu = models.DateField()
     suma_salariu = models.DecimalField(max_digits=12, decimal_places=2)
     data_adaugare = models.DateTimeField(auto_now_add=True)
+    data_modificare = models.DateTimeField(auto_now=True, db_index=True)
 
     objects = models.Manager()
 
 
+# prețurile produsului copiate pe linia de factură la emitere: totalurile unei facturi nu se mai
+# schimbă când se modifică ulterior prețul sau cota TVA a produsului
+CAMPURI_PRET_LINIE = ('pret_cumparare', 'pret_vanzare', 'tva_produs')
+
+
 class DetaliiFactura(models.Model):
     id = models.AutoField(primary_key=True)
     id_factura = models.ForeignKey(Factura, on_delete=models.CASCADE)
     id_produs = models.ForeignKey(Produs, on_delete=models.CASCADE)
     cantitate = models.IntegerField()
-    data_adaugare = models.DateTimeField(auto_now_add=True)
+    pret_cumparare = models.DecimalField(max_digits=10, decimal_places=2)
+    pret_vanzare = models.DecimalField(max_digits=10, decimal_places=2)
+    tva_produs = models.DecimalField(max_digits=5, decimal_places=2)
+    data_adaugare = models.DateTimeField(auto_now_add=True, db_index=True)
+    data_modificare = models.DateTimeField(auto_now=True, db_index=True)
 
     objects = models.Manager()
 
+    def save(self, *args, **kwargs):
+        # prețurile lipsă se iau din produs (creările din bloc le completează în DetaliiFacturaSerializer)
+        for camp in CAMPURI_PRET_LINIE:
+            if getattr(self, camp) is None:
+                setattr(self, camp, getattr(self.id_produs, camp))
+        super().save(*args, **kwargs)
+
 
 class CerereClient(models.Model):
     id = models.AutoField(primary_key=True)
@@ -109,6 +171,7 @@ class CerereClient(models.Model):
     detalii_produs = models.CharField(max_length=255)
     status = models.BooleanField(default=False)
     data_cerere = models.DateTimeField(auto_now_add=True)
+    data_modificare = models.DateTimeField(auto_now=True, db_index=True)
 
     objects = models.Manager()
 
@@ -125,15 +188,34 @@ class ContFurnizor(models.Model):
     suma_tranzactie = models.DecimalField(max_digits=12, decimal_places=2)
     data_tranzactie = models.DateField()
     modalitate_plata = models.CharField(max_length=255)
+    data_modificare = models.DateTimeField(auto_now=True, db_index=True)
 
     objects = models.Manager()
 
+    def save(self, *args, **kwargs):
+        """
+        Salvează tranzacția și ajustează soldul furnizorului (solduri.py) în aceeași tranzacție:
+        la modificare, valorile vechi sunt recitite cu rândul blocat și scoase din sold.
+        Ștergerile sunt tratate de semnalul post_delete (signals.py).
+        """
+        from SistemManagementInventar import solduri
+
+        with transaction.atomic():
+            veche = None
+            if not self._state.adding and self.pk is not None:
+                veche = ContFurnizor.objects.select_for_update().filter(pk=self.pk).first()
+            super().save(*args, **kwargs)
+            if veche is not None:
+                solduri.aplica_tranzactie(veche, semn=-1)
+            solduri.aplica_tranzactie(self)
+
 
 class BancaFurnizor(models.Model):
     id = models.AutoField(primary_key=True)
     nr_cont_bancar = models.CharField(max_length=255)
     swift = models.CharField(max_length=255)
     id_furnizor = models.ForeignKey(Furnizor, on_delete=models.CASCADE)
+    data_modificare = models.DateTimeField(auto_now=True, db_index=True)
 
     objects = models.Manager()
 
@@ -143,5 +225,267 @@ class BancaAngajat(models.Model):
     nr_cont_bancar = models.CharField(max_length=255)
     swift = models.CharField(max_length=255)
     id_angajat = models.ForeignKey(Angajat, on_delete=models.CASCADE)
+    data_modificare = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = models.Manager()
+
+
+class SoldFurnizor(models.Model):
+    """
+    Soldul curent al unui furnizor, actualizat incremental la fiecare tranzacție ContFurnizor.
+    sold_net = total_credit - total_debit (pozitiv = suma pe care o datorăm furnizorului)
+    """
+    id = models.AutoField(primary_key=True)
+    id_furnizor = models.OneToOneField(Furnizor, on_delete=models.CASCADE, related_name='sold')
+    total_debit = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_credit = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    sold_net = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    data_ultima_tranzactie = models.DateField(blank=True, null=True)
+    data_modificare = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = models.Manager()
+
+
+class Sarcina(models.Model):
+    """
+    O sarcină (job) executată în fundal de comanda ruleaza_sarcini, fără broker extern:
+    tabela este coada, iar un lucrător revendică sarcina cu un UPDATE condiționat pe stare.
+    """
+    STARE_ASTEPTARE = 'asteptare'
+    STARE_RULARE = 'rulare'
+    STARE_FINALIZATA = 'finalizata'
+    STARE_EROARE = 'eroare'
+    STARE_CHOICES = [
+        (STARE_ASTEPTARE, "În așteptare"),
+        (STARE_RULARE, "În rulare"),
+        (STARE_FINALIZATA, "Finalizată"),
+        (STARE_EROARE, "Eroare"),
+    ]
+
+    id = models.AutoField(primary_key=True)
+    tip = models.CharField(max_length=100)
+    parametri = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    stare = models.CharField(max_length=20, choices=STARE_CHOICES, default=STARE_ASTEPTARE)
+    rezultat = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    eroare = models.TextField(blank=True, default='')
+    incercari = models.IntegerField(default=0)
+    lucrator = models.CharField(max_length=255, blank=True, default='')
+    id_angajat = models.ForeignKey(Angajat, on_delete=models.SET_NULL, null=True, blank=True)
+    data_adaugare = models.DateTimeField(auto_now_add=True)
+    data_start = models.DateTimeField(null=True, blank=True)
+    data_final = models.DateTimeField(null=True, blank=True)
+
+    objects = models.Manager()
+
+    class Meta:
+        indexes = [models.Index(fields=['stare', 'id'])]
+
+
+class StergereSync(models.Model):
+    """
+    Marcaj ("tombstone") pentru un rând șters dintr-un model sincronizat prin /api/sync/,
+    ca un client să afle și ce a dispărut de la ultima sincronizare. Scris din signals.py.
+    """
+    id = models.AutoField(primary_key=True)
+    model = models.CharField(max_length=100)
+    id_obiect = models.IntegerField()
+    data_modificare = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = models.Manager()
+
+
+class VanzareZilnica(models.Model):
+    """
+    Vânzările unui produs într-o zi încheiată (rollup din DetaliiFactura, vezi vanzari.py).
+    Rapoartele și prognoza citesc de aici în loc să parcurgă toate liniile de factură.
+    """
+    id = models.AutoField(primary_key=True)
+    id_produs = models.ForeignKey(Produs, on_delete=models.CASCADE)
+    data = models.DateField()
+    cantitate = models.IntegerField(default=0)
+    valoare_vanzare = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    valoare_cumparare = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    objects = models.Manager()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['id_produs', 'data'], name='vanzare_zilnica_unica')]
+        indexes = [models.Index(fields=['data', 'id_produs'])]
+
+
+class VanzareZilnicaClient(models.Model):
+    """Vânzările către un client într-o zi încheiată (rollup din DetaliiFactura, vezi vanzari.py)."""
+    id = models.AutoField(primary_key=True)
+    id_client = models.ForeignKey(Client, on_delete=models.CASCADE)
+    data = models.DateField()
+    cantitate = models.IntegerField(default=0)
+    valoare_vanzare = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    valoare_cumparare = models.DecimalField(max_digits=14, decimal_places=2, default=0)
 
     objects = models.Manager()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['id_client', 'data'], name='vanzare_zilnica_client_unica')]
+        indexes = [models.Index(fields=['data', 'id_client'])]
+
+
+class ProgresAgregare(models.Model):
+    """
+    Până la ce zi (inclusiv) este calculată o agregare incrementală: rollup-urile zilnice
+    ('vanzari_zilnice') și fiecare fereastră a clasamentelor ('fereastra_30' etc.), vezi vanzari.py.
+    """
+    cheie = models.CharField(max_length=50, primary_key=True)
+    pana_la = models.DateField()
+
+    objects = models.Manager()
+
+
+class VersiuneRezultate(models.Model):
+    """
+    Versiunea curentă a unei familii de rezultate din cache: rezultatele unui tip de sarcină
+    ('sarcini:acasa' etc.) sau analizele vânzărilor. Cheile din cache conțin versiunea, iar o
+    invalidare o mărește atomic (UPDATE ... versiune = versiune + 1) după commit, vezi sarcini.py.
+    """
+    cheie = models.CharField(max_length=100, primary_key=True)
+    versiune = models.BigIntegerField()
+
+    objects = models.Manager()
+
+
+class EvenimentFlux(models.Model):
+    """
+    Un eveniment al fluxului /api/evenimente/, scris după commit de procesul care l-a publicat și
+    citit periodic de fiecare proces cu abonați SSE (vezi evenimente.py). Șters după câteva minute.
+    """
+    id = models.BigAutoField(primary_key=True)
+    tip = models.CharField(max_length=50)
+    date = models.JSONField(encoder=DjangoJSONEncoder)
+    data_creare = models.DateTimeField(default=timezone.now, db_index=True)
+
+    objects = models.Manager()
+
+
+class TotalFereastra(models.Model):
+    """
+    Totalul vânzărilor unui produs sau client pe ultimele `zile` zile încheiate, actualizat
+    incremental din rollup-uri la fiecare zi nouă (vezi vanzari.py); clasamentele citesc de aici.
+    """
+    id = models.AutoField(primary_key=True)
+    zile = models.PositiveSmallIntegerField()
+    id_produs = models.ForeignKey(Produs, on_delete=models.CASCADE, null=True, blank=True)
+    id_client = models.ForeignKey(Client, on_delete=models.CASCADE, null=True, blank=True)
+    cantitate = models.IntegerField(default=0)
+    valoare_vanzare = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    valoare_cumparare = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['zile', 'id_produs'], name='total_fereastra_produs_unic'),
+            models.UniqueConstraint(fields=['zile', 'id_client'], name='total_fereastra_client_unic'),
+        ]
+
+
+class FacturaArhiva(models.Model):
+    """
+    Factură mutată din Factura de comanda arhiveaza_facturi (vezi arhiva.py); își păstrează id-ul,
+    deci API-ul o găsește și după arhivare.
+    """
+    id = models.IntegerField(primary_key=True)
+    id_client = models.ForeignKey(Client, on_delete=models.CASCADE)
+    data_adaugare = models.DateTimeField(db_index=True)
+    data_modificare = models.DateTimeField()
+    data_arhivare = models.DateTimeField(auto_now_add=True)
+
+    objects = models.Manager()
+
+
+class DetaliiFacturaArhiva(models.Model):
+    """Linie a unei facturi arhivate. Relația inversă are același nume ca la Factura (detaliifactura)."""
+    id = models.IntegerField(primary_key=True)
+    id_factura = models.ForeignKey(FacturaArhiva, on_delete=models.CASCADE,
+                                   related_name='detaliifactura_set', related_query_name='detaliifactura')
+    id_produs = models.ForeignKey(Produs, on_delete=models.CASCADE)
+    cantitate = models.IntegerField()
+    pret_cumparare = models.DecimalField(max_digits=10, decimal_places=2)
+    pret_vanzare = models.DecimalField(max_digits=10, decimal_places=2)
+    tva_produs = models.DecimalField(max_digits=5, decimal_places=2)
+    data_adaugare = models.DateTimeField(db_index=True)
+    data_modificare = models.DateTimeField()
+
+    objects = models.Manager()
+
+
+class CheieIdempotenta(models.Model):
+    """
+    O cheie Idempotency-Key folosită pe un endpoint de creare, cu răspunsul primei execuții
+    (vezi idempotenta.py). Unică per (angajat, rută, cheie); ștearsă după data_expirare.
+    """
+    id = models.AutoField(primary_key=True)
+    cheie = models.CharField(max_length=255)
+    ruta = models.CharField(max_length=255)
+    id_angajat = models.ForeignKey(Angajat, on_delete=models.CASCADE)
+    amprenta = models.CharField(max_length=64)
+    cod_raspuns = models.PositiveSmallIntegerField(null=True, blank=True)
+    raspuns = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    data_adaugare = models.DateTimeField(auto_now_add=True)
+    data_expirare = models.DateTimeField(db_index=True)
+
+    objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['id_angajat', 'ruta', 'cheie'], name='cheie_idempotenta_unica'),
+        ]
+
+
+class FragmentStoc(models.Model):
+    """
+    O parte din stocul unui produs fragmentat (Produs.stoc_fragmentat): vânzările scad dintr-un
+    fragment ales aleator, ca facturile concurente să nu blocheze același rând (vezi stocuri.py).
+    """
+    id = models.AutoField(primary_key=True)
+    id_produs = models.ForeignKey(Produs, on_delete=models.CASCADE, related_name='fragmente_stoc')
+    index = models.PositiveSmallIntegerField()
+    cantitate = models.IntegerField(default=0)
+
+    objects = models.Manager()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['id_produs', 'index'], name='fragment_stoc_unic')]
+
+
+class TokenCerere(models.Model):
+    """
+    Indexul inversat al cererilor în așteptare (CerereClient.status=False): un rând pe fiecare
+    token distinct din detalii_produs. nr_tokenuri = câte tokenuri are cererea (vezi potriviri.py).
+    """
+    id = models.AutoField(primary_key=True)
+    token = models.CharField(max_length=64)
+    id_cerere = models.ForeignKey(CerereClient, on_delete=models.CASCADE, related_name='tokenuri')
+    nr_tokenuri = models.PositiveSmallIntegerField()
+
+    objects = models.Manager()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['token', 'id_cerere'], name='token_cerere_unic')]
+        # căutarea după prefix din admin (LIKE 'x%'), vezi DetaliiProdus
+        indexes = [models.Index(fields=['token'], name='token_cerere_prefix_idx', opclasses=['varchar_pattern_ops'])]
+
+
+class PotrivireCerere(models.Model):
+    """
+    Un produs intrat în stoc care poate satisface o cerere în așteptare. scor = fracția din
+    tokenurile cererii regăsite în produs; o potrivire respinsă este ștearsă.
+    """
+    id = models.AutoField(primary_key=True)
+    id_cerere = models.ForeignKey(CerereClient, on_delete=models.CASCADE, related_name='potriviri')
+    id_produs = models.ForeignKey(Produs, on_delete=models.CASCADE, related_name='potriviri_cereri')
+    scor = models.FloatField()
+    data_potrivire = models.DateTimeField(db_index=True)
+
+    objects = models.Manager()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['id_cerere', 'id_produs'], name='potrivire_cerere_unica')]
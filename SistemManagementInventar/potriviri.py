@@ -0,0 +1,148 @@
+# potriviri.py
+# Potrivirea cererilor clienților (CerereClient.detalii_produs, text liber) cu produsele care intră
+# în stoc, fără să parcurgem toate cererile în așteptare la fiecare produs:
+# - cererile în așteptare (status=False) sunt împărțite în tokenuri (cuvinte normalizate, fără
+#   diacritice și fără cuvinte de legătură) și păstrate într-un index inversat, TokenCerere
+#   (token -> cereri); indexul este întreținut la salvarea cererii (signals.py), iar o cerere
+#   rezolvată (status=True) este scoasă din index, cu tot cu potrivirile ei
+# - la crearea sau reaprovizionarea unui produs se caută în index doar tokenurile produsului
+#   (nume + tip), deci costul depinde de câte cereri au cuvinte comune cu produsul, nu de
+#   numărul total de cereri
+# - scorul unei cereri = fracția din tokenurile ei regăsite în produs; potrivirile cu scor de cel
+#   puțin POTRIVIRI_SCOR_MINIM sunt salvate în PotrivireCerere (/api/potriviri_cereri/)
+# Indexul se reconstruiește cu comanda reconstruieste_index_cereri (ex. după un import direct în baza de date).
+import re
+import unicodedata
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from SistemManagementInventar.models import CerereClient, PotrivireCerere, Produs, TokenCerere
+from SistemManagementInventar.sarcini import param_boolean, tip_sarcina
+
+# cuvinte prea frecvente în cereri ca să spună ceva despre produs
+CUVINTE_IGNORATE = {
+    'si', 'sau', 'de', 'la', 'cu', 'pentru', 'din', 'pe', 'in', 'un', 'o', 'al', 'ai', 'ale', 'care',
+    'caut', 'vreau', 'doresc', 'doreste', 'nevoie', 'produs', 'buc', 'bucati',
+}
+LUNGIME_MINIMA_TOKEN = 2
+LUNGIME_MAXIMA_TOKEN = 64
+DIMENSIUNE_LOT = 500
+
+
+def tokenizeaza(text):
+    """'Lapte Zuzu 1,5% - pentru Ionescu' -> {'lapte', 'zuzu', 'ionescu'}"""
+    text = unicodedata.normalize('NFKD', str(text or ''))
+    text = ''.join(caracter for caracter in text if not unicodedata.combining(caracter)).lower()
+    return {
+        token[:LUNGIME_MAXIMA_TOKEN] for token in re.findall(r'[a-z0-9]+', text)
+        if len(token) >= LUNGIME_MINIMA_TOKEN and token not in CUVINTE_IGNORATE
+    }
+
+
+def tokenuri_produs(produs):
+    return tokenizeaza(f'{produs.nume} {produs.tip_produs}')
+
+
+def _randuri_index(cereri):
+    randuri = []
+    for cerere in cereri:
+        if cerere.status:
+            continue
+        tokenuri = tokenizeaza(cerere.detalii_produs)
+        randuri.extend(
+            TokenCerere(token=token, id_cerere_id=cerere.id, nr_tokenuri=len(tokenuri)) for token in tokenuri
+        )
+    return randuri
+
+
+@transaction.atomic
+def indexeaza_cereri(cereri):
+    """Reface intrările din index ale cererilor date; cele rezolvate ies din index și își pierd potrivirile."""
+    id_uri = [cerere.id for cerere in cereri]
+    TokenCerere.objects.filter(id_cerere__in=id_uri).delete()
+    rezolvate = [cerere.id for cerere in cereri if cerere.status]
+    if rezolvate:
+        PotrivireCerere.objects.filter(id_cerere__in=rezolvate).delete()
+    TokenCerere.objects.bulk_create(_randuri_index(cereri), batch_size=1000)
+
+
+def potriveste_produse(produse, scor_minim=None):
+    """
+    Caută în index cererile în așteptare pentru produsele date (cele cu stoc) și salvează potrivirile
+    noi sau actualizează scorul celor existente. Returnează numărul de potriviri salvate.
+    """
+    if scor_minim is None:
+        scor_minim = getattr(settings, 'POTRIVIRI_SCOR_MINIM', 0.6)
+    produse_pe_token = defaultdict(list)
+    for produs in produse:
+        if produs.stoc_total > 0:
+            for token in tokenuri_produs(produs):
+                produse_pe_token[token].append(produs.id)
+    if not produse_pe_token:
+        return 0
+
+    # cerere -> produs -> câte tokenuri ale cererii se regăsesc în produs
+    gasite = defaultdict(lambda: defaultdict(int))
+    nr_tokenuri = {}
+    tokenuri = list(produse_pe_token)
+    for start in range(0, len(tokenuri), DIMENSIUNE_LOT):
+        intrari = TokenCerere.objects.filter(token__in=tokenuri[start:start + DIMENSIUNE_LOT]).values_list(
+            'token', 'id_cerere_id', 'nr_tokenuri'
+        )
+        for token, id_cerere, nr in intrari.iterator(chunk_size=2000):
+            nr_tokenuri[id_cerere] = nr
+            for id_produs in produse_pe_token[token]:
+                gasite[id_cerere][id_produs] += 1
+
+    acum = timezone.now()
+    potriviri = [
+        PotrivireCerere(id_cerere_id=id_cerere, id_produs_id=id_produs,
+                        scor=round(numar / nr_tokenuri[id_cerere], 3), data_potrivire=acum)
+        for id_cerere, pe_produs in gasite.items()
+        for id_produs, numar in pe_produs.items()
+        if numar / nr_tokenuri[id_cerere] >= scor_minim
+    ]
+    PotrivireCerere.objects.bulk_create(
+        potriviri, batch_size=1000, update_conflicts=True,
+        unique_fields=['id_cerere', 'id_produs'], update_fields=['scor', 'data_potrivire'],
+    )
+    return len(potriviri)
+
+
+@tip_sarcina('reconstruieste_index_cereri', memoreaza=False, doar_admin=True,
+             parametri={'potriveste': param_boolean})
+def reconstruieste_index(potriveste=False):
+    """
+    Reconstruiește tot indexul din cererile în așteptare, într-o singură tranzacție (cititorii văd
+    indexul vechi până la final). Cu potriveste=True, caută apoi potriviri pentru toate produsele cu stoc.
+    """
+    rezultat = {'cereri': 0, 'tokenuri': 0, 'potriviri': 0}
+    with transaction.atomic():
+        TokenCerere.objects.all().delete()
+        ultimul_id = 0
+        while True:
+            cereri = list(CerereClient.objects.filter(status=False, id__gt=ultimul_id)
+                          .only('id', 'status', 'detalii_produs').order_by('id')[:DIMENSIUNE_LOT])
+            if not cereri:
+                break
+            randuri = _randuri_index(cereri)
+            TokenCerere.objects.bulk_create(randuri, batch_size=1000)
+            rezultat['cereri'] += len(cereri)
+            rezultat['tokenuri'] += len(randuri)
+            ultimul_id = cereri[-1].id
+        # potrivirile cererilor rezolvate între timp nu mai au ce căuta în listă
+        PotrivireCerere.objects.filter(id_cerere__status=True).delete()
+
+    if potriveste:
+        ultimul_id = 0
+        while True:
+            produse = list(Produs.objects.filter(stoc_total__gt=0, id__gt=ultimul_id)
+                           .only('id', 'nume', 'tip_produs', 'stoc_total').order_by('id')[:DIMENSIUNE_LOT])
+            if not produse:
+                break
+            rezultat['potriviri'] += potriveste_produse(produse)
+            ultimul_id = produse[-1].id
+    return rezultat
@@ -0,0 +1,122 @@
+# prognoza.py
+# Viteza de vânzare și punctul de reaprovizionare pentru toate produsele deodată (NumPy):
+# - seria zilnică vine din rollup-ul VanzareZilnica (vanzari.py), citită cu o singură interogare
+#   și pusă într-o matrice produse x zile; mediile și abaterea standard se calculează vectorizat
+# - statisticile cererii depind doar de zilele încheiate, deci sunt memorate (sarcina
+#   'prognoza_cerere') până la următoarea actualizare a rollup-ului; stocul se citește live
+# - punct de reaprovizionare = medie * zile_livrare + z * abatere * sqrt(zile_livrare)
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.dateparse import parse_date
+
+from SistemManagementInventar.models import Produs, VanzareZilnica
+from SistemManagementInventar.sarcini import calculeaza, param_data, tip_sarcina
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# zilele pe care se calculează mediile mobile; ultima este și fereastra încărcată din rollup
+FERESTRE_ZILE = (7, 30, 90)
+# fereastra pe care se calculează viteza de vânzare și abaterea standard
+FEREASTRA_VITEZA = 30
+
+
+def _necesita_numpy():
+    if np is None:
+        raise ImproperlyConfigured("Prognoza stocului necesita numpy (pip install numpy)")
+
+
+@tip_sarcina('prognoza_cerere', parametri={'azi': param_data})
+def statistici_cerere(azi):
+    """
+    Mediile zilnice (FERESTRE_ZILE) și abaterea standard pe FEREASTRA_VITEZA zile, pentru
+    produsele cu vânzări în ultimele max(FERESTRE_ZILE) zile încheiate dinaintea zilei `azi`.
+    Returnează liste paralele, ordonate după id_produs.
+    """
+    _necesita_numpy()
+    azi = parse_date(azi) if isinstance(azi, str) else azi
+    nr_zile = max(FERESTRE_ZILE)
+    prima_zi = azi - timedelta(days=nr_zile)
+    randuri = list(VanzareZilnica.objects
+                   .filter(data__gte=prima_zi, data__lt=azi)
+                   .values_list('id_produs', 'data', 'cantitate'))
+    if not randuri:
+        return {'id_produs': [], 'abatere': [], **{f'medie_{zile}': [] for zile in FERESTRE_ZILE}}
+
+    id_uri = np.fromiter((rand[0] for rand in randuri), dtype=np.int64, count=len(randuri))
+    coloane = np.fromiter(((rand[1] - prima_zi).days for rand in randuri), dtype=np.int64, count=len(randuri))
+    cantitati = np.fromiter((rand[2] for rand in randuri), dtype=np.float64, count=len(randuri))
+
+    produse, linii = np.unique(id_uri, return_inverse=True)
+    serie = np.zeros((len(produse), nr_zile))
+    np.add.at(serie, (linii, coloane), cantitati)
+
+    rezultat = {'id_produs': produse.tolist()}
+    for zile in FERESTRE_ZILE:
+        rezultat[f'medie_{zile}'] = np.round(serie[:, -zile:].mean(axis=1), 4).tolist()
+    rezultat['abatere'] = np.round(serie[:, -FEREASTRA_VITEZA:].std(axis=1), 4).tolist()
+    return rezultat
+
+
+def prognoza_stoc(zile_livrare=None, z_serviciu=None, pagina=1, dimensiune=50):
+    """
+    Prognoza pentru toate produsele, ordonată după urgență (cele mai puține zile de stoc primele;
+    produsele fără vânzări la final), paginată.
+    Returnează {'total', 'pagina', 'dimensiune', 'zile_livrare', 'z_serviciu', 'rezultate'}.
+    """
+    _necesita_numpy()
+    zile_livrare = zile_livrare or getattr(settings, 'PROGNOZA_ZILE_LIVRARE', 7)
+    z_serviciu = getattr(settings, 'PROGNOZA_Z_SERVICIU', 1.65) if z_serviciu is None else z_serviciu
+
+    statistici = calculeaza('prognoza_cerere')
+    produse = list(Produs.objects.order_by('id').values_list('id', 'nume', 'stoc_total'))
+    id_uri = np.fromiter((produs[0] for produs in produse), dtype=np.int64, count=len(produse))
+    stoc = np.fromiter((produs[2] for produs in produse), dtype=np.float64, count=len(produse))
+
+    # aliniază statisticile (doar produsele cu vânzări) pe lista completă de produse
+    id_statistici = np.asarray(statistici['id_produs'], dtype=np.int64)
+    pozitii = np.searchsorted(id_statistici, id_uri)
+    are_vanzari = np.isin(id_uri, id_statistici)
+
+    def aliniaza(cheie):
+        # zeroul adăugat la final acoperă pozițiile din afara listei (produse fără vânzări)
+        valori = np.append(np.asarray(statistici[cheie], dtype=np.float64), 0.0)
+        return np.where(are_vanzari, valori[pozitii], 0.0)
+
+    medii = {zile: aliniaza(f'medie_{zile}') for zile in FERESTRE_ZILE}
+    viteza = medii[FEREASTRA_VITEZA]
+    abatere = aliniaza('abatere')
+
+    stoc_siguranta = z_serviciu * abatere * np.sqrt(zile_livrare)
+    punct_reaprovizionare = viteza * zile_livrare + stoc_siguranta
+    de_comandat = np.maximum(np.ceil(punct_reaprovizionare - stoc), 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        zile_acoperire = np.where(viteza > 0, np.maximum(stoc, 0) / viteza, np.inf)
+
+    ordine = np.lexsort((id_uri, zile_acoperire))
+    inceput = (pagina - 1) * dimensiune
+    rezultate = []
+    for index in ordine[inceput:inceput + dimensiune]:
+        rezultate.append({
+            'id_produs': produse[index][0],
+            'nume': produse[index][1],
+            'stoc_total': produse[index][2],
+            **{f'medie_{zile}': round(float(medii[zile][index]), 2) for zile in FERESTRE_ZILE},
+            'abatere': round(float(abatere[index]), 2),
+            'zile_acoperire': None if np.isinf(zile_acoperire[index]) else round(float(zile_acoperire[index]), 1),
+            'stoc_siguranta': round(float(stoc_siguranta[index]), 2),
+            'punct_reaprovizionare': round(float(punct_reaprovizionare[index]), 2),
+            'de_comandat': int(de_comandat[index]),
+        })
+    return {
+        'total': len(produse),
+        'pagina': pagina,
+        'dimensiune': dimensiune,
+        'zile_livrare': zile_livrare,
+        'z_serviciu': z_serviciu,
+        'rezultate': rezultate,
+    }
@@ -0,0 +1,199 @@
+# rapoarte.py
+# Rapoarte agregate calculate în baza de date (GROUP BY), cu cache pe perioade încheiate.
+# O perioadă încheiată (ex. o lună trecută) nu se mai schimbă în mod normal, așa că rezultatul
+# ei se păstrează în cache fără expirare și se invalidează explicit doar când se scrie în ea.
+# Doar lunile cuprinse complet în interval trec prin cache; o primă / ultimă lună acoperită parțial
+# se calculează exact pe zilele cerute, deci totalurile corespund intervalului afișat.
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from SistemManagementInventar.models import Angajat, SalariuAngajat
+from SistemManagementInventar.sarcini import param_alegere, param_data, param_intreg, tip_sarcina
+
+PREFIX_SALARII = 'raport_salarii'
+
+
+def inceput_luna(data):
+    return data.replace(day=1)
+
+
+def luna_urmatoare(data):
+    return date(data.year + 1, 1, 1) if data.month == 12 else date(data.year, data.month + 1, 1)
+
+
+def ultima_zi_luna(data):
+    return luna_urmatoare(data) - timedelta(days=1)
+
+
+def luni_interval(data_start, data_end):
+    """Lista primelor zile ale lunilor dintre data_start și data_end (inclusiv)."""
+    luni = []
+    luna = inceput_luna(data_start)
+    while luna <= data_end:
+        luni.append(luna)
+        luna = luna_urmatoare(luna)
+    return luni
+
+
+def _cheie(prefix, perioada):
+    return f'{prefix}:{perioada.isoformat()}'
+
+
+def rezultate_pe_perioade(prefix, perioade, calculeaza, este_inchisa):
+    """
+    Returnează {perioada: rezultat} pentru toate perioadele cerute.
+    - perioadele încheiate (este_inchisa(perioada) == True) se citesc din cache când există
+    - restul, plus cele încheiate lipsă din cache, se calculează împreună cu un singur apel
+      calculeaza(perioade_lipsa) -> {perioada: rezultat}
+    - rezultatele perioadelor încheiate se pun în cache fără expirare
+    """
+    inchise = {perioada: _cheie(prefix, perioada) for perioada in perioade if este_inchisa(perioada)}
+    din_cache = cache.get_many(list(inchise.values())) if inchise else {}
+
+    rezultate = {}
+    lipsa = []
+    for perioada in perioade:
+        cheie = inchise.get(perioada)
+        if cheie is not None and cheie in din_cache:
+            rezultate[perioada] = din_cache[cheie]
+        else:
+            lipsa.append(perioada)
+
+    if lipsa:
+        calculate = calculeaza(lipsa)
+        rezultate.update(calculate)
+        de_salvat = {inchise[perioada]: calculate[perioada] for perioada in lipsa if perioada in inchise}
+        if de_salvat:
+            cache.set_many(de_salvat, timeout=None)
+    return rezultate
+
+
+def invalideaza_perioade(prefix, *perioade):
+    cache.delete_many([_cheie(prefix, perioada) for perioada in perioade])
+
+
+# ===== Raport salarii =====
+
+def invalideaza_luna_salarii(*date_salariu):
+    """Apelată din semnalele SalariuAngajat (signals.py), după commit, pentru lunile afectate."""
+    invalideaza_perioade(PREFIX_SALARII, *{inceput_luna(data) for data in date_salariu if data})
+
+
+def _calculeaza_luni_salarii(luni):
+    """Un singur GROUP BY (luna, angajat) pentru toate lunile lipsă din cache."""
+    rezultate = {luna: {} for luna in luni}
+    randuri = (SalariuAngajat.objects
+               .filter(data_salariu__gte=min(luni), data_salariu__lt=luna_urmatoare(max(luni)))
+               .annotate(luna=TruncMonth('data_salariu'))
+               .order_by()
+               .values('luna', 'id_angajat')
+               .annotate(total=Sum('suma_salariu'), nr_plati=Count('id')))
+    for rand in randuri:
+        if rand['luna'] in rezultate:
+            rezultate[rand['luna']][rand['id_angajat']] = (Decimal(rand['total']), rand['nr_plati'])
+    return rezultate
+
+
+def _calculeaza_interval_salarii(data_start, data_end):
+    """{id_angajat: (total, nr_plati)} pe zilele dintre data_start și data_end (inclusiv), fără cache."""
+    randuri = (SalariuAngajat.objects
+               .filter(data_salariu__gte=data_start, data_salariu__lte=data_end)
+               .order_by()
+               .values('id_angajat')
+               .annotate(total=Sum('suma_salariu'), nr_plati=Count('id')))
+    return {rand['id_angajat']: (Decimal(rand['total']), rand['nr_plati']) for rand in randuri}
+
+
+def _sumar(eticheta, pe_angajat, angajati):
+    """pe_angajat: {id_angajat: (total, nr_plati)} -> dict pentru răspuns."""
+    total = sum((valoare[0] for valoare in pe_angajat.values()), Decimal('0'))
+    nr_angajati = len(pe_angajat)
+    detalii = []
+    for id_angajat, (total_angajat, nr_plati) in sorted(pe_angajat.items()):
+        info = angajati.get(id_angajat, {})
+        detalii.append({
+            'id_angajat': id_angajat,
+            'nume': info.get('nume'),
+            'prenume': info.get('prenume'),
+            'total': f"{total_angajat:.2f}",
+            'nr_plati': nr_plati,
+            'medie_plata': f"{total_angajat / nr_plati:.2f}",
+        })
+    return {
+        'perioada': eticheta,
+        'total': f"{total:.2f}",
+        'nr_angajati': nr_angajati,
+        'medie_pe_angajat': f"{(total / nr_angajati if nr_angajati else Decimal('0')):.2f}",
+        'angajati': detalii,
+    }
+
+
+def _ca_data(valoare):
+    data = parse_date(valoare) if isinstance(valoare, str) else valoare
+    if data is None:
+        raise ValueError(f'Data invalida: {valoare}')
+    return data
+
+
+@tip_sarcina('raport_salarii', parametri={
+    'data_start': param_data, 'data_end': param_data,
+    'granularitate': param_alegere('luna', 'an'), 'id_angajat': param_intreg,
+})
+def raport_salarii(data_start, data_end, granularitate='luna', id_angajat=None):
+    """
+    Totaluri de salarii pe lună sau pe an, pe angajat și pe toată firma, plus medii și headcount.
+    Lunile încheiate se servesc din cache; doar luna curentă (și ce lipsește din cache) se calculează.
+    Prima și ultima lună, dacă intervalul le acoperă doar parțial, se calculează pe zilele cerute.
+    """
+    data_start, data_end = _ca_data(data_start), _ca_data(data_end)
+    azi = timezone.localdate()
+    luna_curenta = inceput_luna(azi)
+    luni = luni_interval(data_start, data_end)
+
+    # luna -> (prima zi, ultima zi) din interval, pentru lunile acoperite parțial
+    partiale = {}
+    for luna in luni:
+        inceput, sfarsit = max(luna, data_start), min(ultima_zi_luna(luna), data_end)
+        if inceput != luna or sfarsit != ultima_zi_luna(luna):
+            partiale[luna] = (inceput, sfarsit)
+    complete = [luna for luna in luni if luna not in partiale]
+
+    pe_luni = rezultate_pe_perioade(
+        PREFIX_SALARII, complete, _calculeaza_luni_salarii, lambda luna: luna < luna_curenta
+    ) if complete else {}
+    for luna, (inceput, sfarsit) in partiale.items():
+        pe_luni[luna] = _calculeaza_interval_salarii(inceput, sfarsit)
+
+    if id_angajat is not None:
+        pe_luni = {luna: {k: v for k, v in valori.items() if k == id_angajat} for luna, valori in pe_luni.items()}
+
+    # grupare pe perioada cerută (luna sau an)
+    perioade = {}
+    for luna in luni:
+        eticheta = luna.strftime('%Y-%m') if granularitate == 'luna' else str(luna.year)
+        grup = perioade.setdefault(eticheta, {})
+        for id_ang, (total, nr_plati) in pe_luni.get(luna, {}).items():
+            total_vechi, nr_vechi = grup.get(id_ang, (Decimal('0'), 0))
+            grup[id_ang] = (total_vechi + total, nr_vechi + nr_plati)
+
+    interval = {}
+    for grup in perioade.values():
+        for id_ang, (total, nr_plati) in grup.items():
+            total_vechi, nr_vechi = interval.get(id_ang, (Decimal('0'), 0))
+            interval[id_ang] = (total_vechi + total, nr_vechi + nr_plati)
+
+    angajati = {
+        angajat['id']: angajat
+        for angajat in Angajat.objects.filter(id__in=list(interval)).values('id', 'nume', 'prenume')
+    }
+    return {
+        'perioade': [_sumar(eticheta, grup, angajati) for eticheta, grup in perioade.items()],
+        'total_interval': _sumar(f"{data_start.isoformat()} - {data_end.isoformat()}", interval, angajati),
+    }
+
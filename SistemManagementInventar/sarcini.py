@@ -0,0 +1,347 @@
+# sarcini.py
+# Execuția în fundal a calculelor grele (dashboard, rapoarte, reconcilieri), fără broker extern:
+# - Sarcina este coada: view-ul inserează un rând, comanda ruleaza_sarcini îl execută
+# - revendicarea unei sarcini este un UPDATE ... WHERE stare='asteptare', deci doi lucrători
+#   (fire sau procese) nu pot executa aceeași sarcină
+# - rezultatele se păstrează și în cache, sub versiunea tipului lor, până la invalidarea explicită
+#   a tipului (invalideaza_rezultate), deci aceeași cerere nu mai este recalculată; cache-ul trebuie
+#   să fie comun proceselor (CACHES în settings.py)
+# - versiunile sunt rânduri VersiuneRezultate, mărite cu un UPDATE atomic după commit-ul scrierii:
+#   tranzacția scrierii nu ține blocat rândul versiunii, iar un rezultat calculat înainte de commit
+#   rămâne sub versiunea veche, deci nu poate fi servit după ce modificarea a devenit vizibilă
+# - fiecare tip își declară parametrii acceptați, cu tipul lor: parametrii trimiși prin API sunt
+#   verificați la trimitere și convertiți (ex. text -> date) înainte de apelul funcției; tipurile
+#   de mentenanță (arhivare, reconcilieri) pot fi trimise doar de administratori
+import hashlib
+import inspect
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from SistemManagementInventar.models import Sarcina, VersiuneRezultate
+
+logger = logging.getLogger(__name__)
+
+# tip -> (funcție(**parametri) care întoarce un rezultat serializabil JSON, memorează rezultatul)
+TIPURI_SARCINI = {}
+# tip -> {parametru: convertor}, parametrii acceptați de tip
+PARAMETRI_SARCINI = {}
+# tipurile care pot fi trimise doar de administratori (EsteAdmin)
+SARCINI_ADMIN = set()
+
+
+def tip_sarcina(nume, memoreaza=True, parametri=None, doar_admin=False):
+    """
+    Decorator: înregistrează o funcție ca tip de sarcină care poate fi rulată în fundal.
+    memoreaza=False pentru acțiuni (ex. reconcilieri) care trebuie executate la fiecare cerere;
+    poate fi și o funcție memoreaza(parametri) -> bool, pentru tipurile ale căror parametri vin
+    liberi din cerere și nu merită fiecare câte o intrare în cache.
+    parametri: {nume: convertor} (param_data, param_intreg ...), singurii parametri acceptați.
+    doar_admin=True pentru acțiunile de mentenanță, care nu pot fi trimise de orice angajat.
+    Un parametru `azi` lipsă se completează cu data curentă, ca rezultatele să nu rămână în cache de ieri.
+    """
+    def inregistreaza(functie):
+        TIPURI_SARCINI[nume] = (functie, memoreaza)
+        PARAMETRI_SARCINI[nume] = dict(parametri or {})
+        if doar_admin:
+            SARCINI_ADMIN.add(nume)
+        return functie
+    return inregistreaza
+
+
+def necesita_admin(tip):
+    return tip in SARCINI_ADMIN
+
+
+# ===== Parametri =====
+# Un convertor primește valoarea din JSON (sau valoarea deja convertită) și întoarce valoarea
+# Python așteptată de funcția sarcinii; pentru o valoare invalidă ridică ValueError.
+
+def param_data(valoare):
+    if isinstance(valoare, date) and not isinstance(valoare, datetime):
+        return valoare
+    data = parse_date(valoare) if isinstance(valoare, str) else None
+    if data is None:
+        raise ValueError(f'data invalida (AAAA-LL-ZZ): {valoare}')
+    return data
+
+
+def param_intreg(valoare):
+    if isinstance(valoare, bool) or not isinstance(valoare, (int, str)):
+        raise ValueError(f'numar intreg invalid: {valoare}')
+    try:
+        numar = int(valoare)
+    except ValueError:
+        raise ValueError(f'numar intreg invalid: {valoare}')
+    if numar < 1:
+        raise ValueError(f'trebuie sa fie cel putin 1: {valoare}')
+    return numar
+
+
+def param_boolean(valoare):
+    if isinstance(valoare, bool):
+        return valoare
+    if valoare in ('true', '1', 1):
+        return True
+    if valoare in ('false', '0', 0):
+        return False
+    raise ValueError(f'valoare booleana invalida: {valoare}')
+
+
+def param_text(valoare):
+    if not isinstance(valoare, str) or len(valoare) > 255:
+        raise ValueError('text de cel mult 255 de caractere')
+    return valoare
+
+
+def param_alegere(*optiuni):
+    def convertor(valoare):
+        if valoare not in optiuni:
+            raise ValueError(f"trebuie sa fie una din: {', '.join(optiuni)}")
+        return valoare
+    return convertor
+
+
+def _converteste_parametri(tip, parametri):
+    """Verifică și convertește parametrii după declarația tipului; None = parametru lipsă."""
+    if not isinstance(parametri, dict):
+        raise ValueError('parametri trebuie sa fie un obiect JSON')
+    acceptati = PARAMETRI_SARCINI[tip]
+    necunoscuti = sorted(set(parametri) - set(acceptati))
+    if necunoscuti:
+        raise ValueError(f"Parametri necunoscuti pentru {tip}: {', '.join(necunoscuti)}")
+    convertiti = {}
+    for nume, valoare in parametri.items():
+        if valoare is None:
+            continue
+        try:
+            convertiti[nume] = acceptati[nume](valoare)
+        except ValueError as e:
+            raise ValueError(f'Parametrul {nume}: {e}')
+    return convertiti
+
+
+def _completeaza_parametri(tip, parametri):
+    """Parametrii verificați, în forma JSON păstrată în Sarcina și folosită în cheia din cache."""
+    functie, _ = TIPURI_SARCINI[tip]
+    parametri = _normalizeaza(_converteste_parametri(tip, parametri or {}), sorteaza=True)
+    if 'azi' in inspect.signature(functie).parameters and not parametri.get('azi'):
+        parametri['azi'] = timezone.localdate().isoformat()
+    return parametri
+
+
+def _timeout_secunde():
+    return getattr(settings, 'SARCINI_TIMEOUT_SECUNDE', 600)
+
+
+def _incercari_maxime():
+    return getattr(settings, 'SARCINI_INCERCARI_MAXIME', 3)
+
+
+def _normalizeaza(valoare, sorteaza=False):
+    """
+    Date, Decimal etc. -> forma JSON, ca rezultatul din cache să arate ca cel din baza de date.
+    Parametrii se sortează după cheie, ca aceeași cerere să fie recunoscută indiferent de ordine.
+    """
+    return json.loads(json.dumps(valoare, sort_keys=sorteaza, cls=DjangoJSONEncoder))
+
+
+# ===== Cache rezultate =====
+
+def versiune_initiala():
+    # nu 1: dacă rândul versiunii este șters, o versiune refolosită ar face vizibile din nou
+    # rezultatele vechi rămase în cache sub ea
+    return time.time_ns()
+
+
+def versiune(cheie):
+    """Versiunea curentă a unei familii de rezultate din cache; rândul se creează la prima citire."""
+    valoare = VersiuneRezultate.objects.filter(cheie=cheie).values_list('versiune', flat=True).first()
+    if valoare is None:
+        valoare = VersiuneRezultate.objects.get_or_create(
+            cheie=cheie, defaults={'versiune': versiune_initiala()}
+        )[0].versiune
+    return valoare
+
+
+def creste_versiuni(*chei):
+    """
+    Mărește versiunile date după commit-ul tranzacției curente (imediat, în afara unei tranzacții).
+    O versiune fără rând nu are încă rezultate în cache, deci nu are ce invalida.
+    """
+    chei = sorted(set(chei))
+    if chei:
+        transaction.on_commit(
+            lambda: VersiuneRezultate.objects.filter(cheie__in=chei).update(versiune=F('versiune') + 1)
+        )
+
+
+def _versiune(tip):
+    return versiune(f'sarcini:{tip}')
+
+
+def _cheie_rezultat(tip, parametri):
+    amprenta = hashlib.sha1(json.dumps(parametri, sort_keys=True, cls=DjangoJSONEncoder).encode('utf-8')).hexdigest()
+    return f'sarcini:rezultat:{tip}:{_versiune(tip)}:{amprenta}'
+
+
+def _se_memoreaza(tip, parametri):
+    memoreaza = TIPURI_SARCINI[tip][1]
+    return memoreaza(parametri) if callable(memoreaza) else memoreaza
+
+
+def rezultat_din_cache(tip, parametri):
+    return cache.get(_cheie_rezultat(tip, parametri))
+
+
+def invalideaza_rezultate(*tipuri):
+    """Schimbă versiunea tipurilor date, după commit: toate rezultatele lor din cache devin inaccesibile."""
+    creste_versiuni(*(f'sarcini:{tip}' for tip in tipuri))
+
+
+def calculeaza(tip, parametri=None):
+    """Rulează sincron un tip de sarcină, cu același cache ca lucrătorii din fundal."""
+    if tip not in TIPURI_SARCINI:
+        raise ValueError(f'Tip de sarcina necunoscut: {tip}')
+    functie, _ = TIPURI_SARCINI[tip]
+    parametri = _completeaza_parametri(tip, parametri)
+    memoreaza = _se_memoreaza(tip, parametri)
+    # cheia (cu versiunea) se citește înainte de calcul: o invalidare apărută în timpul calculului
+    # face rezultatul inaccesibil, în loc să-l salveze sub versiunea nouă
+    cheie = _cheie_rezultat(tip, parametri) if memoreaza else None
+    rezultat = cache.get(cheie) if memoreaza else None
+    if rezultat is None:
+        rezultat = _normalizeaza(functie(**_converteste_parametri(tip, parametri)))
+        if memoreaza:
+            cache.set(cheie, rezultat, timeout=None)
+    return rezultat
+
+
+# ===== Coada =====
+
+def trimite_sarcina(tip, parametri=None, angajat=None):
+    """
+    Pune o sarcină în coadă și o returnează. Dacă rezultatul este deja în cache, sarcina este
+    creată direct finalizată; dacă aceeași sarcină așteaptă deja sau rulează, este refolosită.
+    """
+    if tip not in TIPURI_SARCINI:
+        raise ValueError(f'Tip de sarcina necunoscut: {tip}')
+    parametri = _completeaza_parametri(tip, parametri)
+
+    rezultat = rezultat_din_cache(tip, parametri) if _se_memoreaza(tip, parametri) else None
+    if rezultat is not None:
+        acum = timezone.now()
+        return Sarcina.objects.create(
+            tip=tip, parametri=parametri, stare=Sarcina.STARE_FINALIZATA, rezultat=rezultat,
+            id_angajat=angajat, data_start=acum, data_final=acum,
+        )
+
+    existenta = (Sarcina.objects
+                 .filter(tip=tip, parametri=parametri, stare__in=[Sarcina.STARE_ASTEPTARE, Sarcina.STARE_RULARE])
+                 .order_by('id').first())
+    if existenta is not None:
+        return existenta
+    return Sarcina.objects.create(tip=tip, parametri=parametri, id_angajat=angajat)
+
+
+def revendica_sarcina(lucrator):
+    """Următoarea sarcină în așteptare, marcată atomic ca în rulare de acest lucrător (sau None)."""
+    while True:
+        candidat = (Sarcina.objects.filter(stare=Sarcina.STARE_ASTEPTARE)
+                    .order_by('id').values_list('id', flat=True).first())
+        if candidat is None:
+            return None
+        revendicata = Sarcina.objects.filter(pk=candidat, stare=Sarcina.STARE_ASTEPTARE).update(
+            stare=Sarcina.STARE_RULARE, lucrator=lucrator, data_start=timezone.now(),
+            incercari=F('incercari') + 1,
+        )
+        if revendicata:
+            return Sarcina.objects.get(pk=candidat)
+        # altă instanță a luat-o între SELECT și UPDATE: încercăm următoarea
+
+
+def executa_sarcina(sarcina):
+    try:
+        rezultat = calculeaza(sarcina.tip, sarcina.parametri)
+    except Exception:
+        logger.exception("Sarcina %s (%s) a eșuat", sarcina.id, sarcina.tip)
+        Sarcina.objects.filter(pk=sarcina.pk).update(
+            stare=Sarcina.STARE_EROARE, eroare=traceback.format_exc()[-4000:], data_final=timezone.now()
+        )
+        return False
+    Sarcina.objects.filter(pk=sarcina.pk).update(
+        stare=Sarcina.STARE_FINALIZATA, rezultat=rezultat, eroare='', data_final=timezone.now()
+    )
+    return True
+
+
+def recupereaza_sarcini_blocate():
+    """
+    Sarcinile rămase în rulare peste SARCINI_TIMEOUT_SECUNDE (lucrător oprit brusc) sunt puse
+    înapoi în coadă, sau marcate cu eroare după SARCINI_INCERCARI_MAXIME încercări.
+    """
+    limita = timezone.now() - timedelta(seconds=_timeout_secunde())
+    blocate = Sarcina.objects.filter(stare=Sarcina.STARE_RULARE, data_start__lt=limita)
+    eronate = blocate.filter(incercari__gte=_incercari_maxime()).update(
+        stare=Sarcina.STARE_EROARE, eroare='Timpul de executie a fost depasit', data_final=timezone.now()
+    )
+    repuse = blocate.update(stare=Sarcina.STARE_ASTEPTARE, lucrator='')
+    return repuse, eronate
+
+
+def _bucla_lucrator(nume, interval, oprire, pana_la_golire):
+    try:
+        while not oprire.is_set():
+            close_old_connections()
+            sarcina = revendica_sarcina(nume)
+            if sarcina is None:
+                if pana_la_golire:
+                    return
+                oprire.wait(interval)
+                continue
+            executa_sarcina(sarcina)
+    finally:
+        # conexiunile sunt per fir de execuție: le închidem pe ale acestui fir
+        connections.close_all()
+
+
+def ruleaza_lucratori(nr_fire=2, interval=1.0, pana_la_golire=False, oprire=None):
+    """
+    Pornește nr_fire fire de execuție care consumă coada până la oprire (sau până la golirea
+    cozii, cu pana_la_golire=True). Mai multe procese pot rula în paralel pe aceeași bază de date.
+    """
+    oprire = oprire or threading.Event()
+    prefix = f'{socket.gethostname()}:{os.getpid()}'
+    recupereaza_sarcini_blocate()
+    fire = [
+        threading.Thread(target=_bucla_lucrator, args=(f'{prefix}:{index}', interval, oprire, pana_la_golire),
+                         name=f'lucrator-sarcini-{index}', daemon=True)
+        for index in range(nr_fire)
+    ]
+    for fir in fire:
+        fir.start()
+    try:
+        ultima_recuperare = time.monotonic()
+        while any(fir.is_alive() for fir in fire):
+            for fir in fire:
+                fir.join(timeout=interval)
+            if time.monotonic() - ultima_recuperare > _timeout_secunde():
+                recupereaza_sarcini_blocate()
+                ultima_recuperare = time.monotonic()
+    finally:
+        oprire.set()
+        for fir in fire:
+            fir.join()
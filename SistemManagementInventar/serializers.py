@@ -1,14 +1,218 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
+from rest_framework.fields import empty
 from .models import (
     Furnizor, BancaFurnizor, Produs, DetaliiProdus,
     Factura, Angajat, Client, SalariuAngajat,
-    DetaliiFactura, CerereClient, ContFurnizor, BancaAngajat
+    DetaliiFactura, CerereClient, ContFurnizor, BancaAngajat, SoldFurnizor, Sarcina, FacturaArhiva, PotrivireCerere,
+    CAMPURI_PRET_LINIE
 )
 
+# Marcaj: specificația de câmpuri / expandări se citește din query params-ul cererii
+_DIN_CERERE = object()
+
+
+def _citeste_lista(valoare):
+    """'id,nume, produs.nume' -> {'id', 'nume', 'produs.nume'}"""
+    return {element.strip() for element in valoare.split(',') if element.strip()}
+
+
+def _sub_cai(cai, prefix):
+    """Căile de sub un prefix: ({'produs.nume', 'produs.id'}, 'produs') -> {'nume', 'id'}"""
+    return {cale[len(prefix) + 1:] for cale in cai if cale.startswith(prefix + '.')}
+
+
+def specificatie_din_cerere(request):
+    """
+    Citește ?fields= și ?expand= din cerere.
+    - fields lipsă  -> None (toate câmpurile)
+    - expand lipsă  -> None (expandările implicite ale fiecărui serializer)
+    - expand gol    -> set() (nicio expandare, deci niciun JOIN)
+    """
+    if request is None:
+        return None, None
+    parametri = getattr(request, 'query_params', request.GET)
+    campuri = parametri.get('fields')
+    expandari = parametri.get('expand')
+    campuri = _citeste_lista(campuri) if campuri else None
+    expandari = _citeste_lista(expandari) if expandari is not None else None
+    return campuri, expandari
+
+
+# Câmp FK pentru scrierile în bloc: dacă lista părinte (ListaScriereInBloc) a preîncărcat deja
+# obiectele referite, cheia este căutată în dicționarul preîncărcat, nu cu câte un SELECT pe rând
+class RelatiePreincarcata(serializers.PrimaryKeyRelatedField):
+
+    def to_internal_value(self, data):
+        preincarcate = getattr(self.parent, '_relatii_preincarcate', None)
+        if preincarcate is None or self.field_name not in preincarcate:
+            return super().to_internal_value(data)
+        cheie = _cheie_primara(self.get_queryset().model, data)
+        if cheie is None:
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        obiect = preincarcate[self.field_name].get(cheie)
+        if obiect is None:
+            self.fail('does_not_exist', pk_value=data)
+        return obiect
+
+
+def _cheie_primara(model, valoare):
+    """Valoarea trimisă convertită la tipul cheii primare ('5' -> 5), sau None dacă nu se poate."""
+    if isinstance(valoare, bool):
+        return None
+    try:
+        return model._meta.pk.to_python(valoare)
+    except (DjangoValidationError, TypeError, ValueError):
+        return None
+
+
+# ListSerializer pentru scrierile many=True (liniile unei facturi, detaliile unui produs):
+# - validare: cheile fiecărui câmp FK, din toate elementele, sunt aduse cu o singură interogare
+#   IN pe model (in_bulk), apoi fiecare element este validat pe acel set (RelatiePreincarcata)
+# - salvare: toate elementele într-un singur bulk_create
+# bulk_create nu trimite post_save, deci rezultatele memorate care depind de model sunt
+# invalidate o singură dată, la fel ca în signals.py
+class ListaScriereInBloc(serializers.ListSerializer):
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+        self.child._relatii_preincarcate = self._preincarca_relatii(data)
+        try:
+            return super().to_internal_value(data)
+        finally:
+            del self.child._relatii_preincarcate
+
+    def _preincarca_relatii(self, data):
+        preincarcate = {}
+        for nume, camp in self.child.fields.items():
+            if not isinstance(camp, RelatiePreincarcata) or camp.read_only:
+                continue
+            model = camp.get_queryset().model
+            chei = {_cheie_primara(model, element.get(nume)) for element in data if isinstance(element, dict)}
+            chei.discard(None)
+            preincarcate[nume] = camp.get_queryset().in_bulk(chei) if chei else {}
+        return preincarcate
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        obiecte = model.objects.bulk_create([model(**date) for date in validated_data])
+        # import local: signals -> sincronizare -> serializers
+        from SistemManagementInventar.signals import invalideaza_dependente
+        if obiecte:
+            invalideaza_dependente(model)
+        return obiecte
+
+
+# Serializer de bază pentru câmpuri dinamice (?fields= / ?expand=):
+# - Meta.expandari: {'cheie_iesire': ('camp_fk', 'NumeSerializer')}, relațiile care pot fi incluse nested
+# - Meta.expandari_implicite: expandările folosite când cererea nu trimite ?expand=
+#   (păstrează formatul istoric al răspunsurilor)
+# - căile cu punct se aplică pe nivelul nested: ?fields=id,produs.nume&expand=produs.furnizor
+# - aceeași specificație construiește și interogarea (optimizeaza_queryset): only() pentru
+#   coloanele cerute și select_related doar pentru relațiile expandate
+class SerializerDinamic(serializers.ModelSerializer):
+    serializer_related_field = RelatiePreincarcata
+
+    def __init__(self, *args, campuri=_DIN_CERERE, expandari=_DIN_CERERE, **kwargs):
+        super().__init__(*args, **kwargs)
+        if campuri is _DIN_CERERE or expandari is _DIN_CERERE:
+            campuri_cerere, expandari_cerere = specificatie_din_cerere(self.context.get('request'))
+            campuri = campuri_cerere if campuri is _DIN_CERERE else campuri
+            expandari = expandari_cerere if expandari is _DIN_CERERE else expandari
+
+        self._campuri_nivel, self._expandari_active = self.rezolva_specificatie(campuri, expandari)
+        self._serializere_nested = {}
+
+        # La scriere (data=...) păstrăm toate câmpurile, filtrarea se aplică doar la citire
+        if kwargs.get('data', empty) is empty and self._campuri_nivel is not None:
+            for nume in list(self.fields):
+                if nume not in self._campuri_nivel:
+                    self.fields.pop(nume)
+
+    @classmethod
+    def _clasa_serializer(cls, nume_clasa):
+        return globals()[nume_clasa]
+
+    @classmethod
+    def rezolva_specificatie(cls, campuri, expandari):
+        """
+        Returnează (câmpuri de pe acest nivel sau None, {cheie: (camp_fk, clasa, campuri, expandari)})
+        pentru expandările care trebuie incluse în răspuns.
+        """
+        meta = cls.Meta
+        disponibile = getattr(meta, 'expandari', {})
+        campuri_nivel = {cale.split('.')[0] for cale in campuri} if campuri is not None else None
+
+        if expandari is None:
+            nume_active = [nume for nume in getattr(meta, 'expandari_implicite', ()) if nume in disponibile]
+        else:
+            nume_active = [nume for nume in disponibile if nume in {cale.split('.')[0] for cale in expandari}]
+
+        active = {}
+        for nume in nume_active:
+            if campuri_nivel is not None and nume not in campuri_nivel:
+                continue
+            camp_fk, nume_clasa = disponibile[nume]
+            campuri_nested = _sub_cai(campuri, nume) or None if campuri is not None else None
+            expandari_nested = _sub_cai(expandari, nume) if expandari is not None else None
+            active[nume] = (camp_fk, cls._clasa_serializer(nume_clasa), campuri_nested, expandari_nested)
+        return campuri_nivel, active
+
+    def to_representation(self, instance):
+        response = super().to_representation(instance)
+        for nume, (camp_fk, clasa, campuri_nested, expandari_nested) in self._expandari_active.items():
+            legat = getattr(instance, camp_fk)
+            if legat is None:
+                response[nume] = None
+                continue
+            # serializer-ul nested se construiește o singură dată și e refolosit pe toate rândurile
+            if nume not in self._serializere_nested:
+                self._serializere_nested[nume] = clasa(
+                    campuri=campuri_nested, expandari=expandari_nested, context=self.context
+                )
+            response[nume] = self._serializere_nested[nume].to_representation(legat)
+        return response
+
+    @classmethod
+    def optimizeaza_queryset(cls, queryset, request=None, campuri=_DIN_CERERE, expandari=_DIN_CERERE):
+        """
+        Aplică pe queryset select_related pentru expandările cerute și only() pentru
+        câmpurile cerute, ca răspunsurile mai mici să însemne și interogări mai ieftine.
+        """
+        if campuri is _DIN_CERERE or expandari is _DIN_CERERE:
+            campuri_cerere, expandari_cerere = specificatie_din_cerere(request)
+            campuri = campuri_cerere if campuri is _DIN_CERERE else campuri
+            expandari = expandari_cerere if expandari is _DIN_CERERE else expandari
+
+        relatii, coloane, restrans = [], [], []
+        cls._colecteaza(campuri, expandari, '', relatii, coloane, restrans)
+        if relatii:
+            queryset = queryset.select_related(*relatii)
+        if any(restrans):
+            queryset = queryset.only(*coloane)
+        return queryset
+
+    @classmethod
+    def _colecteaza(cls, campuri, expandari, prefix, relatii, coloane, restrans):
+        model = cls.Meta.model
+        campuri_nivel, active = cls.rezolva_specificatie(campuri, expandari)
+        restrans.append(campuri_nivel is not None)
+
+        concrete = {camp.name for camp in model._meta.concrete_fields}
+        selectate = concrete if campuri_nivel is None else (campuri_nivel & concrete)
+        selectate |= {model._meta.pk.name} | {camp_fk for camp_fk, _, _, _ in active.values()}
+        coloane.extend(prefix + camp for camp in selectate)
+
+        for camp_fk, clasa, campuri_nested, expandari_nested in active.values():
+            cale = prefix + camp_fk
+            relatii.append(cale)
+            clasa._colecteaza(campuri_nested, expandari_nested, cale + '__', relatii, coloane, restrans)
+
 # Serializer pentru modelul Furnizor:
 # - folosește ModelSerializer pentru a genera automat câmpurile
 # - fields="__all__" include toate câmpurile modelului în JSON
-class FurnizorSerializer(serializers.ModelSerializer):
+class FurnizorSerializer(SerializerDinamic):
     class Meta:
         model = Furnizor
         fields = "__all__"
@@ -17,79 +221,69 @@ class FurnizorSerializer(serializers.ModelSerializer):
 # Serializer pentru conturile bancare ale furnizorilor:
 # - include toate câmpurile din model
 # - la serializare adaugă la ieșire și datele furnizorului asociat, sub cheia 'furnizor'
-class BancaFurnizorSerializer(serializers.ModelSerializer):
+class BancaFurnizorSerializer(SerializerDinamic):
     class Meta:
         model = BancaFurnizor
         fields = "__all__"
-
-    def to_representation(self, instance):
-        # obține dict-ul standard (toate câmpurile modelului)
-        response = super().to_representation(instance)
-        # adaugă sub-serializare pentru relația ForeignKey -> furnizor
-        response['furnizor'] = FurnizorSerializer(instance.id_furnizor).data
-        return response
+        expandari = {'furnizor': ('id_furnizor', 'FurnizorSerializer')}
+        expandari_implicite = ('furnizor',)
 
 
 # Serializer pentru conturile bancare ale angajaților:
 # - include toate câmpurile din model
 # - la serializare adaugă datele angajatului asociat, sub cheia 'angajat'
-class BancaAngajatSerializer(serializers.ModelSerializer):
+class BancaAngajatSerializer(SerializerDinamic):
     class Meta:
         model = BancaAngajat
         fields = "__all__"
-
-    def to_representation(self, instance):
-        response = super().to_representation(instance)
-        response['angajat'] = AngajatSerializer(instance.id_angajat).data
-        return response
+        expandari = {'angajat': ('id_angajat', 'AngajatSerializer')}
+        expandari_implicite = ('angajat',)
 
 
 # Serializer pentru produse:
 # - serializare completă a modelului Produs
 # - adaugă date complete despre furnizorul produsului
-class ProdusSerializer(serializers.ModelSerializer):
+class ProdusSerializer(SerializerDinamic):
     class Meta:
         model = Produs
         fields = "__all__"
-
-    def to_representation(self, instance):
-        response = super().to_representation(instance)
-        response['furnizor'] = FurnizorSerializer(instance.id_furnizor).data
-        return response
+        expandari = {'furnizor': ('id_furnizor', 'FurnizorSerializer')}
+        expandari_implicite = ('furnizor',)
 
 
 # Serializer pentru detaliile fiecărui produs:
 # - serializare completă a modelului DetaliiProdus
 # - adaugă date complete despre produsul de referință
-class DetaliiProdusSerializer(serializers.ModelSerializer):
+# - cu many=True validează și salvează în bloc (ListaScriereInBloc)
+class DetaliiProdusSerializer(SerializerDinamic):
     class Meta:
         model = DetaliiProdus
         fields = "__all__"
-
-    def to_representation(self, instance):
-        response = super().to_representation(instance)
-        response['produs'] = ProdusSerializer(instance.id_produs).data
-        return response
+        expandari = {'produs': ('id_produs', 'ProdusSerializer')}
+        expandari_implicite = ('produs',)
+        list_serializer_class = ListaScriereInBloc
 
 
 # Variantă “simplă” care nu face nesting suplimentar,
 # utilă dacă vrei doar câmpurile brute din DetaliiProdus
-class DetaliiProdusSerializerSimplu(serializers.ModelSerializer):
+class DetaliiProdusSerializerSimplu(SerializerDinamic):
     class Meta:
         model = DetaliiProdus
         fields = "__all__"
 
 # Serializer pentru angajat:
 # - include toate câmpurile din modelul Angajat
-class AngajatSerializer(serializers.ModelSerializer):
+# - parola (hash-ul) se poate scrie, dar nu mai este trimisă niciodată în răspuns
+class AngajatSerializer(SerializerDinamic):
     class Meta:
         model = Angajat
         fields = "__all__"
+        extra_kwargs = {'password': {'write_only': True}}
 
 
 # Serializer pentru client:
 # - include toate câmpurile din modelul Client
-class ClientSerializer(serializers.ModelSerializer):
+class ClientSerializer(SerializerDinamic):
     class Meta:
         model = Client
         fields = "__all__"
@@ -98,63 +292,163 @@ class ClientSerializer(serializers.ModelSerializer):
 # Serializer pentru factură:
 # - serializare completă a modelului Factura
 # - la ieșire, include și datele clientului asociat sub cheia 'client'
-class FacturaSerializer(serializers.ModelSerializer):
+class FacturaSerializer(SerializerDinamic):
     class Meta:
         model = Factura
         fields = "__all__"
-
-    def to_representation(self, instance):
-        response = super().to_representation(instance)
-        response['client'] = ClientSerializer(instance.id_client).data
-        return response
+        expandari = {'client': ('id_client', 'ClientSerializer')}
+        expandari_implicite = ('client',)
 
 
 # Serializer pentru salariul angajatului:
 # - include toate câmpurile din SalariuAngajat
 # - adaugă nesting cu datele angajatului
-class SalariuAngajatSerializer(serializers.ModelSerializer):
+class SalariuAngajatSerializer(SerializerDinamic):
     class Meta:
         model = SalariuAngajat
         fields = "__all__"
-
-    def to_representation(self, instance):
-        response = super().to_representation(instance)
-        response['angajat'] = AngajatSerializer(instance.id_angajat).data
-        return response
+        expandari = {'angajat': ('id_angajat', 'AngajatSerializer')}
+        expandari_implicite = ('angajat',)
 
 
 # Serializer pentru elementele dintr-o factură:
 # - include toate câmpurile din DetaliiFactura
 # - adaugă nesting pentru factura și produsul asociat
-class DetaliiFacturaSerializer(serializers.ModelSerializer):
+# - cu many=True validează și salvează în bloc (ListaScriereInBloc)
+# - prețurile și cota TVA nu se primesc de la client: se copiază din produs la validare
+class DetaliiFacturaSerializer(SerializerDinamic):
     class Meta:
         model = DetaliiFactura
         fields = "__all__"
+        read_only_fields = CAMPURI_PRET_LINIE
+        expandari = {
+            'factura': ('id_factura', 'FacturaSerializer'),
+            'produs': ('id_produs', 'ProdusSerializer'),
+        }
+        expandari_implicite = ('factura', 'produs')
+        list_serializer_class = ListaScriereInBloc
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        produs = attrs.get('id_produs')
+        if produs is not None:
+            for camp in CAMPURI_PRET_LINIE:
+                attrs[camp] = getattr(produs, camp)
+        return attrs
+
+
+# Serializer pentru liniile unei facturi la citire:
+# - include produsul (nume, preț de vânzare, cotă TVA) fără nesting complet
+# - valoare_neta / valoare_tva / valoare_bruta vin adnotate din facturi.linii_cu_totaluri()
+class LinieFacturaSerializer(serializers.ModelSerializer):
+    nume_produs = serializers.CharField(source='id_produs.nume', read_only=True)
+    pret_unitar = serializers.DecimalField(source='pret_vanzare', max_digits=10, decimal_places=2, read_only=True)
+    cota_tva = serializers.DecimalField(source='tva_produs', max_digits=5, decimal_places=2, read_only=True)
+    valoare_neta = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    valoare_tva = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    valoare_bruta = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
 
-    def to_representation(self, instance):
-        response = super().to_representation(instance)
-        response['factura'] = FacturaSerializer(instance.id_factura).data
-        response['produs'] = ProdusSerializer(instance.id_produs).data
-        return response
+    class Meta:
+        model = DetaliiFactura
+        fields = ("id", "id_produs", "nume_produs", "cantitate", "pret_unitar", "cota_tva",
+                  "valoare_neta", "valoare_tva", "valoare_bruta")
+
+
+# Serializer pentru factura completă (citire):
+# - antetul și clientul, ca FacturaSerializer
+# - liniile și totalurile net / TVA / brut, adnotate din facturi.facturi_cu_totaluri()
+class FacturaDetaliataSerializer(FacturaSerializer):
+    nr_linii = serializers.IntegerField(read_only=True)
+    total_net = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    total_tva = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    total_brut = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    linii = LinieFacturaSerializer(many=True, read_only=True)
+
+    class Meta(FacturaSerializer.Meta):
+        pass
+
+
+# Serializer pentru facturile arhivate (citire):
+# - aceeași formă ca FacturaDetaliataSerializer, plus data_arhivare
+class FacturaArhivaDetaliataSerializer(FacturaDetaliataSerializer):
+    class Meta(FacturaDetaliataSerializer.Meta):
+        model = FacturaArhiva
 
 
 # Serializer pentru cererile clienților:
 # - include toate câmpurile din modelul CerereClient
-class CerereClientSerializer(serializers.ModelSerializer):
+class CerereClientSerializer(SerializerDinamic):
     class Meta:
         model = CerereClient
         fields = "__all__"
 
 
+# Serializer pentru potrivirile dintre cererile clienților și produsele intrate în stoc (citire):
+# - datele cererii și ale produsului fără nesting complet (vin prin select_related)
+class PotrivireCerereSerializer(serializers.ModelSerializer):
+    nume_client = serializers.CharField(source='id_cerere.nume_client', read_only=True)
+    telefon = serializers.CharField(source='id_cerere.telefon', read_only=True)
+    detalii_cerere = serializers.CharField(source='id_cerere.detalii_produs', read_only=True)
+    data_cerere = serializers.DateTimeField(source='id_cerere.data_cerere', read_only=True)
+    nume_produs = serializers.CharField(source='id_produs.nume', read_only=True)
+    stoc_total = serializers.IntegerField(source='id_produs.stoc_total', read_only=True)
+
+    class Meta:
+        model = PotrivireCerere
+        fields = ("id", "id_cerere", "nume_client", "telefon", "detalii_cerere", "data_cerere",
+                  "id_produs", "nume_produs", "stoc_total", "scor", "data_potrivire")
+        read_only_fields = fields
+
+
 # Serializer pentru conturile furnizorilor (tranzacții):
 # - include toate câmpurile din ContFurnizor
 # - la serializare, include și datele furnizorului
-class ContFurnizorSerializer(serializers.ModelSerializer):
+class ContFurnizorSerializer(SerializerDinamic):
     class Meta:
         model = ContFurnizor
         fields = "__all__"
+        expandari = {'furnizor': ('id_furnizor', 'FurnizorSerializer')}
+        expandari_implicite = ('furnizor',)
 
-    def to_representation(self, instance):
-        response = super().to_representation(instance)
-        response['furnizor'] = FurnizorSerializer(instance.id_furnizor).data
-        return response
+
+# Serializer pentru soldul curent al furnizorilor:
+# - include totalurile întreținute incremental din ContFurnizor
+# - la serializare, include și datele furnizorului
+class SoldFurnizorSerializer(SerializerDinamic):
+    class Meta:
+        model = SoldFurnizor
+        fields = "__all__"
+        expandari = {'furnizor': ('id_furnizor', 'FurnizorSerializer')}
+        expandari_implicite = ('furnizor',)
+
+
+# Serializere folosite la importul în masă al catalogului de produse:
+# - id_furnizor este validat ca simplu întreg; existența furnizorilor se verifică
+#   o singură dată pentru tot fișierul, nu cu câte un SELECT pe rând
+class ProdusImportSerializer(serializers.ModelSerializer):
+    id_furnizor = serializers.IntegerField()
+
+    class Meta:
+        model = Produs
+        exclude = ("id", "data_adaugare")
+        # unicitatea (nume, nr_lot, id_furnizor) este verificată de import pe tot lotul, nu pe fiecare rând
+        validators = []
+
+
+# Detaliile scrise în bloc (import, actualizarea unui produs): produsul părinte este
+# stabilit de view, deci câmpul id_produs nu mai este validat pe fiecare rând
+class DetaliiProdusScriereSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DetaliiProdus
+        fields = ("nume_atribut", "valoare_atribut", "unitate_masura", "descriere")
+        list_serializer_class = ListaScriereInBloc
+
+
+# Serializer pentru sarcinile în fundal (starea lor, fără rezultat):
+# - rezultatul se citește separat, din /api/sarcini/<id>/rezultat/
+class SarcinaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Sarcina
+        fields = ("id", "tip", "parametri", "stare", "eroare", "incercari",
+                  "data_adaugare", "data_start", "data_final")
+        read_only_fields = fields
@@ -0,0 +1,138 @@
+# signals.py
+# - invalidarea rezultatelor memorate ale sarcinilor (sarcini.py) la orice scriere în modelele
+#   din care sunt calculate
+# - marcajele de ștergere (StergereSync) pentru modelele sincronizate prin /api/sync/
+# - indexul inversat al cererilor clienților în așteptare (potriviri.py)
+# - soldurile furnizorilor la ștergerea tranzacțiilor (solduri.py; crearea / modificarea sunt în ContFurnizor.save)
+# - lunile de salarii păstrate în cache de rapoarte.py, la orice scriere în SalariuAngajat (API, admin,
+#   ștergeri în cascadă din Angajat)
+# Importat din SistemmanagementinventarConfig.ready().
+# Scrierile în masă (ștergeri de detalii, importuri, arhivare) rulează în scrieri_in_bloc(): semnalele
+# trimise pe fiecare rând doar adună marcajele și tipurile de invalidat, scrise o singură dată la final.
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from SistemManagementInventar import potriviri, rapoarte, sarcini, sincronizare, solduri
+from SistemManagementInventar.models import Angajat, CerereClient, ContFurnizor, DetaliiFactura, DetaliiProdus, \
+    Factura, Furnizor, Produs, SalariuAngajat, StergereSync
+
+# model -> tipurile de sarcini ale căror rezultate depind de el
+DEPENDENTE_SARCINI = {
+    CerereClient: ('acasa',),
+    Factura: ('acasa',),
+    DetaliiFactura: ('acasa',),
+    Produs: ('acasa', 'fatete_atribute'),
+    DetaliiProdus: ('fatete_atribute',),
+    Furnizor: ('acasa', 'raport_vechime_furnizori'),
+    Angajat: ('acasa', 'raport_salarii'),
+    ContFurnizor: ('raport_vechime_furnizori',),
+    SalariuAngajat: ('raport_salarii',),
+}
+
+
+# blocul de scrieri în masă activ în firul curent: {'marcaje': [StergereSync], 'tipuri': {tip de sarcină}}
+_bloc = threading.local()
+
+
+@contextmanager
+def scrieri_in_bloc():
+    """
+    Cât timp blocul este activ, ștergerile nu mai inserează câte un StergereSync pe rând și nu mai
+    invalidează sarcinile pe rând: la ieșirea fără eroare, marcajele se scriu cu un singur bulk_create
+    și fiecare tip de sarcină afectat este invalidat o dată. Se folosește în tranzacția scrierii.
+    """
+    if getattr(_bloc, 'date', None) is not None:
+        # bloc imbricat: totul se scrie la ieșirea din cel exterior
+        yield
+        return
+    _bloc.date = {'marcaje': [], 'tipuri': set()}
+    try:
+        yield
+        date = _bloc.date
+    finally:
+        _bloc.date = None
+    StergereSync.objects.bulk_create(date['marcaje'], batch_size=1000)
+    if date['tipuri']:
+        sarcini.invalideaza_rezultate(*sorted(date['tipuri']))
+
+
+def invalideaza_dependente(model):
+    """Invalidează sarcinile care depind de model (o singură dată pe bloc, în scrieri_in_bloc)."""
+    tipuri = DEPENDENTE_SARCINI.get(model, ())
+    bloc = getattr(_bloc, 'date', None)
+    if bloc is not None:
+        bloc['tipuri'].update(tipuri)
+    elif tipuri:
+        sarcini.invalideaza_rezultate(*tipuri)
+
+
+def invalideaza_sarcini_dependente(sender, update_fields=None, **kwargs):
+    # autentificarea actualizează doar last_login, care nu intră în niciun raport
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalideaza_dependente(sender)
+
+
+def marcheaza_stergere(sender, instance, **kwargs):
+    marcaj = sincronizare.marcaj_stergere(sender, instance.pk)
+    bloc = getattr(_bloc, 'date', None)
+    if bloc is not None:
+        bloc['marcaje'].append(marcaj)
+    else:
+        marcaj.save()
+
+
+for _model in DEPENDENTE_SARCINI:
+    post_save.connect(invalideaza_sarcini_dependente, sender=_model,
+                      dispatch_uid=f'invalideaza_sarcini_{_model.__name__}_save')
+    post_delete.connect(invalideaza_sarcini_dependente, sender=_model,
+                        dispatch_uid=f'invalideaza_sarcini_{_model.__name__}_delete')
+
+for _model, _ in sincronizare.MODELE_SINCRONIZATE.values():
+    post_delete.connect(marcheaza_stergere, sender=_model,
+                        dispatch_uid=f'stergere_sync_{_model.__name__}')
+
+
+def indexeaza_cerere(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {'detalii_produs', 'status'} & set(update_fields):
+        return
+    potriviri.indexeaza_cereri([instance])
+
+
+post_save.connect(indexeaza_cerere, sender=CerereClient, dispatch_uid='index_cereri_save')
+
+
+def scade_din_sold(sender, instance, **kwargs):
+    solduri.aplica_tranzactie(instance, semn=-1)
+
+
+post_delete.connect(scade_din_sold, sender=ContFurnizor, dispatch_uid='sold_furnizor_delete')
+
+
+def retine_luna_salariu(sender, instance, raw=False, **kwargs):
+    # data de dinainte de salvare: dacă se mută salariul în altă lună, se invalidează amândouă
+    if raw or instance.pk is None:
+        instance._data_salariu_veche = None
+        return
+    instance._data_salariu_veche = (SalariuAngajat.objects.filter(pk=instance.pk)
+                                    .values_list('data_salariu', flat=True).first())
+
+
+def invalideaza_luna_salariu(sender, instance, **kwargs):
+    luni = (getattr(instance, '_data_salariu_veche', None), instance.data_salariu)
+
+    def dupa_commit():
+        # întâi lunile, apoi versiunea rapoartelor: un raport calculat între cele două ar fi
+        # memorat sub versiunea veche, deci tot invalid
+        rapoarte.invalideaza_luna_salarii(*luni)
+        sarcini.invalideaza_rezultate('raport_salarii')
+
+    transaction.on_commit(dupa_commit)
+
+
+pre_save.connect(retine_luna_salariu, sender=SalariuAngajat, dispatch_uid='luna_salarii_pre_save')
+post_save.connect(invalideaza_luna_salariu, sender=SalariuAngajat, dispatch_uid='luna_salarii_save')
+post_delete.connect(invalideaza_luna_salariu, sender=SalariuAngajat, dispatch_uid='luna_salarii_delete')
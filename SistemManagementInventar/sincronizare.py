@@ -0,0 +1,110 @@
+# sincronizare.py
+# Sincronizare incrementală pentru frontend (/api/sync/?since=<cursor>):
+# - fiecare model urmărit are data_modificare (auto_now, indexat), ștergerile lasă un StergereSync
+# - cursorul reține, pe model, ultima poziție trimisă (data_modificare, id), deci paginarea este
+#   de tip keyset: fiecare lot continuă exact de unde s-a oprit cel anterior, fără OFFSET
+# - rândurile sunt trimise fără nesting (doar cheile externe), ca loturile să rămână mici
+import base64
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from SistemManagementInventar.models import CerereClient, DetaliiProdus, Furnizor, Produs, StergereSync
+from SistemManagementInventar.serializers import CerereClientSerializer, DetaliiProdusSerializerSimplu, \
+    FurnizorSerializer, ProdusSerializer
+
+# nume în API -> (model, serializer); ordinea contează: furnizorii înaintea produselor lor
+MODELE_SINCRONIZATE = {
+    'furnizor': (Furnizor, FurnizorSerializer),
+    'produs': (Produs, ProdusSerializer),
+    'detalii_produs': (DetaliiProdus, DetaliiProdusSerializerSimplu),
+    'cerere_client': (CerereClient, CerereClientSerializer),
+}
+NUME_DUPA_MODEL = {model: nume for nume, (model, _) in MODELE_SINCRONIZATE.items()}
+
+DIMENSIUNE_LOT_SYNC = 500
+CHEIE_STERGERI = '_sterse'
+
+
+def codifica_cursor(pozitii):
+    text = json.dumps(pozitii, separators=(',', ':'), sort_keys=True)
+    return base64.urlsafe_b64encode(text.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodifica_cursor(cursor):
+    """Cursor gol -> {} (prima sincronizare, totul de la început)."""
+    if not cursor:
+        return {}
+    try:
+        text = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        pozitii = json.loads(text)
+        for nume, (data, id_rand) in pozitii.items():
+            if parse_datetime(data) is None or not isinstance(id_rand, int):
+                raise ValueError(nume)
+    except (ValueError, TypeError, AttributeError):
+        raise ValueError('Cursor de sincronizare invalid')
+    return pozitii
+
+
+def _dupa_pozitie(queryset, pozitie):
+    if not pozitie:
+        return queryset
+    data, id_rand = parse_datetime(pozitie[0]), pozitie[1]
+    return queryset.filter(Q(data_modificare__gt=data) | Q(data_modificare=data, id__gt=id_rand))
+
+
+def _lot(queryset, pozitie, ramase):
+    """(rânduri, mai_sunt) pentru următorul lot de cel mult `ramase` rânduri după poziție."""
+    queryset = _dupa_pozitie(queryset, pozitie).order_by('data_modificare', 'id')
+    if ramase <= 0:
+        return [], queryset.exists()
+    randuri = list(queryset[:ramase + 1])
+    return randuri[:ramase], len(randuri) > ramase
+
+
+def sincronizeaza(cursor=None, dimensiune_lot=DIMENSIUNE_LOT_SYNC):
+    """
+    Următorul lot de modificări și ștergeri după cursor.
+    Returnează {'modificari': {model: [rânduri]}, 'sterse': {model: [id-uri]}, 'cursor', 'mai_sunt'}.
+    Rândurile modificate în ultimele SYNC_MARJA_SECUNDE sunt amânate pentru lotul următor, ca o
+    tranzacție încă neconfirmată cu o dată de modificare mai veche să nu fie sărită.
+    """
+    pozitii = decodifica_cursor(cursor)
+    limita = timezone.now() - timedelta(seconds=getattr(settings, 'SYNC_MARJA_SECUNDE', 2))
+    ramase = dimensiune_lot
+    mai_sunt = False
+    modificari, sterse = {}, {}
+
+    for nume, (model, serializer_class) in MODELE_SINCRONIZATE.items():
+        randuri, rest = _lot(model.objects.filter(data_modificare__lte=limita), pozitii.get(nume), ramase)
+        mai_sunt = mai_sunt or rest
+        if randuri:
+            modificari[nume] = serializer_class(randuri, many=True, campuri=None, expandari=set()).data
+            pozitii[nume] = [randuri[-1].data_modificare.isoformat(), randuri[-1].id]
+            ramase -= len(randuri)
+
+    marcaje, rest = _lot(
+        StergereSync.objects.filter(model__in=list(MODELE_SINCRONIZATE), data_modificare__lte=limita),
+        pozitii.get(CHEIE_STERGERI), ramase,
+    )
+    mai_sunt = mai_sunt or rest
+    for marcaj in marcaje:
+        sterse.setdefault(marcaj.model, []).append(marcaj.id_obiect)
+    if marcaje:
+        pozitii[CHEIE_STERGERI] = [marcaje[-1].data_modificare.isoformat(), marcaje[-1].id]
+
+    return {
+        'modificari': modificari,
+        'sterse': sterse,
+        'cursor': codifica_cursor(pozitii),
+        'mai_sunt': mai_sunt,
+    }
+
+
+def marcaj_stergere(model, id_obiect):
+    """Marcajul (nesalvat) pentru un rând șters al unui model sincronizat; scris din signals.py."""
+    return StergereSync(model=NUME_DUPA_MODEL[model], id_obiect=id_obiect)
@@ -0,0 +1,140 @@
+# solduri.py
+# Soldurile furnizorilor (SoldFurnizor), întreținute incremental din tranzacțiile ContFurnizor.
+# Fiecare creare / modificare / ștergere de tranzacție ajustează un singur rând de sold cu
+# expresii F(), deci citirea soldului unui furnizor costă O(1), indiferent de istoric.
+# Ajustarea este făcută de model, nu de view-uri: ContFurnizor.save() (creare / modificare, cu rândul
+# vechi blocat) și semnalul post_delete (signals.py, inclusiv ștergerile în cascadă și din admin).
+# bulk_create / update() pe ContFurnizor ocolesc ambele căi; după ele se rulează reconstruieste_solduri.
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Max, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from SistemManagementInventar.models import ContFurnizor, SoldFurnizor
+from SistemManagementInventar.sarcini import param_data, tip_sarcina
+
+# tip_tranzactie: '1' = Debit, orice altceva ('2') = Credit
+DEBIT = '1'
+
+ZERO = Value(Decimal('0.00'), output_field=DecimalField(max_digits=14, decimal_places=2))
+
+# Intervalele raportului de vechime: (cheie, zile minime, zile maxime sau None)
+INTERVALE_VECHIME = [
+    ('zile_0_30', 0, 30),
+    ('zile_31_60', 31, 60),
+    ('zile_61_90', 61, 90),
+    ('zile_peste_90', 91, None),
+]
+
+
+def _debit_credit(tranzactie):
+    suma = Decimal(tranzactie.suma_tranzactie)
+    if str(tranzactie.tip_tranzactie) == DEBIT:
+        return suma, Decimal('0')
+    return Decimal('0'), suma
+
+
+def aplica_tranzactie(tranzactie, semn=1):
+    """
+    Adaugă (semn=1) sau scoate (semn=-1) efectul unei tranzacții din soldul furnizorului ei.
+    Trebuie apelată în aceeași tranzacție de bază de date cu scrierea în ContFurnizor.
+    """
+    debit, credit = _debit_credit(tranzactie)
+    if semn > 0:
+        sold, _ = SoldFurnizor.objects.get_or_create(id_furnizor_id=tranzactie.id_furnizor_id)
+    else:
+        # fără rând de sold (ex. furnizorul este șters în cascadă) nu avem ce scădea
+        sold = SoldFurnizor.objects.filter(id_furnizor_id=tranzactie.id_furnizor_id).first()
+        if sold is None:
+            return
+
+    modificari = {
+        'total_debit': F('total_debit') + semn * debit,
+        'total_credit': F('total_credit') + semn * credit,
+        'sold_net': F('sold_net') + semn * (credit - debit),
+        'data_modificare': timezone.now(),
+    }
+    if semn > 0:
+        data = Value(tranzactie.data_tranzactie)
+        modificari['data_ultima_tranzactie'] = Greatest(Coalesce(F('data_ultima_tranzactie'), data), data)
+    SoldFurnizor.objects.filter(pk=sold.pk).update(**modificari)
+
+    # La scoaterea ultimei tranzacții, data ultimei tranzacții se recalculează din istoric
+    if semn < 0 and sold.data_ultima_tranzactie == tranzactie.data_tranzactie:
+        ultima = (ContFurnizor.objects.filter(id_furnizor_id=tranzactie.id_furnizor_id)
+                  .exclude(pk=tranzactie.pk)
+                  .aggregate(ultima=Max('data_tranzactie'))['ultima'])
+        SoldFurnizor.objects.filter(pk=sold.pk).update(data_ultima_tranzactie=ultima, data_modificare=timezone.now())
+
+
+def _suma_conditionata(conditie=None, semnat=False):
+    """Sum(CASE WHEN ...) pe suma tranzacției; semnat=True: credit pozitiv, debit negativ."""
+    if semnat:
+        valoare = Case(
+            When(tip_tranzactie=DEBIT, then=-F('suma_tranzactie')),
+            default=F('suma_tranzactie'),
+        )
+    else:
+        valoare = F('suma_tranzactie')
+    if conditie is not None:
+        valoare = Case(When(conditie, then=valoare), default=ZERO)
+    return Coalesce(Sum(valoare), ZERO)
+
+
+@tip_sarcina('reconstruieste_solduri', memoreaza=False, doar_admin=True)
+def reconstruieste_solduri():
+    """Recalculează toate soldurile dintr-o singură interogare agregată (GROUP BY furnizor)."""
+    agregate = (ContFurnizor.objects.order_by()
+                .values('id_furnizor')
+                .annotate(total_debit=_suma_conditionata(Q(tip_tranzactie=DEBIT)),
+                          total_credit=_suma_conditionata(~Q(tip_tranzactie=DEBIT)),
+                          data_ultima_tranzactie=Max('data_tranzactie')))
+    solduri = [
+        SoldFurnizor(
+            id_furnizor_id=rand['id_furnizor'],
+            total_debit=rand['total_debit'],
+            total_credit=rand['total_credit'],
+            sold_net=rand['total_credit'] - rand['total_debit'],
+            data_ultima_tranzactie=rand['data_ultima_tranzactie'],
+        )
+        for rand in agregate
+    ]
+    with transaction.atomic():
+        SoldFurnizor.objects.all().delete()
+        SoldFurnizor.objects.bulk_create(solduri, batch_size=1000)
+    return len(solduri)
+
+
+def raport_vechime(azi=None):
+    """
+    Raport de vechime pe furnizor: suma netă (credit - debit) a tranzacțiilor pe intervale
+    de 0-30 / 31-60 / 61-90 / peste 90 de zile, calculată cu agregate condiționate în baza de date.
+    """
+    azi = azi or timezone.localdate()
+    agregari = {}
+    for cheie, zile_min, zile_max in INTERVALE_VECHIME:
+        # tranzacțiile cu dată în viitor intră în primul interval
+        conditie = Q(data_tranzactie__lte=azi - timedelta(days=zile_min)) if zile_min else Q()
+        if zile_max is not None:
+            conditie &= Q(data_tranzactie__gte=azi - timedelta(days=zile_max))
+        agregari[cheie] = _suma_conditionata(conditie, semnat=True)
+    agregari['total'] = _suma_conditionata(semnat=True)
+
+    return list(ContFurnizor.objects.order_by()
+                .values('id_furnizor', 'id_furnizor__nume')
+                .annotate(**agregari)
+                .order_by('-total'))
+
+
+@tip_sarcina('raport_vechime_furnizori', parametri={'azi': param_data})
+def raport_vechime_formatat(azi=None):
+    """raport_vechime cu sumele ca text cu 2 zecimale, forma trimisă de API."""
+    raport = raport_vechime(parse_date(azi) if isinstance(azi, str) else azi)
+    for rand in raport:
+        for cheie in [cheie for cheie, _, _ in INTERVALE_VECHIME] + ['total']:
+            rand[cheie] = f"{rand[cheie]:.2f}"
+    return raport
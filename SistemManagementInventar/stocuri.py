@@ -0,0 +1,171 @@
+# stocuri.py
+# Scăderea stocului la facturare, cu un mod fragmentat opțional pentru produsele foarte vândute:
+# - implicit, rândul Produs este blocat (select_for_update), verificat și actualizat; în promoții
+#   toate facturile cu același produs se așteaptă unele pe altele pe acest rând
+# - produsele cu stoc_fragmentat = True au stocul împărțit pe N rânduri FragmentStoc: o vânzare
+#   scade cu un UPDATE condiționat (cantitate >= cerută) dintr-un fragment ales aleator, deci
+#   facturile concurente blochează de regulă fragmente diferite
+# - dacă niciun fragment nu are singur cantitatea cerută, rândul Produs și apoi toate fragmentele
+#   produsului sunt blocate (în ordinea index-ului), cantitatea se ia din suma lor și restul se
+#   reîmparte egal
+# - modul se citește fără blocare pe calea rapidă: un UPDATE reușit pe un fragment ține rândul blocat,
+#   deci (de)fragmentarea, care blochează fragmentele înainte să le șteargă, îl vede; dacă produsul a
+#   fost defragmentat între timp, fragmentele lipsesc, iar calea lentă recitește produsul blocat
+# - Produs.stoc_total al unui produs fragmentat este suma fragmentelor, actualizată leneș în fundal:
+#   o vânzare dintr-un fragment programează (după commit) sarcina sincronizeaza_stoc_fragmentat,
+#   executată de ruleaza_sarcini; citirile din catalog nu mai scriu nimic
+# - programarea este comasată: cât timp o sincronizare așteaptă în coadă, vânzările noi nu mai adaugă
+#   alta (marcaj în cache); sarcina șterge marcajul când pornește, deci vânzările din timpul rulării
+#   programează următoarea și nicio scădere nu rămâne nesincronizată
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from SistemManagementInventar import sarcini
+from SistemManagementInventar.models import FragmentStoc, Produs
+
+
+class StocInsuficient(Exception):
+    def __init__(self, produs, disponibil):
+        super().__init__(f'Stoc insuficient pentru {produs.nume}: {disponibil} unitati disponibile')
+        self.produs = produs
+        self.disponibil = disponibil
+
+
+CHEIE_SINCRONIZARE_PROGRAMATA = 'stocuri:sincronizare_programata'
+
+
+def numar_fragmente_implicit():
+    return getattr(settings, 'STOC_NUMAR_FRAGMENTE', 8)
+
+
+def _imparte(fragmente, total):
+    """Împarte total cât mai egal pe fragmente (primele primesc restul împărțirii)."""
+    baza, rest = divmod(max(total, 0), len(fragmente))
+    for index, fragment in enumerate(fragmente):
+        fragment.cantitate = baza + (1 if index < rest else 0)
+
+
+def scade_stoc(id_produs, cantitate):
+    """
+    Scade cantitatea din stocul produsului, în tranzacția apelantului. Returnează produsul, cu
+    stoc_total = stocul rămas (pentru un produs fragmentat: estimat din fragmentele citite).
+    Ridică StocInsuficient dacă nu este destul stoc și Produs.DoesNotExist dacă produsul lipsește.
+    """
+    # produsele nefragmentate: un singur rând blocat, ca până acum
+    produs = Produs.objects.select_for_update().filter(id=id_produs, stoc_fragmentat=False).first()
+    if produs is not None:
+        return _scade_din_rand(produs, cantitate)
+
+    produs = Produs.objects.get(id=id_produs)
+    fragmente = list(FragmentStoc.objects.filter(id_produs=id_produs).values_list('id', 'cantitate'))
+    candidati = [id_fragment for id_fragment, disponibil in fragmente if disponibil >= cantitate]
+    random.shuffle(candidati)
+    for id_fragment in candidati:
+        # condiționat: alt proces poate fi scăzut între timp același fragment
+        if FragmentStoc.objects.filter(id=id_fragment, cantitate__gte=cantitate).update(
+                cantitate=F('cantitate') - cantitate):
+            produs.stoc_total = sum(disponibil for _, disponibil in fragmente) - cantitate
+            transaction.on_commit(programeaza_sincronizare)
+            return produs
+
+    # calea lentă: produsul blocat și recitit, modul lui nu se mai poate schimba până la commit
+    produs = Produs.objects.select_for_update().get(id=id_produs)
+    if not produs.stoc_fragmentat:
+        return _scade_din_rand(produs, cantitate)
+    produs.stoc_total = _scade_reechilibrand(produs, cantitate)
+    transaction.on_commit(programeaza_sincronizare)
+    return produs
+
+
+def _scade_din_rand(produs, cantitate):
+    """Produs nefragmentat, deja blocat de apelant."""
+    if cantitate > produs.stoc_total:
+        raise StocInsuficient(produs, produs.stoc_total)
+    produs.stoc_total = max(produs.stoc_total - cantitate, 0)
+    produs.save()
+    return produs
+
+
+def programeaza_sincronizare():
+    """Pune în coadă sincronizarea stoc_total, dacă nu așteaptă deja una (vezi antetul modulului)."""
+    # expirarea marcajului acoperă un lucrător oprit: după ea, următoarea vânzare reîncearcă
+    if cache.add(CHEIE_SINCRONIZARE_PROGRAMATA, 1, timeout=getattr(settings, 'STOC_SINCRONIZARE_SECUNDE', 300)):
+        sarcini.trimite_sarcina('sincronizeaza_stoc_fragmentat')
+
+
+def _scade_reechilibrand(produs, cantitate):
+    fragmente = list(FragmentStoc.objects.select_for_update().filter(id_produs=produs.id).order_by('index'))
+    total = sum(fragment.cantitate for fragment in fragmente)
+    if not fragmente or cantitate > total:
+        raise StocInsuficient(produs, total)
+    _imparte(fragmente, total - cantitate)
+    FragmentStoc.objects.bulk_update(fragmente, ['cantitate'])
+    return total - cantitate
+
+
+@transaction.atomic
+def fragmenteaza_stoc(id_produs, numar_fragmente=None):
+    """Trece produsul în modul fragmentat (sau îl reîmparte pe alt număr de fragmente)."""
+    numar_fragmente = numar_fragmente or numar_fragmente_implicit()
+    if numar_fragmente < 1:
+        raise ValueError('Numarul de fragmente trebuie sa fie cel putin 1')
+    produs = Produs.objects.select_for_update().get(id=id_produs)
+    existente = list(FragmentStoc.objects.select_for_update().filter(id_produs=produs.id))
+    total = sum(fragment.cantitate for fragment in existente) if produs.stoc_fragmentat else produs.stoc_total
+    FragmentStoc.objects.filter(id_produs=produs.id).delete()
+
+    fragmente = [FragmentStoc(id_produs=produs, index=index) for index in range(numar_fragmente)]
+    _imparte(fragmente, total)
+    FragmentStoc.objects.bulk_create(fragmente)
+    Produs.objects.filter(id=produs.id).update(stoc_fragmentat=True, stoc_total=total, data_modificare=timezone.now())
+    return total
+
+
+@transaction.atomic
+def defragmenteaza_stoc(id_produs):
+    """Readuce stocul produsului într-un singur rând (Produs.stoc_total) și șterge fragmentele."""
+    produs = Produs.objects.select_for_update().get(id=id_produs)
+    if not produs.stoc_fragmentat:
+        return produs.stoc_total
+    total = sum(FragmentStoc.objects.select_for_update().filter(id_produs=produs.id).values_list('cantitate', flat=True))
+    FragmentStoc.objects.filter(id_produs=produs.id).delete()
+    Produs.objects.filter(id=produs.id).update(stoc_fragmentat=False, stoc_total=total, data_modificare=timezone.now())
+    return total
+
+
+def redistribuie_stoc(produse):
+    """
+    După o scriere explicită a stoc_total (update produs, import) pe produse fragmentate:
+    noua valoare este reîmpărțită pe fragmentele lor, în tranzacția apelantului.
+    """
+    for produs in produse:
+        if not produs.stoc_fragmentat:
+            continue
+        fragmente = list(FragmentStoc.objects.select_for_update().filter(id_produs=produs.id).order_by('index'))
+        if fragmente:
+            _imparte(fragmente, produs.stoc_total)
+            FragmentStoc.objects.bulk_update(fragmente, ['cantitate'])
+
+
+@sarcini.tip_sarcina('sincronizeaza_stoc_fragmentat', memoreaza=False, doar_admin=True)
+def sincronizeaza_stoc_fragmentat():
+    """
+    Aduce Produs.stoc_total la suma fragmentelor, pentru produsele fragmentate rămase în urmă.
+    Citește întâi (fără blocări) și scrie doar dacă este cazul; returnează numărul de produse actualizate.
+    """
+    cache.delete(CHEIE_SINCRONIZARE_PROGRAMATA)
+    suma = Subquery(FragmentStoc.objects.filter(id_produs=OuterRef('pk'))
+                    .values('id_produs').annotate(suma=Sum('cantitate')).values('suma'))
+    ramase = list(Produs.objects.filter(stoc_fragmentat=True).annotate(suma_fragmente=suma)
+                  .exclude(stoc_total=F('suma_fragmente')).values_list('id', flat=True))
+    if not ramase:
+        return 0
+    actualizate = Produs.objects.filter(id__in=ramase).update(stoc_total=suma, data_modificare=timezone.now())
+    # UPDATE-ul nu trimite semnale, deci invalidăm explicit dashboard-ul
+    sarcini.invalideaza_rezultate('acasa')
+    return actualizate
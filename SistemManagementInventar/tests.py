@@ -1,3 +1,1218 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import io
+import json
+import runpy
+import tempfile
+import zipfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import brotli
+import msgpack
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import AsyncClient, LiveServerTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from SistemManagementInventar import arhiva, evenimente, fatete, incalzire, middleware, potriviri, rapoarte, sarcini, \
+    solduri, stocuri, throttling, vanzari
+from SistemManagementInventar.models import Angajat, CerereClient, CheieIdempotenta, Client, ContFurnizor, \
+    DetaliiFactura, DetaliiFacturaArhiva, DetaliiProdus, EvenimentFlux, Factura, FacturaArhiva, FragmentStoc, Furnizor, \
+    PotrivireCerere, Produs, SalariuAngajat, SoldFurnizor, TokenCerere, TotalFereastra, VanzareZilnica
+from SistemManagementInventar.management.commands.test_incarcare import percentila
+from SistemManagementInventar.serializers import DetaliiFacturaSerializer
+
+
+# fără manifestul generat de collectstatic (whitenoise), șabloanele admin nu pot fi randate în teste
+@override_settings(STORAGES={'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}})
+class BugetInterogariAdminTest(TestCase):
+    """
+    Listele din admin pentru tabelele mari: un număr fix de interogări, care nu crește cu rândurile
+    afișate (fără N+1 pe FK-uri), și fără COUNT(*) pe tabelă când numărul este estimat.
+    """
+    # changelist -> interogări maxime (sesiune + utilizator + număr + rânduri + date_hierarchy)
+    BUGETE = {
+        'produs': 7,
+        'detaliiprodus': 6,
+        'factura': 7,
+        'detaliifactura': 7,
+        'client': 6,
+        'salariuangajat': 6,
+        'contfurnizor': 6,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Angajat.objects.create_superuser(
+            username='admin_buget', password='parola', email='admin@exemplu.ro', nume='Admin', prenume='Buget'
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def _adauga_randuri(self, numar):
+        furnizor = Furnizor.objects.create(nume='Furnizor buget', adresa='-', nr_telefon='-', email='-', descriere='-')
+        for index in range(numar):
+            produs = Produs.objects.create(
+                nume=f'Produs buget {index}', tip_produs='-', pret_cumparare=1, pret_vanzare=2, tva_produs=19,
+                nr_lot=str(index), nr_raft='-', data_expirare=date(2030, 1, 1), data_producere=date(2024, 1, 1),
+                id_furnizor=furnizor, descriere='-', stoc_total=10, cantitate_in_pachet=1,
+            )
+            DetaliiProdus.objects.create(id_produs=produs, nume_atribut='culoare', valoare_atribut='rosu')
+            client = Client.objects.create(nume=f'Client buget {index}', adresa='-', contact=str(index))
+            factura = Factura.objects.create(id_client=client)
+            DetaliiFactura.objects.create(id_factura=factura, id_produs=produs, cantitate=1)
+            SalariuAngajat.objects.create(id_angajat=self.admin, data_salariu=date(2024, 1, 1), suma_salariu=index)
+            ContFurnizor.objects.create(
+                id_furnizor=furnizor, tip_tranzactie=1, suma_tranzactie=index, data_tranzactie=date(2024, 1, 1),
+                modalitate_plata='-',
+            )
+
+    def _interogari(self, url):
+        with CaptureQueriesContext(connection) as interogari:
+            raspuns = self.client.get(url)
+        self.assertEqual(raspuns.status_code, 200)
+        return [interogare['sql'] for interogare in interogari.captured_queries]
+
+    def test_bugetul_nu_creste_cu_randurile(self):
+        for model, buget in self.BUGETE.items():
+            url = reverse(f'admin:SistemManagementInventar_{model}_changelist')
+            putine = len(self._interogari(url))
+            self._adauga_randuri(15)
+            multe = len(self._interogari(url))
+            with self.subTest(model=model):
+                self.assertLessEqual(multe, buget)
+                self.assertEqual(putine, multe)
+
+    def test_numar_estimat_fara_count(self):
+        self._adauga_randuri(3)
+        with mock.patch('SistemManagementInventar.admin.numar_estimat_randuri', return_value=500000):
+            for model in self.BUGETE:
+                url = reverse(f'admin:SistemManagementInventar_{model}_changelist')
+                with self.subTest(model=model):
+                    self.assertFalse([sql for sql in self._interogari(url) if 'COUNT(' in sql.upper()])
+
+    def test_cautare_numerica_si_dupa_prefix(self):
+        self._adauga_randuri(3)
+        produs = Produs.objects.get(nume='Produs buget 1')
+        for model in self.BUGETE:
+            url = reverse(f'admin:SistemManagementInventar_{model}_changelist')
+            with self.subTest(model=model):
+                self.assertLessEqual(len(self._interogari(f'{url}?q={produs.id}')), self.BUGETE[model])
+                self.assertLessEqual(len(self._interogari(f'{url}?q=buget')), self.BUGETE[model])
+        raspuns = self.client.get(reverse('admin:SistemManagementInventar_produs_changelist') + '?q=Produs')
+        self.assertContains(raspuns, 'Produs buget 1 (1)')
+
+    def test_tabele_generate_fara_count(self):
+        # tabelele scrise de aplicație (sync, index, rollup-uri, arhivă, sarcini, idempotență): aceleași reguli, fără adăugare
+        for model in ('stergeresync', 'tokencerere', 'vanzarezilnica', 'vanzarezilnicaclient', 'potrivirecerere',
+                      'facturaarhiva', 'detaliifacturaarhiva', 'sarcina', 'cheieidempotenta', 'progresagregare',
+                      'totalfereastra'):
+            url = reverse(f'admin:SistemManagementInventar_{model}_changelist')
+            with self.subTest(model=model):
+                with mock.patch('SistemManagementInventar.admin.numar_estimat_randuri', return_value=500000):
+                    interogari = self._interogari(url)
+                self.assertFalse([sql for sql in interogari if 'COUNT(' in sql.upper()])
+                self.assertLessEqual(len(interogari), 7)
+                self.assertLessEqual(len(self._interogari(f'{url}?q=1')), 7)
+        raspuns = self.client.get(reverse('admin:SistemManagementInventar_vanzarezilnica_add'))
+        self.assertEqual(raspuns.status_code, 403)
+
+
+class TestAPI(TestCase):
+    """Bază pentru testele de API: un angajat autentificat, un furnizor și găleți de limitare goale."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.angajat = Angajat.objects.create_user(
+            username='angajat_test', password='parola', email='angajat@exemplu.ro', nume='Test', prenume='Angajat'
+        )
+        cls.furnizor = Furnizor.objects.create(nume='Furnizor test', adresa='-', nr_telefon='-', email='-', descriere='-')
+
+    def setUp(self):
+        throttling.stocare().reseteaza()
+        self.api = APIClient()
+        self.api.force_authenticate(self.angajat)
+
+    def creeaza_produs(self, nume='Produs test', stoc=10, detalii=None, **campuri):
+        date_produs = dict(
+            nume=nume, tip_produs='Medicamente', pret_cumparare=1, pret_vanzare=2, tva_produs=19, nr_lot='L1',
+            nr_raft='R1', data_expirare=date(2030, 1, 1), data_producere=date(2024, 1, 1), id_furnizor=self.furnizor,
+            descriere='-', stoc_total=stoc, cantitate_in_pachet=1,
+        )
+        date_produs.update(campuri)
+        produs = Produs.objects.create(**date_produs)
+        for nume_atribut, valoare in (detalii or {}).items():
+            DetaliiProdus.objects.create(id_produs=produs, nume_atribut=nume_atribut, valoare_atribut=valoare)
+        return produs
+
+    def factura(self, *linii, nume='Client factura', contact='0700', cheie=None):
+        corp = {'nume': nume, 'adresa': 'Strada 1', 'contact': contact,
+                'detalii_produs': [{'id': produs.id, 'cantitate': cantitate} for produs, cantitate in linii]}
+        antete = {'HTTP_IDEMPOTENCY_KEY': cheie} if cheie else {}
+        return self.api.post('/api/api_generare_factura/', corp, format='json', **antete)
+
+
+class ExportTest(TestAPI):
+
+    def test_csv_in_flux(self):
+        self.creeaza_produs('Paracetamol')
+        raspuns = self.api.get('/api/export/produse/')
+        self.assertEqual(raspuns.status_code, 200)
+        self.assertTrue(raspuns['Content-Type'].startswith('text/csv'))
+        self.assertEqual(raspuns['Content-Disposition'], 'attachment; filename="produse.csv"')
+        randuri = b''.join(raspuns.streaming_content).decode('utf-8').splitlines()
+        self.assertTrue(randuri[0].startswith('\ufeffID produs,Nume,Tip produs'))
+        self.assertTrue(any(',Paracetamol,' in rand for rand in randuri[1:]))
+
+    def test_xlsx_si_interval(self):
+        self.creeaza_produs('Paracetamol')
+        raspuns = self.api.get('/api/export/produse/?tip=xlsx&data_start=2000-01-01')
+        self.assertEqual(raspuns.status_code, 200)
+        with zipfile.ZipFile(io.BytesIO(b''.join(raspuns.streaming_content))) as arhiva:
+            foaie = arhiva.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertIn('>ID produs<', foaie)
+        self.assertIn('>Paracetamol<', foaie)
+
+        raspuns = self.api.get('/api/export/produse/?data_start=2999-01-01')
+        self.assertEqual(len(b''.join(raspuns.streaming_content).decode('utf-8').splitlines()), 1)
+
+    async def test_flux_asincron_sub_asgi(self):
+        await sync_to_async(self.creeaza_produs)('Paracetamol')
+        token = str(AccessToken.for_user(self.angajat))
+        raspuns = await AsyncClient().get('/api/export/produse/', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(raspuns.status_code, 200)
+        # un iterator sincron ar fi citit în întregime în memorie de Django înainte de trimitere
+        self.assertTrue(raspuns.is_async)
+        randuri = b''.join([bucata async for bucata in raspuns.streaming_content]).decode('utf-8').splitlines()
+        self.assertTrue(randuri[0].startswith('\ufeffID produs,Nume,Tip produs'))
+        self.assertTrue(any(',Paracetamol,' in rand for rand in randuri[1:]))
+
+    def test_parametri_invalizi(self):
+        self.assertEqual(self.api.get('/api/export/necunoscut/').status_code, 404)
+        self.assertEqual(self.api.get('/api/export/produse/?tip=pdf').status_code, 400)
+        self.assertEqual(self.api.get('/api/export/produse/?data_start=31-12-2025').status_code, 400)
+
+    def _linii_facturi(self, raspuns):
+        return [rand.split(',') for rand in b''.join(raspuns.streaming_content).decode('utf-8').splitlines()[1:]]
+
+    def test_facturi_cu_arhiva(self):
+        produs = self.creeaza_produs('Paracetamol')
+        client = Client.objects.create(nume='Client export', adresa='-', contact='0711')
+        veche = FacturaArhiva.objects.create(id=900001, id_client=client, data_modificare=timezone.now(),
+                                             data_adaugare=timezone.make_aware(datetime(2020, 3, 1, 10)))
+        DetaliiFacturaArhiva.objects.create(id=900001, id_factura=veche, id_produs=produs, cantitate=4,
+                                            pret_cumparare=1, pret_vanzare=3, tva_produs=9,
+                                            data_adaugare=veche.data_adaugare, data_modificare=veche.data_modificare)
+        noua = Factura.objects.create(id_client=client)
+        DetaliiFactura.objects.create(id_factura=noua, id_produs=produs, cantitate=1)
+
+        linii = [linie for linie in self._linii_facturi(self.api.get('/api/export/facturi/'))
+                 if linie[2] == 'Client export']
+        # arhiva se exportă înaintea tabelei calde
+        self.assertEqual([(int(linie[0]), int(linie[7])) for linie in linii], [(veche.id, 4), (noua.id, 1)])
+        # prețul și cota TVA sunt cele de pe linie, nu cele curente ale produsului
+        self.assertEqual([(Decimal(linie[9]), Decimal(linie[10])) for linie in linii],
+                         [(Decimal('3'), Decimal('9')), (Decimal('2'), Decimal('19'))])
+
+        raspuns = self.api.get('/api/export/facturi/?data_start=2020-03-01&data_end=2020-03-01')
+        self.assertEqual([int(linie[0]) for linie in self._linii_facturi(raspuns)], [veche.id])
+
+        raspuns = self.api.get('/api/export/facturi/?tip=xlsx&data_start=2020-01-01&data_end=2020-12-31')
+        self.assertEqual(raspuns['Content-Disposition'], 'attachment; filename="facturi.xlsx"')
+        with zipfile.ZipFile(io.BytesIO(b''.join(raspuns.streaming_content))) as arhiva:
+            foaie = arhiva.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertIn('>Client export<', foaie)
+        self.assertEqual(foaie.count('<row>'), 2)
+
+
+class TotaluriFacturaTest(TestAPI):
+
+    def test_preturi_de_la_emitere_si_tva_rotunjit_pe_linie(self):
+        produse = [self.creeaza_produs(f'Produs {i}', pret_vanzare=Decimal('0.35')) for i in range(2)]
+        self.assertEqual(self.factura(*[(produs, 1) for produs in produse]).status_code, 201)
+        factura = Factura.objects.latest('id')
+        # prețurile se schimbă după emitere: factura nu se modifică
+        Produs.objects.filter(id__in=[produs.id for produs in produse]).update(pret_vanzare=10, tva_produs=9)
+
+        date_factura = self.api.get(f'/api/factura/{factura.id}/').json()['data']
+        # 0.35 * 19% = 0.0665 -> 0.07 pe fiecare linie; rotunjit pe total ar fi fost 0.13
+        self.assertEqual((date_factura['total_net'], date_factura['total_tva'], date_factura['total_brut']),
+                         ('0.70', '0.14', '0.84'))
+        self.assertEqual({(linie['pret_unitar'], linie['cota_tva'], linie['valoare_tva'])
+                          for linie in date_factura['linii']}, {('0.35', '19.00', '0.07')})
+
+
+class ImportProduseTest(TestAPI):
+
+    def rand_import(self, nume, **campuri):
+        rand = {
+            'nume': nume, 'tip_produs': 'Medicamente', 'pret_cumparare': '1.00', 'pret_vanzare': '2.00',
+            'tva_produs': 19, 'nr_lot': 'L1', 'nr_raft': 'R1', 'data_expirare': '2030-01-01',
+            'data_producere': '2024-01-01', 'id_furnizor': self.furnizor.id, 'descriere': '-', 'stoc_total': 5,
+            'cantitate_in_pachet': 1,
+        }
+        rand.update(campuri)
+        return rand
+
+    def test_erori_pe_rand(self):
+        randuri = [
+            self.rand_import('Valid', detalii_produs=[{'nume_atribut': 'forma', 'valoare_atribut': 'tableta'}]),
+            self.rand_import('Furnizor lipsa', id_furnizor=999999),
+            self.rand_import('Pret invalid', pret_cumparare='abc'),
+        ]
+        raspuns = self.api.post('/api/import_produse/', randuri, format='json')
+        self.assertEqual(raspuns.status_code, 200)
+        raport = raspuns.json()['data']
+        self.assertEqual((raport['creat'], raport['actualizat']), (1, 0))
+        self.assertEqual([eroare['rand'] for eroare in raport['erori']], [2, 3])
+        self.assertFalse(Produs.objects.filter(nume__in=['Furnizor lipsa', 'Pret invalid']).exists())
+        self.assertEqual(
+            list(DetaliiProdus.objects.filter(id_produs__nume='Valid').values_list('nume_atribut', 'valoare_atribut')),
+            [('forma', 'tableta')],
+        )
+
+    def test_upsert_dupa_cheie(self):
+        produs = self.creeaza_produs('Existent', stoc=1, detalii={'forma': 'tableta'})
+        rand = self.rand_import('Existent', pret_vanzare='3.50', stoc_total=40,
+                                detalii_produs=[{'nume_atribut': 'forma', 'valoare_atribut': 'sirop'}])
+
+        raspuns = self.api.post('/api/import_produse/?upsert=1', [rand], format='json')
+        self.assertEqual((raspuns.json()['data']['creat'], raspuns.json()['data']['actualizat']), (0, 1))
+        produs.refresh_from_db()
+        self.assertEqual((produs.pret_vanzare, produs.stoc_total), (Decimal('3.50'), 40))
+        self.assertEqual(list(produs.detaliiprodus_set.values_list('valoare_atribut', flat=True)), ['sirop'])
+        self.assertEqual(Produs.objects.filter(nume='Existent').count(), 1)
+
+        # fără upsert, o cheie existentă este o eroare pe rând; celelalte rânduri se importă
+        raspuns = self.api.post('/api/import_produse/', [self.rand_import('Nou'), rand], format='json')
+        raport = raspuns.json()['data']
+        self.assertEqual((raport['creat'], raport['actualizat']), (1, 0))
+        self.assertEqual([eroare['rand'] for eroare in raport['erori']], [2])
+        self.assertEqual(Produs.objects.filter(nume='Existent').count(), 1)
+
+    def test_cheie_repetata_in_fisier(self):
+        for parametri in ('', '?upsert=1'):
+            raspuns = self.api.post(f'/api/import_produse/{parametri}',
+                                    [self.rand_import('Repetat'), self.rand_import('Repetat', stoc_total=9)],
+                                    format='json')
+            self.assertEqual([eroare['rand'] for eroare in raspuns.json()['data']['erori']], [2])
+        self.assertEqual(list(Produs.objects.filter(nume='Repetat').values_list('stoc_total', flat=True)), [5])
+
+
+class DetaliiProdusActualizareTest(TestAPI):
+
+    def test_diferenta_detalii(self):
+        produs = self.creeaza_produs(detalii={'forma': 'tableta', 'culoare': 'alb', 'gust': 'amar'})
+        forma, culoare = (DetaliiProdus.objects.get(id_produs=produs, nume_atribut=nume) for nume in ('forma', 'culoare'))
+        corp = {'nume': 'Produs redenumit', 'detalii_produs': [
+            {'id': forma.id, 'valoare_atribut': 'capsula'},
+            {'id': culoare.id},
+            {'nume_atribut': 'concentratie', 'valoare_atribut': '500', 'unitate_masura': 'mg'},
+        ]}
+        raspuns = self.api.put(f'/api/produs/{produs.id}/', corp, format='json')
+        self.assertEqual(raspuns.status_code, 200, raspuns.content)
+        self.assertEqual(
+            dict(DetaliiProdus.objects.filter(id_produs=produs).values_list('nume_atribut', 'valoare_atribut')),
+            {'forma': 'capsula', 'culoare': 'alb', 'concentratie': '500'},
+        )
+        self.assertEqual(DetaliiProdus.objects.get(pk=forma.pk).pk, forma.pk)
+
+    def test_detaliu_strain_respins(self):
+        produs = self.creeaza_produs(detalii={'forma': 'tableta'})
+        alt_produs = self.creeaza_produs('Alt produs', detalii={'forma': 'sirop'})
+        strain = DetaliiProdus.objects.get(id_produs=alt_produs)
+
+        raspuns = self.api.put(f'/api/produs/{produs.id}/', {
+            'nume': 'Nu se salveaza', 'detalii_produs': [{'id': strain.id, 'valoare_atribut': 'modificat'}],
+        }, format='json')
+        self.assertEqual(raspuns.status_code, 400)
+        self.assertIn(str(strain.id), raspuns.json()['message'])
+        produs.refresh_from_db()
+        strain.refresh_from_db()
+        self.assertEqual((produs.nume, strain.valoare_atribut), ('Produs test', 'sirop'))
+        self.assertTrue(DetaliiProdus.objects.filter(id_produs=produs).exists())
+
+
+class CampuriDinamiceTest(TestAPI):
+
+    def test_fields_si_expand(self):
+        produs = self.creeaza_produs(detalii={'forma': 'tableta'})
+
+        date_produse = self.api.get('/api/produs/?fields=id,nume').json()['data']
+        self.assertEqual(set(date_produse[0]), {'id', 'nume'})
+
+        rand = next(p for p in self.api.get('/api/produs/?fields=id,furnizor.nume&expand=furnizor').json()['data']
+                    if p['id'] == produs.id)
+        self.assertEqual(rand, {'id': produs.id, 'furnizor': {'nume': 'Furnizor test'}})
+
+        rand = self.api.get(f'/api/produs/{produs.id}/?expand=').json()['data']
+        self.assertNotIn('furnizor', rand)
+        self.assertEqual(rand['id_furnizor'], self.furnizor.id)
+
+    def test_detalii_fara_id(self):
+        produs = self.creeaza_produs('Singurul cu detalii', detalii={'forma': 'tableta'})
+        raspuns = self.api.get('/api/produs/?fields=nume,detalii_produs')
+        self.assertEqual(raspuns.status_code, 200)
+        rand = next(p for p in raspuns.json()['data'] if p['nume'] == produs.nume)
+        self.assertNotIn('id', rand)
+        self.assertEqual([detaliu['valoare_atribut'] for detaliu in rand['detalii_produs']], ['tableta'])
+
+
+@override_settings(COMPRESIE_PRAG_OCTETI=100)
+class NegociereRaspunsTest(TestAPI):
+
+    def setUp(self):
+        super().setUp()
+        for index in range(5):
+            self.creeaza_produs(f'Produs {index}')
+
+    def test_msgpack(self):
+        raspuns = self.api.get('/api/produs/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(raspuns['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(raspuns.content)['message'], 'Produse listate')
+
+    def test_compresie_dupa_accept_encoding(self):
+        necomprimat = self.api.get('/api/produs/')
+        self.assertFalse(necomprimat.has_header('Content-Encoding'))
+
+        raspuns = self.api.get('/api/produs/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(raspuns['Content-Encoding'], 'br')
+        self.assertIn('Accept-Encoding', raspuns['Vary'])
+        self.assertEqual(json.loads(brotli.decompress(raspuns.content)), necomprimat.json())
+
+        raspuns = self.api.get('/api/produs/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(raspuns['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(raspuns.content)), necomprimat.json())
+
+    def test_brotli_cu_umplutura_aleatoare(self):
+        lungimi = []
+        for umplutura in (0, 40):
+            with mock.patch.object(middleware.secrets, 'randbelow', return_value=umplutura) as randbelow:
+                raspuns = self.api.get('/api/produs/', HTTP_ACCEPT_ENCODING='br')
+            randbelow.assert_called_once_with(middleware.CompresieRaspunsMiddleware.max_random_bytes + 1)
+            self.assertEqual(raspuns['Content-Encoding'], 'br')
+            self.assertEqual(json.loads(brotli.decompress(raspuns.content))['message'], 'Produse listate')
+            lungimi.append(len(raspuns.content))
+        # meta-blocul de metadate: 2 octeți de antet + umplutura
+        self.assertEqual(lungimi[1] - lungimi[0], 42)
+
+    def test_export_comprimat_ramane_in_flux(self):
+        raspuns = self.api.get('/api/export/produse/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertTrue(raspuns.streaming)
+        self.assertEqual(raspuns['Content-Encoding'], 'gzip')
+        self.assertFalse(raspuns.has_header('Content-Length'))
+        csv_text = gzip.decompress(b''.join(raspuns.streaming_content)).decode('utf-8')
+        self.assertIn(',Produs 3,', csv_text)
+
+    async def test_export_comprimat_ramane_in_flux_sub_asgi(self):
+        token = str(AccessToken.for_user(self.angajat))
+        raspuns = await AsyncClient().get('/api/export/produse/',
+                                          headers={'Authorization': f'Bearer {token}', 'Accept-Encoding': 'gzip'})
+        self.assertTrue(raspuns.is_async)
+        self.assertEqual(raspuns['Content-Encoding'], 'gzip')
+        bucati = [bucata async for bucata in raspuns.streaming_content]
+        # rândurile sunt comprimate pe loturi, nu câte un membru gzip pe rând
+        self.assertEqual(len(bucati), 1)
+        self.assertIn(',Produs 3,', gzip.decompress(b''.join(bucati)).decode('utf-8'))
+
+
+class SoldFurnizorTest(TestAPI):
+
+    def _sold(self):
+        sold = SoldFurnizor.objects.get(id_furnizor=self.furnizor)
+        return sold.total_debit, sold.total_credit, sold.sold_net
+
+    def _tranzactie(self, tip, suma, data_tranzactie='2025-05-10'):
+        raspuns = self.api.post('/api/contfurnizor/', {
+            'id_furnizor': self.furnizor.id, 'tip_tranzactie': tip, 'suma_tranzactie': suma,
+            'data_tranzactie': data_tranzactie, 'modalitate_plata': 'OP',
+        }, format='json')
+        self.assertEqual(raspuns.status_code, 201, raspuns.content)
+        return ContFurnizor.objects.latest('id')
+
+    def _verifica_reconstruit(self):
+        incremental = self._sold()
+        solduri.reconstruieste_solduri()
+        self.assertEqual(self._sold(), incremental)
+
+    def test_creare_modificare_stergere(self):
+        self._tranzactie('2', '100.00')
+        debit = self._tranzactie('1', '30.00', '2025-05-20')
+        self.assertEqual(self._sold(), (Decimal('30.00'), Decimal('100.00'), Decimal('70.00')))
+        self.assertEqual(SoldFurnizor.objects.get(id_furnizor=self.furnizor).data_ultima_tranzactie, date(2025, 5, 20))
+
+        raspuns = self.api.put(f'/api/contfurnizor/{debit.id}/', {'suma_tranzactie': '50.00'}, format='json')
+        self.assertEqual(raspuns.status_code, 200, raspuns.content)
+        self.assertEqual(self._sold(), (Decimal('50.00'), Decimal('100.00'), Decimal('50.00')))
+        self._verifica_reconstruit()
+
+        self.assertEqual(self.api.delete(f'/api/contfurnizor/{debit.id}/').status_code, 204)
+        self.assertEqual(self._sold(), (Decimal('0.00'), Decimal('100.00'), Decimal('100.00')))
+        self.assertEqual(SoldFurnizor.objects.get(id_furnizor=self.furnizor).data_ultima_tranzactie, date(2025, 5, 10))
+        self._verifica_reconstruit()
+
+    def test_mutare_la_alt_furnizor(self):
+        alt_furnizor = Furnizor.objects.create(nume='Alt furnizor', adresa='-', nr_telefon='-', email='-', descriere='-')
+        tranzactie = self._tranzactie('2', '80.00')
+        self.api.put(f'/api/contfurnizor/{tranzactie.id}/', {'id_furnizor': alt_furnizor.id}, format='json')
+        self.assertEqual(self._sold()[2], Decimal('0.00'))
+        self.assertEqual(SoldFurnizor.objects.get(id_furnizor=alt_furnizor).sold_net, Decimal('80.00'))
+
+
+@override_settings(SYNC_MARJA_SECUNDE=0)
+class SincronizareTest(TestAPI):
+
+    def _sincronizeaza(self, cursor='', lot=500):
+        raspuns = self.api.get('/api/sync/', {'since': cursor, 'lot': lot})
+        self.assertEqual(raspuns.status_code, 200, raspuns.content)
+        return raspuns.json()['data']
+
+    def test_cursor_in_loturi(self):
+        for index in range(5):
+            self.creeaza_produs(f'Produs sync {index}')
+        vazute, cursor = set(), ''
+        while True:
+            date_sync = self._sincronizeaza(cursor, lot=2)
+            produse = date_sync['modificari'].get('produs', [])
+            self.assertFalse(vazute & {produs['id'] for produs in produse})
+            vazute |= {produs['id'] for produs in produse}
+            cursor = date_sync['cursor']
+            if not date_sync['mai_sunt']:
+                break
+        self.assertTrue(set(Produs.objects.values_list('id', flat=True)) <= vazute)
+
+        gol = self._sincronizeaza(cursor)
+        self.assertEqual((gol['modificari'], gol['sterse']), ({}, {}))
+
+        produs = Produs.objects.get(nume='Produs sync 3')
+        produs.nume = 'Produs sync redenumit'
+        produs.save()
+        modificari = self._sincronizeaza(cursor)['modificari']
+        self.assertEqual([p['nume'] for p in modificari['produs']], ['Produs sync redenumit'])
+
+    def test_marcaje_stergere(self):
+        produs = self.creeaza_produs(detalii={'forma': 'tableta', 'culoare': 'alb'})
+        cursor = self._sincronizeaza()['cursor']
+        sterse = list(DetaliiProdus.objects.filter(id_produs=produs).values_list('id', flat=True))
+
+        with CaptureQueriesContext(connection) as interogari:
+            self.api.put(f'/api/produs/{produs.id}/', {'detalii_produs': []}, format='json')
+        # un singur INSERT pentru toate marcajele
+        self.assertEqual(len([i for i in interogari.captured_queries if 'INSERT INTO "SistemManagementInventar_stergeresync"' in i['sql']]), 1)
+        self.assertEqual(sorted(self._sincronizeaza(cursor)['sterse']['detalii_produs']), sorted(sterse))
+
+    def test_cursor_invalid(self):
+        self.assertEqual(self.api.get('/api/sync/', {'since': 'nu-este-cursor'}).status_code, 400)
+
+
+class LimitareCereriTest(TestAPI):
+
+    @override_settings(LIMITARI_GALETI={'catalog': (2, 0.5), 'implicit': (100, 5)})
+    def test_429_cu_retry_after(self):
+        coduri = [self.api.get('/api/produs/').status_code for _ in range(3)]
+        self.assertEqual(coduri, [200, 200, 429])
+        raspuns = self.api.get('/api/produs/')
+        self.assertEqual(raspuns.status_code, 429)
+        self.assertIn(int(raspuns['Retry-After']), (1, 2))
+        # altă clasă de endpoint, altă găleată
+        self.assertEqual(self.api.get('/api/contfurnizor/').status_code, 200)
+
+    @override_settings(LIMITARI_GALETI={'catalog': (1, 0.5), 'implicit': (100, 5)})
+    def test_galeti_pe_utilizator(self):
+        alt_angajat = Angajat.objects.create_user(username='alt_angajat', password='parola', email='alt@exemplu.ro',
+                                                  nume='Alt', prenume='Angajat')
+        alt_api = APIClient()
+        alt_api.force_authenticate(alt_angajat)
+        self.assertEqual(self.api.get('/api/produs/').status_code, 200)
+        self.assertEqual(self.api.get('/api/produs/').status_code, 429)
+        self.assertEqual(alt_api.get('/api/produs/').status_code, 200)
+
+
+class IdempotentaTest(TestAPI):
+
+    def test_reluare_si_422(self):
+        produs = self.creeaza_produs(stoc=100)
+        facturi_initiale = Factura.objects.count()
+
+        prima = self.factura((produs, 2), cheie='cheie-1')
+        a_doua = self.factura((produs, 2), cheie='cheie-1')
+        self.assertEqual((prima.status_code, a_doua.status_code), (201, 201))
+        self.assertEqual(a_doua.json(), prima.json())
+        self.assertEqual(a_doua['Idempotent-Replayed'], 'true')
+        produs.refresh_from_db()
+        self.assertEqual(produs.stoc_total, 98)
+        self.assertEqual(Factura.objects.count(), facturi_initiale + 1)
+
+        alt_corp = self.factura((produs, 3), cheie='cheie-1')
+        self.assertEqual(alt_corp.status_code, 422)
+        produs.refresh_from_db()
+        self.assertEqual(produs.stoc_total, 98)
+
+    def test_eroarea_nu_pastreaza_cheia(self):
+        produs = self.creeaza_produs(stoc=1)
+        self.assertEqual(self.factura((produs, 5), cheie='cheie-2').status_code, 400)
+        self.assertFalse(CheieIdempotenta.objects.filter(cheie='cheie-2').exists())
+        self.assertEqual(self.factura((produs, 1), cheie='cheie-2').status_code, 201)
+
+
+class StocFragmentatTest(TestAPI):
+
+    def setUp(self):
+        super().setUp()
+        self.produs = self.creeaza_produs(stoc=100)
+        stocuri.fragmenteaza_stoc(self.produs.id, 4)
+
+    def _fragmente(self):
+        return list(FragmentStoc.objects.filter(id_produs=self.produs).order_by('index').values_list('cantitate', flat=True))
+
+    def test_scadere_dintr_un_fragment(self):
+        self.assertEqual(self._fragmente(), [25, 25, 25, 25])
+        produs = stocuri.scade_stoc(self.produs.id, 20)
+        self.assertEqual(produs.stoc_total, 80)
+        self.assertEqual(sorted(self._fragmente()), [5, 25, 25, 25])
+
+    def test_reechilibrare_cand_niciun_fragment_nu_ajunge(self):
+        stocuri.scade_stoc(self.produs.id, 20)
+        produs = stocuri.scade_stoc(self.produs.id, 30)
+        self.assertEqual(produs.stoc_total, 50)
+        self.assertEqual(self._fragmente(), [13, 13, 12, 12])
+        with self.assertRaises(stocuri.StocInsuficient):
+            stocuri.scade_stoc(self.produs.id, 51)
+        self.assertEqual(sum(self._fragmente()), 50)
+
+    def test_defragmentat_intre_citire_si_scadere(self):
+        # defragmentarea se încheie după ce fragmentele au fost citite fără blocare
+        def defragmenteaza(candidati):
+            stocuri.defragmenteaza_stoc(self.produs.id)
+
+        with mock.patch.object(stocuri.random, 'shuffle', side_effect=defragmenteaza):
+            produs = stocuri.scade_stoc(self.produs.id, 10)
+        self.assertEqual(produs.stoc_total, 90)
+        self.produs.refresh_from_db()
+        self.assertEqual((self.produs.stoc_fragmentat, self.produs.stoc_total), (False, 90))
+
+    def test_factura_cu_stoc_insuficient_anuleaza_tot(self):
+        alt_produs = self.creeaza_produs('Stoc mic', stoc=1)
+        facturi_initiale = Factura.objects.count()
+        raspuns = self.factura((self.produs, 10), (alt_produs, 5), contact='0799')
+        self.assertEqual(raspuns.status_code, 400)
+        self.assertEqual(Factura.objects.count(), facturi_initiale)
+        self.assertFalse(Client.objects.filter(contact='0799').exists())
+        self.assertEqual(sum(self._fragmente()), 100)
+
+    def test_sincronizare_in_fundal(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.factura((self.produs, 10)).status_code, 201)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.factura((self.produs, 10)).status_code, 201)
+        # citirea nu scrie, iar cele două vânzări au programat o singură sincronizare
+        self.assertEqual(self.api.get(f'/api/produs/{self.produs.id}/').json()['data']['stoc_total'], 100)
+        self.assertEqual(stocuri.sarcini.Sarcina.objects.filter(tip='sincronizeaza_stoc_fragmentat').count(), 1)
+        stocuri.sincronizeaza_stoc_fragmentat()
+        self.assertEqual(self.api.get(f'/api/produs/{self.produs.id}/').json()['data']['stoc_total'], 80)
+
+
+class ValidareInBlocTest(TestAPI):
+
+    def _scrie_linii(self, factura, produs, numar):
+        date_linii = [{'id_factura': factura.id, 'id_produs': produs.id, 'cantitate': 1} for _ in range(numar)]
+        with CaptureQueriesContext(connection) as interogari:
+            serializer = DetaliiFacturaSerializer(data=date_linii, many=True)
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            serializer.save()
+        return len(interogari.captured_queries)
+
+    def test_interogari_constante(self):
+        produs = self.creeaza_produs()
+        factura = Factura.objects.create(id_client=Client.objects.create(nume='C', adresa='-', contact='1'))
+        self.assertEqual(self._scrie_linii(factura, produs, 3), self._scrie_linii(factura, produs, 60))
+        self.assertEqual(DetaliiFactura.objects.filter(id_factura=factura).count(), 63)
+
+    def test_cheie_inexistenta(self):
+        produs = self.creeaza_produs()
+        factura = Factura.objects.create(id_client=Client.objects.create(nume='C', adresa='-', contact='1'))
+        serializer = DetaliiFacturaSerializer(data=[
+            {'id_factura': factura.id, 'id_produs': produs.id, 'cantitate': 1},
+            {'id_factura': factura.id, 'id_produs': 999999, 'cantitate': 1},
+        ], many=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors[0], {})
+        self.assertIn('id_produs', serializer.errors[1])
+
+    def test_creare_produs_cu_detalii_invalide(self):
+        corp = {
+            'nume': 'Produs nou', 'tip_produs': 'Medicamente', 'pret_cumparare': '1.00', 'pret_vanzare': '2.00',
+            'tva_produs': 19, 'nr_lot': 'L1', 'nr_raft': 'R1', 'data_expirare': '2030-01-01',
+            'data_producere': '2024-01-01', 'id_furnizor': self.furnizor.id, 'descriere': '-', 'stoc_total': 5,
+            'cantitate_in_pachet': 1, 'detalii_produs': [{'nume_atribut': 'forma'}],
+        }
+        raspuns = self.api.post('/api/produs/', corp, format='json')
+        self.assertEqual(raspuns.status_code, 400)
+        self.assertIn('valoare_atribut', raspuns.json()['message'])
+        self.assertFalse(Produs.objects.filter(nume='Produs nou').exists())
+
+        corp['detalii_produs'] = [{'nume_atribut': 'forma', 'valoare_atribut': 'tableta'}]
+        self.assertEqual(self.api.post('/api/produs/', corp, format='json').status_code, 201)
+        self.assertEqual(list(DetaliiProdus.objects.filter(id_produs__nume='Produs nou')
+                              .values_list('valoare_atribut', flat=True)), ['tableta'])
+
+
+class PotriviriCereriTest(TestAPI):
+
+    def test_tokenizare(self):
+        self.assertEqual(potriviri.tokenizeaza('Caut lapte Zuzu 1,5% pentru Ștefan'), {'lapte', 'zuzu', 'stefan'})
+
+    def test_potrivire_la_creare_si_reaprovizionare(self):
+        cerere_lapte = CerereClient.objects.create(nume_client='A', telefon='1', detalii_produs='Lapte Zuzu')
+        cerere_branza = CerereClient.objects.create(nume_client='B', telefon='2', detalii_produs='branza telemea de oaie')
+        CerereClient.objects.create(nume_client='C', telefon='3', detalii_produs='ceva fara legatura')
+
+        potriviri.potriveste_produse([self.creeaza_produs('Lapte ZUZU 3.5%', tip_produs='Lactate')])
+        self.assertEqual(list(PotrivireCerere.objects.values_list('id_cerere', 'scor')), [(cerere_lapte.id, 1.0)])
+
+        telemea = self.creeaza_produs('Telemea oaie', tip_produs='Lactate', stoc=0)
+        raspuns = self.api.put(f'/api/produs/{telemea.id}/', {'stoc_total': 10}, format='json')
+        self.assertEqual(raspuns.status_code, 200, raspuns.content)
+        self.assertEqual(PotrivireCerere.objects.get(id_cerere=cerere_branza).scor, round(2 / 3, 3))
+
+        listate = self.api.get('/api/potriviri_cereri/').json()['data']
+        self.assertEqual({p['id_cerere'] for p in listate}, {cerere_lapte.id, cerere_branza.id})
+
+    def test_cererea_rezolvata_iese_din_index(self):
+        cerere = CerereClient.objects.create(nume_client='A', telefon='1', detalii_produs='Lapte Zuzu')
+        potriviri.potriveste_produse([self.creeaza_produs('Lapte Zuzu')])
+        cerere.status = True
+        cerere.save()
+        self.assertFalse(TokenCerere.objects.filter(id_cerere=cerere).exists())
+        self.assertFalse(PotrivireCerere.objects.filter(id_cerere=cerere).exists())
+        potriviri.potriveste_produse([self.creeaza_produs('Lapte Zuzu', nr_lot='L2')])
+        self.assertFalse(PotrivireCerere.objects.exists())
+
+
+class LuniSalariiCacheTest(TestAPI):
+    """Lunile încheiate din raportul de salarii se invalidează la orice scriere, nu doar prin API."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.salariu = SalariuAngajat.objects.create(
+            id_angajat=self.angajat, data_salariu=date(2024, 3, 10), suma_salariu=Decimal('1000'))
+        self.alt_salariu = SalariuAngajat.objects.create(
+            id_angajat=self.angajat, data_salariu=date(2024, 4, 10), suma_salariu=Decimal('500'))
+
+    def _total(self, luna):
+        raport = rapoarte.raport_salarii(luna, rapoarte.ultima_zi_luna(luna))
+        return Decimal(str(raport['total_interval']['total']))
+
+    def test_modificare_din_orm_muta_luna(self):
+        martie, aprilie = date(2024, 3, 1), date(2024, 4, 1)
+        self.assertEqual(self._total(martie), Decimal('1000'))
+        self.assertEqual(self._total(aprilie), Decimal('500'))
+
+        self.salariu.data_salariu = date(2024, 4, 20)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.salariu.save()
+        # ambele luni au ieșit din cache: cea veche și cea nouă
+        self.assertEqual(self._total(martie), Decimal('0'))
+        self.assertEqual(self._total(aprilie), Decimal('1500'))
+
+    def test_actualizare_prin_api(self):
+        martie = date(2024, 3, 1)
+        self.assertEqual(self._total(martie), Decimal('1000'))
+        with self.captureOnCommitCallbacks(execute=True):
+            raspuns = self.api.put(f'/api/toti_angajati_salariu/{self.salariu.id}/',
+                                   {'suma_salariu': '1200'}, format='json')
+        self.assertEqual(raspuns.status_code, 200, raspuns.content)
+        self.assertEqual(self._total(martie), Decimal('1200'))
+
+    def test_stergere_in_cascada(self):
+        martie = date(2024, 3, 1)
+        self.assertEqual(self._total(martie), Decimal('1000'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.angajat.delete()
+        self.assertIsNone(cache.get(f'{rapoarte.PREFIX_SALARII}:{martie.isoformat()}'))
+        self.assertEqual(self._total(martie), Decimal('0'))
+
+    def test_invalidare_doar_dupa_commit(self):
+        martie = date(2024, 3, 1)
+        self._total(martie)
+        with self.captureOnCommitCallbacks(execute=False) as apeluri:
+            self.salariu.delete()
+        self.assertIsNotNone(cache.get(f'{rapoarte.PREFIX_SALARII}:{martie.isoformat()}'))
+        for apel in apeluri:
+            apel()
+        self.assertIsNone(cache.get(f'{rapoarte.PREFIX_SALARII}:{martie.isoformat()}'))
+
+
+class FateteTest(TestAPI):
+
+    def setUp(self):
+        super().setUp()
+        self.creeaza_produs('Paracetamol', detalii={'concentratie': '500', 'forma': 'tableta'})
+        self.creeaza_produs('Paracetamol forte', detalii={'concentratie': '1000', 'forma': 'tableta'})
+        self.creeaza_produs('Ibuprofen', detalii={'concentratie': '500', 'forma': 'capsula'})
+        self.creeaza_produs('Sirop', tip_produs='Siropuri', detalii={'forma': 'sirop'})
+
+    def _filtreaza(self, parametri):
+        raspuns = self.api.get('/api/filtrare_atribute/?' + parametri)
+        self.assertEqual(raspuns.status_code, 200, raspuns.content)
+        return raspuns.json()['data']
+
+    @staticmethod
+    def _numere(fateta):
+        return {valoare['valoare']: valoare['numar'] for valoare in fateta}
+
+    def test_numere_pe_fatete(self):
+        date_filtrare = self._filtreaza('atribut[concentratie]=500')
+        self.assertEqual(date_filtrare['numar_produse'], 2)
+        self.assertEqual(sorted(p['nume'] for p in date_filtrare['produse']), ['Ibuprofen', 'Paracetamol'])
+        self.assertEqual(self._numere(date_filtrare['fatete']['atribute']['forma']), {'tableta': 1, 'capsula': 1})
+        self.assertNotIn('concentratie', date_filtrare['fatete']['atribute'])
+        self.assertEqual(self._numere(date_filtrare['fatete']['tip_produs']), {'Medicamente': 2})
+
+    def test_sau_pe_valori_si_pe_atribute(self):
+        date_filtrare = self._filtreaza(
+            'atribut[concentratie]=500&atribut[concentratie]=1000&atribut[forma]=tableta&tip_produs=Medicamente'
+        )
+        self.assertEqual(sorted(p['nume'] for p in date_filtrare['produse']), ['Paracetamol', 'Paracetamol forte'])
+        self.assertEqual(date_filtrare['fatete']['tip_produs'], [])
+
+    def test_cache_invalidat_si_limitat(self):
+        self.assertEqual(self._numere(self._filtreaza('')['fatete']['atribute']['forma'])['tableta'], 2)
+        # invalidarea se aplică la commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.creeaza_produs('Aspirina', detalii={'forma': 'tableta'})
+        self.assertEqual(self._numere(self._filtreaza('')['fatete']['atribute']['forma'])['tableta'], 3)
+
+        self.assertTrue(fatete.memoreaza_fatete({'atribute': {'forma': ['tableta']}}))
+        self.assertFalse(fatete.memoreaza_fatete({'atribute': {'forma': ['inexistenta']}}))
+        self.assertFalse(fatete.memoreaza_fatete({'atribute': {'forma': ['tableta', 'capsula', 'sirop']}}))
+        prea_multe = '&'.join(f'atribut[a{index}]=v' for index in range(fatete.ATRIBUTE_MAXIME_FILTRU + 1))
+        self.assertEqual(self.api.get('/api/filtrare_atribute/?' + prea_multe).status_code, 400)
+
+
+class EvenimenteTest(TestAPI):
+
+    async def _urmatorul(self, flux):
+        """Următorul mesaj din flux care nu este heartbeat."""
+        while (mesaj := await asyncio.wait_for(flux.__anext__(), timeout=1)) == ': heartbeat\n\n':
+            pass
+        return mesaj
+
+    async def test_abonatul_primeste_doar_tipurile_cerute(self):
+        abonat = evenimente.hub.aboneaza([evenimente.EVENIMENT_STOC])
+        try:
+            evenimente.hub.publica(1, evenimente.EVENIMENT_FACTURA_NOUA, {'id_factura': 1})
+            evenimente.hub.publica(2, evenimente.EVENIMENT_STOC, {'id_produs': 5})
+            self.assertEqual(await asyncio.wait_for(abonat.coada.get(), timeout=1),
+                             (2, evenimente.EVENIMENT_STOC, {'id_produs': 5}))
+            self.assertTrue(abonat.coada.empty())
+        finally:
+            evenimente.hub.dezaboneaza(abonat)
+        self.assertEqual(evenimente.hub.numar_abonati(), 0)
+
+    async def test_coada_plina_devine_resincronizare(self):
+        abonat = evenimente.hub.aboneaza(dimensiune_coada=2)
+        try:
+            for id_eveniment in range(1, 4):
+                evenimente.hub.publica(id_eveniment, evenimente.EVENIMENT_STOC, {})
+            await asyncio.sleep(0)
+            self.assertEqual(abonat.coada.qsize(), 1)
+            self.assertEqual(abonat.coada.get_nowait(), (None, evenimente.EVENIMENT_RESINCRONIZARE, {'pierdute': 3}))
+        finally:
+            evenimente.hub.dezaboneaza(abonat)
+
+    async def test_flux_sse(self):
+        with mock.patch.object(evenimente.releu, 'porneste') as porneste:
+            flux = evenimente.flux_sse([evenimente.EVENIMENT_STOC], interval_heartbeat=0.01)
+            self.assertEqual(await flux.__anext__(), 'retry: 5000\n\n')
+            porneste.assert_called_once()
+            self.assertEqual(await flux.__anext__(), ': heartbeat\n\n')
+            evenimente.hub.publica(7, evenimente.EVENIMENT_STOC, {'nume': 'Paracetamol', 'stoc_total': 3})
+            self.assertEqual(await self._urmatorul(flux),
+                             'id: 7\nevent: stoc\ndata: {"nume": "Paracetamol", "stoc_total": 3}\n\n')
+            await flux.aclose()
+        self.assertEqual(evenimente.hub.numar_abonati(), 0)
+
+    def test_publicat_doar_dupa_commit(self):
+        produs = self.creeaza_produs(stoc=5)
+        with self.captureOnCommitCallbacks(execute=False) as apeluri:
+            self.assertEqual(self.factura((produs, 2)).status_code, 201)
+        self.assertFalse(EvenimentFlux.objects.exists())
+        for apel in apeluri:
+            apel()
+        self.assertEqual(sorted(EvenimentFlux.objects.values_list('tip', flat=True)),
+                         [evenimente.EVENIMENT_FACTURA_NOUA, evenimente.EVENIMENT_STOC])
+        self.assertEqual(EvenimentFlux.objects.get(tip=evenimente.EVENIMENT_STOC).date['stoc_total'], 3)
+
+    def test_releul_livreaza_evenimentele_altor_procese_o_data(self):
+        hub = mock.Mock()
+        releu = evenimente.ReleuEvenimente(hub)
+        vechi = EvenimentFlux.objects.create(tip=evenimente.EVENIMENT_STOC, date={},
+                                             data_creare=timezone.now() - timedelta(hours=1))
+        anterior = EvenimentFlux.objects.create(tip=evenimente.EVENIMENT_STOC, date={'id_produs': 1})
+        # la pornire, evenimentele existente doar se marchează
+        releu.sondeaza(livreaza=False)
+        nou = EvenimentFlux.objects.create(tip=evenimente.EVENIMENT_CERERE_NOUA, date={'id_cerere': 4})
+        releu.sondeaza()
+        releu.sondeaza()
+        hub.publica.assert_called_once_with(nou.id, evenimente.EVENIMENT_CERERE_NOUA, {'id_cerere': 4})
+        # rândurile mai vechi decât EVENIMENTE_PASTRARE_SECUNDE sunt șterse
+        self.assertEqual(set(EvenimentFlux.objects.values_list('id', flat=True)), {anterior.id, nou.id})
+        self.assertFalse(EvenimentFlux.objects.filter(id=vechi.id).exists())
+
+    def test_501_sub_wsgi(self):
+        raspuns = self.api.get('/api/evenimente/')
+        self.assertEqual(raspuns.status_code, 501)
+
+    async def test_flux_sub_asgi(self):
+        client = AsyncClient()
+        self.assertEqual((await client.get('/api/evenimente/')).status_code, 401)
+        token = str(AccessToken.for_user(self.angajat))
+        with mock.patch.object(evenimente.releu, 'porneste'):
+            raspuns = await client.get(f'/api/evenimente/?tipuri=stoc&token={token}')
+            self.assertEqual(raspuns.status_code, 200)
+            self.assertEqual(raspuns['Content-Type'], 'text/event-stream')
+            flux = aiter(raspuns.streaming_content)
+            self.assertEqual(await anext(flux), b'retry: 5000\n\n')
+            await flux.aclose()
+
+
+class TestVanzari(TestAPI):
+    """Vânzări din zilele trecute: facturile sunt mutate în trecut după creare (data_adaugare este auto_now_add)."""
+
+    def vinde(self, produs, cantitate, zile_in_urma=1, client=None):
+        client = client or Client.objects.create(nume='Client vanzari', adresa='-', contact=f'v{Client.objects.count()}')
+        moment = vanzari.inceput_zi(timezone.localdate() - timedelta(days=zile_in_urma)) + timedelta(hours=12)
+        factura = Factura.objects.create(id_client=client)
+        DetaliiFactura.objects.create(id_factura=factura, id_produs=produs, cantitate=cantitate)
+        Factura.objects.filter(pk=factura.pk).update(data_adaugare=moment)
+        DetaliiFactura.objects.filter(id_factura=factura).update(data_adaugare=moment)
+        return factura
+
+
+class PrognozaStocTest(TestVanzari):
+
+    def _prognoza(self, **parametri):
+        raspuns = self.api.get('/api/prognoza_stoc/', {'dimensiune': 500, **parametri})
+        self.assertEqual(raspuns.status_code, 200, raspuns.content)
+        return raspuns.json()['data']
+
+    def test_rollup_si_punct_de_reaprovizionare(self):
+        vandut = self.creeaza_produs('Vandut zilnic', stoc=10)
+        nevandut = self.creeaza_produs('Nevandut', stoc=10)
+        for zi in range(1, 31):
+            self.vinde(vandut, 3, zile_in_urma=zi)
+
+        date_prognoza = self._prognoza(zile_livrare=7)
+        self.assertEqual(VanzareZilnica.objects.filter(id_produs=vandut).count(), 30)
+        rezultate = {rand['id_produs']: rand for rand in date_prognoza['rezultate']}
+        rand = rezultate[vandut.id]
+        self.assertEqual((rand['medie_7'], rand['medie_30'], rand['abatere']), (3.0, 3.0, 0.0))
+        self.assertEqual(rand['zile_acoperire'], 3.3)
+        self.assertEqual((rand['punct_reaprovizionare'], rand['de_comandat']), (21.0, 11))
+        self.assertIsNone(rezultate[nevandut.id]['zile_acoperire'])
+        ordine = [rand['id_produs'] for rand in date_prognoza['rezultate']]
+        self.assertLess(ordine.index(vandut.id), ordine.index(nevandut.id))
+
+    def test_rollup_incremental(self):
+        produs = self.creeaza_produs(stoc=100)
+        self.vinde(produs, 2, zile_in_urma=3)
+        self.assertEqual(vanzari.actualizeaza_vanzari_zilnice()['pana_la'], timezone.localdate() - timedelta(days=1))
+        # nimic nou de agregat
+        self.assertEqual(vanzari.actualizeaza_vanzari_zilnice()['randuri'], 0)
+
+        # o zi deja agregată se reface doar la cerere
+        self.vinde(produs, 5, zile_in_urma=3)
+        zi = timezone.localdate() - timedelta(days=3)
+        self.assertEqual(VanzareZilnica.objects.get(id_produs=produs, data=zi).cantitate, 2)
+        vanzari.actualizeaza_vanzari_zilnice(de_la=zi)
+        self.assertEqual(VanzareZilnica.objects.get(id_produs=produs, data=zi).cantitate, 7)
+
+    def test_parametri_invalizi(self):
+        self.assertEqual(self.api.get('/api/prognoza_stoc/?zile_livrare=0').status_code, 400)
+        self.assertEqual(self.api.get('/api/prognoza_stoc/?dimensiune=1000').status_code, 400)
+
+
+class AnalizeVanzariTest(TestVanzari):
+
+    def _analize(self, **parametri):
+        raspuns = self.api.get('/api/analize_vanzari/', parametri)
+        self.assertEqual(raspuns.status_code, 200, raspuns.content)
+        return {perioada['perioada']: perioada for perioada in raspuns.json()['data']}
+
+    def test_zile_incheiate_si_azi(self):
+        produs = self.creeaza_produs('Analizat', stoc=100, tip_produs='Analize')
+        self.vinde(produs, 2, zile_in_urma=2)
+        self.vinde(produs, 1, zile_in_urma=0)
+        azi = timezone.localdate()
+        alaltaieri = (azi - timedelta(days=2)).isoformat()
+
+        perioade = self._analize(data_start=alaltaieri, data_end=azi.isoformat(), grupare='tip_produs')
+        self.assertEqual(len(perioade), 3)
+        grup = next(g for g in perioade[alaltaieri]['grupuri'] if g['tip_produs'] == 'Analize')
+        self.assertEqual((grup['bucati'], grup['vanzari'], grup['cost'], grup['profit']), (2, '4.00', '2.00', '2.00'))
+        # ziua curentă vine direct din liniile de factură, nu din rollup
+        grup = next(g for g in perioade[azi.isoformat()]['grupuri'] if g['tip_produs'] == 'Analize')
+        self.assertEqual(grup['bucati'], 1)
+
+        # perioadele încheiate sunt memorate: o vânzare nouă azi schimbă doar ziua curentă
+        self.vinde(produs, 4, zile_in_urma=0)
+        perioade = self._analize(data_start=alaltaieri, data_end=azi.isoformat(), grupare='tip_produs')
+        self.assertEqual(next(g for g in perioade[azi.isoformat()]['grupuri'] if g['tip_produs'] == 'Analize')['bucati'], 5)
+
+    def test_luna_pe_furnizor(self):
+        produs = self.creeaza_produs(stoc=100)
+        self.vinde(produs, 3, zile_in_urma=1)
+        ieri = timezone.localdate() - timedelta(days=1)
+        perioade = self._analize(data_start=ieri.isoformat(), data_end=ieri.isoformat(), granularitate='luna',
+                                 grupare='furnizor')
+        self.assertEqual(list(perioade), [ieri.replace(day=1).isoformat()])
+        grup = next(g for g in perioade[ieri.replace(day=1).isoformat()]['grupuri']
+                    if g['id_furnizor'] == self.furnizor.id)
+        self.assertEqual((grup['nume'], grup['bucati']), ('Furnizor test', 3))
+
+    def test_parametri_invalizi(self):
+        self.assertEqual(self.api.get('/api/analize_vanzari/?grupare=client').status_code, 400)
+        self.assertEqual(self.api.get('/api/analize_vanzari/?granularitate=an').status_code, 400)
+        self.assertEqual(self.api.get('/api/analize_vanzari/?data_start=2020-01-01&data_end=2025-01-01').status_code,
+                         400)
+
+
+class ClasamentTest(TestVanzari):
+
+    def _clasament(self, **parametri):
+        raspuns = self.api.get('/api/clasament/', {'n': 100, **parametri})
+        self.assertEqual(raspuns.status_code, 200, raspuns.content)
+        return raspuns.json()['data']
+
+    def test_criterii_si_ferestre(self):
+        ieftin = self.creeaza_produs('Ieftin', stoc=100, pret_vanzare=2, pret_cumparare=1)
+        scump = self.creeaza_produs('Scump', stoc=100, pret_vanzare=10, pret_cumparare=9)
+        self.vinde(ieftin, 5, zile_in_urma=2)
+        self.vinde(scump, 2, zile_in_urma=2)
+        self.vinde(scump, 10, zile_in_urma=20)
+
+        def ordine(date_clasament):
+            return [rand['nume'] for rand in date_clasament['clasament'] if rand['nume'] in ('Ieftin', 'Scump')]
+
+        self.assertEqual(ordine(self._clasament(criteriu='vanzari', zile=7)), ['Scump', 'Ieftin'])
+        self.assertEqual(ordine(self._clasament(criteriu='bucati', zile=7)), ['Ieftin', 'Scump'])
+        self.assertEqual(ordine(self._clasament(criteriu='marja', zile=7)), ['Ieftin', 'Scump'])
+        date_clasament = self._clasament(criteriu='bucati', zile=30)
+        self.assertEqual(ordine(date_clasament), ['Scump', 'Ieftin'])
+        self.assertEqual(date_clasament['pana_la'], (timezone.localdate() - timedelta(days=1)).isoformat())
+        self.assertEqual(next(r for r in date_clasament['clasament'] if r['nume'] == 'Scump')['bucati'], 12)
+
+    def test_fereastra_avanseaza_incremental(self):
+        produs = self.creeaza_produs(stoc=100)
+        self.vinde(produs, 4, zile_in_urma=8)
+        ieri = timezone.localdate() - timedelta(days=1)
+        # ferestrele sunt calculate ca și cum ultima zi agregată ar fi fost acum două zile
+        vanzari.actualizeaza_vanzari_zilnice(pana_la=ieri - timedelta(days=1))
+        self.assertEqual(TotalFereastra.objects.get(zile=7, id_produs=produs).cantitate, 4)
+
+        # ziua de acum 8 zile iese din fereastra de 7 zile, cea de ieri intră
+        self.vinde(produs, 1, zile_in_urma=1)
+        vanzari.actualizeaza_vanzari_zilnice()
+        self.assertEqual(TotalFereastra.objects.get(zile=7, id_produs=produs).cantitate, 1)
+        self.assertEqual(TotalFereastra.objects.get(zile=30, id_produs=produs).cantitate, 5)
+
+    def test_clienti_si_parametri_invalizi(self):
+        produs = self.creeaza_produs(stoc=100)
+        client = Client.objects.create(nume='Client fidel', adresa='-', contact='0722')
+        self.vinde(produs, 3, zile_in_urma=1, client=client)
+        randuri = self._clasament(entitate='client', zile=7)['clasament']
+        self.assertEqual(next(r for r in randuri if r['id_client'] == client.id)['bucati'], 3)
+
+        self.assertEqual(self.api.get('/api/clasament/?zile=14').status_code, 400)
+        self.assertEqual(self.api.get('/api/clasament/?criteriu=profit').status_code, 400)
+        self.assertEqual(self.api.get('/api/clasament/?n=0').status_code, 400)
+
+
+class ArhivaFacturiTest(TestVanzari):
+
+    def setUp(self):
+        super().setUp()
+        self.produs = self.creeaza_produs(stoc=100)
+        self.vechi = [self.vinde(self.produs, cantitate, zile_in_urma=400) for cantitate in (1, 2, 3)]
+        self.recenta = self.vinde(self.produs, 4, zile_in_urma=1)
+
+    def test_simulare(self):
+        iesire = io.StringIO()
+        call_command('arhiveaza_facturi', '--simulare', stdout=iesire)
+        self.assertIn('Simulare:', iesire.getvalue())
+        self.assertFalse(FacturaArhiva.objects.filter(id__in=[factura.id for factura in self.vechi]).exists())
+
+    def test_mutare_fara_pierderi(self):
+        vanzari.actualizeaza_vanzari_zilnice()
+        rollup = list(VanzareZilnica.objects.filter(id_produs=self.produs).values_list('data', 'cantitate'))
+        raport = arhiva.arhiveaza_facturi(dimensiune_lot=2)
+        id_uri = [factura.id for factura in self.vechi]
+        self.assertGreaterEqual(raport['facturi'], 3)
+        self.assertFalse(Factura.objects.filter(id__in=id_uri).exists())
+        self.assertEqual(sorted(DetaliiFacturaArhiva.objects.filter(id_factura__in=id_uri)
+                                .values_list('cantitate', flat=True)), [1, 2, 3])
+        self.assertTrue(Factura.objects.filter(id=self.recenta.id).exists())
+        # rapoartele citesc din rollup, care nu se schimbă la arhivare
+        self.assertEqual(list(VanzareZilnica.objects.filter(id_produs=self.produs).values_list('data', 'cantitate')),
+                         rollup)
+        self.assertEqual([cantitate for _, cantitate in rollup], [6, 4])
+
+        # o factură arhivată se găsește după id, cu totalurile ei
+        raspuns = self.api.get(f'/api/factura/{self.vechi[2].id}/')
+        self.assertEqual(raspuns.status_code, 200)
+        self.assertEqual((raspuns.json()['data']['nr_linii'], raspuns.json()['data']['total_net']), (1, '6.00'))
+        listate = self.api.get('/api/factura/?arhiva=1').json()['data']
+        self.assertTrue(set(id_uri) <= {factura['id'] for factura in listate})
+
+    def test_ultima_factura_ramane(self):
+        ultima = self.vinde(self.produs, 1, zile_in_urma=400)
+        arhiva.arhiveaza_facturi()
+        self.assertTrue(Factura.objects.filter(id=ultima.id).exists())
+
+
+class TestIncarcareTest(LiveServerTestCase):
+    """Comanda test_incarcare rulată scurt contra unui server real (thread-ul LiveServerTestCase)."""
+
+    def setUp(self):
+        throttling.stocare().reseteaza()
+        Angajat.objects.create_user(username='incarcare', password='parola', email='incarcare@exemplu.ro',
+                                    nume='Test', prenume='Incarcare')
+        furnizor = Furnizor.objects.create(nume='Furnizor incarcare', adresa='-', nr_telefon='-', email='-',
+                                           descriere='-')
+        Produs.objects.create(
+            nume='Produs incarcare', tip_produs='-', pret_cumparare=1, pret_vanzare=2, tva_produs=19, nr_lot='-',
+            nr_raft='-', data_expirare=date(2030, 1, 1), data_producere=date(2024, 1, 1), id_furnizor=furnizor,
+            descriere='-', stoc_total=1000, cantitate_in_pachet=1,
+        )
+
+    def test_rulare_si_comparatie(self):
+        with tempfile.TemporaryDirectory() as director:
+            fisier = Path(director) / 'rezultate.json'
+            call_command('test_incarcare', '--url', self.live_server_url, '--utilizator', 'incarcare:parola',
+                         '--rata', '20', '--durata', '1', '--fire', '4', '--mix', 'produs=1,factura=1',
+                         '--salveaza', str(fisier), '--eticheta', 'test', stdout=io.StringIO())
+            rezultate = json.loads(fisier.read_text(encoding='utf-8'))
+            self.assertEqual(rezultate['eticheta'], 'test')
+            self.assertEqual(sum(date['cereri'] for date in rezultate['scenarii'].values()), 20)
+            for scenariu, date_scenariu in rezultate['scenarii'].items():
+                with self.subTest(scenariu=scenariu):
+                    self.assertEqual(date_scenariu['rata_erori'], 0)
+                    self.assertLessEqual(date_scenariu['p50_ms'], date_scenariu['p99_ms'])
+
+            iesire = io.StringIO()
+            call_command('test_incarcare', '--url', self.live_server_url, '--utilizator', 'incarcare:parola',
+                         '--rata', '5', '--durata', '0.4', '--mix', 'produs=1', '--salveaza',
+                         str(Path(director) / 'a_doua.json'), '--compara', str(fisier), stdout=iesire)
+            self.assertIn('Comparatie cu test', iesire.getvalue())
+
+    def test_parametri_invalizi(self):
+        with self.assertRaisesMessage(CommandError, 'Scenariu necunoscut'):
+            call_command('test_incarcare', '--url', self.live_server_url, '--utilizator', 'incarcare:parola',
+                         '--mix', 'checkout=1')
+        with self.assertRaisesMessage(CommandError, 'Autentificare esuata'):
+            call_command('test_incarcare', '--url', self.live_server_url, '--utilizator', 'incarcare:gresit')
+
+    def test_percentila(self):
+        valori = list(range(1, 101))
+        self.assertEqual((percentila(valori, 50), percentila(valori, 95), percentila(valori, 99)), (50, 95, 99))
+        self.assertEqual(percentila([7], 99), 7)
+        self.assertIsNone(percentila([], 50))
+
+
+class IncalzireTest(TestCase):
+
+    def test_etape(self):
+        self.assertGreater(incalzire.incalzeste_serializere(), 10)
+        self.assertGreater(incalzire.incalzeste_rute(), 10)
+        self.assertEqual(incalzire.incalzeste_baza_de_date(), 1)
+
+    @override_settings(INCALZIRE_SARCINI=('acasa',))
+    def test_cache_calculat_inainte_de_prima_cerere(self):
+        self.assertEqual(incalzire.incalzeste_cache(), 1)
+        with CaptureQueriesContext(connection) as interogari:
+            sarcini.calculeaza('acasa')
+        # doar versiunea și citirea din cache
+        self.assertEqual(len(interogari.captured_queries), 2)
+
+    def test_etapa_esuata_nu_opreste_pornirea(self):
+        with self.assertLogs('SistemManagementInventar.incalzire', 'ERROR'):
+            durate = incalzire._ruleaza_etape([('esuata', lambda: 1 / 0), ('buna', lambda: None)])
+        self.assertEqual(list(durate), ['esuata', 'buna'])
+
+    def test_hook_uri_gunicorn(self):
+        configuratie = runpy.run_path(str(Path(settings.BASE_DIR) / 'gunicorn.conf.py'))
+        self.assertTrue(configuratie['preload_app'])
+        server, worker = mock.Mock(), mock.Mock(pid=123)
+        with mock.patch('SistemManagementInventar.incalzire.connections.close_all') as inchide:
+            configuratie['when_ready'](server)
+        inchide.assert_called_once()
+        configuratie['post_worker_init'](worker)
+        etape = worker.log.info.call_args.args[-1]
+        self.assertEqual(list(etape), ['serializere', 'rute', 'baza_de_date'])
+        self.assertEqual(list(server.log.info.call_args.args[-1]), ['serializere', 'rute', 'cache'])
+
+
+class VersiuniRezultateTest(TestCase):
+
+    def _dashboard(self):
+        return sarcini.calculeaza('acasa')['total_furnizori']
+
+    def test_invalidare_dupa_commit(self):
+        inainte = self._dashboard()
+        with self.captureOnCommitCallbacks() as dupa_commit:
+            Furnizor.objects.create(nume='Furnizor nou', adresa='-', nr_telefon='-', email='-', descriere='-')
+        # până la commit, cititorii primesc rezultatul vechi și nu scrie nimeni în rândul versiunii
+        self.assertEqual(self._dashboard(), inainte)
+        self.assertEqual(len(dupa_commit), 1)
+        dupa_commit[0]()
+        self.assertEqual(self._dashboard(), inainte + 1)
+
+    def test_incrementare_atomica(self):
+        versiune = sarcini.versiune('sarcini:acasa')
+        with self.captureOnCommitCallbacks(execute=True):
+            sarcini.invalideaza_rezultate('acasa', 'acasa')
+            sarcini.invalideaza_rezultate('acasa')
+        self.assertEqual(sarcini.versiune('sarcini:acasa'), versiune + 2)
+        with CaptureQueriesContext(connection) as interogari, self.captureOnCommitCallbacks(execute=True):
+            sarcini.invalideaza_rezultate('acasa')
+        # un singur UPDATE ... SET versiune = versiune + 1, nu citire urmată de scriere
+        self.assertEqual(len(interogari.captured_queries), 1)
+        self.assertTrue(interogari.captured_queries[0]['sql'].startswith('UPDATE'))
+
+    def test_tranzactie_anulata_nu_invalideaza(self):
+        versiune = sarcini.versiune('sarcini:acasa')
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    sarcini.invalideaza_rezultate('acasa')
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertEqual(sarcini.versiune('sarcini:acasa'), versiune)
+
+
+class DateInitialeTest(TestCase):
+    """Migrarea 0003_date_initiale: fixture-ul încărcat cu modelele istorice, cu datele și cheile lui."""
+
+    def test_randuri_si_date_din_fixture(self):
+        self.assertEqual(Angajat.objects.count(), 5)
+        self.assertEqual((Client.objects.count(), Factura.objects.count(), DetaliiFactura.objects.count()), (4, 4, 3))
+        self.assertEqual(Factura.objects.get(pk=1).data_adaugare,
+                         datetime(2025, 5, 20, 14, 29, 49, 60000, tzinfo=dt_timezone.utc))
+        self.assertEqual(SalariuAngajat.objects.get(pk=1).id_angajat.username, 'lucav06')
+        self.assertTrue(Angajat.objects.get(username='admin3').este_admin)
+        # id-urile noi continuă după cele din fixture
+        self.assertEqual(Client.objects.create(nume='Nou', adresa='-', contact='-').pk, 5)
@@ -0,0 +1,196 @@
+# throttling.py
+# Limitarea cererilor per utilizator și per clasă de endpoint (token bucket), ca un client care
+# face polling agresiv să nu țină baza de date ocupată:
+# - fiecare pereche (clasă, utilizator) are o găleată cu `capacitate` jetoane, reumplută continuu
+#   cu `rata` jetoane pe secundă; o cerere consumă un jeton, fără jeton se răspunde 429 cu
+#   Retry-After = secundele până la următorul jeton
+# - clasa vine din atributul throttle_scope al view-ului (implicit 'implicit'), limitele din
+#   settings.LIMITARI_GALETI: stricte pentru dashboard / rapoarte / exporturi, generoase pentru catalog
+# - utilizatorii autentificați sunt identificați după id, restul după IP
+# - gălețile stau în memoria procesului sau, cu LIMITARI_STOCARE = 'cache', în cache-ul Django
+#   (partajat între workeri când CACHES este Redis / Memcached)
+# - cererile acceptate / respinse sunt numărate pe clasă (și respingerile pe utilizator), pentru
+#   ajustarea limitelor din date: GET /api/limitari/
+import math
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+CLASA_IMPLICITA = 'implicit'
+# peste atâtea găleți ținute în proces, cele deja pline (inactive) sunt eliminate
+GALETI_MAXIME_PROCES = 10000
+# câți utilizatori cu cele mai multe respingeri apar în statistici
+UTILIZATORI_STATISTICI = 20
+
+
+def limite(clasa):
+    """(capacitate, jetoane pe secundă) pentru clasă, sau None dacă este nelimitată."""
+    galeti = getattr(settings, 'LIMITARI_GALETI', {})
+    return galeti.get(clasa, galeti.get(CLASA_IMPLICITA))
+
+
+def _reumple(jetoane, ultima, capacitate, rata, acum):
+    return min(float(capacitate), jetoane + max(0.0, acum - ultima) * rata)
+
+
+def _consuma(jetoane, rata):
+    """(jetoane rămase, secunde de așteptat): 0 secunde dacă a existat un jeton de consumat."""
+    if jetoane >= 1:
+        return jetoane - 1, 0.0
+    return jetoane, (1 - jetoane) / rata
+
+
+class StocareProces:
+    """Găleți și contoare într-un dict al procesului (un singur worker sau limite per worker)."""
+
+    def __init__(self):
+        self._lacat = threading.Lock()
+        self._galeti = {}
+        self._contoare = Counter()
+        self._respingeri_utilizatori = Counter()
+
+    def consuma(self, cheie, capacitate, rata, acum):
+        with self._lacat:
+            jetoane, ultima = self._galeti.get(cheie, (float(capacitate), acum))
+            jetoane, asteptare = _consuma(_reumple(jetoane, ultima, capacitate, rata, acum), rata)
+            self._galeti[cheie] = (jetoane, acum)
+            if len(self._galeti) > GALETI_MAXIME_PROCES:
+                self._elimina_inactive(acum)
+            return asteptare
+
+    def _elimina_inactive(self, acum):
+        for cheie, (jetoane, ultima) in list(self._galeti.items()):
+            capacitate, rata = limite(cheie.split(':', 1)[0]) or (0, 0)
+            if not rata or jetoane + (acum - ultima) * rata >= capacitate:
+                del self._galeti[cheie]
+        # toate încă active: se păstrează jumătatea folosită cel mai recent
+        if len(self._galeti) > GALETI_MAXIME_PROCES // 2:
+            recente = sorted(self._galeti.items(), key=lambda element: element[1][1], reverse=True)
+            self._galeti = dict(recente[:GALETI_MAXIME_PROCES // 2])
+
+    def numara(self, clasa, ident, respinsa):
+        with self._lacat:
+            self._contoare[(clasa, 'respinse' if respinsa else 'acceptate')] += 1
+            if respinsa:
+                self._respingeri_utilizatori[(clasa, ident)] += 1
+
+    def contor(self, clasa, tip):
+        return self._contoare[(clasa, tip)]
+
+    def respingeri_utilizatori(self):
+        return self._respingeri_utilizatori.most_common(UTILIZATORI_STATISTICI)
+
+    def reseteaza(self):
+        with self._lacat:
+            self._galeti.clear()
+            self._contoare.clear()
+            self._respingeri_utilizatori.clear()
+
+
+class StocareCache(StocareProces):
+    """
+    Găleți și contoare pe clasă în cache-ul Django, comune tuturor workerilor.
+    Citirea și scrierea găleții nu sunt atomice: două cereri simultane ale aceluiași utilizator
+    pot consuma același jeton, deci limita este aproximativă (cu cel mult câteva cereri în plus).
+    Respingerile pe utilizator rămân numărate în proces (cheile din cache nu pot fi enumerate).
+    """
+
+    def consuma(self, cheie, capacitate, rata, acum):
+        cheie = f'limitari:galeata:{cheie}'
+        jetoane, ultima = cache.get(cheie, (float(capacitate), acum))
+        jetoane, asteptare = _consuma(_reumple(jetoane, ultima, capacitate, rata, acum), rata)
+        # după ce s-ar fi umplut la loc, găleata poate dispărea din cache
+        cache.set(cheie, (jetoane, acum), timeout=math.ceil(capacitate / rata) + 1)
+        return asteptare
+
+    def numara(self, clasa, ident, respinsa):
+        tip = 'respinse' if respinsa else 'acceptate'
+        cheie = f'limitari:contor:{clasa}:{tip}'
+        if not cache.add(cheie, 1, timeout=None):
+            try:
+                cache.incr(cheie)
+            except ValueError:
+                cache.set(cheie, 1, timeout=None)
+        if respinsa:
+            with self._lacat:
+                self._respingeri_utilizatori[(clasa, ident)] += 1
+
+    def contor(self, clasa, tip):
+        return cache.get(f'limitari:contor:{clasa}:{tip}', 0)
+
+    def reseteaza(self):
+        clase = getattr(settings, 'LIMITARI_GALETI', {})
+        cache.delete_many([f'limitari:contor:{clasa}:{tip}' for clasa in clase for tip in ('acceptate', 'respinse')])
+        with self._lacat:
+            self._respingeri_utilizatori.clear()
+
+
+STOCARI = {'proces': StocareProces, 'cache': StocareCache}
+_stocari = {}
+_lacat_stocari = threading.Lock()
+
+
+def stocare():
+    """Stocarea aleasă prin LIMITARI_STOCARE ('proces' sau 'cache'), creată o singură dată per proces."""
+    nume = getattr(settings, 'LIMITARI_STOCARE', 'proces')
+    if nume not in STOCARI:
+        raise ValueError(f"LIMITARI_STOCARE necunoscuta: {nume} (optiuni: {', '.join(STOCARI)})")
+    with _lacat_stocari:
+        if nume not in _stocari:
+            _stocari[nume] = STOCARI[nume]()
+        return _stocari[nume]
+
+
+def statistici():
+    """Limitele configurate și contoarele pe clasă, plus utilizatorii cu cele mai multe respingeri."""
+    sursa = stocare()
+    clase = []
+    for clasa, limita in getattr(settings, 'LIMITARI_GALETI', {}).items():
+        acceptate, respinse = sursa.contor(clasa, 'acceptate'), sursa.contor(clasa, 'respinse')
+        total = acceptate + respinse
+        clase.append({
+            'clasa': clasa,
+            'capacitate': limita[0] if limita else None,
+            'jetoane_pe_secunda': limita[1] if limita else None,
+            'acceptate': acceptate,
+            'respinse': respinse,
+            'procent_respinse': round(100 * respinse / total, 2) if total else 0.0,
+        })
+    return {
+        'stocare': getattr(settings, 'LIMITARI_STOCARE', 'proces'),
+        'clase': clase,
+        'utilizatori_respinsi': [
+            {'clasa': clasa, 'utilizator': ident, 'respinse': numar}
+            for (clasa, ident), numar in sursa.respingeri_utilizatori()
+        ],
+    }
+
+
+class LimitareGaleata(BaseThrottle):
+    """
+    Throttle DRF cu token bucket per (clasă, utilizator); clasa = view.throttle_scope.
+    DRF transformă wait() în header-ul Retry-After al răspunsului 429.
+    """
+
+    def allow_request(self, request, view):
+        clasa = getattr(view, 'throttle_scope', None) or CLASA_IMPLICITA
+        limita = limite(clasa)
+        if not limita:
+            return True
+        utilizator = getattr(request, 'user', None)
+        if utilizator is not None and utilizator.is_authenticated:
+            ident = f'utilizator:{utilizator.pk}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+
+        sursa = stocare()
+        self.asteptare = sursa.consuma(f'{clasa}:{ident}', limita[0], limita[1], time.time())
+        sursa.numara(clasa, ident, respinsa=self.asteptare > 0)
+        return self.asteptare == 0
+
+    def wait(self):
+        return getattr(self, 'asteptare', None)
@@ -0,0 +1,499 @@
+# vanzari.py
+# Rollup-urile zilnice ale vânzărilor (VanzareZilnica pe produs, VanzareZilnicaClient pe client),
+# construite din DetaliiFactura și din arhivă (DetaliiFacturaArhiva, vezi arhiva.py):
+# - doar zilele încheiate (înainte de azi) sunt agregate; ziua curentă se citește live
+# - actualizarea este incrementală: continuă de la ultima zi agregată, cu un singur GROUP BY
+#   (produs / client, zi) pe intervalul nou, și este idempotentă (zilele din interval sunt rescrise)
+# - o factură modificată / ștearsă dintr-o zi deja agregată se recuperează cu
+#   `manage.py actualizeaza_vanzari --de-la <zi>`
+# - totalurile pe ferestre mobile (ultimele 7 / 30 / 90 / 365 zile) pentru clasamente avansează
+#   odată cu rollup-ul: se adaugă zilele noi și se scad cele ieșite din fereastră
+# - dashboard-ul (sarcina 'acasa') citește seria pe zile din rollup, nu din toate liniile
+# Valorile folosesc prețurile produselor din momentul agregării (liniile de factură nu păstrează
+# prețul de la momentul vânzării).
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Min, Q, Sum
+from django.db.models.functions import TruncDate, TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from SistemManagementInventar.models import Angajat, CerereClient, DetaliiFactura, DetaliiFacturaArhiva, Factura, \
+    FacturaArhiva, Furnizor, ProgresAgregare, Produs, TotalFereastra, VanzareZilnica, VanzareZilnicaClient
+from SistemManagementInventar.rapoarte import inceput_luna, luna_urmatoare, rezultate_pe_perioade
+from SistemManagementInventar.sarcini import creste_versiuni, invalideaza_rezultate, param_data, tip_sarcina, versiune
+
+# ProgresAgregare: ultima zi procesată, chiar dacă nu a avut vânzări (altfel ar fi reluată la fiecare apel)
+CHEIE_PROGRES_ROLLUP = 'vanzari_zilnice'
+# sarcinile memorate care citesc din rollup
+SARCINI_DEPENDENTE = ('prognoza_cerere', 'acasa')
+ZERO = Decimal('0')
+TIP_SUMA = DecimalField(max_digits=14, decimal_places=2)
+
+# rollup -> (câmpul din rollup, lookup-ul pe liniile de factură, același în tabelele calde și în arhivă)
+ROLLUPURI = (
+    (VanzareZilnica, 'id_produs', 'id_produs'),
+    (VanzareZilnicaClient, 'id_client', 'id_factura__id_client'),
+)
+
+
+def valoare_linii(camp_pret):
+    """
+    Sum(cantitate * pret) pe liniile de factură (camp_pret: pret_vanzare / pret_cumparare),
+    cu prețurile copiate pe linie la emiterea facturii.
+    """
+    return Sum(ExpressionWrapper(F('cantitate') * F(camp_pret), output_field=TIP_SUMA))
+
+
+def inceput_zi(zi):
+    return timezone.make_aware(datetime.combine(zi, time.min))
+
+
+def ultima_zi_agregata():
+    return ProgresAgregare.objects.filter(cheie=CHEIE_PROGRES_ROLLUP).values_list('pana_la', flat=True).first()
+
+
+def linii_factura(**filtre):
+    """Liniile de factură filtrate, din tabela caldă și din arhivă (aceleași nume de câmpuri)."""
+    return [DetaliiFactura.objects.filter(**filtre), DetaliiFacturaArhiva.objects.filter(**filtre)]
+
+
+def _prima_zi_cu_vanzari():
+    prime = [linii.aggregate(prima=Min('data_adaugare'))['prima'] for linii in linii_factura()]
+    prime = [prima for prima in prime if prima is not None]
+    return timezone.localdate(min(prime)) if prime else None
+
+
+def vanzari_pe_zile(linii, camp='id_produs'):
+    """GROUP BY (camp, zi) peste un queryset de linii de factură (DetaliiFactura sau arhiva)."""
+    return (linii
+            .annotate(zi=TruncDate('data_adaugare'))
+            .order_by()
+            .values(camp, 'zi')
+            .annotate(vandute=Sum('cantitate'),
+                      vanzare=valoare_linii('pret_vanzare'),
+                      cumparare=valoare_linii('pret_cumparare')))
+
+
+def _randuri_rollup(model, camp, lookup, surse):
+    """Rândurile rollup-ului din mai multe surse de linii (o zi poate fi parțial arhivată)."""
+    totaluri = {}
+    for linii in surse:
+        for rand in vanzari_pe_zile(linii, lookup):
+            total = totaluri.setdefault((rand[lookup], rand['zi']), [0, ZERO, ZERO])
+            total[0] += rand['vandute']
+            total[1] += rand['vanzare'] or ZERO
+            total[2] += rand['cumparare'] or ZERO
+    return [
+        model(**{f'{camp}_id': id_obiect}, data=zi, cantitate=bucati, valoare_vanzare=vanzare,
+              valoare_cumparare=cumparare)
+        for (id_obiect, zi), (bucati, vanzare, cumparare) in totaluri.items()
+    ]
+
+
+@tip_sarcina('actualizeaza_vanzari', memoreaza=False, doar_admin=True,
+             parametri={'de_la': param_data, 'pana_la': param_data})
+def actualizeaza_vanzari_zilnice(de_la=None, pana_la=None):
+    """
+    Agregă zilele [de_la, pana_la] (implicit: de la ziua de după ultima agregată până ieri),
+    apoi aduce la zi ferestrele clasamentelor. Returnează {'de_la', 'pana_la', 'randuri'}.
+    """
+    ieri = timezone.localdate() - timedelta(days=1)
+    pana_la = min(pana_la or ieri, ieri)
+    ultima = ultima_zi_agregata()
+    if de_la is None:
+        de_la = ultima + timedelta(days=1) if ultima else _prima_zi_cu_vanzari()
+    if de_la is None or de_la > pana_la:
+        if ultima is not None:
+            actualizeaza_ferestre(ultima)
+        return {'de_la': de_la, 'pana_la': pana_la, 'randuri': 0}
+
+    # interval pe data_adaugare (indexat), nu __date, ca filtrul să poată folosi indexul
+    linii = linii_factura(data_adaugare__gte=inceput_zi(de_la),
+                          data_adaugare__lt=inceput_zi(pana_la + timedelta(days=1)))
+    numar = 0
+    with transaction.atomic():
+        for model, camp, lookup in ROLLUPURI:
+            randuri = _randuri_rollup(model, camp, lookup, linii)
+            model.objects.filter(data__gte=de_la, data__lte=pana_la).delete()
+            model.objects.bulk_create(randuri, batch_size=2000)
+            if model is VanzareZilnica:
+                numar = len(randuri)
+        if ultima is None or pana_la > ultima:
+            ProgresAgregare.objects.update_or_create(cheie=CHEIE_PROGRES_ROLLUP, defaults={'pana_la': pana_la})
+
+    rescriere = ultima is not None and de_la <= ultima
+    if rescriere:
+        _invalideaza_analize()
+    invalideaza_rezultate(*SARCINI_DEPENDENTE)
+    actualizeaza_ferestre(max(pana_la, ultima or pana_la), reconstruieste=rescriere)
+    return {'de_la': de_la, 'pana_la': pana_la, 'randuri': numar}
+
+
+def reagrega_clienti(id_uri):
+    """
+    După unificarea clienților (clienti.unifica_clienti) facturile duplicatelor aparțin clientului
+    canonic: rollup-ul acestuia se recalculează pe toate zilele agregate, iar ferestrele se reconstruiesc.
+    """
+    ultima = ultima_zi_agregata()
+    if ultima is None or not id_uri:
+        return
+    linii = linii_factura(id_factura__id_client__in=list(id_uri),
+                          data_adaugare__lt=inceput_zi(ultima + timedelta(days=1)))
+    with transaction.atomic():
+        VanzareZilnicaClient.objects.filter(id_client__in=list(id_uri), data__lte=ultima).delete()
+        VanzareZilnicaClient.objects.bulk_create(
+            _randuri_rollup(VanzareZilnicaClient, 'id_client', 'id_factura__id_client', linii), batch_size=2000
+        )
+    actualizeaza_ferestre(ultima, reconstruieste=True)
+
+
+# ===== Analize pe perioade (/api/analize_vanzari/) =====
+# Zilele încheiate vin din rollup, ziua curentă direct din DetaliiFactura. Perioadele sunt
+# întregi (ex. toată luna în care cade data_start); cele încheiate se păstrează în cache, deci
+# aceeași comparație lună cu lună nu mai interoghează baza de date.
+
+PREFIX_ANALIZE = 'analize_vanzari'
+CHEIE_VERSIUNE_ROLLUP = 'vanzari:rollup'
+ANALIZE_PERIOADE_MAXIME = 400
+
+# granularitate -> (funcția Trunc, începutul perioadei care conține o zi, începutul perioadei următoare)
+GRANULARITATI = {
+    'zi': (TruncDay, lambda zi: zi, lambda zi: zi + timedelta(days=1)),
+    'saptamana': (TruncWeek, lambda zi: zi - timedelta(days=zi.weekday()), lambda zi: zi + timedelta(days=7)),
+    'luna': (TruncMonth, inceput_luna, luna_urmatoare),
+}
+
+# grupare -> {câmp în răspuns: lookup (identic pe VanzareZilnica și DetaliiFactura, ambele au id_produs)}
+GRUPARI = {
+    'produs': {'id_produs': 'id_produs', 'nume': 'id_produs__nume'},
+    'tip_produs': {'tip_produs': 'id_produs__tip_produs'},
+    'furnizor': {'id_furnizor': 'id_produs__id_furnizor', 'nume': 'id_produs__id_furnizor__nume'},
+}
+
+
+def _versiune_rollup():
+    # versiunea este comună tuturor proceselor (VersiuneRezultate, ca în sarcini.py)
+    return versiune(CHEIE_VERSIUNE_ROLLUP)
+
+
+def _invalideaza_analize():
+    """Zilele deja agregate au fost rescrise: toate perioadele din cache devin inaccesibile."""
+    creste_versiuni(CHEIE_VERSIUNE_ROLLUP)
+
+
+def perioade_interval(data_start, data_end, granularitate):
+    _, inceput, urmatoarea = GRANULARITATI[granularitate]
+    perioade = []
+    perioada = inceput(data_start)
+    while perioada <= data_end:
+        perioade.append(perioada)
+        perioada = urmatoarea(perioada)
+    return perioade
+
+
+def _aduna(rezultate, perioada, cheie, rand):
+    bucati, vanzare, cumparare = rezultate[perioada].get(cheie, (0, ZERO, ZERO))
+    rezultate[perioada][cheie] = (
+        bucati + (rand['bucati'] or 0), vanzare + (rand['vanzare'] or ZERO), cumparare + (rand['cumparare'] or ZERO),
+    )
+
+
+def _calculator_perioade(granularitate, grupare):
+    trunc, inceput, urmatoarea = GRANULARITATI[granularitate]
+    campuri = GRUPARI[grupare]
+
+    def calculeaza(perioade):
+        """Un GROUP BY (perioadă, grupare) pe rollup, plus unul pe liniile de azi, pentru perioadele lipsă."""
+        rezultate = {perioada: {} for perioada in perioade}
+        azi = timezone.localdate()
+        randuri = (VanzareZilnica.objects
+                   .filter(data__gte=min(perioade), data__lt=min(urmatoarea(max(perioade)), azi))
+                   .annotate(perioada=trunc('data'))
+                   .order_by()
+                   .values('perioada', *campuri.values())
+                   .annotate(bucati=Sum('cantitate'), vanzare=Sum('valoare_vanzare'),
+                             cumparare=Sum('valoare_cumparare')))
+        for rand in randuri:
+            if rand['perioada'] in rezultate:
+                _aduna(rezultate, rand['perioada'], tuple(rand[camp] for camp in campuri.values()), rand)
+
+        perioada_azi = inceput(azi)
+        if perioada_azi in rezultate:
+            randuri = (DetaliiFactura.objects
+                       .filter(data_adaugare__gte=inceput_zi(azi))
+                       .order_by()
+                       .values(*campuri.values())
+                       .annotate(bucati=Sum('cantitate'), vanzare=valoare_linii('pret_vanzare'),
+                                 cumparare=valoare_linii('pret_cumparare')))
+            for rand in randuri:
+                _aduna(rezultate, perioada_azi, tuple(rand[camp] for camp in campuri.values()), rand)
+        return rezultate
+
+    return calculeaza
+
+
+def _sumar(bucati, vanzare, cumparare):
+    return {
+        'bucati': bucati,
+        'vanzari': f"{vanzare:.2f}",
+        'cost': f"{cumparare:.2f}",
+        'profit': f"{vanzare - cumparare:.2f}",
+    }
+
+
+def analize_vanzari(data_start, data_end, granularitate='luna', grupare='produs'):
+    """
+    Vânzări, cost, profit și bucăți pe fiecare perioadă (zi / saptamana / luna) din interval,
+    grupate pe produs, tip_produs sau furnizor, plus totalul fiecărei perioade.
+    """
+    if granularitate not in GRANULARITATI:
+        raise ValueError(f'Granularitate invalida: {granularitate} ({" / ".join(GRANULARITATI)})')
+    if grupare not in GRUPARI:
+        raise ValueError(f'Grupare invalida: {grupare} ({" / ".join(GRUPARI)})')
+    perioade = perioade_interval(data_start, data_end, granularitate)
+    if len(perioade) > ANALIZE_PERIOADE_MAXIME:
+        raise ValueError(f'Intervalul are {len(perioade)} perioade (maxim {ANALIZE_PERIOADE_MAXIME})')
+    if not perioade:
+        return []
+
+    actualizeaza_vanzari_zilnice()
+    _, _, urmatoarea = GRANULARITATI[granularitate]
+    azi = timezone.localdate()
+    pe_perioade = rezultate_pe_perioade(
+        f'{PREFIX_ANALIZE}:{_versiune_rollup()}:{granularitate}:{grupare}', perioade,
+        _calculator_perioade(granularitate, grupare), lambda perioada: urmatoarea(perioada) <= azi,
+    )
+
+    campuri = list(GRUPARI[grupare])
+    raspuns = []
+    for perioada in perioade:
+        grupuri = sorted(pe_perioade[perioada].items(), key=lambda element: element[1][1], reverse=True)
+        raspuns.append({
+            'perioada': perioada.isoformat(),
+            'total': _sumar(sum(valori[0] for _, valori in grupuri),
+                            sum((valori[1] for _, valori in grupuri), ZERO),
+                            sum((valori[2] for _, valori in grupuri), ZERO)),
+            'grupuri': [{**dict(zip(campuri, cheie)), **_sumar(*valori)} for cheie, valori in grupuri],
+        })
+    return raspuns
+
+
+# ===== Clasamente (/api/clasament/) =====
+
+FERESTRE_CLASAMENT = (7, 30, 90, 365)
+# rollup -> câmpul din TotalFereastra
+SURSE_FERESTRE = ((VanzareZilnica, 'id_produs'), (VanzareZilnicaClient, 'id_client'))
+
+# entitate -> (câmpul din TotalFereastra, {câmp în răspuns: lookup})
+ENTITATI_CLASAMENT = {
+    'produs': ('id_produs', {'id_produs': 'id_produs', 'nume': 'id_produs__nume',
+                             'tip_produs': 'id_produs__tip_produs'}),
+    'furnizor': ('id_produs', {'id_furnizor': 'id_produs__id_furnizor', 'nume': 'id_produs__id_furnizor__nume'}),
+    'client': ('id_client', {'id_client': 'id_client', 'nume': 'id_client__nume'}),
+}
+CRITERII_CLASAMENT = {'vanzari': 'vanzare', 'bucati': 'bucati', 'marja': 'marja'}
+
+
+def _totaluri_rollup(model, camp, de_la, pana_la):
+    """{id: [bucăți, vânzare, cumpărare]} pe zilele [de_la, pana_la] ale unui rollup."""
+    randuri = (model.objects
+               .filter(data__gte=de_la, data__lte=pana_la)
+               .order_by()
+               .values(camp)
+               .annotate(bucati=Sum('cantitate'), vanzare=Sum('valoare_vanzare'), cumparare=Sum('valoare_cumparare')))
+    return {rand[camp]: [rand['bucati'], rand['vanzare'], rand['cumparare']] for rand in randuri}
+
+
+def _reconstruieste_fereastra(zile, pana_la):
+    TotalFereastra.objects.filter(zile=zile).delete()
+    de_la = pana_la - timedelta(days=zile - 1)
+    totaluri = [
+        TotalFereastra(zile=zile, **{f'{camp}_id': id_obiect}, cantitate=bucati,
+                       valoare_vanzare=vanzare, valoare_cumparare=cumparare)
+        for model, camp in SURSE_FERESTRE
+        for id_obiect, (bucati, vanzare, cumparare) in _totaluri_rollup(model, camp, de_la, pana_la).items()
+    ]
+    TotalFereastra.objects.bulk_create(totaluri, batch_size=2000)
+
+
+def _avanseaza_fereastra(zile, vechi, pana_la):
+    """Fereastra se mută de la (vechi - zile, vechi] la (pana_la - zile, pana_la]: doar diferența se scrie."""
+    for model, camp in SURSE_FERESTRE:
+        diferente = _totaluri_rollup(model, camp, vechi + timedelta(days=1), pana_la)
+        iesite = _totaluri_rollup(model, camp, vechi - timedelta(days=zile - 1), pana_la - timedelta(days=zile))
+        for id_obiect, valori in iesite.items():
+            diferenta = diferente.setdefault(id_obiect, [0, ZERO, ZERO])
+            for index, valoare in enumerate(valori):
+                diferenta[index] -= valoare
+        if not diferente:
+            continue
+
+        existente = {
+            getattr(total, f'{camp}_id'): total
+            for total in TotalFereastra.objects.filter(zile=zile, **{f'{camp}__in': list(diferente)})
+        }
+        noi, modificate, goale = [], [], []
+        for id_obiect, (bucati, vanzare, cumparare) in diferente.items():
+            total = existente.get(id_obiect)
+            if total is None:
+                total = TotalFereastra(zile=zile, **{f'{camp}_id': id_obiect}, valoare_vanzare=ZERO,
+                                       valoare_cumparare=ZERO)
+                noi.append(total)
+            total.cantitate += bucati
+            total.valoare_vanzare += vanzare
+            total.valoare_cumparare += cumparare
+            if total.pk is None:
+                continue
+            if not total.cantitate and not total.valoare_vanzare and not total.valoare_cumparare:
+                goale.append(total.pk)
+            else:
+                modificate.append(total)
+        TotalFereastra.objects.filter(pk__in=goale).delete()
+        TotalFereastra.objects.bulk_update(modificate, ['cantitate', 'valoare_vanzare', 'valoare_cumparare'],
+                                           batch_size=2000)
+        TotalFereastra.objects.bulk_create(noi, batch_size=2000)
+
+
+def _cheie_fereastra(zile):
+    return f'fereastra_{zile}'
+
+
+def actualizeaza_ferestre(pana_la, reconstruieste=False):
+    """
+    Aduce fiecare fereastră din FERESTRE_CLASAMENT la ziua pana_la. Avansul este un UPDATE
+    condiționat pe ziua veche, deci o fereastră nu poate fi avansată de două ori în paralel.
+    """
+    stari = dict(ProgresAgregare.objects
+                 .filter(cheie__in=[_cheie_fereastra(zile) for zile in FERESTRE_CLASAMENT])
+                 .values_list('cheie', 'pana_la'))
+    for zile in FERESTRE_CLASAMENT:
+        cheie = _cheie_fereastra(zile)
+        vechi = stari.get(cheie)
+        if vechi == pana_la and not reconstruieste:
+            continue
+        with transaction.atomic():
+            if vechi is None:
+                _, avansata = ProgresAgregare.objects.get_or_create(cheie=cheie, defaults={'pana_la': pana_la})
+            else:
+                avansata = ProgresAgregare.objects.filter(cheie=cheie, pana_la=vechi).update(pana_la=pana_la)
+            if not avansata:
+                # altă cerere a actualizat-o între timp
+                continue
+            if reconstruieste or vechi is None or not 0 < (pana_la - vechi).days < zile:
+                _reconstruieste_fereastra(zile, pana_la)
+            else:
+                _avanseaza_fereastra(zile, vechi, pana_la)
+
+
+def clasament(entitate='produs', criteriu='vanzari', zile=30, numar=10):
+    """
+    Primele `numar` produse / furnizori / clienți după vânzări, bucăți sau marjă, pe ultimele `zile`
+    zile încheiate: un GROUP BY ... ORDER BY ... LIMIT peste totalurile ferestrei (nu peste facturi).
+    """
+    if entitate not in ENTITATI_CLASAMENT:
+        raise ValueError(f'Entitate invalida: {entitate} ({" / ".join(ENTITATI_CLASAMENT)})')
+    if criteriu not in CRITERII_CLASAMENT:
+        raise ValueError(f'Criteriu invalid: {criteriu} ({" / ".join(CRITERII_CLASAMENT)})')
+    if zile not in FERESTRE_CLASAMENT:
+        raise ValueError(f'Fereastra invalida: {zile} ({" / ".join(map(str, FERESTRE_CLASAMENT))} zile)')
+
+    actualizeaza_vanzari_zilnice()
+    camp, campuri = ENTITATI_CLASAMENT[entitate]
+    prima_cheie = next(iter(campuri.values()))
+    randuri = (TotalFereastra.objects
+               .filter(zile=zile, **{f'{camp}__isnull': False})
+               .order_by()
+               .values(*campuri.values())
+               .annotate(bucati=Sum('cantitate'), vanzare=Sum('valoare_vanzare'), cumparare=Sum('valoare_cumparare'),
+                         marja=ExpressionWrapper(Sum('valoare_vanzare') - Sum('valoare_cumparare'),
+                                                 output_field=TIP_SUMA))
+               .order_by(f'-{CRITERII_CLASAMENT[criteriu]}', prima_cheie)[:numar])
+
+    fereastra = ProgresAgregare.objects.filter(cheie=_cheie_fereastra(zile)).values_list('pana_la', flat=True).first()
+    return {
+        'de_la': fereastra - timedelta(days=zile - 1) if fereastra else None,
+        'pana_la': fereastra,
+        'clasament': [
+            {'pozitie': pozitie, **{cheie: rand[lookup] for cheie, lookup in campuri.items()},
+             **_sumar(rand['bucati'], rand['vanzare'] or ZERO, rand['cumparare'] or ZERO)}
+            for pozitie, rand in enumerate(randuri, start=1)
+        ],
+    }
+
+
+# ===== Dashboard (pagina acasă) =====
+
+def _sume_pe_zile():
+    """[(zi, vânzare, cumpărare)] ordonat: zilele agregate din rollup, restul (inclusiv azi) din liniile calde."""
+    ultima = ultima_zi_agregata()
+    pe_zile = {}
+    if ultima is not None:
+        randuri = (VanzareZilnica.objects
+                   .filter(data__lte=ultima)
+                   .order_by()
+                   .values('data')
+                   .annotate(vanzare=Sum('valoare_vanzare'), cumparare=Sum('valoare_cumparare')))
+        pe_zile.update({rand['data']: (rand['vanzare'], rand['cumparare']) for rand in randuri})
+    linii = DetaliiFactura.objects.all()
+    if ultima is not None:
+        linii = linii.filter(data_adaugare__gte=inceput_zi(ultima + timedelta(days=1)))
+    randuri = (linii
+               .annotate(zi=TruncDate('data_adaugare'))
+               .order_by()
+               .values('zi')
+               .annotate(vanzare=valoare_linii('pret_vanzare'), cumparare=valoare_linii('pret_cumparare')))
+    pe_zile.update({rand['zi']: (rand['vanzare'], rand['cumparare']) for rand in randuri})
+    return [(zi, *pe_zile[zi]) for zi in sorted(pe_zile)]
+
+
+@tip_sarcina('acasa', parametri={'azi': param_data})
+def date_acasa(azi):
+    """
+    Datele dashboard-ului: numărători și sume de vânzare / cumpărare / profit, total, pentru
+    azi și pe fiecare zi cu facturi (diagrame). Seria pe zile vine din rollup, plus zilele încă
+    neagregate dintr-un singur GROUP BY pe liniile calde; facturile arhivate sunt incluse.
+    """
+    azi = parse_date(azi) if isinstance(azi, str) else azi
+    if azi is None:
+        raise ValueError('Data invalida pentru dashboard')
+    diagrama_vanzari, diagrama_cumparare, diagrama_profit = [], [], []
+    suma_vanzare = suma_cumparare = 0.0
+    suma_vanzare_azi = suma_cumparare_azi = 0.0
+    for zi, vanzare, cumparare in _sume_pe_zile():
+        vanzare, cumparare = float(vanzare or 0), float(cumparare or 0)
+        suma_vanzare += vanzare
+        suma_cumparare += cumparare
+        if zi == azi:
+            suma_vanzare_azi, suma_cumparare_azi = vanzare, cumparare
+        diagrama_vanzari.append({"data": zi, "suma": vanzare})
+        diagrama_cumparare.append({"data": zi, "suma": cumparare})
+        diagrama_profit.append({"data": zi, "suma": vanzare - cumparare})
+
+    cereri = CerereClient.objects.aggregate(
+        total=Count('id'),
+        asteptare=Count('id', filter=Q(status=False)),
+        completate=Count('id', filter=Q(status=True)),
+    )
+    return {
+        "cerere_client": cereri['total'],
+        "nr_facturi": Factura.objects.count() + FacturaArhiva.objects.count(),
+        "total_produse": Produs.objects.count(),
+        "total_furnizori": Furnizor.objects.count(),
+        "total_angajati": Angajat.objects.count(),
+        "suma_vanzare": f"{suma_vanzare:.2f}",
+        "suma_cumparare": f"{suma_cumparare:.2f}",
+        "suma_profit": f"{suma_vanzare - suma_cumparare:.2f}",
+        "cerere_client_asteptare": cereri['asteptare'],
+        "cerere_client_completate": cereri['completate'],
+        "suma_vanzare_azi": f"{suma_vanzare_azi:.2f}",
+        "suma_profit_azi": f"{suma_vanzare_azi - suma_cumparare_azi:.2f}",
+        "data_produse_expirate_serializer": Produs.objects.filter(
+            data_expirare__range=[azi, azi + timedelta(days=7)]
+        ).count(),
+        "diagrama_vanzari": diagrama_vanzari,
+        "diagrama_cumparare": diagrama_cumparare,
+        "diagrama_profit": diagrama_profit,
+    }
@@ -1,25 +1,36 @@
-from datetime import timedelta
+from datetime import date, timedelta
 
 from django.contrib.auth.hashers import make_password
+from django.core.handlers.asgi import ASGIRequest
 from django.db import transaction
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 from django.shortcuts import get_object_or_404
+from django.views import View
 from rest_framework import viewsets, status, generics
+from rest_framework.negotiation import BaseContentNegotiation
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.routers import DefaultRouter
 from rest_framework.views import APIView
+from rest_framework.exceptions import AuthenticationFailed
 
+from SistemManagementInventar import clienti, evenimente, exporturi, facturi, fatete, idempotenta, importuri, potriviri, \
+    prognoza, rapoarte, sarcini, signals, sincronizare, stocuri, throttling, vanzari
 from SistemManagementInventar.models import Furnizor, BancaFurnizor, Produs, DetaliiProdus, ContFurnizor, Angajat, \
-    BancaAngajat, SalariuAngajat, CerereClient, Factura, DetaliiFactura
+    BancaAngajat, SalariuAngajat, CerereClient, Factura, SoldFurnizor, Sarcina, FacturaArhiva, \
+    PotrivireCerere
 from SistemManagementInventar.permissions import EsteAdmin
 from SistemManagementInventar.serializers import FurnizorSerializer, BancaFurnizorSerializer, ProdusSerializer, \
-    DetaliiProdusSerializer, DetaliiProdusSerializerSimplu, ContFurnizorSerializer, AngajatSerializer, \
+    DetaliiProdusSerializer, DetaliiProdusSerializerSimplu, DetaliiProdusScriereSerializer, ContFurnizorSerializer, AngajatSerializer, \
     BancaAngajatSerializer, SalariuAngajatSerializer, ClientSerializer, FacturaSerializer, DetaliiFacturaSerializer, \
-    CerereClientSerializer
+    CerereClientSerializer, SoldFurnizorSerializer, FacturaDetaliataSerializer, FacturaArhivaDetaliataSerializer, \
+    SarcinaSerializer, PotrivireCerereSerializer, specificatie_din_cerere
 
 # ===== IMPORTANTE =====
 # 1. Toate view-urile folosesc JWT pentru autentificare și permit doar utilizatorilor autentificați
@@ -69,6 +80,7 @@ class LoginView(APIView):
 class FurnizorViewSet(viewsets.ModelViewSet):
     authentication_classes = [JWTAuthentication] # Important: Securitate prin JWT
     permission_classes = [IsAuthenticated] # Important: Securitate prin JWT
+    throttle_scope = 'catalog'
     queryset = Furnizor.objects.all()
     serializer_class = FurnizorSerializer
 
@@ -78,7 +90,7 @@ class FurnizorViewSet(viewsets.ModelViewSet):
         pentru răspunsuri consistente și sigure
         """
         try:
-            furnizor = Furnizor.objects.all()
+            furnizor = FurnizorSerializer.optimizeaza_queryset(Furnizor.objects.all(), request)
             serializer = FurnizorSerializer(furnizor, many=True, context={'request': request})
             response_dict = {'error': False, 'message': 'Furnizori listati', 'data': serializer.data}
             return Response(response_dict, status=status.HTTP_200_OK)
@@ -86,6 +98,7 @@ class FurnizorViewSet(viewsets.ModelViewSet):
             response_dict = {'error': True, 'message': f'Eroare la listarea furnizorilor: {str(e)}'}
             return Response(response_dict, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @idempotenta.idempotent
     def create(self, request):
         """Important: Validare date înainte de creare și răspuns cu management de erori"""
         try:
@@ -117,13 +130,14 @@ class FurnizorViewSet(viewsets.ModelViewSet):
         exemplu de relație one-to-many gestionată prin serializere nested
         """
         try:
-            furnizor = get_object_or_404(Furnizor, pk=pk)
+            furnizor = get_object_or_404(FurnizorSerializer.optimizeaza_queryset(Furnizor.objects.all(), request), pk=pk)
             serializer = FurnizorSerializer(furnizor, context={'request': request})
 
             data_serializer = serializer.data
 
-            banca_furnizor = BancaFurnizor.objects.filter(id_furnizor=furnizor)
-            detalii_banca_serializer = BancaFurnizorSerializer(banca_furnizor, many=True, context={'request': request})
+            banca_furnizor = BancaFurnizor.objects.filter(id_furnizor=furnizor).select_related('id_furnizor')
+            detalii_banca_serializer = BancaFurnizorSerializer(banca_furnizor, many=True, campuri=None, expandari=None,
+                                                               context={'request': request})
 
             data_serializer['banca_furnizor'] = detalii_banca_serializer.data
 
@@ -147,9 +161,10 @@ class FurnizorOnlyViewSet(generics.ListAPIView):
     """
     serializer_class = FurnizorSerializer
     permission_classes = [AllowAny]
+    throttle_scope = 'catalog'
 
     def get_queryset(self):
-        return Furnizor.objects.all()
+        return FurnizorSerializer.optimizeaza_queryset(Furnizor.objects.all(), self.request)
 
 class BancaFurnizorViewSet(viewsets.ModelViewSet):
     """ViewSet pentru operatii CRUD pe model BancaFurnizor"""
@@ -158,6 +173,7 @@ class BancaFurnizorViewSet(viewsets.ModelViewSet):
     queryset = BancaFurnizor.objects.all()
     serializer_class = BancaFurnizorSerializer
 
+    @idempotenta.idempotent
     def create(self, request):
         try:
             serializer = BancaFurnizorSerializer(data=request.data, context={'request': request})
@@ -171,7 +187,7 @@ class BancaFurnizorViewSet(viewsets.ModelViewSet):
 
     def list(self, request):
         try:
-            bancafurnizor = BancaFurnizor.objects.all()
+            bancafurnizor = BancaFurnizorSerializer.optimizeaza_queryset(BancaFurnizor.objects.all(), request)
             serializer = BancaFurnizorSerializer(bancafurnizor, many=True, context={'request': request})
             response_dict = {'error': False, 'message': 'Date banca furnizor listate', 'data': serializer.data}
             return Response(response_dict, status=status.HTTP_200_OK)
@@ -181,7 +197,9 @@ class BancaFurnizorViewSet(viewsets.ModelViewSet):
 
     def retrieve(self, request, pk=None):
         try:
-            bancafurnizor = get_object_or_404(BancaFurnizor, pk=pk)
+            bancafurnizor = get_object_or_404(
+                BancaFurnizorSerializer.optimizeaza_queryset(BancaFurnizor.objects.all(), request), pk=pk
+            )
             serializer = BancaFurnizorSerializer(bancafurnizor, context={'request': request})
             response_data = {
                 "error": False,
@@ -215,32 +233,36 @@ class ProdusViewSet(viewsets.ModelViewSet):
     """
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'catalog'
     queryset               = Produs.objects.all()
     serializer_class       = ProdusSerializer
 
+    @idempotenta.idempotent
     def create(self, request):
         """
         Important: Crearea unui produs cu detalii asociate - exemplu de
         creare relații parent-child într-o singură cerere
         """
         try:
-            serializer = ProdusSerializer(data=request.data, context={'request': request})
-            serializer.is_valid(raise_exception=True)
-            serializer.save()
-            id_produs = serializer.data['id']
-
-            #adaug id-ul produsului care este folosit pt detalii
-            lista_detalii_produs =[]
-            for detalii_produs in request.data['detalii_produs']:
-                print(detalii_produs)
-                #detalii produs pt serializer
-                detalii_produs['id_produs'] = id_produs
-                lista_detalii_produs.append(detalii_produs)
-                print(detalii_produs)
-
-            serializer2=DetaliiProdusSerializer(data=lista_detalii_produs, many=True, context={'request': request})
-            serializer2.is_valid()
-            serializer2.save()
+            # detalii invalide: produsul nu rămâne salvat fără ele
+            with transaction.atomic():
+                serializer = ProdusSerializer(data=request.data, context={'request': request})
+                serializer.is_valid(raise_exception=True)
+                serializer.save()
+                id_produs = serializer.instance.id
+
+                #adaug id-ul produsului care este folosit pt detalii
+                lista_detalii_produs =[]
+                for detalii_produs in request.data['detalii_produs']:
+                    #detalii produs pt serializer
+                    detalii_produs['id_produs'] = id_produs
+                    lista_detalii_produs.append(detalii_produs)
+
+                serializer2=DetaliiProdusSerializer(data=lista_detalii_produs, many=True, context={'request': request})
+                serializer2.is_valid(raise_exception=True)
+                serializer2.save()
+                # cererile clienților care așteaptă acest produs
+                potriviri.potriveste_produse([serializer.instance])
 
             response_dict = {'error': False, 'message': 'Creat cu succes'}
             return Response(response_dict, status=status.HTTP_201_CREATED)
@@ -254,17 +276,24 @@ class ProdusViewSet(viewsets.ModelViewSet):
         returnare date relaționate într-un singur răspuns
         """
         try:
-            produs = Produs.objects.all()
-            serializer = ProdusSerializer(produs, many=True, context={'request': request})
+            produse = list(ProdusSerializer.optimizeaza_queryset(Produs.objects.all(), request))
+            serializer = ProdusSerializer(produse, many=True, context={'request': request})
 
             date_produse=serializer.data
-            listaprodusenoua=[]
 
-            for produs in date_produse:
-                date_produs=DetaliiProdus.objects.filter(id_produs=produs['id'])
-                detalii_produs_serializer=DetaliiProdusSerializerSimplu(date_produs, many=True, context={'request': request})
-                produs['detalii_produs']=detalii_produs_serializer.data
-                listaprodusenoua.append(produs)
+            # detaliile tuturor produselor vin dintr-o singură interogare (doar dacă sunt cerute);
+            # id-ul se ia din instanțe, pentru că ?fields= poate să nu includă câmpul id
+            campuri, _ = specificatie_din_cerere(request)
+            if campuri is None or 'detalii_produs' in campuri:
+                detalii_pe_produs = {}
+                toate_detaliile = DetaliiProdus.objects.filter(id_produs__in=[p.id for p in produse])
+                detalii_produs_serializer = DetaliiProdusSerializerSimplu(
+                    toate_detaliile, many=True, campuri=None, expandari=set(), context={'request': request}
+                )
+                for detaliu in detalii_produs_serializer.data:
+                    detalii_pe_produs.setdefault(detaliu['id_produs'], []).append(detaliu)
+                for produs, date_produs in zip(produse, date_produse):
+                    date_produs['detalii_produs'] = detalii_pe_produs.get(produs.id, [])
 
             response_dict = {'error': False, 'message': 'Produse listate', 'data': serializer.data}
             return Response(response_dict, status=status.HTTP_200_OK)
@@ -274,14 +303,18 @@ class ProdusViewSet(viewsets.ModelViewSet):
 
     def retrieve(self, request, pk=None):
         try:
-            produs = get_object_or_404(Produs, pk=pk)
+            produs = get_object_or_404(ProdusSerializer.optimizeaza_queryset(Produs.objects.all(), request), pk=pk)
             serializer = ProdusSerializer(produs, context={'request': request})
 
             data_serializer=serializer.data
 
-            date_produs=DetaliiProdus.objects.filter(id_produs=data_serializer['id'])
-            detalii_produs_serializer=DetaliiProdusSerializerSimplu(date_produs, many=True, context={'request': request})
-            data_serializer['detalii_produs']=detalii_produs_serializer.data
+            campuri, _ = specificatie_din_cerere(request)
+            if campuri is None or 'detalii_produs' in campuri:
+                date_produs=DetaliiProdus.objects.filter(id_produs=produs.id)
+                detalii_produs_serializer=DetaliiProdusSerializerSimplu(
+                    date_produs, many=True, campuri=None, expandari=set(), context={'request': request}
+                )
+                data_serializer['detalii_produs']=detalii_produs_serializer.data
 
             response_data = {
                 "error": False,
@@ -299,7 +332,11 @@ class ProdusViewSet(viewsets.ModelViewSet):
     def update(self, request, pk=None):
         """
         Important: Update complex pentru produs și detaliile sale asociate
-        Demonstrează gestionarea corectă a relațiilor parent-child în actualizări
+        Detaliile existente sunt încărcate o singură dată și comparate cu payload-ul:
+        - fără id (sau id 0)          -> detaliu nou (bulk_create)
+        - cu id al acestui produs     -> actualizare (bulk_update)
+        - lipsă din payload           -> ștergere (un singur DELETE)
+        Totul rulează într-o singură tranzacție, cu număr constant de interogări.
         """
         try:
             produs = get_object_or_404(Produs, pk=pk)
@@ -307,35 +344,113 @@ class ProdusViewSet(viewsets.ModelViewSet):
             data = request.data.copy()
             detalii_list = data.pop('detalii_produs', None)
 
-            # Actualizăm produsul fără detalii
-            serializer = ProdusSerializer(produs, data=data, context={'request': request}, partial=True)
-            serializer.is_valid(raise_exception=True)
-            serializer.save()
-
-            # Procesăm detaliile produsului separat
-            if detalii_list is not None:
-                for det in detalii_list:
-                    det_data = det.copy()
-                    det_id = det_data.pop('id', None)
-                    # Asigurăm referința corectă către produs
-                    det_data['id_produs'] = produs.id
-
-                    if not det_id or det_id == 0:
-                        # Creare detaliu nou
-                        det_serializer = DetaliiProdusSerializer(data=det_data, context={'request': request})
-                        det_serializer.is_valid(raise_exception=True)
-                        det_serializer.save()
-                    else:
-                        # Actualizare detaliu existent
-                        det_obj = get_object_or_404(DetaliiProdus, pk=det_id)
-                        det_serializer = DetaliiProdusSerializer(det_obj, data=det_data, context={'request': request}, partial=True)
-                        det_serializer.is_valid(raise_exception=True)
-                        det_serializer.save()
+            with transaction.atomic():
+                # Actualizăm produsul fără detalii
+                stoc_anterior = produs.stoc_total
+                serializer = ProdusSerializer(produs, data=data, context={'request': request}, partial=True)
+                serializer.is_valid(raise_exception=True)
+                serializer.save()
+                if 'stoc_total' in serializer.validated_data:
+                    stocuri.redistribuie_stoc([produs])
+                    # reaprovizionare: cererile clienților care așteaptă produsul
+                    if produs.stoc_total > stoc_anterior:
+                        potriviri.potriveste_produse([produs])
+
+                # Procesăm detaliile produsului separat
+                if detalii_list is not None:
+                    self._sincronizeaza_detalii(produs, detalii_list)
+
+                evenimente.publica_dupa_commit(evenimente.EVENIMENT_STOC, {
+                    'id_produs': produs.id, 'nume': produs.nume, 'stoc_total': produs.stoc_total,
+                })
 
             return Response({'error': False, 'message': 'Produs actualizat cu succes'}, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({'error': True, 'message': f'Eroare la actualizarea produsului: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
 
+    @staticmethod
+    def _sincronizeaza_detalii(produs, detalii_list):
+        existente = {det.id: det for det in DetaliiProdus.objects.filter(id_produs=produs)}
+        noi, modificate, pastrate = [], {}, set()
+
+        for det in detalii_list:
+            det_data = dict(det)
+            det_id = det_data.pop('id', None)
+
+            if not det_id:
+                # Creare detaliu nou (validat și salvat în bloc, mai jos)
+                noi.append(det_data)
+                continue
+
+            # Actualizare detaliu existent: trebuie să aparțină acestui produs
+            det_obj = existente.get(int(det_id))
+            if det_obj is None:
+                raise ValueError(f'Detaliul {det_id} nu apartine produsului {produs.id}')
+            det_serializer = DetaliiProdusScriereSerializer(det_obj, data=det_data, partial=True)
+            det_serializer.is_valid(raise_exception=True)
+            for camp, valoare in det_serializer.validated_data.items():
+                setattr(det_obj, camp, valoare)
+            det_obj.data_modificare = timezone.now()
+            modificate[det_obj.id] = det_obj
+            pastrate.add(det_obj.id)
+
+        noi_serializer = DetaliiProdusScriereSerializer(data=noi, many=True)
+        noi_serializer.is_valid(raise_exception=True)
+
+        # marcajele de ștergere (sync) și invalidările se scriu o singură dată pentru toate detaliile
+        with signals.scrieri_in_bloc():
+            # Detaliile care nu mai apar în payload sunt șterse
+            sterse = [det_id for det_id in existente if det_id not in pastrate]
+            if sterse:
+                DetaliiProdus.objects.filter(id_produs=produs, id__in=sterse).delete()
+            if modificate:
+                # bulk_update nu completează auto_now, deci data_modificare este setată explicit
+                DetaliiProdus.objects.bulk_update(
+                    list(modificate.values()), list(DetaliiProdusScriereSerializer.Meta.fields) + ['data_modificare']
+                )
+            if noi:
+                noi_serializer.save(id_produs=produs)
+
+class ImportProduseViewSet(APIView):
+    """
+    Important: Import în masă al catalogului de produse
+    Acceptă fie un fișier încărcat (multipart, câmpul "fisier", .csv sau .json),
+    fie direct un JSON: [...] sau {"produse": [...], "upsert": true}
+    ex: POST /api/import_produse/?upsert=1
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @idempotenta.idempotent
+    def post(self, request):
+        try:
+            fisier = request.FILES.get('fisier')
+            if fisier is not None:
+                randuri = importuri.citeste_fisier(fisier.name, fisier.read())
+            elif isinstance(request.data, list):
+                randuri = request.data
+            else:
+                randuri = request.data.get('produse', [])
+
+            upsert = request.query_params.get('upsert') in ('1', 'true')
+            if isinstance(request.data, dict) and request.data.get('upsert') in (True, '1', 'true'):
+                upsert = True
+
+            if not isinstance(randuri, list):
+                raise ValueError('Lista de produse lipseste')
+
+            raport = importuri.importa_produse(randuri, upsert=upsert)
+            response_dict = {
+                'error': False,
+                'message': f"Import finalizat: {raport['creat']} create, {raport['actualizat']} actualizate, "
+                           f"{len(raport['erori'])} randuri cu erori",
+                'data': raport
+            }
+            return Response(response_dict, status=status.HTTP_200_OK)
+        except Exception as e:
+            response_dict = {'error': True, 'message': f'Eroare la importul produselor: {str(e)}'}
+            return Response(response_dict, status=status.HTTP_400_BAD_REQUEST)
+
 #cont furnizor viewset
 class ContFurnizorViewSet(viewsets.ModelViewSet):
     authentication_classes = [JWTAuthentication]
@@ -343,10 +458,12 @@ class ContFurnizorViewSet(viewsets.ModelViewSet):
     queryset               = ContFurnizor.objects.all()
     serializer_class       = ContFurnizorSerializer
 
+    @idempotenta.idempotent
     def create(self, request):
         try:
             serializer = ContFurnizorSerializer(data=request.data, context={'request': request})
             serializer.is_valid(raise_exception=True)
+            # soldul furnizorului este ajustat de ContFurnizor.save()
             serializer.save()
             response_dict = {'error': False, 'message': 'Date cont salvate cu succes'}
             return Response(response_dict, status=status.HTTP_201_CREATED)
@@ -356,7 +473,7 @@ class ContFurnizorViewSet(viewsets.ModelViewSet):
 
     def list(self, request):
         try:
-            contfurnizor = ContFurnizor.objects.all()
+            contfurnizor = ContFurnizorSerializer.optimizeaza_queryset(ContFurnizor.objects.all(), request)
             serializer = ContFurnizorSerializer(contfurnizor, many=True, context={'request': request})
             response_dict = {'error': False, 'message': 'Date cont furnizor listate', 'data': serializer.data}
             return Response(response_dict, status=status.HTTP_200_OK)
@@ -366,7 +483,9 @@ class ContFurnizorViewSet(viewsets.ModelViewSet):
 
     def retrieve(self, request, pk=None):
         try:
-            contfurnizor = get_object_or_404(ContFurnizor, pk=pk)
+            contfurnizor = get_object_or_404(
+                ContFurnizorSerializer.optimizeaza_queryset(ContFurnizor.objects.all(), request), pk=pk
+            )
             serializer = ContFurnizorSerializer(contfurnizor, context={'request': request})
             response_data = {
                 "error": False,
@@ -383,16 +502,351 @@ class ContFurnizorViewSet(viewsets.ModelViewSet):
 
     def update(self, request, pk=None):
         try:
-            contfurnizor = get_object_or_404(ContFurnizor, pk=pk)
-            serializer = ContFurnizorSerializer(contfurnizor, data=request.data, context={'request': request}, partial=True)
-            serializer.is_valid(raise_exception=True)
-            serializer.save()
+            with transaction.atomic():
+                # rândul este citit blocat, ca o modificare concurentă să nu lucreze pe valori vechi;
+                # ContFurnizor.save() scoate valorile vechi din sold și le adaugă pe cele noi
+                contfurnizor = get_object_or_404(ContFurnizor.objects.select_for_update(), pk=pk)
+                serializer = ContFurnizorSerializer(contfurnizor, data=request.data, context={'request': request}, partial=True)
+                serializer.is_valid(raise_exception=True)
+                serializer.save()
             response_dict = {'error': False, 'message': 'Actualizare date cont reusita'}
             return Response(response_dict, status=status.HTTP_200_OK)
         except Exception as e:
             response_dict = {'error': True, 'message': f'Eroare la actualizarea datelor: {str(e)}'}
             return Response(response_dict, status=status.HTTP_400_BAD_REQUEST)
 
+class SoldFurnizorViewSet(viewsets.ViewSet):
+    """
+    Important: Soldul fiecărui furnizor (total debit, total credit, net, ultima tranzacție)
+    Valorile sunt întreținute incremental la fiecare tranzacție, deci citirea e O(1)
+    ex: GET /api/sold_furnizor/  sau  GET /api/sold_furnizor/<id_furnizor>/
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        try:
+            sold = SoldFurnizorSerializer.optimizeaza_queryset(SoldFurnizor.objects.all(), request)
+            serializer = SoldFurnizorSerializer(sold, many=True, context={'request': request})
+            response_dict = {'error': False, 'message': 'Solduri furnizori listate', 'data': serializer.data}
+            return Response(response_dict, status=status.HTTP_200_OK)
+        except Exception as e:
+            response_dict = {'error': True, 'message': f'Eroare la listarea soldurilor: {str(e)}'}
+            return Response(response_dict, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def retrieve(self, request, pk=None):
+        try:
+            furnizor = get_object_or_404(Furnizor, pk=pk)
+            sold = SoldFurnizorSerializer.optimizeaza_queryset(
+                SoldFurnizor.objects.filter(id_furnizor=furnizor), request
+            ).first()
+            if sold is None:
+                # furnizor fără nicio tranzacție
+                sold = SoldFurnizor(id_furnizor=furnizor)
+            serializer = SoldFurnizorSerializer(sold, context={'request': request})
+            response_data = {
+                "error": False,
+                "message": "Sold furnizor gasit",
+                "data": serializer.data
+            }
+            return Response(response_data, status=status.HTTP_200_OK)
+        except Exception as e:
+            response_data = {
+                "error": True,
+                "message": f"Eroare la obtinerea soldului: {str(e)}"
+            }
+            return Response(response_data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class RaportVechimeFurnizoriViewSet(APIView):
+    """
+    Important: Raport de vechime a datoriilor către furnizori (0-30 / 31-60 / 61-90 / 90+ zile)
+    Calculat integral în baza de date, cu câte o sumă condiționată pe fiecare interval
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'rapoarte'
+
+    def get(self, request):
+        try:
+            data_referinta = request.query_params.get('data')
+            azi = parse_date(data_referinta) if data_referinta else None
+            if data_referinta and azi is None:
+                raise ValueError(f'Data invalida: {data_referinta}')
+            raport = sarcini.calculeaza('raport_vechime_furnizori', {'azi': azi})
+            response_dict = {'error': False, 'message': 'Raport vechime furnizori', 'data': raport}
+            return Response(response_dict, status=status.HTTP_200_OK)
+        except Exception as e:
+            response_dict = {'error': True, 'message': f'Eroare la generarea raportului: {str(e)}'}
+            return Response(response_dict, status=status.HTTP_400_BAD_REQUEST)
+
+class RaportSalariiViewSet(APIView):
+    """
+    Important: Raport de salarii pe lună / an - totaluri pe angajat și pe firmă, medii și număr de angajați
+    Calculat cu GROUP BY (TruncMonth) în baza de date; lunile încheiate sunt servite din cache
+    ex: ?an=2025&granularitate=luna sau ?data_start=2025-01-01&data_end=2025-06-30&granularitate=an
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'rapoarte'
+
+    def get(self, request):
+        try:
+            granularitate = request.query_params.get('granularitate', 'luna')
+            if granularitate not in ('luna', 'an'):
+                raise ValueError(f'Granularitate invalida: {granularitate} (luna sau an)')
+
+            an = request.query_params.get('an')
+            data_start = request.query_params.get('data_start')
+            data_end = request.query_params.get('data_end')
+            if data_start or data_end:
+                inceput, sfarsit = parse_date(data_start or ''), parse_date(data_end or '')
+                if inceput is None or sfarsit is None:
+                    raise ValueError('data_start si data_end trebuie date impreuna, in format YYYY-MM-DD')
+            else:
+                an = int(an) if an else timezone.localdate().year
+                inceput, sfarsit = date(an, 1, 1), date(an, 12, 31)
+            if inceput > sfarsit:
+                raise ValueError('data_start este dupa data_end')
+
+            id_angajat = request.query_params.get('id_angajat')
+            raport = rapoarte.raport_salarii(
+                inceput, sfarsit, granularitate, int(id_angajat) if id_angajat else None
+            )
+            response_dict = {'error': False, 'message': 'Raport salarii', 'data': raport}
+            return Response(response_dict, status=status.HTTP_200_OK)
+        except Exception as e:
+            response_dict = {'error': True, 'message': f'Eroare la generarea raportului de salarii: {str(e)}'}
+            return Response(response_dict, status=status.HTTP_400_BAD_REQUEST)
+
+class SyncViewSet(APIView):
+    """
+    Important: Sincronizare incrementală - doar rândurile modificate / șterse după cursor
+    Prima cerere fără since descarcă totul în loturi; se repetă cu cursorul primit cât timp mai_sunt=true
+    ex: GET /api/sync/?since=<cursor>&lot=500
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'catalog'
+
+    def get(self, request):
+        try:
+            lot = int(request.query_params.get('lot', sincronizare.DIMENSIUNE_LOT_SYNC))
+            if not 1 <= lot <= 5000:
+                raise ValueError('lot trebuie sa fie intre 1 si 5000')
+            date_sync = sincronizare.sincronizeaza(request.query_params.get('since'), lot)
+            response_dict = {'error': False, 'message': 'Modificari de la ultima sincronizare', 'data': date_sync}
+            return Response(response_dict, status=status.HTTP_200_OK)
+        except Exception as e:
+            response_dict = {'error': True, 'message': f'Eroare la sincronizare: {str(e)}'}
+            return Response(response_dict, status=status.HTTP_400_BAD_REQUEST)
+
+class PrognozaStocViewSet(APIView):
+    """
+    Important: Prognoza stocului - viteza de vânzare (medii pe 7/30/90 zile), zile de stoc rămase,
+    punct de reaprovizionare și cantitatea de comandat, pentru toate produsele, cele mai urgente primele
+    Calculată vectorizat (NumPy) din rollup-ul zilnic al vânzărilor, actualizat incremental la fiecare cerere
+    ex: GET /api/prognoza_stoc/?pagina=1&dimensiune=50&zile_livrare=10&z=1.65
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'rapoarte'
+
+    def get(self, request):
+        try:
+            pagina = int(request.query_params.get('pagina', 1))
+            dimensiune = int(request.query_params.get('dimensiune', 50))
+            if pagina < 1 or not 1 <= dimensiune <= 500:
+                raise ValueError('pagina trebuie sa fie >= 1, iar dimensiune intre 1 si 500')
+            zile_livrare = request.query_params.get('zile_livrare')
+            zile_livrare = int(zile_livrare) if zile_livrare else None
+            if zile_livrare is not None and zile_livrare < 1:
+                raise ValueError('zile_livrare trebuie sa fie cel putin 1')
+            z_serviciu = request.query_params.get('z')
+            z_serviciu = float(z_serviciu) if z_serviciu else None
+
+            vanzari.actualizeaza_vanzari_zilnice()
+            date_prognoza = prognoza.prognoza_stoc(zile_livrare, z_serviciu, pagina, dimensiune)
+            response_dict = {'error': False, 'message': 'Prognoza stoc', 'data': date_prognoza}
+            return Response(response_dict, status=status.HTTP_200_OK)
+        except Exception as e:
+            response_dict = {'error': True, 'message': f'Eroare la calculul prognozei: {str(e)}'}
+            return Response(response_dict, status=status.HTTP_400_BAD_REQUEST)
+
+class AnalizeVanzariViewSet(APIView):
+    """
+    Important: Analize vânzări pe zi / săptămână / lună, grupate pe produs, tip_produs sau furnizor
+    Vânzări, cost, profit și bucăți dintr-un GROUP BY pe rollup-ul zilnic; perioadele încheiate vin din cache
+    ex: GET /api/analize_vanzari/?data_start=2025-01-01&data_end=2025-06-30&granularitate=luna&grupare=furnizor
+    (implicit: ultimele 30 de zile, pe zi, pe produs)
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'rapoarte'
+
+    def get(self, request):
+        try:
+            data_start = request.query_params.get('data_start')
+            data_end = request.query_params.get('data_end')
+            if data_start or data_end:
+                inceput, sfarsit = parse_date(data_start or ''), parse_date(data_end or '')
+                if inceput is None or sfarsit is None:
+                    raise ValueError('data_start si data_end trebuie date impreuna, in format YYYY-MM-DD')
+            else:
+                sfarsit = timezone.localdate()
+                inceput = sfarsit - timedelta(days=29)
+            if inceput > sfarsit:
+                raise ValueError('data_start este dupa data_end')
+
+            analize = vanzari.analize_vanzari(
+                inceput, sfarsit,
+                request.query_params.get('granularitate', 'zi'),
+                request.query_params.get('grupare', 'produs'),
+            )
+            response_dict = {'error': False, 'message': 'Analize vanzari', 'data': analize}
+            return Response(response_dict, status=status.HTTP_200_OK)
+        except Exception as e:
+            response_dict = {'error': True, 'message': f'Eroare la generarea analizei: {str(e)}'}
+            return Response(response_dict, status=status.HTTP_400_BAD_REQUEST)
+
+class ClasamentViewSet(APIView):
+    """
+    Important: Clasamente - primele N produse / furnizori / clienți după vânzări, bucăți sau marjă
+    Pe ultimele 7 / 30 / 90 / 365 zile încheiate, din totalurile ferestrei actualizate incremental
+    ex: GET /api/clasament/?entitate=furnizor&criteriu=marja&zile=90&n=5
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'rapoarte'
+
+    def get(self, request):
+        try:
+            numar = int(request.query_params.get('n', 10))
+            if not 1 <= numar <= 100:
+                raise ValueError('n trebuie sa fie intre 1 si 100')
+            date_clasament = vanzari.clasament(
+                request.query_params.get('entitate', 'produs'),
+                request.query_params.get('criteriu', 'vanzari'),
+                int(request.query_params.get('zile', 30)),
+                numar,
+            )
+            response_dict = {'error': False, 'message': 'Clasament', 'data': date_clasament}
+            return Response(response_dict, status=status.HTTP_200_OK)
+        except Exception as e:
+            response_dict = {'error': True, 'message': f'Eroare la generarea clasamentului: {str(e)}'}
+            return Response(response_dict, status=status.HTTP_400_BAD_REQUEST)
+
+class LimitariViewSet(APIView):
+    """
+    Important: Statisticile limitării cererilor (doar admin) - limitele pe clasă de endpoint,
+    cererile acceptate / respinse și utilizatorii respinși cel mai des, pentru ajustarea LIMITARI_GALETI
+    ex: GET /api/limitari/ ; DELETE /api/limitari/ resetează contoarele
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, EsteAdmin]
+
+    def get(self, request):
+        try:
+            response_dict = {'error': False, 'message': 'Statistici limitari', 'data': throttling.statistici()}
+            return Response(response_dict, status=status.HTTP_200_OK)
+        except Exception as e:
+            response_dict = {'error': True, 'message': f'Eroare la citirea statisticilor: {str(e)}'}
+            return Response(response_dict, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def delete(self, request):
+        try:
+            throttling.stocare().reseteaza()
+            return Response({'error': False, 'message': 'Contoare resetate'}, status=status.HTTP_200_OK)
+        except Exception as e:
+            response_dict = {'error': True, 'message': f'Eroare la resetarea contoarelor: {str(e)}'}
+            return Response(response_dict, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class FiltrareAtributeViewSet(APIView):
+    """
+    Important: Filtrarea produselor după atribute (DetaliiProdus) și tip, cu fațetele pentru restul
+    atributelor: câte produse au fiecare valoare, ca lista de filtre să arate doar combinații posibile
+    Fațetele sunt memorate până la următoarea scriere în catalog; produsele se citesc la fiecare cerere
+    ex: GET /api/filtrare_atribute/?atribut[concentratie]=500mg&atribut[forma]=tableta&tip_produs=Medicamente&pagina=1
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'catalog'
+
+    def get(self, request):
+        try:
+            pagina = int(request.query_params.get('pagina', 1))
+            dimensiune = int(request.query_params.get('dimensiune', 50))
+            if pagina < 1 or not 1 <= dimensiune <= 500:
+                raise ValueError('pagina trebuie sa fie >= 1, iar dimensiune intre 1 si 500')
+            atribute, tip_produs = fatete.citeste_filtre(request.query_params)
+
+            date_fatete = sarcini.calculeaza('fatete_atribute', {'atribute': atribute, 'tip_produs': tip_produs})
+            produse = ProdusSerializer.optimizeaza_queryset(
+                fatete.filtreaza_produse(atribute, tip_produs).order_by('nume', 'id'), request
+            )
+            start = (pagina - 1) * dimensiune
+            serializer = ProdusSerializer(produse[start:start + dimensiune], many=True, context={'request': request})
+            response_dict = {
+                'error': False,
+                'message': 'Produse filtrate dupa atribute',
+                'data': {
+                    'produse': serializer.data,
+                    'numar_produse': date_fatete['numar_produse'],
+                    'fatete': {'atribute': date_fatete['atribute'], 'tip_produs': date_fatete['tip_produs']},
+                },
+            }
+            return Response(response_dict, status=status.HTTP_200_OK)
+        except Exception as e:
+            response_dict = {'error': True, 'message': f'Eroare la filtrarea produselor: {str(e)}'}
+            return Response(response_dict, status=status.HTTP_400_BAD_REQUEST)
+
+def _autentifica_sse(request):
+    """
+    JWT din header-ul Authorization sau, pentru EventSource din browser (care nu poate trimite
+    header-e), din ?token=<access token>. Returnează angajatul sau None.
+    """
+    autentificare = JWTAuthentication()
+    try:
+        rezultat = autentificare.authenticate(request)
+        if rezultat is not None:
+            return rezultat[0]
+        token = request.GET.get('token')
+        if token:
+            return autentificare.get_user(autentificare.get_validated_token(token))
+    except AuthenticationFailed:
+        pass
+    return None
+
+
+class EvenimenteViewSet(View):
+    """
+    Important: Flux server-sent events cu modificările de stoc, facturile și cererile noi
+    View asincron: conexiunea rămâne deschisă fără să blocheze un worker, deci doar sub ASGI (worker-ii
+    uvicorn din gunicorn.conf.py, evenimentele trec între ei prin baza de date, vezi evenimente.py);
+    sub un server WSGI (runserver, clientul de test) răspunde 501
+    ex: GET /api/evenimente/?tipuri=stoc,cerere_noua&token=<access token>
+    """
+    http_method_names = ['get']
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({'error': True, 'message': 'Fluxul de evenimente necesita un server ASGI'},
+                                status=501)
+        angajat = await sync_to_async(_autentifica_sse)(request)
+        if angajat is None or not angajat.is_active:
+            return JsonResponse({'error': True, 'message': 'Autentificare necesara'}, status=401)
+
+        tipuri = request.GET.get('tipuri')
+        tipuri = [tip.strip() for tip in tipuri.split(',')] if tipuri else list(evenimente.TIPURI_EVENIMENTE)
+        necunoscute = [tip for tip in tipuri if tip not in evenimente.TIPURI_EVENIMENTE]
+        if necunoscute:
+            return JsonResponse({'error': True, 'message': f'Tipuri de evenimente necunoscute: {", ".join(necunoscute)}'},
+                                status=400)
+
+        response = StreamingHttpResponse(evenimente.flux_sse(tipuri), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # nginx: fără buffer, evenimentele pleacă imediat
+        return response
+
 #view angajati
 
 class AngajatViewSet(viewsets.ModelViewSet):
@@ -401,6 +855,7 @@ class AngajatViewSet(viewsets.ModelViewSet):
     queryset               = Angajat.objects.all()
     serializer_class       = AngajatSerializer
 
+    @idempotenta.idempotent
     def create(self, request):
         try:
             data = request.data.copy()
@@ -422,7 +877,7 @@ class AngajatViewSet(viewsets.ModelViewSet):
 
     def list(self, request):
         try:
-            angajati  = Angajat.objects.all()
+            angajati  = AngajatSerializer.optimizeaza_queryset(Angajat.objects.all(), request)
             serializer = AngajatSerializer(angajati, many=True, context={'request': request})
             return Response({'error': False, 'message': 'Date angajat listate', 'data': serializer.data},
                             status=status.HTTP_200_OK)
@@ -432,7 +887,7 @@ class AngajatViewSet(viewsets.ModelViewSet):
 
     def retrieve(self, request, pk=None):
         try:
-            angajat = get_object_or_404(Angajat, pk=pk)
+            angajat = get_object_or_404(AngajatSerializer.optimizeaza_queryset(Angajat.objects.all(), request), pk=pk)
             serializer = AngajatSerializer(angajat, context={'request': request})
             return Response({'error': False, 'message': 'Date angajat găsite', 'data': serializer.data},
                             status=status.HTTP_200_OK)
@@ -469,7 +924,9 @@ class BancaAngajatByAngIDViewSet(generics.ListAPIView):
 
     def get_queryset(self):
         id_angajat=self.kwargs["id_angajat"]
-        return BancaAngajat.objects.filter(id_angajat=id_angajat)
+        return BancaAngajatSerializer.optimizeaza_queryset(
+            BancaAngajat.objects.filter(id_angajat=id_angajat), self.request
+        )
 
 class SalariuAngajatByAngIDViewSet(generics.ListAPIView):
     serializer_class = SalariuAngajatSerializer
@@ -478,11 +935,14 @@ class SalariuAngajatByAngIDViewSet(generics.ListAPIView):
 
     def get_queryset(self):
         id_angajat=self.kwargs["id_angajat"]
-        return SalariuAngajat.objects.filter(id_angajat=id_angajat)
+        return SalariuAngajatSerializer.optimizeaza_queryset(
+            SalariuAngajat.objects.filter(id_angajat=id_angajat), self.request
+        )
 class BancaAngajatViewSet(viewsets.ViewSet):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @idempotenta.idempotent
     def create(self, request):
         try:
             serializer = BancaAngajatSerializer(data=request.data, context={'request': request})
@@ -496,7 +956,7 @@ class BancaAngajatViewSet(viewsets.ViewSet):
 
     def list(self, request):
         try:
-            bancaangajat = BancaAngajat.objects.all()
+            bancaangajat = BancaAngajatSerializer.optimizeaza_queryset(BancaAngajat.objects.all(), request)
             serializer = BancaAngajatSerializer(bancaangajat, many=True, context={'request': request})
             response_dict = {'error': False, 'message': 'Date banca angajat listate', 'data': serializer.data}
             return Response(response_dict, status=status.HTTP_200_OK)
@@ -506,7 +966,9 @@ class BancaAngajatViewSet(viewsets.ViewSet):
 
     def retrieve(self, request, pk=None):
         try:
-            bancaangajat = get_object_or_404(BancaAngajat, pk=pk)
+            bancaangajat = get_object_or_404(
+                BancaAngajatSerializer.optimizeaza_queryset(BancaAngajat.objects.all(), request), pk=pk
+            )
             serializer = BancaAngajatSerializer(bancaangajat, context={'request': request})
             response_data = {
                 "error": False,
@@ -537,6 +999,7 @@ class SalariuAngajatViewSet(viewsets.ViewSet):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @idempotenta.idempotent
     def create(self, request):
         try:
             serializer = SalariuAngajatSerializer(data=request.data, context={'request': request})
@@ -550,7 +1013,7 @@ class SalariuAngajatViewSet(viewsets.ViewSet):
 
     def list(self, request):
         try:
-            salariuangajat = SalariuAngajat.objects.all()
+            salariuangajat = SalariuAngajatSerializer.optimizeaza_queryset(SalariuAngajat.objects.all(), request)
             serializer = SalariuAngajatSerializer(salariuangajat, many=True, context={'request': request})
             response_dict = {'error': False, 'message': 'Date salariu angajat listate', 'data': serializer.data}
             return Response(response_dict, status=status.HTTP_200_OK)
@@ -560,7 +1023,9 @@ class SalariuAngajatViewSet(viewsets.ViewSet):
 
     def retrieve(self, request, pk=None):
         try:
-            salariuangajat = get_object_or_404(BancaAngajat, pk=pk)
+            salariuangajat = get_object_or_404(
+                SalariuAngajatSerializer.optimizeaza_queryset(SalariuAngajat.objects.all(), request), pk=pk
+            )
             serializer = SalariuAngajatSerializer(salariuangajat, context={'request': request})
             response_data = {
                 "error": False,
@@ -591,9 +1056,10 @@ class ProdusByNumeViewSet(generics.ListAPIView):
     serializer_class = ProdusSerializer
     authentication_classes = [JWTAuthentication]    # <- adăugat
     permission_classes     = [IsAuthenticated]      # <- adăugat
+    throttle_scope = 'catalog'
     def get_queryset(self):
         nume = self.kwargs["nume"]
-        return Produs.objects.filter(nume__contains=nume)
+        return ProdusSerializer.optimizeaza_queryset(Produs.objects.filter(nume__contains=nume), self.request)
 
 class GenerareFacturaViewSet(viewsets.ViewSet):
     """
@@ -603,21 +1069,22 @@ class GenerareFacturaViewSet(viewsets.ViewSet):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @idempotenta.idempotent
     def create(self, request):
         """
         Procesul complet de creare factură implică:
-        1. Crearea clientului
+        1. Identificarea clientului (existent după nume + contact, altfel creat)
         2. Crearea facturii cu referință la client
         3. Adăugarea detaliilor pentru fiecare produs
         4. Validarea și actualizarea stocului pentru fiecare produs
         """
         try:
             with transaction.atomic():
-                # 1. Creare client
+                # 1. Client existent (aceeași cheie nume + contact) sau client nou
                 client_ser = ClientSerializer(data=request.data, context={'request': request})
                 client_ser.is_valid(raise_exception=True)
-                client_ser.save()
-                id_client = client_ser.data['id']
+                client, _ = clienti.obtine_sau_creeaza_client(**client_ser.validated_data)
+                id_client = client.id
 
                 # 2. Creare factură
                 factura_ser = FacturaSerializer(
@@ -626,7 +1093,7 @@ class GenerareFacturaViewSet(viewsets.ViewSet):
                 )
                 factura_ser.is_valid(raise_exception=True)
                 factura_ser.save()
-                id_factura = factura_ser.data['id']
+                id_factura = factura_ser.instance.id
 
                 # 3. Pregătire detalii factură + validare stoc
                 lista_detalii = []
@@ -634,26 +1101,27 @@ class GenerareFacturaViewSet(viewsets.ViewSet):
                     prod_id = det['id']
                     cant = int(det['cantitate'])
 
-                    # blocăm rândul de produs pentru update concurrent
-                    produs = Produs.objects.select_for_update().get(id=prod_id)
-
-                    # validare stoc
-                    if cant > produs.stoc_total:
-                        # forțăm rollback și returnăm eroare
+                    # validare + actualizare stoc: rândul produsului blocat pentru update concurent,
+                    # sau un singur fragment la produsele cu stoc fragmentat (stocuri.py)
+                    try:
+                        produs = stocuri.scade_stoc(prod_id, cant)
+                    except stocuri.StocInsuficient as e:
+                        # ieșirea din atomic() cu return ar face commit la client, factură și stocul
+                        # deja scăzut pentru liniile anterioare: marcăm explicit tranzacția pentru rollback
+                        transaction.set_rollback(True)
                         return Response(
                             {
                                 'error': True,
                                 'message': (
-                                    f"Stoc epuizat pentru „{produs.nume}”. "
-                                    f"Ai doar {produs.stoc_total} unități."
+                                    f"Stoc epuizat pentru „{e.produs.nume}”. "
+                                    f"Ai doar {e.disponibil} unități."
                                 )
                             },
                             status=status.HTTP_400_BAD_REQUEST
                         )
-
-                    # actualizare stoc (nu poate scădea sub 0)
-                    produs.stoc_total = max(produs.stoc_total - cant, 0)
-                    produs.save()
+                    evenimente.publica_dupa_commit(evenimente.EVENIMENT_STOC, {
+                        'id_produs': produs.id, 'nume': produs.nume, 'stoc_total': produs.stoc_total,
+                    })
 
                     lista_detalii.append({
                         'id_produs': prod_id,
@@ -669,6 +1137,10 @@ class GenerareFacturaViewSet(viewsets.ViewSet):
                 )
                 detaliu_ser.is_valid(raise_exception=True)
                 detaliu_ser.save()
+                evenimente.publica_dupa_commit(evenimente.EVENIMENT_FACTURA_NOUA, {
+                    'id_factura': id_factura, 'id_client': id_client, 'nume_client': client.nume,
+                    'nr_produse': len(lista_detalii),
+                })
 
                 return Response(
                     {'error': False, 'message': 'Factura creată cu succes'},
@@ -681,6 +1153,64 @@ class GenerareFacturaViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+class FacturaViewSet(viewsets.ViewSet):
+    """
+    Important: Citirea facturilor - antet, client, linii și totaluri net / TVA / brut
+    Totalurile sunt adnotate în baza de date, deci lista costă un număr constant de interogări
+    Lista conține facturile curente (?arhiva=1 pentru cele arhivate); o factură arhivată se
+    găsește și după id, la fel ca înainte de arhivare
+    ex: ?id_client=3&data_start=2025-05-01&data_end=2025-05-31
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def _queryset(self, request, arhiva=False):
+        serializer_class = FacturaArhivaDetaliataSerializer if arhiva else FacturaDetaliataSerializer
+        model = FacturaArhiva if arhiva else Factura
+        return facturi.facturi_cu_totaluri(serializer_class.optimizeaza_queryset(model.objects.all(), request))
+
+    def list(self, request):
+        try:
+            arhiva = request.query_params.get('arhiva') in ('1', 'true')
+            queryset = self._queryset(request, arhiva).order_by('-data_adaugare', '-id')
+            id_client = request.query_params.get('id_client')
+            if id_client:
+                queryset = queryset.filter(id_client_id=id_client)
+            data_start = request.query_params.get('data_start')
+            if data_start:
+                queryset = queryset.filter(data_adaugare__date__gte=parse_date(data_start))
+            data_end = request.query_params.get('data_end')
+            if data_end:
+                queryset = queryset.filter(data_adaugare__date__lte=parse_date(data_end))
+            serializer_class = FacturaArhivaDetaliataSerializer if arhiva else FacturaDetaliataSerializer
+            serializer = serializer_class(queryset, many=True, context={'request': request})
+            response_dict = {'error': False, 'message': 'Facturi listate', 'data': serializer.data}
+            return Response(response_dict, status=status.HTTP_200_OK)
+        except Exception as e:
+            response_dict = {'error': True, 'message': f'Eroare la listarea facturilor: {str(e)}'}
+            return Response(response_dict, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def retrieve(self, request, pk=None):
+        try:
+            factura = self._queryset(request).filter(pk=pk).first()
+            if factura is not None:
+                serializer = FacturaDetaliataSerializer(factura, context={'request': request})
+            else:
+                factura = get_object_or_404(self._queryset(request, arhiva=True), pk=pk)
+                serializer = FacturaArhivaDetaliataSerializer(factura, context={'request': request})
+            response_data = {
+                "error": False,
+                "message": "Factura gasita",
+                "data": serializer.data
+            }
+            return Response(response_data, status=status.HTTP_200_OK)
+        except Exception as e:
+            response_data = {
+                "error": True,
+                "message": f"Eroare la obtinerea facturii: {str(e)}"
+            }
+            return Response(response_data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 class CerereClientViewSet(viewsets.ModelViewSet):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
@@ -689,7 +1219,7 @@ class CerereClientViewSet(viewsets.ModelViewSet):
 
     def list(self, request):
         try:
-            cerereclient = CerereClient.objects.all()
+            cerereclient = CerereClientSerializer.optimizeaza_queryset(CerereClient.objects.all(), request)
             serializer = CerereClientSerializer(cerereclient, many=True, context={'request': request})
             response_dict = {'error': False, 'message': 'Clienti listati', 'data': serializer.data}
             return Response(response_dict, status=status.HTTP_200_OK)
@@ -697,11 +1227,13 @@ class CerereClientViewSet(viewsets.ModelViewSet):
             response_dict = {'error': True, 'message': f'Eroare la listarea clientilor: {str(e)}'}
             return Response(response_dict, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @idempotenta.idempotent
     def create(self, request):
         try:
             serializer = CerereClientSerializer(data=request.data, context={'request': request})
             serializer.is_valid(raise_exception=True)
             serializer.save()
+            evenimente.publica_dupa_commit(evenimente.EVENIMENT_CERERE_NOUA, serializer.data)
             response_dict = {'error': False, 'message': 'Client creat cu succes'}
             return Response(response_dict, status=status.HTTP_201_CREATED)
         except Exception as e:
@@ -722,7 +1254,9 @@ class CerereClientViewSet(viewsets.ModelViewSet):
 
     def retrieve(self, request, pk=None):
         try:
-            cerereclient = get_object_or_404(CerereClient, pk=pk)
+            cerereclient = get_object_or_404(
+                CerereClientSerializer.optimizeaza_queryset(CerereClient.objects.all(), request), pk=pk
+            )
             serializer = CerereClientSerializer(cerereclient, context={'request': request})
 
             data_serializer = serializer.data
@@ -740,116 +1274,215 @@ class CerereClientViewSet(viewsets.ModelViewSet):
             }
             return Response(response_data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class PotrivireCerereViewSet(viewsets.ViewSet):
+    """
+    Important: Cererile clienților în așteptare care pot fi satisfăcute de produse intrate în stoc,
+    cele mai sigure potriviri primele (scor = fracția din cuvintele cererii regăsite în produs)
+    Potrivirile sunt calculate la crearea / reaprovizionarea produselor, dintr-un index inversat (potriviri.py)
+    DELETE respinge o potrivire; o cerere marcată rezolvată (status=true) își pierde potrivirile
+    ex: GET /api/potriviri_cereri/?id_produs=12&pagina=1&dimensiune=50
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        try:
+            pagina = int(request.query_params.get('pagina', 1))
+            dimensiune = int(request.query_params.get('dimensiune', 50))
+            if pagina < 1 or not 1 <= dimensiune <= 500:
+                raise ValueError('pagina trebuie sa fie >= 1, iar dimensiune intre 1 si 500')
+            queryset = PotrivireCerere.objects.select_related('id_cerere', 'id_produs').filter(id_cerere__status=False)
+            for parametru in ('id_cerere', 'id_produs'):
+                if request.query_params.get(parametru):
+                    queryset = queryset.filter(**{parametru: int(request.query_params[parametru])})
+            queryset = queryset.order_by('-scor', '-data_potrivire', '-id')
+            start = (pagina - 1) * dimensiune
+            serializer = PotrivireCerereSerializer(queryset[start:start + dimensiune], many=True)
+            response_dict = {'error': False, 'message': 'Potriviri cereri', 'data': serializer.data}
+            return Response(response_dict, status=status.HTTP_200_OK)
+        except Exception as e:
+            response_dict = {'error': True, 'message': f'Eroare la listarea potrivirilor: {str(e)}'}
+            return Response(response_dict, status=status.HTTP_400_BAD_REQUEST)
+
+    def destroy(self, request, pk=None):
+        try:
+            potrivire = get_object_or_404(PotrivireCerere, pk=pk)
+            potrivire.delete()
+            return Response({'error': False, 'message': 'Potrivire respinsa'}, status=status.HTTP_200_OK)
+        except Exception as e:
+            response_dict = {'error': True, 'message': f'Eroare la respingerea potrivirii: {str(e)}'}
+            return Response(response_dict, status=status.HTTP_404_NOT_FOUND)
+
 class ApiAcasaViewSet(viewsets.ViewSet):
     """
     Important: Endpoint pentru dashboard/pagina principală
     Agregă date din multiple modele pentru a oferi o imagine de ansamblu
+    Calculul (vanzari.date_acasa) este memorat până la următoarea modificare a datelor;
+    cu ?asincron=1 este pus în coada de sarcini și se răspunde imediat cu sarcina (202)
     """
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'dashboard'
     def list(self, request):
-        cerere_client = CerereClient.objects.all()
-        cerere_client_serializer = CerereClientSerializer(cerere_client, many=True, context={'request': request})
+        if request.query_params.get('asincron'):
+            sarcina = sarcini.trimite_sarcina('acasa', angajat=request.user)
+            return raspuns_sarcina(sarcina)
 
-        nr_facturi = Factura.objects.all()
-        nr_facturi_serializer = FacturaSerializer(nr_facturi, many=True, context={'request': request})
+        dict_response = {
+            "error": False,
+            "message": "Date pagina acasa",
+            **sarcini.calculeaza('acasa'),
+        }
+        return Response(dict_response)
 
-        total_produse = Produs.objects.all()
-        total_produse_serializer = ProdusSerializer(total_produse, many=True, context={'request': request})
+class IgnoraNegociereContinut(BaseContentNegotiation):
+    """
+    Negociere care acceptă orice header Accept (ex. text/csv): endpoint-urile de export
+    își construiesc singure răspunsul în flux, renderer-ul DRF e folosit doar pentru erori.
+    """
+    def select_parser(self, request, parsers):
+        return parsers[0]
 
-        total_furnizori = Furnizor.objects.all()
-        total_furnizori_serializer = FurnizorSerializer(total_furnizori, many=True, context={'request': request})
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return (renderers[0], renderers[0].media_type)
 
-        total_angajati= Angajat.objects.all()
-        total_angajati_serializer = AngajatSerializer(total_angajati, many=True, context={'request': request})
-        #aici am ramas
 
-        detalii_factura=DetaliiFactura.objects.all()
-        suma_profit=0
-        suma_vanzare=0
-        suma_cumparare=0
+class ExportViewSet(APIView):
+    """
+    Important: Export contabil în flux (CSV sau XLSX)
+    ex: GET /api/export/facturi/?tip=xlsx&data_start=2025-05-01&data_end=2025-05-31
+    Resurse: facturi, produse, contfurnizor, salarii
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'export'
+    content_negotiation_class = IgnoraNegociereContinut
 
-        for det in detalii_factura:
-            cant = det.cantitate
-            suma_cumparare += float(det.id_produs.pret_cumparare) * cant
-            suma_vanzare += float(det.id_produs.pret_vanzare) * cant
+    def get(self, request, resursa):
+        if resursa not in exporturi.EXPORTURI:
+            return Response({'error': True, 'message': f'Resursa de export necunoscuta: {resursa}'},
+                            status=status.HTTP_404_NOT_FOUND)
 
-        suma_profit = suma_vanzare - suma_cumparare
+        tip = request.query_params.get('tip', 'csv').lower()
+        if tip not in ('csv', 'xlsx'):
+            return Response({'error': True, 'message': 'Parametrul tip trebuie sa fie csv sau xlsx'},
+                            status=status.HTTP_400_BAD_REQUEST)
 
-        cerere_client_asteptare = CerereClient.objects.filter(status=False)
-        cerere_client_asteptare_serializer = CerereClientSerializer(cerere_client_asteptare, many=True, context={'request': request})
+        try:
+            data_start = self._citeste_data(request, 'data_start')
+            data_end = self._citeste_data(request, 'data_end')
+        except ValueError as e:
+            return Response({'error': True, 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        interogari = exporturi.construieste_interogari(resursa, data_start, data_end)
+        antete = exporturi.antete_export(resursa)
+        randuri = exporturi.randuri_export(resursa, interogari)
+
+        if tip == 'xlsx':
+            response = StreamingHttpResponse(
+                exporturi.flux_pentru_server(request, exporturi.flux_xlsx(antete, randuri)),
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            )
+        else:
+            response = StreamingHttpResponse(
+                exporturi.flux_pentru_server(request, exporturi.flux_csv(antete, randuri)),
+                content_type='text/csv; charset=utf-8'
+            )
+        response['Content-Disposition'] = f'attachment; filename="{resursa}.{tip}"'
+        return response
+
+    @staticmethod
+    def _citeste_data(request, parametru):
+        valoare = request.query_params.get(parametru)
+        if not valoare:
+            return None
+        data = parse_date(valoare)
+        if data is None:
+            raise ValueError(f'Data invalida pentru {parametru}: {valoare} (format asteptat AAAA-LL-ZZ)')
+        return data
 
-        cerere_client_completate = CerereClient.objects.filter(status=True)
-        cerere_client_completate_serializer = CerereClientSerializer(cerere_client_completate, many=True, context={'request': request})
+# Definirea endpoint-urilor
+router = DefaultRouter()
+router.register(r'furnizor', FurnizorViewSet, basename='furnizor')
+router.register(r'banca-furnizor', BancaFurnizorViewSet, basename='banca-furnizor')
+router.register(r'produs', ProdusViewSet, basename='produs')
 
-        azi = timezone.localdate()
-        azi1 = timezone.localdate()
-        data_curenta_7zile = azi1 + timedelta(days=7)
-        detalii_factura_azi = DetaliiFactura.objects.filter(data_adaugare__date=azi)
-        suma_profit_azi=0
-        suma_vanzare_azi=0
-        suma_cumparare_azi=0
+urlpatterns = router.urls
 
-        for factura in detalii_factura_azi:
-            suma_cumparare_azi += float(factura.id_produs.pret_cumparare) * factura.cantitate
-            suma_vanzare_azi += float(factura.id_produs.pret_vanzare) * factura.cantitate
 
-        suma_profit_azi = suma_vanzare_azi - suma_cumparare_azi
+def raspuns_sarcina(sarcina):
+    """Răspunsul standard pentru o sarcină trimisă în fundal: 202 cât timp nu e gata, 200 dacă e deja finalizată."""
+    cod = status.HTTP_200_OK if sarcina.stare == Sarcina.STARE_FINALIZATA else status.HTTP_202_ACCEPTED
+    response_dict = {'error': False, 'message': 'Sarcina trimisa', 'data': SarcinaSerializer(sarcina).data}
+    return Response(response_dict, status=cod)
 
-        produse_expirate = Produs.objects.filter(
-            data_expirare__range=[azi, data_curenta_7zile]
-        )
 
-        produse_expirate_serializer = ProdusSerializer(produse_expirate, many=True, context={'request': request})
+class SarcinaViewSet(viewsets.ViewSet):
+    """
+    Important: Sarcini în fundal pentru calculele grele (dashboard, rapoarte, reconcilieri)
+    POST {"tip": "raport_salarii", "parametri": {...}} -> sarcina; GET /<id>/ -> starea ei
+    Sarcinile sunt executate de comanda ruleaza_sarcini; fiecare angajat își vede doar sarcinile proprii
+    Tipurile de mentenanță (arhivare, reconcilieri, curățenie) pot fi trimise doar de administratori
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
 
-        data_facturi=DetaliiFactura.objects.order_by().values("data_adaugare__date").distinct()
+    def _queryset(self, request):
+        queryset = Sarcina.objects.all()
+        if not request.user.is_staff:
+            queryset = queryset.filter(id_angajat=request.user)
+        return queryset
 
-        lista_profit_diagrama=[]
-        lista_vanzare_diagrama=[]
-        lista_cumparare_diagrama=[]
+    @idempotenta.idempotent
+    def create(self, request):
+        try:
+            tip = request.data.get('tip')
+            if sarcini.necesita_admin(tip) and not EsteAdmin().has_permission(request, self):
+                response_dict = {'error': True, 'message': f'Doar administratorii pot trimite sarcini de tipul {tip}'}
+                return Response(response_dict, status=status.HTTP_403_FORBIDDEN)
+            parametri = request.data.get('parametri') or {}
+            sarcina = sarcini.trimite_sarcina(tip, parametri, angajat=request.user)
+            return raspuns_sarcina(sarcina)
+        except Exception as e:
+            response_dict = {'error': True, 'message': f'Eroare la trimiterea sarcinii: {str(e)}'}
+            return Response(response_dict, status=status.HTTP_400_BAD_REQUEST)
 
-        for datafactura in data_facturi:
-            data_acces = datafactura["data_adaugare__date"]
-            detalii_list = DetaliiFactura.objects.filter(data_adaugare__date=data_acces)
-            suma_cumparare_inner = 0
-            suma_vanzare_inner = 0
+    def list(self, request):
+        try:
+            queryset = self._queryset(request).order_by('-id')[:100]
+            serializer = SarcinaSerializer(queryset, many=True)
+            response_dict = {'error': False, 'message': 'Sarcini listate', 'data': serializer.data}
+            return Response(response_dict, status=status.HTTP_200_OK)
+        except Exception as e:
+            response_dict = {'error': True, 'message': f'Eroare la listarea sarcinilor: {str(e)}'}
+            return Response(response_dict, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            # iterăm lista de DetaliiFactura, nu lista de date
-            for det in detalii_list:
-                suma_cumparare_inner += float(det.id_produs.pret_cumparare) * det.cantitate
-                suma_vanzare_inner += float(det.id_produs.pret_vanzare) * det.cantitate
+    def retrieve(self, request, pk=None):
+        try:
+            sarcina = get_object_or_404(self._queryset(request).defer('rezultat'), pk=pk)
+            serializer = SarcinaSerializer(sarcina)
+            response_dict = {'error': False, 'message': 'Stare sarcina', 'data': serializer.data}
+            return Response(response_dict, status=status.HTTP_200_OK)
+        except Exception as e:
+            response_dict = {'error': True, 'message': f'Eroare la obtinerea sarcinii: {str(e)}'}
+            return Response(response_dict, status=status.HTTP_404_NOT_FOUND)
 
-            suma_profit_inner = suma_vanzare_inner - suma_cumparare_inner
-            lista_profit_diagrama.append({"data":data_acces,"suma":suma_profit_inner})
-            lista_vanzare_diagrama.append({"data":data_acces,"suma":suma_vanzare_inner})
-            lista_cumparare_diagrama.append({"data":data_acces,"suma":suma_cumparare_inner})
 
-        dict_response = {
-            "error": False,
-            "message": "Date pagina acasa",
-            "cerere_client": len(cerere_client_serializer.data),
-            "nr_facturi": len(nr_facturi_serializer.data),
-            "total_produse": len(total_produse_serializer.data),
-            "total_furnizori": len(total_furnizori_serializer.data),
-            "total_angajati": len(total_angajati_serializer.data),
-            "suma_vanzare": f"{suma_vanzare:.2f}",
-            "suma_cumparare": f"{suma_cumparare:.2f}",
-            "suma_profit": f"{suma_profit:.2f}",
-            "cerere_client_asteptare": len(cerere_client_asteptare_serializer.data),
-            "cerere_client_completate": len(cerere_client_completate_serializer.data),
-            "suma_vanzare_azi": f"{suma_vanzare_azi:.2f}",
-            "suma_profit_azi": f"{suma_profit_azi:.2f}",
-            "data_produse_expirate_serializer": produse_expirate.count(),
-            "diagrama_vanzari": lista_vanzare_diagrama,
-            "diagrama_cumparare": lista_cumparare_diagrama,
-            "diagrama_profit": lista_profit_diagrama,
-        }
-        return Response(dict_response)
+class SarcinaRezultatViewSet(SarcinaViewSet):
+    """Rezultatul unei sarcini finalizate; 202 cât timp sarcina așteaptă sau rulează."""
 
-# Definirea endpoint-urilor
-router = DefaultRouter()
-router.register(r'furnizor', FurnizorViewSet, basename='furnizor')
-router.register(r'banca-furnizor', BancaFurnizorViewSet, basename='banca-furnizor')
-router.register(r'produs', ProdusViewSet, basename='produs')
+    def retrieve(self, request, pk=None):
+        try:
+            sarcina = get_object_or_404(self._queryset(request), pk=pk)
+        except Exception as e:
+            response_dict = {'error': True, 'message': f'Eroare la obtinerea sarcinii: {str(e)}'}
+            return Response(response_dict, status=status.HTTP_404_NOT_FOUND)
 
-urlpatterns = router.urls
\ No newline at end of file
+        if sarcina.stare == Sarcina.STARE_FINALIZATA:
+            response_dict = {'error': False, 'message': 'Rezultat sarcina', 'data': sarcina.rezultat}
+            return Response(response_dict, status=status.HTTP_200_OK)
+        if sarcina.stare == Sarcina.STARE_EROARE:
+            response_dict = {'error': True, 'message': 'Sarcina a esuat', 'data': SarcinaSerializer(sarcina).data}
+            return Response(response_dict, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        response_dict = {'error': False, 'message': 'Sarcina nu este inca finalizata', 'data': SarcinaSerializer(sarcina).data}
+        return Response(response_dict, status=status.HTTP_202_ACCEPTED)
@@ -10,3 +10,6 @@ python manage.py collectstatic --no-input
 # 2. Creează/actualizează schema
 python manage.py migrate
 
+# 3. Tabela cache-ului comun proceselor (CACHES în settings.py); nu face nimic dacă există deja
+python manage.py createcachetable
+
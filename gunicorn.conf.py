@@ -0,0 +1,26 @@
+# gunicorn.conf.py
+# Configurația gunicorn (citită automat din directorul curent):
+#   gunicorn SistemDeManagementInventar.asgi:application
+# - worker-i uvicorn (ASGI): fluxul /api/evenimente/ ține conexiuni deschise fără să ocupe un worker;
+#   evenimentele ajung între worker-i prin tabela EvenimentFlux (evenimente.py)
+# - preload_app: aplicația se încarcă o singură dată, în master, și este încălzită acolo
+#   (serializere, rute, cache); worker-ii o moștenesc la fork, copy-on-write
+# - fiecare worker își verifică conexiunea la baza de date imediat după pornire, nu la prima cerere
+#   (sub ASGI view-urile sincrone rulează în fire proprii, cu conexiunile lor)
+# Etapele sunt în SistemManagementInventar/incalzire.py; benchmark_pornire le măsoară efectul.
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+worker_class = 'uvicorn_worker.UvicornWorker'
+preload_app = True
+
+
+def when_ready(server):
+    from SistemManagementInventar import incalzire
+    server.log.info("Incalzire master (ms): %s", incalzire.incalzeste_master())
+
+
+def post_worker_init(worker):
+    from SistemManagementInventar import incalzire
+    worker.log.info("Incalzire worker %s (ms): %s", worker.pid, incalzire.incalzeste_lucrator())